@@ -0,0 +1,142 @@
+"""
+챗 요청 성능 계측 모듈
+
+요청 하나마다 대기 시간(queue wait), 업스트림 연결 시간, 첫 토큰까지의 시간(TTFT),
+전체 생성 시간, 프롬프트/응답 토큰 수, 초당 토큰 수를 모델별로 기록한다.
+게이트웨이와 챗봇 서비스가 각자의 접두사(prefix)로 같은 계측을 사용한다.
+"""
+import time
+from dataclasses import dataclass
+from common.metrics import REGISTRY, TOKEN_BUCKETS, RATE_BUCKETS
+
+
+@dataclass
+class ChatTiming:
+    """한 요청의 측정값 (측정하지 못한 값은 None)"""
+    model: str
+    status: str = "success"
+    queue_wait: float = None
+    connect: float = None
+    ttft: float = None
+    total: float = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # False면 응답이 한 번에 도착하므로 TTFT 이후 구간이 아닌 전체 시간으로 속도 계산
+    streamed: bool = True
+
+    @property
+    def tokens_per_second(self):
+        """첫 토큰 이후 구간의 생성 속도 (TTFT가 없으면 전체 시간 기준)"""
+        if not self.completion_tokens or self.total is None:
+            return None
+        window = self.total - (self.ttft or 0.0) if self.streamed else self.total
+        if window <= 0:
+            window = self.total
+        return self.completion_tokens / window if window > 0 else None
+
+
+class ChatTelemetry:
+    """
+    모델별 챗 성능 지표
+
+    Args:
+        prefix: 메트릭 이름 접두사 (예: "chatbot", "gateway")
+        registry: 메트릭 저장소
+    """
+
+    def __init__(self, prefix, registry=REGISTRY):
+        labels = ("model",)
+        self.requests = registry.counter(
+            f"{prefix}_chat_requests_total", "Chat requests by model and status", ("model", "status"))
+        self.queue_wait = registry.histogram(
+            f"{prefix}_chat_queue_wait_seconds", "Time spent waiting before the chat request was processed", labels)
+        self.connect = registry.histogram(
+            f"{prefix}_chat_upstream_connect_seconds", "Time to connect to the upstream", labels)
+        self.ttft = registry.histogram(
+            f"{prefix}_chat_time_to_first_token_seconds", "Time to first token", labels)
+        self.total = registry.histogram(
+            f"{prefix}_chat_generation_seconds", "Total generation time", labels)
+        self.prompt_tokens = registry.counter(
+            f"{prefix}_chat_prompt_tokens_total", "Prompt tokens", labels)
+        self.completion_tokens = registry.counter(
+            f"{prefix}_chat_completion_tokens_total", "Completion tokens", labels)
+        self.prompt_tokens_hist = registry.histogram(
+            f"{prefix}_chat_prompt_tokens", "Prompt tokens per request", labels, buckets=TOKEN_BUCKETS)
+        self.completion_tokens_hist = registry.histogram(
+            f"{prefix}_chat_completion_tokens", "Completion tokens per request", labels, buckets=TOKEN_BUCKETS)
+        self.tokens_per_second = registry.histogram(
+            f"{prefix}_chat_tokens_per_second", "Generation speed in tokens per second", labels, buckets=RATE_BUCKETS)
+
+    def record(self, timing):
+        """ChatTiming 하나를 기록"""
+        model = timing.model
+        self.requests.inc(model=model, status=timing.status)
+        for histogram, value in (
+            (self.queue_wait, timing.queue_wait),
+            (self.connect, timing.connect),
+            (self.ttft, timing.ttft),
+            (self.total, timing.total),
+        ):
+            if value is not None:
+                histogram.observe(value, model=model)
+        if timing.status != "success":
+            return
+        if timing.prompt_tokens:
+            self.prompt_tokens.inc(timing.prompt_tokens, model=model)
+            self.prompt_tokens_hist.observe(timing.prompt_tokens, model=model)
+        if timing.completion_tokens:
+            self.completion_tokens.inc(timing.completion_tokens, model=model)
+            self.completion_tokens_hist.observe(timing.completion_tokens, model=model)
+        rate = timing.tokens_per_second
+        if rate is not None:
+            self.tokens_per_second.observe(rate, model=model)
+
+    def stats(self):
+        """모델별 집계 (stats 엔드포인트용)"""
+        models = {}
+
+        def entry(model):
+            return models.setdefault(model, {"requests": {}})
+
+        for (model, status), count in self.requests.snapshot().items():
+            entry(model)["requests"][status] = count
+        for name, histogram in (
+            ("queue_wait_seconds", self.queue_wait),
+            ("connect_seconds", self.connect),
+            ("ttft_seconds", self.ttft),
+            ("generation_seconds", self.total),
+            ("tokens_per_second", self.tokens_per_second),
+        ):
+            for (model,), summary in histogram.snapshot().items():
+                entry(model)[name] = summary
+        for name, counter in (
+            ("prompt_tokens", self.prompt_tokens),
+            ("completion_tokens", self.completion_tokens),
+        ):
+            for (model,), value in counter.snapshot().items():
+                entry(model)[name] = value
+        return {"models": models}
+
+
+class ReceivedAtMiddleware:
+    """
+    요청 수신 시각을 request.state.received_at 에 기록하는 ASGI 미들웨어
+
+    동기 핸들러는 스레드풀에서 실행되므로, 핸들러 시작 시각과의 차이가 대기 시간(queue wait)이 된다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["received_at"] = time.perf_counter()
+        await self.app(scope, receive, send)
+
+
+def queue_wait_since(request):
+    """ReceivedAtMiddleware 기록 시각부터 지금까지의 시간 (기록이 없으면 None)"""
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is None:
+        return None
+    return time.perf_counter() - received_at
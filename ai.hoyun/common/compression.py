@@ -0,0 +1,162 @@
+"""
+서비스 공통 응답 압축 (gzip / brotli)
+
+- negotiate(): Accept-Encoding(q 값 포함)에서 사용할 인코딩 선택 (brotli 모듈이 있으면 br 우선)
+- compress(): 본문 압축
+- CompressionMiddleware: 최소 크기 이상인 압축 가능한 응답(JSON, 텍스트)을 한 번에 압축.
+  스트리밍 응답(프록시, SSE)과 이미 Content-Encoding이 있는 응답은 그대로 전달한다.
+
+brotli는 선택 의존성이다 (없으면 gzip만 사용).
+
+환경 변수:
+- HTTP_COMPRESSION_MIN_SIZE: 압축할 최소 본문 크기 (바이트, 기본 1024)
+"""
+import gzip
+import os
+from starlette.datastructures import Headers, MutableHeaders  # type: ignore
+from common.http_cache import encoded_etag
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+MIN_SIZE = int(os.getenv("HTTP_COMPRESSION_MIN_SIZE", "1024"))
+
+# 요청마다 압축할 때의 수준 (응답 지연과 압축률의 절충)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# 같은 q 값이면 앞쪽을 선택
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml",
+                       "image/svg+xml", "application/x-ndjson")
+
+
+def negotiate(accept_encoding, supported=SUPPORTED_ENCODINGS):
+    """
+    Accept-Encoding에서 사용할 인코딩 선택
+
+    Args:
+        accept_encoding: Accept-Encoding 헤더 값
+        supported: 서버가 지원하는 인코딩 (선호 순)
+
+    Returns:
+        str | None: 인코딩 (압축하지 않으면 None)
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body, encoding, level=None):
+    """
+    본문 압축
+
+    Args:
+        body: 원본 bytes
+        encoding: "gzip" 또는 "br"
+        level: 압축 수준 (None이면 요청별 기본값, 미리 압축해 캐시하는 경우 높게)
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY if level is None else level)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+    raise ValueError(f"unsupported encoding: {encoding}")
+
+
+def is_compressible(content_type):
+    content_type = (content_type or "").lower()
+    # SSE는 이벤트마다 바로 보내야 하므로 제외
+    if content_type.startswith("text/event-stream"):
+        return False
+    return any(content_type.startswith(t) for t in _COMPRESSIBLE_TYPES)
+
+
+def add_vary(headers, value="Accept-Encoding"):
+    """Vary 헤더에 값 추가 (이미 있으면 그대로)"""
+    current = headers.get("vary", "")
+    if value.lower() not in [v.strip().lower() for v in current.split(",")]:
+        headers["vary"] = f"{current}, {value}" if current else value
+
+
+class CompressionMiddleware:
+    """
+    응답 압축 ASGI 미들웨어
+
+    Args:
+        app: ASGI 앱
+        minimum_size: 압축할 최소 본문 크기 (바이트)
+    """
+
+    def __init__(self, app, minimum_size=MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if "content-encoding" in headers or not is_compressible(headers.get("content-type")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # 스트리밍 응답: 모으지 않고 그대로 보냄
+                await send(start)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            # 압축 여부가 Accept-Encoding에 따라 달라지므로 작은 본문에도 Vary를 남김
+            add_vary(headers)
+            if encoding is not None and len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+                if "etag" in headers:
+                    headers["etag"] = encoded_etag(headers["etag"], encoding)
+            await send({**start, "headers": headers.raw})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,41 @@
+"""
+서비스 공통 gunicorn 설정 (uvicorn 워커)
+
+각 서비스 Dockerfile이 `gunicorn main:app -c common/gunicorn_conf.py`로 실행한다.
+워커 수만큼 프로세스(코어)를 쓰며, 워커끼리 공유해야 하는 상태는 common.shared_state를 통해 주고받는다.
+
+워커 재시작(GUNICORN_MAX_REQUESTS)이나 종료 신호를 받으면 워커는 새 요청을 받지 않고
+처리 중인 요청(예: 5분짜리 Netflix 크롤링)이 끝날 때까지 기다린 뒤 종료한다.
+GUNICORN_GRACEFUL_TIMEOUT / GUNICORN_TIMEOUT은 서비스에서 가장 오래 걸리는 요청보다 길게 잡는다.
+
+환경 변수:
+- PORT: 수신 포트
+- WEB_CONCURRENCY: 워커 프로세스 수 (기본 1)
+- GUNICORN_MAX_REQUESTS: 워커가 이만큼 요청을 처리하면 새 워커로 교체 (0이면 교체하지 않음)
+- GUNICORN_MAX_REQUESTS_JITTER: 워커들이 동시에 교체되지 않도록 더하는 임의 값의 최대치
+- GUNICORN_GRACEFUL_TIMEOUT: 종료/교체 시 처리 중인 요청을 기다리는 최대 시간 (초)
+- GUNICORN_TIMEOUT: 이 시간 동안 응답이 없는 워커는 강제 종료 (초, 교체 중인 워커에도 적용)
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+
+# 워커마다 lifespan에서 DB 연결/스레드를 만들므로 앱을 fork 전에 불러오지 않음
+preload_app = False
+
+# 요청 로그는 앱의 JSON 로깅(common.log)과 계측 미들웨어가 남김
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def worker_exit(server, worker):
+    server.log.info("worker exited (pid %s)", worker.pid)
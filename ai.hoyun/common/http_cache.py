@@ -0,0 +1,165 @@
+"""
+서비스 공통 조건부 GET (ETag / If-None-Match)
+
+- make_etag(): 내용 해시 또는 버전 값으로 강한 ETag 생성
+- not_modified(): 엔드포인트가 본문을 만들기 전에 버전 ETag로 304 여부 판단 (본문을 다시 계산하지 않음)
+- ConditionalGetMiddleware: ETag를 직접 달지 않은 GET 응답은 본문 해시로 ETag를 달고,
+  If-None-Match가 일치하면 본문 대신 304를 보냄 (계산은 하지만 전송량은 줄어듦)
+
+압축된 표현은 같은 내용이라도 바이트가 다르므로 ETag에 인코딩 접미사를 붙인다 ("<hash>-gzip").
+If-None-Match 비교 시에는 접미사를 떼고 비교하므로 어떤 인코딩으로 받은 ETag든 304가 된다.
+"""
+import hashlib
+from starlette.datastructures import Headers, MutableHeaders  # type: ignore
+
+# 압축 표현의 ETag 접미사 (common.compression이 붙임)
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+# 304 응답에 남기는 헤더 (RFC 9110 15.4.5)
+_NOT_MODIFIED_HEADERS = frozenset({"etag", "cache-control", "vary", "expires", "content-location", "date"})
+
+# 본문 해시 ETag를 계산할 최대 본문 크기 (이보다 크면 그대로 전달)
+MAX_HASHED_BODY = 8 * 1024 * 1024
+
+
+def make_etag(*parts):
+    """
+    강한 ETag 생성
+
+    Args:
+        *parts: bytes(본문) 또는 버전을 이루는 값들 (예: "diaries", user_id, version)
+
+    Returns:
+        str: 따옴표로 감싼 ETag
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()}"'
+
+
+def encoded_etag(etag, encoding):
+    """압축 표현의 ETag ("<hash>" → "<hash>-gzip")"""
+    if not etag or encoding in (None, "identity") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def identity_etag(etag):
+    """압축 표현의 ETag에서 인코딩 접미사 제거 ("<hash>-gzip" → "<hash>", 압축을 풀어 다시 보낼 때)"""
+    if not etag:
+        return etag
+    for suffix in ENCODING_SUFFIXES:
+        if etag.endswith(f'{suffix}"'):
+            return f'{etag[:-len(suffix) - 1]}"'
+    return etag
+
+
+def _opaque(tag):
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def etag_matches(if_none_match, etag):
+    """
+    If-None-Match가 ETag와 일치하는지 (약한 비교, 인코딩 접미사 무시)
+
+    Args:
+        if_none_match: If-None-Match 헤더 값 (쉼표로 구분한 목록 또는 "*")
+        etag: 현재 표현의 ETag
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(tag) == current for tag in if_none_match.split(","))
+
+
+def not_modified(request, etag, headers=None):
+    """
+    요청의 If-None-Match가 etag와 일치하면 304 응답, 아니면 None
+
+    Args:
+        request: Starlette Request
+        etag: 현재 버전의 ETag
+        headers: 304에도 함께 보낼 헤더 (Cache-Control, Vary 등)
+    """
+    from starlette.responses import Response  # type: ignore
+
+    if request.method not in ("GET", "HEAD") or not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag})
+
+
+class ConditionalGetMiddleware:
+    """
+    GET/HEAD 200 응답에 본문 해시 ETag를 달고 If-None-Match가 일치하면 304로 바꾸는 ASGI 미들웨어
+
+    본문이 한 번에 오는 응답(JSONResponse 등)만 처리하고, 스트리밍 응답(프록시, SSE)과
+    이미 ETag나 Content-Encoding이 있는 응답은 그대로 전달한다.
+
+    Args:
+        app: ASGI 앱
+        cache_control: ETag를 단 응답에 Cache-Control이 없을 때 넣을 값 (None이면 넣지 않음)
+    """
+
+    def __init__(self, app, cache_control="no-cache"):
+        self.app = app
+        self.cache_control = cache_control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = None
+        passthrough = False
+
+        async def send_with_etag(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if message["status"] != 200 or "etag" in headers or "content-encoding" in headers:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) > MAX_HASHED_BODY:
+                # 스트리밍 응답: 해시를 위해 모으지 않고 그대로 보냄
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            etag = make_etag(body)
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            headers["etag"] = etag
+            if self.cache_control and "cache-control" not in headers:
+                headers["cache-control"] = self.cache_control
+            if etag_matches(if_none_match, etag):
+                raw = [(k, v) for k, v in headers.raw if k.decode("latin-1").lower() in _NOT_MODIFIED_HEADERS]
+                await send({"type": "http.response.start", "status": 304, "headers": raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({**start, "headers": headers.raw})
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
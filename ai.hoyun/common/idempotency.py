@@ -0,0 +1,189 @@
+"""
+서비스 공통 Idempotency-Key 저장소
+
+같은 키로 동시에 들어온 요청은 실행 하나(in-flight, 게이트웨이는 업스트림 호출, 챗봇은 completion)를 공유하고,
+보존 기간(TTL) 안에 다시 들어온 요청은 저장된 결과를 돌려받는다.
+최대 항목 수가 정해진 LRU 구조이며, 실패한 실행은 저장하지 않아 같은 키로 재시도할 수 있다.
+
+워커 프로세스가 여러 개면 공유 상태 저장소(common.shared_state)에 키별 락과 완료된 결과를 두어
+다른 워커로 들어온 같은 키의 요청도 실행 하나를 공유한다.
+이벤트 루프 안에서만 사용한다 (블로킹 작업은 func 안에서 스레드 풀로 넘김).
+"""
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+
+# 공유 저장소 키 접두사
+_RESULT_PREFIX = "idem:"
+_LOCK_PREFIX = "idem-lock:"
+
+# 다른 워커가 처리 중인 키의 결과를 확인하는 간격 (초)
+_POLL_INTERVAL = 0.05
+
+
+class IdempotencyConflict(Exception):
+    """같은 키가 다른 요청 본문으로 재사용됨"""
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "future", "expires_at")
+
+    def __init__(self, fingerprint, future):
+        self.fingerprint = fingerprint
+        self.future = future
+        # 호출이 끝나기 전에는 만료되지 않음
+        self.expires_at = None
+
+
+def fingerprint(payload):
+    """요청 본문(dict 또는 bytes)의 정규화된 해시"""
+    if isinstance(payload, (bytes, bytearray)):
+        raw = bytes(payload)
+    else:
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class AsyncIdempotencyStore:
+    """
+    asyncio용 Idempotency-Key 저장소
+
+    Args:
+        max_entries: 보관할 최대 키 수 (완료된 항목부터 LRU로 제거)
+        ttl_seconds: 완료된 결과의 보존 시간 (초)
+        backend: 워커끼리 공유하는 상태 저장소 (shared가 True일 때만 사용)
+        encode: 결과 → JSON으로 바꿀 수 있는 값 (공유 저장소에 저장할 때)
+        decode: encode의 역변환
+        lock_seconds: 워커 간 락의 최대 유지 시간 (초, 가장 긴 실행보다 길게)
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=600, backend=None, encode=None, decode=None,
+                 lock_seconds=300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend if backend is not None and backend.shared else None
+        self.encode = encode or (lambda result: result)
+        self.decode = decode or (lambda value: value)
+        self.lock_seconds = lock_seconds
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.joins = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+    def _evict(self, now):
+        for key in [k for k, e in self._entries.items() if e.expires_at is not None and e.expires_at <= now]:
+            del self._entries[key]
+        if len(self._entries) <= self.max_entries:
+            return
+        for key in [k for k, e in self._entries.items() if e.expires_at is not None]:
+            del self._entries[key]
+            if len(self._entries) <= self.max_entries:
+                break
+
+    async def run(self, key, request_fingerprint, func, cacheable=None):
+        """
+        키 단위로 코루틴 실행을 한 번으로 합침
+
+        Args:
+            key: Idempotency-Key 값
+            request_fingerprint: 요청 본문 해시
+            func: 실제 작업 (인자 없는 코루틴 함수)
+            cacheable: 결과를 보존할지 판단하는 함수 (False면 동시 대기자만 공유하고 저장하지 않음)
+
+        Returns:
+            tuple: (결과, 재사용 여부)
+
+        Raises:
+            IdempotencyConflict: 같은 키가 다른 본문으로 사용된 경우
+        """
+        while True:
+            self._evict(time.monotonic())
+            entry = self._entries.get(key)
+            if entry is None:
+                break
+            if entry.fingerprint != request_fingerprint:
+                raise IdempotencyConflict(key)
+            self._entries.move_to_end(key)
+            if entry.future.done():
+                self.hits += 1
+            else:
+                self.joins += 1
+            try:
+                # 대기 중인 요청이 취소되어도 원래 호출에 영향이 없도록 shield
+                return await asyncio.shield(entry.future), True
+            except asyncio.CancelledError:
+                # 원래 요청이 취소된 경우에만 다시 시도
+                if not entry.future.cancelled():
+                    raise
+
+        entry = _Entry(request_fingerprint, asyncio.get_running_loop().create_future())
+        self._entries[key] = entry
+
+        try:
+            if self.backend is None:
+                self.misses += 1
+                result, replayed = await func(), False
+            else:
+                result, replayed = await self._run_shared(key, request_fingerprint, func, cacheable)
+        except BaseException as e:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            if isinstance(e, asyncio.CancelledError):
+                entry.future.cancel()
+            else:
+                entry.future.set_exception(e)
+                # 대기자가 없을 때 "exception was never retrieved" 경고 방지
+                entry.future.exception()
+            raise
+
+        if cacheable is None or cacheable(result):
+            entry.expires_at = time.monotonic() + self.ttl_seconds
+            self._evict(time.monotonic())
+        elif self._entries.get(key) is entry:
+            del self._entries[key]
+        entry.future.set_result(result)
+        return result, replayed
+
+    async def _run_shared(self, key, request_fingerprint, func, cacheable):
+        """다른 워커가 같은 키를 처리했거나 처리 중이면 그 결과를 사용, 아니면 락을 잡고 직접 실행"""
+        token = uuid.uuid4().hex.encode()
+        while True:
+            raw = self.backend.get(_RESULT_PREFIX + key)
+            if raw is not None:
+                stored = json.loads(raw)
+                if stored["fingerprint"] != request_fingerprint:
+                    raise IdempotencyConflict(key)
+                self.shared_hits += 1
+                return self.decode(stored["result"]), True
+            if self.backend.add(_LOCK_PREFIX + key, token, self.lock_seconds):
+                break
+            # 락을 잡은 워커가 실패하면(결과 없이 락 해제) 이 워커가 이어서 실행
+            await asyncio.sleep(_POLL_INTERVAL)
+
+        self.misses += 1
+        try:
+            result = await func()
+            if cacheable is None or cacheable(result):
+                stored = {"fingerprint": request_fingerprint, "result": self.encode(result)}
+                self.backend.set(_RESULT_PREFIX + key, json.dumps(stored).encode("utf-8"), self.ttl_seconds)
+        finally:
+            self.backend.delete(_LOCK_PREFIX + key, token)
+        return result, False
+
+    def stats(self):
+        in_flight = sum(1 for e in self._entries.values() if e.expires_at is None)
+        return {
+            "entries": len(self._entries),
+            "in_flight": in_flight,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "joins": self.joins,
+            "misses": self.misses,
+            "shared": self.backend is not None,
+            "shared_hits": self.shared_hits,
+        }
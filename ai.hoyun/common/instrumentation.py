@@ -0,0 +1,179 @@
+"""
+서비스 공통 요청 계측 모듈
+
+- InstrumentationMiddleware: 라우트별 요청 수/지연 시간 히스토그램, 처리 중 요청 수 게이지,
+  응답 헤더 Server-Timing (프론트엔드 개발자 도구에서 구간별 시간 확인)
+- phase(): 요청 안의 구간(예: 크롤러 driver_start, page_load, scroll, parse) 시간 측정
+- record_upstream(): 업스트림 호출(프록시 대상 서비스, LLM API 등) 시간 기록
+- instrument(app, service): 계측/트레이싱 미들웨어와 /metrics, /traces 엔드포인트를 한 번에 등록
+
+구간/업스트림 시간은 메트릭으로 항상 기록되고, 요청 처리 중이면 해당 요청의 Server-Timing에도 추가된다.
+phase()는 트레이싱 span도 함께 만든다 (common.tracing).
+"""
+import contextvars
+import re
+import time
+from contextlib import contextmanager
+from common.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from common.tracing import TracingMiddleware, start_span, tracer
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency including the response body", ("method", "route"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed", ("method",))
+PHASE_DURATION = REGISTRY.histogram(
+    "phase_duration_seconds", "Duration of named phases inside a request", ("phase",))
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "upstream_call_duration_seconds", "Duration of calls to upstream services", ("upstream", "outcome"))
+
+# 라우트에 매칭되지 않은 요청의 route 레이블 (경로를 그대로 쓰면 레이블 수가 무한히 늘어남)
+UNMATCHED_ROUTE = "<unmatched>"
+
+_TOKEN_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+_current_timing = contextvars.ContextVar("server_timing", default=None)
+
+
+class ServerTiming:
+    """
+    요청 하나의 Server-Timing 항목
+
+    같은 이름으로 여러 번 기록하면 시간이 합산된다 (예: 스크롤을 여러 번 반복한 경우).
+    """
+
+    __slots__ = ("service", "_entries")
+
+    def __init__(self, service):
+        self.service = service
+        self._entries = {}
+
+    def add(self, name, seconds):
+        name = _TOKEN_RE.sub("_", name)
+        self._entries[name] = self._entries.get(name, 0.0) + seconds
+
+    def header(self):
+        """Server-Timing 헤더 값 (desc에 서비스 이름을 넣어 게이트웨이/서비스 항목을 구분)"""
+        return ", ".join(
+            f'{name};dur={seconds * 1000.0:.1f};desc="{self.service}"'
+            for name, seconds in self._entries.items()
+        )
+
+
+def record_timing(name, seconds):
+    """처리 중인 요청의 Server-Timing에 항목 추가 (요청 밖에서 호출되면 무시)"""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+@contextmanager
+def phase(name):
+    """
+    구간 시간 측정
+
+    Args:
+        name: 구간 이름 (예: "page_load")
+    """
+    started = time.perf_counter()
+    try:
+        with start_span(name):
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        PHASE_DURATION.observe(elapsed, phase=name)
+        record_timing(name, elapsed)
+
+
+def record_upstream(upstream, seconds, outcome="ok"):
+    """
+    업스트림 호출 시간 기록
+
+    Args:
+        upstream: 업스트림 이름 (예: "diary", "openai")
+        seconds: 호출 시간 (초)
+        outcome: 결과 (ok, error, timeout 등)
+    """
+    UPSTREAM_DURATION.observe(seconds, upstream=upstream, outcome=outcome)
+    record_timing(f"upstream_{upstream}", seconds)
+
+
+def _route_template(scope):
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path or UNMATCHED_ROUTE
+
+
+class InstrumentationMiddleware:
+    """
+    요청 계측 ASGI 미들웨어
+
+    응답 헤더를 보내는 시점까지의 처리 시간을 Server-Timing "total" 항목으로 추가하고,
+    응답 본문 전송까지 포함한 전체 시간을 라우트 템플릿(예: "/diary/entries/{entry_id}")별 히스토그램에 기록한다.
+
+    Args:
+        app: ASGI 앱
+        service: Server-Timing desc에 들어갈 서비스 이름
+    """
+
+    def __init__(self, app, service):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        timing = ServerTiming(self.service)
+        token = _current_timing.set(timing)
+        status_code = 500
+        HTTP_IN_FLIGHT.inc(method=method)
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing.add("total", time.perf_counter() - started)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.header().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timing.reset(token)
+            HTTP_IN_FLIGHT.dec(method=method)
+            route = _route_template(scope)
+            HTTP_DURATION.observe(time.perf_counter() - started, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status_code)
+
+
+def instrument(app, service):
+    """
+    FastAPI 앱에 계측/트레이싱 미들웨어와 /metrics, /traces 엔드포인트 등록
+
+    Args:
+        app: FastAPI 앱
+        service: 서비스 이름 (Server-Timing desc, span의 service)
+    """
+    from fastapi.responses import PlainTextResponse  # type: ignore
+
+    async def metrics():
+        """Prometheus 메트릭 노출"""
+        return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    async def traces(trace_id: str = None, limit: int = 200):
+        """최근 span 조회 (trace_id로 필터)"""
+        return {"service": service, "spans": tracer.recent(trace_id, limit)}
+
+    tracer.configure(service)
+    app.add_middleware(InstrumentationMiddleware, service=service)
+    # 트레이싱 미들웨어를 가장 바깥에 두어 서버 span이 요청 전체를 감싸도록 함
+    app.add_middleware(TracingMiddleware)
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+    app.add_api_route("/traces", traces, methods=["GET"], include_in_schema=False)
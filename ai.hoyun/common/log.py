@@ -0,0 +1,208 @@
+"""
+서비스 공통 구조화 로깅
+
+- 로그 레코드를 한 줄짜리 JSON으로 출력 (docker logs / 수집기에서 필드로 검색)
+- QueueHandler → QueueListener: 요청 스레드는 큐에 넣기만 하고, 출력(I/O)은 리스너 스레드가 담당
+- 모든 레코드에 현재 trace_id(= 요청 id, common.tracing)와 log_context()로 묶은 값(예: crawl_id)을 추가
+- Throttled: 반복문 안에서 일정 간격/일정 횟수마다만 기록하고, 생략한 수를 다음 레코드에 남김
+
+환경 변수:
+- LOG_LEVEL: 기본 로그 레벨 (기본 INFO)
+- LOG_LEVELS: 모듈별 레벨 (예: "netflix.netflix=DEBUG,proxy.engine=WARNING")
+- LOG_FORMAT: json(기본) | text
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from common.tracing import current_trace_id
+
+_log_context = contextvars.ContextVar("log_context", default={})
+
+# LogRecord 기본 속성 (나머지는 extra 필드로 출력)
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+_service = None
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    블록 안에서 기록되는 모든 레코드에 필드 추가
+
+    Args:
+        **fields: 추가할 필드 (예: crawl_id="...")
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """호출한 스레드의 컨텍스트(trace_id, log_context 필드)를 레코드에 복사"""
+
+    def filter(self, record):
+        trace_id = current_trace_id()
+        if trace_id is not None and not hasattr(record, "trace_id"):
+            record.trace_id = trace_id
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """레코드를 한 줄 JSON으로 변환"""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if _service:
+            payload["service"] = _service
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _PreparedQueueHandler(logging.handlers.QueueHandler):
+    """
+    큐에 넣기 전에 메시지/예외를 문자열로 만들어 둠
+
+    기본 QueueHandler.prepare()는 포매터로 메시지에 traceback을 합쳐 버려 JSON 필드가 섞이므로,
+    메시지와 exc_text만 확정하고 extra 필드는 그대로 남긴다.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(service, level=None, levels=None):
+    """
+    루트 로거를 큐 기반 구조화 로깅으로 설정 (여러 번 호출해도 한 번만 적용)
+
+    Args:
+        service: 서비스 이름 (모든 레코드에 기록)
+        level: 기본 레벨 (None이면 LOG_LEVEL)
+        levels: 모듈별 레벨 dict (None이면 LOG_LEVELS)
+    """
+    global _listener, _service
+    if _listener is not None:
+        return
+    _service = service
+
+    output = logging.StreamHandler()
+    if os.getenv("LOG_FORMAT", "json").strip().lower() == "text":
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    handler = _PreparedQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, module_level in (levels or _parse_levels(os.getenv("LOG_LEVELS"))).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+class Throttled:
+    """
+    반복문 안에서 쓰는 기록 빈도 제한 로거
+
+    메시지 템플릿별로 interval초에 한 번, 또는 every번에 한 번만 기록한다.
+    생략된 레코드 수는 다음에 기록되는 레코드의 suppressed 필드에 남는다.
+
+    Args:
+        logger: 실제로 기록할 로거
+        interval: 최소 기록 간격 (초)
+        every: N번에 한 번 기록 (interval과 함께 지정하면 둘 중 먼저 만족할 때 기록)
+    """
+
+    def __init__(self, logger, interval=None, every=None):
+        self.logger = logger
+        self.interval = interval
+        self.every = every
+        self._lock = threading.Lock()
+        # 메시지 템플릿 -> [마지막 기록 시각, 생략한 수]
+        self._state = {}
+
+    def _allow(self, msg):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(msg)
+            if state is None:
+                self._state[msg] = [now, 0]
+                return 0, True
+            last, suppressed = state
+            due = (
+                (self.interval is not None and now - last >= self.interval)
+                or (self.every is not None and (suppressed + 1) >= self.every)
+            )
+            if due:
+                state[0], state[1] = now, 0
+                return suppressed, True
+            state[1] += 1
+            return 0, False
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+        suppressed, allowed = self._allow(msg)
+        if not allowed:
+            return
+        if suppressed:
+            kwargs["extra"] = {**kwargs.get("extra", {}), "suppressed": suppressed}
+        kwargs.setdefault("stacklevel", 3)
+        self.logger.log(level, msg, *args, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self.log(logging.ERROR, msg, *args, **kwargs)
@@ -0,0 +1,249 @@
+"""
+서비스 공통 메트릭 모듈
+
+Counter / Gauge / Histogram 을 레이블별로 기록하고 Prometheus 텍스트 형식과
+통계용 dict(JSON)로 내보낸다. 외부 의존성 없이 모든 서비스에서 사용한다.
+
+각 서비스 Dockerfile은 이 디렉터리를 /app/common 으로 복사한다.
+로컬에서 실행할 때는 ai.hoyun 디렉터리를 PYTHONPATH에 추가한다.
+"""
+import bisect
+import math
+import threading
+
+# 지연 시간(초) 기본 버킷
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# 토큰 수 버킷
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+# 초당 토큰 수 버킷
+RATE_BUCKETS = (1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 500, 1000)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._render_samples())
+        return lines
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def _render_samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self.snapshot().items())
+        ]
+
+
+class Gauge(_Metric):
+    """증감 가능한 현재 값"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def _render_samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self.snapshot().items())
+        ]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    def _copy(self):
+        with self._lock:
+            return {k: (list(s.counts), s.total, s.count) for k, s in self._series.items()}
+
+    def quantile(self, q, counts, count):
+        """버킷 경계 사이를 선형 보간한 분위수 추정값"""
+        if count == 0:
+            return None
+        rank = q * count
+        cumulative = 0
+        lower = 0.0
+        for bound, c in zip(self.buckets, counts):
+            if cumulative + c >= rank and c > 0:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * ((rank - cumulative) / c)
+            cumulative += c
+            lower = bound if bound != math.inf else lower
+        return lower
+
+    def snapshot(self):
+        """레이블별 count / sum / mean / p50 / p95 / p99"""
+        result = {}
+        for key, (counts, total, count) in self._copy().items():
+            result[key] = {
+                "count": count,
+                "sum": round(total, 6),
+                "mean": round(total / count, 6) if count else None,
+                "p50": _round(self.quantile(0.50, counts, count)),
+                "p95": _round(self.quantile(0.95, counts, count)),
+                "p99": _round(self.quantile(0.99, counts, count)),
+            }
+        return result
+
+    def _render_samples(self):
+        lines = []
+        for key, (counts, total, count) in sorted(self._copy().items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def _round(value):
+    return round(value, 6) if value is not None else None
+
+
+class Registry:
+    """메트릭 저장소 (같은 이름은 한 번만 등록)"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Prometheus 텍스트 노출 형식"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 서비스 전역 기본 저장소
+REGISTRY = Registry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,294 @@
+"""
+서비스 공통 공유 상태 저장소
+
+워커 프로세스를 여러 개 띄우면(WEB_CONCURRENCY) 프로세스 메모리에 둔 캐시/카운터는 워커마다 따로 생긴다.
+여러 워커가 함께 봐야 하는 상태(Idempotency-Key 응답, 속도 제한 토큰 버킷, 크롤링 스냅샷과 작업 상태)는
+이 저장소를 통해 읽고 쓴다.
+
+- MemoryBackend: 프로세스 메모리 (워커 1개일 때, shared=False)
+- SQLiteBackend: 같은 호스트의 워커들이 SQLite 파일 하나를 공유 (shared=True).
+  기본 위치는 /dev/shm(메모리 파일 시스템)이라 디스크 I/O 없이 프로세스 간에 공유된다.
+  재시작하면 사라져도 되는 상태만 두므로 synchronous=OFF로 쓴다.
+
+값은 bytes이며 모든 키는 만료 시간(ttl, 초)을 가질 수 있다.
+락은 add()로 만든다 (키가 없을 때만 저장, ttl이 지나면 락을 잡은 프로세스가 죽어도 풀림).
+
+환경 변수:
+- SHARED_STATE_BACKEND: auto | memory | sqlite (기본 auto: WEB_CONCURRENCY > 1이면 sqlite)
+- SHARED_STATE_PATH: SQLite 파일 경로 (기본 /dev/shm/hoyun-<서비스>-state.db)
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스 수 (gunicorn도 같은 환경 변수로 워커 수를 정함)
+WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+# 이 횟수만큼 쓸 때마다 만료된 키 정리
+_PURGE_EVERY = 512
+
+
+class MemoryBackend:
+    """
+    프로세스 메모리 저장소 (스레드 안전)
+
+    Args:
+        max_keys: 보관할 최대 키 수 (오래 안 쓴 키부터 제거)
+    """
+
+    shared = False
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._values = OrderedDict()
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self._values.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= now:
+            del self._values[key]
+            return None
+        self._values.move_to_end(key)
+        return item
+
+    def _store(self, key, value, ttl, now):
+        self._values[key] = (value, now + ttl if ttl else None)
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_keys:
+            self._values.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            item = self._live(key, time.time())
+            return item[0] if item is not None else None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl, time.time())
+
+    def add(self, key, value, ttl=None):
+        """키가 없거나 만료되었을 때만 저장 (저장했으면 True)"""
+        now = time.time()
+        with self._lock:
+            if self._live(key, now) is not None:
+                return False
+            self._store(key, value, ttl, now)
+            return True
+
+    def delete(self, key, value=None):
+        """키 삭제 (value를 주면 값이 같을 때만, 자기가 잡은 락을 풀 때 사용)"""
+        with self._lock:
+            item = self._values.get(key)
+            if item is not None and (value is None or item[0] == value):
+                del self._values[key]
+
+    def take_token(self, key, rate, burst, max_clients=None):
+        """
+        토큰 버킷에서 토큰 하나 사용
+
+        Returns:
+            float: 0이면 허용, 양수면 토큰이 찰 때까지 기다려야 하는 시간 (초)
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(burst), now]
+                self._buckets[key] = bucket
+                while len(self._buckets) > (max_clients or self.max_keys):
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / rate
+
+    def bucket_count(self, prefix=""):
+        with self._lock:
+            return sum(1 for key in self._buckets if key.startswith(prefix))
+
+    def describe(self):
+        with self._lock:
+            return {"backend": "memory", "shared": False, "keys": len(self._values), "buckets": len(self._buckets)}
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_kv_expires ON kv (expires_at) WHERE expires_at IS NOT NULL",
+    "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL) "
+    "WITHOUT ROWID",
+)
+
+
+class SQLiteBackend:
+    """
+    워커 프로세스들이 공유하는 SQLite 저장소 (스레드마다 연결 하나)
+
+    Args:
+        path: SQLite 파일 경로 (같은 경로를 여는 프로세스끼리 상태를 공유)
+        bucket_idle: 이 시간(초) 동안 쓰지 않은 토큰 버킷은 정리
+    """
+
+    shared = True
+
+    def __init__(self, path, bucket_idle=3600.0):
+        self.path = path
+        self.bucket_idle = bucket_idle
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # 재시작하면 사라져도 되는 상태이므로 fsync하지 않음
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def _after_write(self, conn):
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0:
+            now = time.time()
+            conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            conn.execute("DELETE FROM buckets WHERE updated_at <= ?", (now - self.bucket_idle,))
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, value, now + ttl if ttl else None)
+        )
+        self._after_write(conn)
+
+    def add(self, key, value, ttl=None):
+        """키가 없거나 만료되었을 때만 저장 (저장했으면 True)"""
+        now = time.time()
+        conn = self._conn()
+        cursor = conn.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?",
+            (key, value, now + ttl if ttl else None, now)
+        )
+        self._after_write(conn)
+        return cursor.rowcount > 0
+
+    def delete(self, key, value=None):
+        """키 삭제 (value를 주면 값이 같을 때만, 자기가 잡은 락을 풀 때 사용)"""
+        if value is None:
+            self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+        else:
+            self._conn().execute("DELETE FROM kv WHERE key = ? AND value = ?", (key, value))
+
+    def take_token(self, key, rate, burst, max_clients=None):
+        """
+        토큰 버킷에서 토큰 하나 사용 (모든 워커가 같은 버킷을 씀)
+
+        Returns:
+            float: 0이면 허용, 양수면 토큰이 찰 때까지 기다려야 하는 시간 (초)
+        """
+        now = time.time()
+        conn = self._conn()
+        # 읽고 쓰는 사이에 다른 워커가 끼어들지 않도록 쓰기 락을 먼저 잡음
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = float(burst) if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+            wait = 0.0
+            if tokens >= 1.0:
+                tokens -= 1.0
+            else:
+                wait = (1.0 - tokens) / rate
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now)
+            )
+            self._after_write(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def bucket_count(self, prefix=""):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM buckets WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff")
+        ).fetchone()[0]
+
+    def describe(self):
+        conn = self._conn()
+        return {
+            "backend": "sqlite",
+            "shared": True,
+            "path": self.path,
+            "keys": conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0],
+            "buckets": conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0],
+        }
+
+
+def get_json(backend, key):
+    raw = backend.get(key)
+    return json.loads(raw) if raw is not None else None
+
+
+def set_json(backend, key, value, ttl=None):
+    backend.set(key, json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), ttl)
+
+
+def _default_path(service):
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"hoyun-{service}-state.db")
+
+
+def create_backend(service):
+    """
+    환경 변수 설정으로 공유 상태 저장소 생성
+
+    Args:
+        service: 서비스 이름 (기본 SQLite 파일 이름에 사용, 서비스마다 파일을 따로 씀)
+
+    Returns:
+        MemoryBackend | SQLiteBackend
+    """
+    kind = os.getenv("SHARED_STATE_BACKEND", "auto").strip().lower()
+    if kind == "auto":
+        kind = "sqlite" if WORKERS > 1 else "memory"
+    if kind == "memory":
+        if WORKERS > 1:
+            logger.warning("memory shared state with multiple workers; state is per worker",
+                           extra={"workers": WORKERS})
+        return MemoryBackend()
+    if kind != "sqlite":
+        raise ValueError(f"unknown SHARED_STATE_BACKEND: {kind}")
+    return SQLiteBackend(os.getenv("SHARED_STATE_PATH") or _default_path(service))
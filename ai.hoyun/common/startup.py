@@ -0,0 +1,148 @@
+"""
+서비스 공통 시작 프로파일 (import 시간, warm-up, 준비 상태)
+
+- StartupProfile: 프로세스 시작부터 앱 모듈 import 완료까지의 시간과 warm-up 작업별 시간을 기록
+- run_warm_up(): 무거운 엔진 import/초기화를 lifespan에서 백그라운드 스레드로 실행
+  (서버는 바로 요청을 받고, /health는 살아 있음만 알림)
+- install(): /ready 엔드포인트 등록. warm-up이 끝나야 200, 그 전에는 503 (게이트웨이 헬스 체크가 사용)
+
+어떤 모듈이 import 시간을 쓰는지 자세히 보려면 `python -X importtime -c "import main"`을 사용한다.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from common.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STARTUP_SECONDS = REGISTRY.gauge(
+    "service_startup_seconds", "Time spent in each start-up phase (imports, warm-up tasks, ready)", ("phase",))
+SERVICE_READY = REGISTRY.gauge(
+    "service_ready", "1 once start-up warm-up has finished successfully")
+
+
+def _process_age():
+    """프로세스가 시작된 뒤 지난 시간 (초, /proc이 없으면 None)"""
+    try:
+        with open("/proc/self/stat") as f:
+            # 두 번째 필드(실행 파일 이름)에 공백이 있을 수 있으므로 마지막 ')' 뒤부터 나눔
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        # starttime은 22번째 필드 (')' 뒤 목록에서는 20번째)
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupProfile:
+    """
+    서비스 시작 과정의 시간과 준비 상태
+
+    앱 모듈(main.py)의 import가 끝난 시점에 생성한다.
+
+    Args:
+        service: 서비스 이름
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._created = time.perf_counter()
+        age = _process_age()
+        # 프로세스 시작(인터프리터, uvicorn, 앱 모듈 import 포함) → 앱 모듈 로드 완료
+        self.import_seconds = round(age, 3) if age is not None else None
+        self._origin = self._created - (age or 0.0)
+        self.tasks = {}
+        self.status = "starting"
+        self.ready_seconds = None
+        self._ready = threading.Event()
+        if self.import_seconds is not None:
+            STARTUP_SECONDS.set(self.import_seconds, phase="imports")
+        SERVICE_READY.set(0)
+
+    @property
+    def ready(self):
+        return self.status == "ready"
+
+    def wait_ready(self, timeout=None):
+        """
+        warm-up이 끝날 때까지 대기 (동기 엔드포인트용)
+
+        Returns:
+            bool: 준비되었으면 True (timeout 안에 끝나지 않았거나 실패하면 False)
+        """
+        self._ready.wait(timeout)
+        return self.ready
+
+    def _run_task(self, name, func, required):
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            seconds = round(time.perf_counter() - started, 3)
+            self.tasks[name] = {"seconds": seconds, "error": f"{type(e).__name__}: {e}", "required": required}
+            log = logger.exception if required else logger.warning
+            log("warm-up task failed", exc_info=True, extra={"task": name, "seconds": seconds})
+            return not required
+        seconds = round(time.perf_counter() - started, 3)
+        self.tasks[name] = {"seconds": seconds}
+        STARTUP_SECONDS.set(seconds, phase=name)
+        logger.info("warm-up task finished", extra={"task": name, "seconds": seconds})
+        return True
+
+    def finish(self, ok=True):
+        """warm-up 완료 처리 (ok가 False면 /ready가 계속 503)"""
+        self.ready_seconds = round(time.perf_counter() - self._origin, 3)
+        self.status = "ready" if ok else "failed"
+        STARTUP_SECONDS.set(self.ready_seconds, phase="ready")
+        SERVICE_READY.set(1 if ok else 0)
+        self._ready.set()
+        log = logger.info if ok else logger.error
+        log("service ready" if ok else "service warm-up failed",
+            extra={"import_seconds": self.import_seconds, "ready_seconds": self.ready_seconds})
+
+    async def warm_up(self, tasks):
+        """
+        warm-up 작업을 순서대로 스레드에서 실행하고 완료 처리
+
+        Args:
+            tasks: (이름, 인자 없는 함수[, 필수 여부]) 목록. 필수 작업(기본)이 하나라도 실패하면 상태가 failed
+        """
+        ok = True
+        for name, func, *required in tasks:
+            ok = await asyncio.to_thread(self._run_task, name, func, required[0] if required else True) and ok
+        self.finish(ok)
+
+    def run_warm_up(self, tasks):
+        """warm-up을 백그라운드 태스크로 시작 (lifespan에서 호출, 반환한 태스크는 종료 시 취소)"""
+        return asyncio.create_task(self.warm_up(tasks))
+
+    def report(self):
+        return {
+            "service": self.service,
+            "status": self.status,
+            "import_seconds": self.import_seconds,
+            "warm_up": self.tasks,
+            "ready_seconds": self.ready_seconds,
+            "uptime_seconds": round(time.perf_counter() - self._origin, 3),
+        }
+
+    def install(self, app):
+        """
+        /ready 엔드포인트 등록
+
+        Args:
+            app: FastAPI 앱
+        """
+        from fastapi.responses import JSONResponse  # type: ignore
+
+        async def ready():
+            """준비 상태 (warm-up 완료 전이나 실패 시 503)"""
+            headers = {"Cache-Control": "no-store"}
+            if not self.ready:
+                headers["Retry-After"] = "1"
+            return JSONResponse(self.report(), status_code=200 if self.ready else 503, headers=headers)
+
+        app.add_api_route("/ready", ready, methods=["GET"], tags=["health"])
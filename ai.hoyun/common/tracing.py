@@ -0,0 +1,331 @@
+"""
+서비스 공통 분산 트레이싱 모듈
+
+W3C Trace Context(traceparent 헤더)로 게이트웨이 → 각 서비스까지 같은 trace_id를 이어 간다.
+외부 수집기 없이 동작하도록 span은 프로세스 안의 링 버퍼(GET /traces) 또는 JSONL 파일로 내보낸다.
+
+- TracingMiddleware: 들어온 traceparent를 이어받거나(없으면 새로 생성) 요청 전체를 감싸는 서버 span 생성,
+  응답 헤더 X-Trace-Id 추가
+- start_span(): 현재 span의 하위 span (예: 업스트림 호출, LLM 호출, 크롤링 구간)
+- inject(): 나가는 요청 헤더에 현재 span의 traceparent 추가
+
+환경 변수:
+- TRACE_SAMPLE_RATIO: 새로 시작하는 trace의 샘플링 비율 (기본 1.0, 0이면 기록 안 함).
+  traceparent를 받은 요청은 상위의 샘플링 결정을 따른다.
+- TRACE_EXPORTER: memory(기본) | file | none
+- TRACE_FILE: file 내보내기 경로 (기본 traces/<서비스>.jsonl)
+- TRACE_BUFFER_SIZE: memory 내보내기에 보관할 최대 span 수 (기본 2048)
+"""
+import atexit
+import contextvars
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(bits):
+    value = random.getrandbits(bits)
+    while value == 0:
+        value = random.getrandbits(bits)
+    return f"{value:0{bits // 4}x}"
+
+
+def parse_traceparent(value):
+    """
+    traceparent 헤더 해석
+
+    Returns:
+        tuple: (trace_id, parent_span_id, sampled) 형식이 잘못되었으면 None
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+class Span:
+    """
+    작업 구간 하나
+
+    샘플링되지 않은 span도 trace_id/span_id는 가지고 있어 하위 서비스로 전달되지만 내보내지는 않는다.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled",
+                 "start", "_started", "duration", "status", "attributes")
+
+    def __init__(self, name, trace_id, parent_id, sampled, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+        self.status = "ok"
+        self.attributes = attributes or {}
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key, value):
+        if self.sampled:
+            self.attributes[key] = value
+
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+            if self.sampled:
+                tracer.export(self)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": tracer.service,
+            "start": round(self.start, 6),
+            "duration_ms": round((self.duration or 0.0) * 1000.0, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class RingBufferExporter:
+    """최근 span을 메모리에 보관 (GET /traces로 조회)"""
+
+    def __init__(self, max_spans=2048):
+        self._spans = deque(maxlen=max_spans)
+
+    def export(self, span):
+        self.add(span.to_dict())
+
+    def add(self, record):
+        # deque.append는 스레드 안전
+        self._spans.append(record)
+
+    def recent(self, trace_id=None, limit=200):
+        spans = list(self._spans)
+        if trace_id:
+            spans = [s for s in spans if s["trace_id"] == trace_id]
+        return spans[-limit:]
+
+    def shutdown(self):
+        pass
+
+
+class JsonlFileExporter:
+    """
+    span을 JSONL 파일에 추가
+
+    요청 처리 경로에서 파일 I/O를 하지 않도록 큐에 넣고 백그라운드 스레드가 모아서 기록한다.
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._recent = RingBufferExporter(256)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span):
+        record = span.to_dict()
+        self._recent.add(record)
+        self._queue.put(record)
+
+    def recent(self, trace_id=None, limit=200):
+        return self._recent.recent(trace_id, limit)
+
+    def _drain(self):
+        records = []
+        while True:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if records:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self._drain()
+        self._drain()
+
+    def shutdown(self):
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+
+class Tracer:
+    """서비스 하나의 트레이싱 설정 (샘플링 비율, 내보내기)"""
+
+    def __init__(self):
+        self.service = "unknown"
+        self.sample_ratio = 1.0
+        self.exporter = None
+
+    def configure(self, service, sample_ratio=None, exporter=None):
+        """
+        환경 변수 기반 설정
+
+        Args:
+            service: 서비스 이름 (span에 기록)
+            sample_ratio: 샘플링 비율 (None이면 TRACE_SAMPLE_RATIO)
+            exporter: 내보내기 객체 (None이면 TRACE_EXPORTER)
+        """
+        self.service = service
+        self.sample_ratio = float(os.getenv("TRACE_SAMPLE_RATIO", "1.0")) if sample_ratio is None else sample_ratio
+        if exporter is None:
+            kind = os.getenv("TRACE_EXPORTER", "memory").strip().lower()
+            if kind == "file":
+                exporter = JsonlFileExporter(os.getenv("TRACE_FILE", f"traces/{service}.jsonl"))
+            elif kind == "memory":
+                exporter = RingBufferExporter(int(os.getenv("TRACE_BUFFER_SIZE", "2048")))
+        if self.exporter is not None and self.exporter is not exporter:
+            self.exporter.shutdown()
+        self.exporter = exporter
+
+    def export(self, span):
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def recent(self, trace_id=None, limit=200):
+        if self.exporter is None:
+            return []
+        return self.exporter.recent(trace_id, limit)
+
+    def should_sample(self):
+        return self.exporter is not None and random.random() < self.sample_ratio
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+tracer = Tracer()
+atexit.register(tracer.shutdown)
+
+
+def current_span():
+    """현재 컨텍스트의 span (없으면 None)"""
+    return _current_span.get()
+
+
+def current_trace_id():
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+@contextmanager
+def start_span(name, parent=None, **attributes):
+    """
+    하위 span 시작 (현재 span이 없으면 새 trace)
+
+    Args:
+        name: span 이름
+        parent: (trace_id, parent_span_id, sampled) 상위 컨텍스트. None이면 현재 span
+        **attributes: span 속성
+    """
+    if parent is None:
+        current = _current_span.get()
+        parent = (current.trace_id, current.span_id, current.sampled) if current is not None else None
+    if parent is None:
+        span = Span(name, _new_id(128), None, tracer.should_sample(), attributes)
+    else:
+        span = Span(name, parent[0], parent[1], parent[2], attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.set_attribute("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        span.finish()
+
+
+def inject(headers):
+    """
+    나가는 요청 헤더에 traceparent 추가
+
+    Args:
+        headers: dict 또는 httpx.Headers
+    """
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent
+    return headers
+
+
+class TracingMiddleware:
+    """
+    요청 전체를 감싸는 서버 span ASGI 미들웨어
+
+    traceparent 헤더가 있으면 이어받고, 없으면 새 trace를 시작한다.
+    span 이름은 라우트 템플릿 기준 (예: "POST /chatbot/chat").
+
+    Args:
+        app: ASGI 앱
+        exclude_paths: span을 만들지 않을 경로 (헬스 체크/메트릭 수집 등 운영용 요청)
+    """
+
+    def __init__(self, app, exclude_paths=("/health", "/metrics", "/traces")):
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+
+        method = scope["method"]
+        with start_span(f"{method} {scope.get('path', '')}", parent=parent) as span:
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "error"
+                    headers = list(message.get("headers", []))
+                    # 프록시된 응답에는 하위 서비스가 넣은 같은 값이 이미 있음
+                    if not any(key.lower() == b"x-trace-id" for key, _ in headers):
+                        headers.append((b"x-trace-id", span.trace_id.encode("latin-1")))
+                        message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{method} {route}"
+                span.set_attribute("http.target", scope.get("path", ""))
@@ -1,15 +1,72 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, APIRouter  # type: ignore
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
-from pydantic import BaseModel  # type: ignore
 import uvicorn  # type: ignore
-import httpx  # type: ignore
+import os
+from proxy.engine import BufferedResponse, ProxyEngine
+from proxy.routes import ROUTES
+from proxy.observers import chat_telemetry
+from proxy.admission import RateLimitPolicy
+from common.compression import CompressionMiddleware
+from common.http_cache import ConditionalGetMiddleware
+from common.idempotency import AsyncIdempotencyStore
+from common.instrumentation import instrument
+from common.log import configure_logging
+from common.shared_state import WORKERS, create_backend
+from common.startup import StartupProfile
+
+# 시작 프로파일 (프로세스 시작 → 모듈 로드 시간, /ready)
+startup = StartupProfile("gateway")
+
+# JSON 구조화 로깅 (큐 기반, LOG_LEVEL / LOG_LEVELS)
+configure_logging("gateway")
+
+# 워커 간 공유 상태 (WEB_CONCURRENCY > 1이면 SQLite, 속도 제한 버킷과 Idempotency-Key 응답)
+shared_state = create_backend("gateway")
+
+# Idempotency-Key 저장소 (재시도/더블클릭으로 중복된 챗봇 POST를 하나로 합침)
+idempotency_store = AsyncIdempotencyStore(
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_KEYS", "1024")),
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600")),
+    backend=shared_state,
+    encode=BufferedResponse.to_dict,
+    decode=BufferedResponse.from_dict
+)
+
+# 모든 라우트에 공통으로 적용할 클라이언트(IP/인증 주체)별 속도 제한 (0이면 끔)
+RATE_LIMIT_RPS = float(os.getenv("GATEWAY_RATE_LIMIT_RPS", "20"))
+RATE_LIMIT_BURST = int(os.getenv("GATEWAY_RATE_LIMIT_BURST", "40"))
+
+# 라우트 테이블 기반 프록시 엔진 (업스트림 연결 풀 공유)
+proxy_engine = ProxyEngine(
+    ROUTES,
+    max_connections=int(os.getenv("GATEWAY_MAX_UPSTREAM_CONNECTIONS", "200")),
+    idempotency_store=idempotency_store,
+    health_interval=float(os.getenv("GATEWAY_HEALTH_CHECK_INTERVAL", "5")),
+    default_rate_limit=RateLimitPolicy(rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST) if RATE_LIMIT_RPS > 0 else None,
+    shared_state=shared_state,
+    workers=WORKERS
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await proxy_engine.startup()
+    startup.finish()
+    yield
+    await proxy_engine.shutdown()
 
 app = FastAPI(
     title="Gateway API",
     version="1.0.0",
-    description="Gateway API 서버"
+    description="Gateway API 서버",
+    lifespan=lifespan
 )
 
+# 게이트웨이 자체 응답의 조건부 GET(ETag/304)과 gzip/brotli 압축
+# 프록시 응답은 스트리밍이므로 업스트림이 단 ETag/Content-Encoding 그대로 전달됨
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+
 # CORS 설정 - React 프론트엔드(localhost:3000) 연결용
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +82,12 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# 라우트별 지연 시간/처리 중 요청 수 메트릭, Server-Timing 헤더, /metrics 엔드포인트
+instrument(app, "gateway")
+
+# 준비 상태 엔드포인트 (/ready, 프록시 엔진 시작 후 200)
+startup.install(app)
+
 # 루트 경로 - API 정보 반환
 @app.get("/")
 async def read_root():
@@ -39,7 +102,7 @@ async def read_root():
 async def health_check():
     """
     Health check 엔드포인트
-    
+
     프론트엔드에서 서버 연결 상태를 확인하는 용도로 사용됩니다.
     """
     return {
@@ -51,239 +114,95 @@ async def health_check():
 # 메인 라우터 생성
 main_router = APIRouter()
 
-# 챗봇 서비스 라우터 생성 및 연결
-chatbot_router = APIRouter(prefix="/chatbot", tags=["chatbot"])
-
-# 요청/응답 모델 정의
-class Message(BaseModel):
-    """메시지 모델"""
-    role: str  # "system", "user", "assistant"
-    content: str
-
-class ChatRequest(BaseModel):
-    """챗봇 요청 모델"""
-    message: str
-    model: str = "gpt-3.5-turbo"
-    system_message: str = "You are a helpful assistant. Respond in Korean."
-    conversation_history: list[Message] = []  # 대화 히스토리 (선택사항)
-
-class ChatResponse(BaseModel):
-    """챗봇 응답 모델"""
-    message: str
-    model: str
-    status: str = "success"
-
-@chatbot_router.get("/chat")
-async def chat():
-    """
-    챗봇 서비스 프록시 - 대화 (GET)
-    
-    기본 테스트용 엔드포인트입니다.
-    
-    - **반환**: 챗봇 응답 (기본 메시지)
-    """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get("http://chatbot-service:9001/chatbot/chat")
-            
-            if response.status_code != 200:
-                error_data = response.json()
-                error_message = error_data.get('detail', 'Unknown error occurred')
-                return ChatResponse(
-                    message=f"오류가 발생했습니다: {error_message}",
-                    model="gpt-3.5-turbo",
-                    status="error"
-                )
-            
-            response_data = response.json()
-            if 'message' in response_data and 'model' in response_data:
-                return ChatResponse(
-                    message=response_data.get('message', ''),
-                    model=response_data.get('model', 'gpt-3.5-turbo'),
-                    status=response_data.get('status', 'success')
-                )
-            else:
-                return ChatResponse(
-                    message=str(response_data),
-                    model="gpt-3.5-turbo",
-                    status="error"
-                )
-        except Exception as e:
-            return ChatResponse(
-                message=f"서버 연결 오류: {str(e)}",
-                model="gpt-3.5-turbo",
-                status="error"
-            )
-
-@chatbot_router.post("/chat")
-async def chat_post(request: ChatRequest):
-    """
-    챗봇 서비스 프록시 - 대화 (POST)
-    
-    사용자 메시지를 받아 AI 챗봇 응답을 반환합니다.
-    
-    **요청 예시:**
-    ```json
-    {
-        "message": "안녕하세요! 오늘 날씨 어때요?",
-        "model": "gpt-3.5-turbo",
-        "system_message": "You are a helpful assistant. Respond in Korean."
-    }
-    ```
-    
-    **응답 예시:**
-    ```json
-    {
-        "message": "안녕하세요! 오늘 날씨에 대한 정보를 제공해드릴 수 없습니다...",
-        "model": "gpt-3.5-turbo",
-        "status": "success"
-    }
-    ```
-    
-    - **message** (필수): 사용자 메시지
-    - **model** (선택): 사용할 모델 (기본값: gpt-3.5-turbo)
-    - **system_message** (선택): 시스템 메시지 (기본값: "You are a helpful assistant. Respond in Korean.")
-    
-    - **반환**: 챗봇 응답
+@main_router.get("/gateway/stats/chat")
+async def chat_stats():
     """
-    from fastapi import HTTPException  # type: ignore
-    
-    timeout = httpx.Timeout(60.0, connect=10.0)  # 1분 타임아웃
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        try:
-            response = await client.post(
-                "http://chatbot-service:9001/chatbot/chat",
-                json=request.dict()
-            )
-            
-            # 에러 응답 처리
-            if response.status_code != 200:
-                error_data = response.json()
-                error_message = error_data.get('detail', 'Unknown error occurred')
-                
-                # 에러 응답을 ChatResponse 형태로 변환
-                return ChatResponse(
-                    message=f"오류가 발생했습니다: {error_message}",
-                    model=request.model,
-                    status="error"
-                )
-            
-            response_data = response.json()
-            
-            # 응답이 ChatResponse 형태인지 확인
-            if 'message' in response_data and 'model' in response_data:
-                return ChatResponse(
-                    message=response_data.get('message', ''),
-                    model=response_data.get('model', request.model),
-                    status=response_data.get('status', 'success')
-                )
-            else:
-                # 예상치 못한 응답 형태
-                return ChatResponse(
-                    message=str(response_data),
-                    model=request.model,
-                    status="error"
-                )
-                
-        except httpx.RequestError as e:
-            # 네트워크 오류
-            return ChatResponse(
-                message=f"서버 연결 오류: {str(e)}",
-                model=request.model,
-                status="error"
-            )
-        except Exception as e:
-            # 기타 오류
-            return ChatResponse(
-                message=f"오류가 발생했습니다: {str(e)}",
-                model=request.model,
-                status="error"
-            )
-
-# 일기 서비스 라우터 생성 및 연결
-diary_router = APIRouter(prefix="/diary", tags=["diary"])
-
-@diary_router.get("/diaries")
-async def get_diaries():
-    """
-    일기 서비스 프록시 - 일기 목록 조회
-    
-    - **반환**: 일기 목록
-    """
-    async with httpx.AsyncClient() as client:
-        response = await client.get("http://diary-service:9002/diary/diaries")
-        return response.json()
+    게이트웨이 챗 프록시 성능 통계
 
-# 크롤러 서비스 라우터 생성 및 연결
-crawler_router = APIRouter(prefix="/crawler", tags=["crawler"])
+    - **반환**: 모델별 요청 수, 대기/연결/첫 바이트/전체 시간(p50/p95/p99), 토큰 사용량
+    """
+    return chat_telemetry.stats()
 
-@crawler_router.get("/crawl")
-async def crawl():
+@main_router.get("/gateway/routes")
+async def list_routes():
     """
-    크롤러 서비스 프록시 - 크롤링 실행
-    
-    - **반환**: 크롤링 결과
+    프록시 라우트 테이블 조회
+
+    - **반환**: 접두사별 업스트림, 타임아웃, 재시도 정책
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get("http://crawler-service:9003/crawler/crawl")
-        return response.json()
+    return {
+        "routes": [
+            {
+                "prefix": route.prefix,
+                "upstream": route.upstream,
+                "methods": list(route.methods),
+                "timeout": route.timeout,
+                "connect_timeout": route.connect_timeout,
+                "retry_attempts": route.retry.attempts,
+                "hedge_after": route.hedge_after,
+                "balancer": route.balancer,
+                "transform": type(route.transform).__name__ if route.transform else None,
+            }
+            for route in proxy_engine.routes
+        ]
+    }
 
-@crawler_router.get("/bugsmusic")
-async def bugsmusic():
+@main_router.get("/gateway/upstreams")
+async def upstream_stats():
     """
-    벅스 실시간 차트 크롤링 프록시
-    
-    - **반환**: 벅스 실시간 차트 데이터 (순위, 제목, 아티스트, 앨범)
+    업스트림 레플리카/장애 대응 상태 조회
+
+    - **반환**: 레플리카별 헬스 상태, in-flight 요청 수, 평균 응답 시간, 서킷 브레이커 상태,
+      업스트림별 재시도 예산, 라우트별 적응형 타임아웃/헤징 수
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get("http://crawler-service:9003/crawler/bugsmusic")
-        return response.json()
+    return proxy_engine.stats()
 
-@crawler_router.get("/danawa_tv")
-async def danawa_tv():
+@main_router.get("/gateway/admission")
+async def admission_stats():
     """
-    다나와 TV 상품 목록 크롤링 프록시
-    
-    - **반환**: 다나와 TV 상품 데이터 (상품명, 가격, 판매처, 링크, 이미지)
+    게이트웨이 수용 제어 상태 조회
+
+    - **반환**: 라우트별 동시 처리 수/대기열 길이/거절 수, 클라이언트별 속도 제한 허용/거절 수
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get("http://crawler-service:9003/crawler/danawa_tv")
-        return response.json()
+    return proxy_engine.admission.stats()
 
-@crawler_router.get("/netflix")
-async def netflix():
+@main_router.get("/gateway/idempotency/stats")
+async def idempotency_stats():
     """
-    JustWatch Netflix 영화 산업 목록 크롤링 프록시
-    
-    - **반환**: Netflix 영화 데이터 (제목, 타입, 링크, 이미지)
+    게이트웨이 Idempotency-Key 저장소 상태 조회
+
+    - **반환**: 저장된 키 수, 진행 중인 요청 수, 재사용(hit/join) 횟수
     """
-    # Netflix 크롤링은 Selenium 사용으로 시간이 오래 걸리므로 타임아웃을 길게 설정
-    timeout = httpx.Timeout(300.0, connect=10.0)  # 5분 타임아웃
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        response = await client.get("http://crawler-service:9003/crawler/netflix")
-        return response.json()
-
-@crawler_router.get("/movie")
-async def movie():
+    return idempotency_store.stats()
+
+@main_router.get("/gateway/workers")
+async def worker_info():
     """
-    KMDB 뉴욕타임즈 21세기 영화 100선 크롤링 프록시
-    
-    - **반환**: 영화 데이터 (순위, 제목, 감독, 제작년도, 링크)
+    워커 프로세스/공유 상태 저장소 조회
+
+    - **반환**: 응답한 워커의 pid, 워커 수, 공유 상태 저장소 종류와 키/토큰 버킷 수
+      (메트릭, 서킷 브레이커, 적응형 타임아웃은 워커마다 따로 집계됨)
     """
-    # Selenium 크롤링은 시간이 오래 걸리므로 타임아웃을 길게 설정
-    timeout = httpx.Timeout(120.0, connect=10.0)  # 2분 타임아웃
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        response = await client.get("http://crawler-service:9003/crawler/movie")
-        return response.json()
+    return {"pid": os.getpid(), "workers": WORKERS, "shared_state": shared_state.describe()}
+
+# 프록시 라우터 생성 - 라우트 테이블의 접두사마다 하위 경로 전체를 업스트림으로 전달
+proxy_router = APIRouter()
+
+for route in proxy_engine.routes:
+    for path in (route.prefix, route.prefix + "/{path:path}"):
+        proxy_router.add_api_route(
+            path,
+            proxy_engine.handle,
+            methods=list(route.methods),
+            tags=[route.tag] if route.tag else None,
+            summary=route.description or None,
+            name=f"proxy:{path}"
+        )
 
 # 메인 라우터를 앱에 포함
 app.include_router(main_router)
-# 챗봇 라우터를 앱에 포함
-app.include_router(chatbot_router)
-# 일기 라우터를 앱에 포함
-app.include_router(diary_router)
-# 크롤러 라우터를 앱에 포함
-app.include_router(crawler_router)
+# 프록시 라우터를 앱에 포함 (챗봇/일기/크롤러)
+app.include_router(proxy_router)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=9000)
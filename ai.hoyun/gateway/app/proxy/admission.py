@@ -0,0 +1,346 @@
+"""
+게이트웨이 요청 수용 제어 (admission control)
+
+- ConcurrencyLimiter: 라우트별 동시 처리 수 상한 + 크기가 정해진 대기열.
+  대기열이 가득 차거나 대기 시간이 지나면 업스트림을 기다리지 않고 바로 503 + Retry-After
+- TokenBucketLimiter: 클라이언트(IP 또는 인증 주체)별 토큰 버킷. 초과하면 바로 429 + Retry-After
+
+느린 업스트림(예: /crawler/netflix 5분 대기)에 요청이 몰려도 게이트웨이의 메모리와 소켓이
+무한정 쌓이지 않도록 한다.
+
+워커 프로세스가 여러 개면(WEB_CONCURRENCY) 토큰 버킷은 공유 상태 저장소(common.shared_state)에 두어
+모든 워커가 같은 버킷을 쓰고, 동시 처리 수/대기열은 워커 수로 나눠 게이트웨이 전체 상한을 유지한다.
+"""
+import asyncio
+import hashlib
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from common.shared_state import MemoryBackend
+from common.metrics import REGISTRY
+from common.instrumentation import record_timing
+
+ADMISSION_REJECTED = REGISTRY.counter(
+    "gateway_admission_rejected_total", "Requests rejected by admission control", ("route", "reason"))
+ROUTE_IN_FLIGHT = REGISTRY.gauge(
+    "gateway_route_in_flight", "Admitted in-flight requests per route", ("route",))
+ROUTE_QUEUED = REGISTRY.gauge(
+    "gateway_route_queued", "Requests waiting for a concurrency slot per route", ("route",))
+QUEUE_WAIT = REGISTRY.histogram(
+    "gateway_admission_queue_wait_seconds", "Time spent waiting for a concurrency slot", ("route",))
+
+
+class AdmissionRejected(Exception):
+    """수용 제어로 거절된 요청"""
+
+    def __init__(self, reason, status_code, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class ConcurrencyPolicy:
+    """
+    라우트 동시 처리 정책
+
+    Args:
+        max_concurrency: 동시에 업스트림으로 보낼 수 있는 요청 수
+        max_queue: 자리가 날 때까지 기다릴 수 있는 요청 수 (넘으면 바로 503)
+        queue_timeout: 대기열에서 기다리는 최대 시간 (초, 넘으면 503)
+    """
+    max_concurrency: int = 64
+    max_queue: int = 128
+    queue_timeout: float = 10.0
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    클라이언트별 토큰 버킷 정책
+
+    Args:
+        rate: 초당 보충되는 토큰 수
+        burst: 버킷 최대 크기 (순간적으로 허용되는 요청 수)
+    """
+    rate: float = 10.0
+    burst: int = 20
+
+
+class AdmissionTicket:
+    """동시 처리 슬롯 (release를 여러 번 불러도 한 번만 반납)"""
+
+    __slots__ = ("_limiter", "_started")
+
+    def __init__(self, limiter):
+        self._limiter = limiter
+        self._started = time.monotonic()
+
+    def release(self):
+        if self._limiter is not None:
+            limiter, self._limiter = self._limiter, None
+            limiter.release(time.monotonic() - self._started)
+
+
+class ConcurrencyLimiter:
+    """라우트 하나의 동시 처리 상한 + FIFO 대기열"""
+
+    # 슬롯 점유 시간 EWMA 가중치 (Retry-After 추정용)
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, name, policy=None):
+        self.name = name
+        self.policy = policy or ConcurrencyPolicy()
+        self.in_flight = 0
+        self._waiters = deque()
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected = {"queue_full": 0, "queue_timeout": 0}
+        self.hold_ewma = None
+
+    @property
+    def queued(self):
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self):
+        """대기열이 빠질 때까지 걸릴 예상 시간 (초)"""
+        hold = self.hold_ewma if self.hold_ewma is not None else 1.0
+        return hold * (self.queued + 1) / self.policy.max_concurrency
+
+    def _update_gauges(self):
+        ROUTE_IN_FLIGHT.set(self.in_flight, route=self.name)
+        ROUTE_QUEUED.set(self.queued, route=self.name)
+
+    def _reject(self, reason):
+        self.rejected[reason] += 1
+        ADMISSION_REJECTED.inc(route=self.name, reason=reason)
+        return AdmissionRejected(reason, 503, self.retry_after())
+
+    async def acquire(self):
+        """
+        슬롯 하나를 얻을 때까지 대기
+
+        Returns:
+            AdmissionTicket: 요청이 끝나면 release() 해야 함
+        Raises:
+            AdmissionRejected: 대기열이 가득 찼거나 대기 시간 초과
+        """
+        if self.in_flight < self.policy.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            self._update_gauges()
+            return AdmissionTicket(self)
+        if self.queued >= self.policy.max_queue:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            # wait_for는 슬롯을 넘겨받은 직후의 취소를 삼키고 결과를 돌려줄 수 있으므로 asyncio.wait 사용
+            # (waiter 자체는 취소하지 않음)
+            await asyncio.wait((waiter,), timeout=self.policy.queue_timeout)
+            if not waiter.done():
+                waiter.cancel()
+                raise self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소되면 다음 대기자에게 넘김
+            if waiter.done() and not waiter.cancelled():
+                self._handoff()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            self._discard(waiter)
+            waited = time.perf_counter() - started
+            QUEUE_WAIT.observe(waited, route=self.name)
+            record_timing("admission_queue", waited)
+            self._update_gauges()
+        self.admitted += 1
+        return AdmissionTicket(self)
+
+    def _discard(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _handoff(self):
+        """슬롯을 대기 중인 다음 요청에 넘기거나, 대기자가 없으면 반납"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # in_flight 수는 그대로 두고 슬롯 소유권만 넘김
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def release(self, held_seconds):
+        if self.hold_ewma is None:
+            self.hold_ewma = held_seconds
+        else:
+            self.hold_ewma += self.EWMA_ALPHA * (held_seconds - self.hold_ewma)
+        self._handoff()
+        self._update_gauges()
+
+    def stats(self):
+        return {
+            "max_concurrency": self.policy.max_concurrency,
+            "max_queue": self.policy.max_queue,
+            "queue_timeout": self.policy.queue_timeout,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": dict(self.rejected),
+            "avg_hold_ms": round(self.hold_ewma * 1000.0, 1) if self.hold_ewma is not None else None,
+        }
+
+
+class TokenBucketLimiter:
+    """
+    클라이언트별 토큰 버킷
+
+    Args:
+        name: 통계/메트릭용 이름
+        policy: 토큰 버킷 정책
+        max_clients: 기억할 최대 클라이언트 수 (오래 안 쓴 버킷부터 제거, 프로세스 메모리 저장소일 때)
+        state: 버킷을 둘 공유 상태 저장소 (None이면 이 프로세스 메모리)
+    """
+
+    def __init__(self, name, policy=None, max_clients=10000, state=None):
+        self.name = name
+        self.policy = policy or RateLimitPolicy()
+        self.max_clients = max_clients
+        self.state = state or MemoryBackend()
+        self._prefix = f"ratelimit:{name}:"
+        self.allowed = 0
+        self.limited = 0
+
+    async def try_acquire(self, key):
+        """
+        토큰 하나 사용
+
+        공유 저장소(SQLite)는 파일 락을 기다리는 동안 이벤트 루프를 막지 않도록 스레드에서 처리한다.
+
+        Returns:
+            float: 0이면 허용, 양수면 토큰이 찰 때까지 기다려야 하는 시간 (초)
+        """
+        args = (self._prefix + key, self.policy.rate, self.policy.burst, self.max_clients)
+        if self.state.shared:
+            wait = await asyncio.to_thread(self.state.take_token, *args)
+        else:
+            wait = self.state.take_token(*args)
+        if wait <= 0:
+            self.allowed += 1
+            return 0.0
+        self.limited += 1
+        ADMISSION_REJECTED.inc(route=self.name, reason="rate_limited")
+        return wait
+
+    def stats(self):
+        return {
+            "rate": self.policy.rate,
+            "burst": self.policy.burst,
+            "clients": self.state.bucket_count(self._prefix),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+def _per_worker(policy, workers):
+    """
+    라우트 전체 동시 처리 정책을 워커 하나의 몫으로 나눔
+
+    내림으로 나눠 워커들의 합이 설정한 상한을 넘지 않게 한다.
+    동시 처리 수는 워커마다 최소 1 (상한이 워커 수보다 작을 때만 합이 워커 수가 됨),
+    대기열은 0이 될 수 있다 (자리가 없으면 기다리지 않고 바로 503).
+    """
+    if workers <= 1:
+        return policy
+    return replace(
+        policy,
+        max_concurrency=max(1, policy.max_concurrency // workers),
+        max_queue=policy.max_queue // workers,
+    )
+
+
+def client_key(request):
+    """
+    요청한 클라이언트 식별 키
+
+    Authorization 헤더가 있으면 인증 주체(토큰 해시)별로, 없으면 접속 IP별로 구분한다.
+    게이트웨이가 가장 앞단이므로 X-Forwarded-For는 믿지 않는다.
+    """
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return "auth:" + hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:16]
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+class AdmissionController:
+    """
+    라우트별 동시 처리 제한 + 클라이언트별 요청 속도 제한
+
+    Args:
+        routes: Route 목록 (route.concurrency / route.rate_limit / route.rate_limit_when 사용)
+        default_rate_limit: 모든 라우트에 공통으로 적용할 클라이언트별 제한 (None이면 없음)
+        state: 토큰 버킷을 둘 공유 상태 저장소 (None이면 이 프로세스 메모리)
+        workers: 워커 프로세스 수 (라우트 동시 처리 수/대기열을 워커마다 나눠 가짐)
+    """
+
+    def __init__(self, routes, default_rate_limit=None, state=None, workers=1):
+        state = state or MemoryBackend()
+        self.workers = workers
+        self._concurrency = {
+            route.prefix: ConcurrencyLimiter(route.prefix, _per_worker(route.concurrency, workers))
+            for route in routes if route.concurrency is not None
+        }
+        self._rate_limits = {
+            route.prefix: TokenBucketLimiter(route.prefix, route.rate_limit, state=state)
+            for route in routes if route.rate_limit is not None
+        }
+        self._default_rate_limit = (
+            TokenBucketLimiter("*", default_rate_limit, state=state) if default_rate_limit is not None else None
+        )
+
+    async def admit(self, route, request):
+        """
+        요청 수용 여부 결정
+
+        Returns:
+            AdmissionTicket | None: 동시 처리 제한이 있는 라우트면 슬롯 (요청이 끝나면 release)
+        Raises:
+            AdmissionRejected: 429 (속도 제한) 또는 503 (대기열 초과)
+        """
+        key = client_key(request)
+        route_limiter = self._rate_limits.get(route.prefix)
+        if route_limiter is not None and route.rate_limit_when is not None and not route.rate_limit_when(request):
+            route_limiter = None
+        for limiter in (self._default_rate_limit, route_limiter):
+            if limiter is None:
+                continue
+            wait = await limiter.try_acquire(key)
+            if wait > 0:
+                raise AdmissionRejected("rate_limited", 429, wait)
+
+        limiter = self._concurrency.get(route.prefix)
+        if limiter is None:
+            return None
+        return await limiter.acquire()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "default_rate_limit": self._default_rate_limit.stats() if self._default_rate_limit else None,
+            "routes": {
+                prefix: {
+                    "concurrency": self._concurrency[prefix].stats() if prefix in self._concurrency else None,
+                    "rate_limit": self._rate_limits[prefix].stats() if prefix in self._rate_limits else None,
+                }
+                for prefix in sorted(set(self._concurrency) | set(self._rate_limits))
+            },
+        }
@@ -0,0 +1,189 @@
+"""
+업스트림 레플리카 부하 분산
+
+업스트림 주소 설정 형식:
+- "http://a:9003,http://b:9003": 고정 레플리카 목록
+- "dns://crawler-service:9003": DNS A 레코드를 주기적으로 조회해 레플리카 목록 갱신
+  (docker compose --scale 로 늘린 컨테이너가 모두 잡힌다)
+
+선택 전략:
+- least_outstanding: 진행 중 요청(in-flight)이 가장 적은 레플리카 (같으면 평균 응답 시간이 짧은 쪽)
+- p2c: 무작위로 두 개를 골라 in-flight가 적은 쪽 (power of two choices)
+
+헬스 체크에 연속으로 실패한 레플리카와 서킷이 열린 레플리카는 선택하지 않는다.
+"""
+import asyncio
+import random
+import socket
+import time
+from urllib.parse import urlsplit
+from common.metrics import REGISTRY
+from proxy.resilience import CircuitBreaker
+
+LEAST_OUTSTANDING = "least_outstanding"
+POWER_OF_TWO = "p2c"
+
+IN_FLIGHT = REGISTRY.gauge(
+    "gateway_upstream_in_flight", "In-flight requests per upstream replica", ("upstream", "replica"))
+REPLICA_LATENCY = REGISTRY.histogram(
+    "gateway_upstream_replica_latency_seconds", "Time to response headers per upstream replica", ("upstream", "replica"))
+REPLICA_HEALTHY = REGISTRY.gauge(
+    "gateway_upstream_replica_healthy", "1 if the replica passed its last health checks", ("upstream", "replica"))
+
+
+class Replica:
+    """레플리카 하나의 상태"""
+
+    # 평균 응답 시간 EWMA 가중치
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, url, pool_name, circuit_policy):
+        self.url = url
+        self.pool_name = pool_name
+        self.breaker = CircuitBreaker(url, circuit_policy)
+        self.in_flight = 0
+        self.requests = 0
+        self.latency_ewma = None
+        self.healthy = True
+        self.health_failures = 0
+        self.last_health_check = None
+        REPLICA_HEALTHY.set(1, upstream=pool_name, replica=url)
+
+    def acquire(self):
+        self.in_flight += 1
+        self.requests += 1
+        IN_FLIGHT.set(self.in_flight, upstream=self.pool_name, replica=self.url)
+
+    def release(self):
+        self.in_flight = max(0, self.in_flight - 1)
+        IN_FLIGHT.set(self.in_flight, upstream=self.pool_name, replica=self.url)
+
+    def observe(self, seconds):
+        REPLICA_LATENCY.observe(seconds, upstream=self.pool_name, replica=self.url)
+        if self.latency_ewma is None:
+            self.latency_ewma = seconds
+        else:
+            self.latency_ewma += self.EWMA_ALPHA * (seconds - self.latency_ewma)
+
+    def selectable(self):
+        return self.healthy and self.breaker.available()
+
+    def load_key(self):
+        return (self.in_flight, self.latency_ewma or 0.0)
+
+    def stats(self):
+        return {
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "latency_ewma_ms": round(self.latency_ewma * 1000.0, 1) if self.latency_ewma is not None else None,
+            "health_failures": self.health_failures,
+            "circuit": self.breaker.stats(),
+        }
+
+
+class ReplicaPool:
+    """
+    업스트림 하나의 레플리카 집합
+
+    Args:
+        name: 업스트림 설정 문자열 (쉼표 목록 또는 dns://host:port)
+        strategy: least_outstanding | p2c
+        circuit_policy: 레플리카별 서킷 브레이커 정책
+        health_path: 헬스 체크 경로
+        unhealthy_threshold: 비정상으로 판단할 연속 헬스 체크 실패 수
+    """
+
+    def __init__(self, name, strategy=LEAST_OUTSTANDING, circuit_policy=None,
+                 health_path="/ready", unhealthy_threshold=2):
+        self.name = name
+        self.strategy = strategy
+        self.circuit_policy = circuit_policy
+        self.health_path = health_path
+        self.unhealthy_threshold = unhealthy_threshold
+        self.replicas = {}
+        self._dns = None
+        if name.startswith("dns://"):
+            parts = urlsplit(name)
+            self._dns = (parts.hostname, parts.port or 80)
+            # 첫 DNS 조회 전까지는 호스트 이름 그대로 사용
+            self._set_urls([f"http://{parts.hostname}:{self._dns[1]}"])
+        else:
+            self._set_urls([url.strip().rstrip("/") for url in name.split(",") if url.strip()])
+
+    def _set_urls(self, urls):
+        current = self.replicas
+        self.replicas = {
+            url: current.get(url) or Replica(url, self.name, self.circuit_policy)
+            for url in urls
+        }
+
+    async def resolve(self):
+        """dns:// 업스트림이면 A 레코드를 다시 조회"""
+        if self._dns is None:
+            return
+        host, port = self._dns
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            return
+        addresses = sorted({info[4][0] for info in infos})
+        if addresses:
+            self._set_urls([f"http://{address}:{port}" for address in addresses])
+
+    def choose(self, exclude=(), count=2):
+        """
+        요청을 보낼 레플리카 후보 (좋은 순서, 최대 count개)
+
+        Args:
+            exclude: 이미 시도한 레플리카 URL
+            count: 후보 수 (헤징용으로 2개)
+        """
+        candidates = [r for r in self.replicas.values() if r.url not in exclude and r.selectable()]
+        if len(candidates) <= 1:
+            return candidates
+        if self.strategy == POWER_OF_TWO:
+            picked = random.sample(candidates, 2)
+            picked.sort(key=Replica.load_key)
+            if count > 2:
+                rest = [r for r in candidates if r not in picked]
+                picked.extend(sorted(rest, key=Replica.load_key))
+            return picked[:count]
+        # 같은 부하면 무작위로 섞어 한 레플리카에 몰리지 않게 함
+        random.shuffle(candidates)
+        candidates.sort(key=Replica.load_key)
+        return candidates[:count]
+
+    def get(self, url):
+        return self.replicas.get(url)
+
+    def retry_after(self):
+        waits = [r.breaker.retry_after() for r in self.replicas.values() if r.healthy]
+        return min(waits) if waits else 1.0
+
+    async def check_health(self, client, timeout=2.0):
+        """모든 레플리카에 헬스 체크 요청 (5xx/연결 실패가 연속되면 비정상)"""
+        async def probe(replica):
+            try:
+                response = await client.get(replica.url + self.health_path, timeout=timeout)
+                ok = response.status_code < 500
+            except Exception:
+                ok = False
+            replica.last_health_check = time.time()
+            if ok:
+                replica.health_failures = 0
+                replica.healthy = True
+            else:
+                replica.health_failures += 1
+                if replica.health_failures >= self.unhealthy_threshold:
+                    replica.healthy = False
+            REPLICA_HEALTHY.set(1 if replica.healthy else 0, upstream=self.name, replica=replica.url)
+
+        await asyncio.gather(*(probe(r) for r in list(self.replicas.values())))
+
+    def stats(self):
+        return {
+            "strategy": self.strategy,
+            "health_path": self.health_path,
+            "replicas": {url: replica.stats() for url, replica in self.replicas.items()},
+        }
@@ -0,0 +1,524 @@
+"""
+게이트웨이 프록시 엔진
+
+라우트 테이블(proxy.routes)에 따라 요청을 업스트림으로 전달한다.
+요청/응답 본문은 디코딩하지 않고 바이트 그대로 스트리밍하며, content-encoding 등 헤더도 그대로 전달한다.
+라우트에 변환기(transform)가 지정되고 변환이 필요한 응답일 때만 본문을 읽는다.
+
+레플리카 선택 (proxy.balancer):
+- 업스트림마다 레플리카 풀을 두고 in-flight 요청 수/응답 시간 기준으로 선택 (least_outstanding 또는 p2c)
+- 주기적으로 /ready를 호출해 응답하지 않거나 준비되지 않은 레플리카는 제외, dns:// 업스트림은 주소 목록도 갱신
+
+수용 제어 (proxy.admission):
+- 클라이언트별 토큰 버킷 초과는 429, 라우트 동시 처리 대기열 초과/대기 시간 초과는 503 (둘 다 Retry-After)
+- 동시 처리 슬롯은 응답 스트리밍이 끝날 때까지 유지
+
+업스트림 장애 대응 (proxy.resilience):
+- 레플리카별 서킷 브레이커: open 상태면 업스트림을 기다리지 않고 바로 503 + Retry-After
+- 재시도: 본문 없는 멱등 요청만, 업스트림별 재시도 예산 안에서
+- 헤징: 레플리카가 여럿이면 느린 요청에 대해 다른 레플리카로 한 번 더 요청하고 먼저 온 응답 사용
+- 적응형 타임아웃: 라우트별 최근 응답 시간 분위수 기반
+
+업스트림 요청마다 트레이싱 span을 만들고 traceparent 헤더로 하위 서비스에 trace를 이어 준다 (common.tracing).
+"""
+import asyncio
+import base64
+import logging
+import time
+import httpx  # type: ignore
+from fastapi import Request  # type: ignore
+from fastapi.responses import JSONResponse, Response, StreamingResponse  # type: ignore
+from starlette.background import BackgroundTask  # type: ignore
+from starlette.datastructures import Headers  # type: ignore
+from common.idempotency import AsyncIdempotencyStore, IdempotencyConflict, fingerprint
+from upstream_timing import UpstreamTimer
+from proxy.resilience import CircuitOpenError, RetryBudget, AdaptiveTimeout
+from proxy.transforms import describe_failure
+from proxy.balancer import ReplicaPool
+from proxy.admission import AdmissionController, AdmissionRejected
+from common.http_cache import identity_etag
+from common.instrumentation import record_upstream
+from common.tracing import start_span, inject
+
+logger = logging.getLogger(__name__)
+
+# 프록시가 전달하지 않는 hop-by-hop 헤더
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "trailers", "transfer-encoding", "upgrade",
+}
+# 요청에서 제외할 헤더 (httpx가 업스트림에 맞게 다시 설정)
+_EXCLUDED_REQUEST_HEADERS = HOP_BY_HOP_HEADERS | {"host"}
+# 응답에서 제외할 헤더 (게이트웨이 서버가 직접 설정)
+_EXCLUDED_RESPONSE_HEADERS = HOP_BY_HOP_HEADERS | {"server", "date"}
+
+
+class BufferedResponse:
+    """본문까지 모두 읽은 업스트림 응답 (Idempotency-Key 저장용)"""
+
+    __slots__ = ("status_code", "headers", "body")
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def to_dict(self):
+        """워커 간 공유 저장소에 넣을 JSON 형태"""
+        return {
+            "status_code": self.status_code,
+            "headers": list(self.headers.multi_items()),
+            "body": base64.b64encode(self.body).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["status_code"], httpx.Headers(data["headers"]), base64.b64decode(data["body"]))
+
+
+def _request_headers(request):
+    headers = [(k, v) for k, v in request.headers.items() if k.lower() not in _EXCLUDED_REQUEST_HEADERS]
+    client_host = request.client.host if request.client else None
+    if client_host:
+        forwarded = request.headers.get("x-forwarded-for")
+        headers.append(("x-forwarded-for", f"{forwarded}, {client_host}" if forwarded else client_host))
+    return headers
+
+
+def _response_headers(headers):
+    """
+    클라이언트에 전달할 업스트림 응답 헤더
+
+    Set-Cookie/Vary/Link처럼 여러 번 오는 헤더가 합쳐지지 않도록 multi_items()로 목록을 만들고,
+    Starlette 응답에 그대로 넘길 수 있게 Headers(raw)로 감싼다 (items()가 같은 이름의 헤더를 모두 돌려줌).
+    """
+    raw = [
+        (k.lower().encode("latin-1"), v.encode("latin-1"))
+        for k, v in headers.multi_items() if k.lower() not in _EXCLUDED_RESPONSE_HEADERS
+    ]
+    return Headers(raw=raw)
+
+
+class ProxyEngine:
+    """
+    라우트 테이블 기반 프록시
+
+    Args:
+        routes: Route 목록
+        max_connections: 업스트림 최대 연결 수
+        idempotency_store: Idempotency-Key 저장소 (dedupe_posts 라우트용)
+        health_interval: 레플리카 헬스 체크/DNS 갱신 주기 (초, 0이면 끔)
+        default_rate_limit: 모든 라우트에 적용할 클라이언트별 속도 제한 (RateLimitPolicy, None이면 없음)
+        shared_state: 워커끼리 공유하는 상태 저장소 (속도 제한 토큰 버킷, None이면 프로세스 메모리)
+        workers: 워커 프로세스 수 (라우트 동시 처리 한도를 워커마다 나눔)
+        transport: 업스트림 요청에 쓸 httpx transport (None이면 기본 연결 풀, 테스트에서 교체)
+    """
+
+    # 응답 extensions에 요청을 보낸 레플리카를 기록하는 키 (응답을 닫을 때 in-flight 감소)
+    _REPLICA_KEY = "gateway_replica"
+
+    def __init__(self, routes, max_connections=200, idempotency_store=None, health_interval=5.0,
+                 default_rate_limit=None, shared_state=None, workers=1, transport=None):
+        # 가장 긴 접두사부터 검사
+        self.routes = sorted(routes, key=lambda r: len(r.prefix), reverse=True)
+        self.max_connections = max_connections
+        self.idempotency_store = idempotency_store or AsyncIdempotencyStore()
+        self.health_interval = health_interval
+        self.admission = AdmissionController(self.routes, default_rate_limit, state=shared_state, workers=workers)
+        self.transport = transport
+        self._client = None
+        self._health_task = None
+        # 업스트림 -> 레플리카 풀 (레플리카별 서킷 브레이커 포함)
+        self._pools = {}
+        # 업스트림 -> 재시도 예산
+        self._budgets = {}
+        # 라우트 접두사 -> 적응형 타임아웃
+        self._timeouts = {}
+        # 라우트 접두사 -> 헤징 요청 수
+        self._hedges = {}
+        for route in self.routes:
+            if route.upstream not in self._pools:
+                self._pools[route.upstream] = ReplicaPool(
+                    route.upstream, strategy=route.balancer, circuit_policy=route.circuit,
+                    health_path=route.health_path
+                )
+            self._budgets.setdefault(route.upstream, RetryBudget(ratio=route.retry.budget_ratio))
+            if route.adaptive_timeout is not None:
+                self._timeouts[route.prefix] = AdaptiveTimeout(route.timeout, route.adaptive_timeout)
+            self._hedges[route.prefix] = 0
+
+    async def startup(self):
+        # 라우트마다 클라이언트를 새로 만들지 않고 연결 풀을 공유 (keep-alive 재사용)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            ),
+            transport=self.transport
+        )
+        for pool in self._pools.values():
+            await pool.resolve()
+        if self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def shutdown(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _health_loop(self):
+        """레플리카 주소 갱신(DNS) + 헬스 체크 반복"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for pool in self._pools.values():
+                try:
+                    await pool.resolve()
+                    await pool.check_health(self.client)
+                except Exception:
+                    logger.exception("health check failed for %s", pool.name)
+
+    @property
+    def client(self):
+        if self._client is None:
+            raise RuntimeError("ProxyEngine is not started")
+        return self._client
+
+    def match(self, path):
+        """경로에 해당하는 라우트 (없으면 None)"""
+        for route in self.routes:
+            if route.matches(path):
+                return route
+        return None
+
+    async def handle(self, request: Request):
+        """FastAPI 핸들러: 요청을 라우트의 업스트림으로 전달"""
+        route = self.match(request.url.path)
+        if route is None:
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
+
+        try:
+            ticket = await self.admission.admit(route, request)
+        except AdmissionRejected as e:
+            return self._rejected_response(route, e)
+        streaming = False
+        try:
+            response = await self._dispatch(route, request, ticket)
+            streaming = isinstance(response, StreamingResponse)
+            return response
+        finally:
+            # 스트리밍 응답이면 슬롯은 스트림이 끝날 때 반납
+            if ticket is not None and not streaming:
+                ticket.release()
+
+    async def _dispatch(self, route, request, ticket):
+        idempotency_key = request.headers.get("idempotency-key")
+        if route.dedupe_posts and request.method == "POST" and idempotency_key:
+            return await self._handle_deduplicated(route, request, idempotency_key)
+
+        timer = UpstreamTimer()
+        content = request.stream() if self._has_body(request) else None
+        try:
+            upstream = await self._send(route, request, content, timer)
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            return self._failure_response(route, request, e, timer)
+
+        if route.transform is not None and route.transform.wants(upstream.status_code, upstream.headers):
+            try:
+                body = await upstream.aread()
+            finally:
+                await self._aclose(upstream)
+            self._observe(route, request, upstream.status_code, upstream.headers, timer)
+            return route.transform.apply(upstream.status_code, upstream.headers, body)
+
+        async def close():
+            await self._aclose(upstream, ticket)
+            self._observe(route, request, upstream.status_code, upstream.headers, timer)
+
+        return StreamingResponse(
+            self._stream(upstream, ticket),
+            status_code=upstream.status_code,
+            headers=_response_headers(upstream.headers),
+            background=BackgroundTask(close)
+        )
+
+    async def _stream(self, upstream, ticket=None):
+        # aiter_raw: content-encoding을 풀지 않은 원본 바이트를 그대로 전달
+        # 클라이언트가 중간에 끊어도 레플리카 in-flight 수/동시 처리 슬롯이 남지 않도록 finally에서 닫음
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        finally:
+            await self._aclose(upstream, ticket)
+
+    async def _aclose(self, response, ticket=None):
+        """업스트림 응답을 닫고 레플리카 in-flight 수 감소 (여러 번 호출해도 한 번만 감소)"""
+        try:
+            await response.aclose()
+        finally:
+            replica = response.extensions.pop(self._REPLICA_KEY, None)
+            if replica is not None:
+                replica.release()
+            if ticket is not None:
+                ticket.release()
+
+    @staticmethod
+    def _has_body(request):
+        return "content-length" in request.headers or "transfer-encoding" in request.headers
+
+    def _timeout(self, route):
+        adaptive = self._timeouts.get(route.prefix)
+        return httpx.Timeout(adaptive.current if adaptive else route.timeout, connect=route.connect_timeout)
+
+    def _hedge_delay(self, route):
+        """헤징 요청을 보낼 지연 시간 (None이면 헤징 안 함)"""
+        if route.hedge_after == "p95":
+            adaptive = self._timeouts.get(route.prefix)
+            if adaptive is None or not adaptive.ready:
+                return None
+            return adaptive.percentile(95)
+        return route.hedge_after
+
+    async def _send(self, route, request, content, timer):
+        """
+        업스트림 요청 전송 (응답 본문은 스트림으로 남겨 둠)
+
+        본문 없는 멱등 요청은 재시도 정책/예산에 따라 다른 레플리카로 재시도하고, 헤징도 적용한다.
+        """
+        # 퍼센트 인코딩된 원본 경로를 그대로 사용
+        # (ASGI raw_path에는 쿼리 문자열이 없어야 하지만 Starlette TestClient 등은 포함하므로 잘라 냄)
+        raw_path = request.scope.get("raw_path") or request.url.path.encode("utf-8")
+        path = raw_path.decode("latin-1").split("?", 1)[0]
+        if request.url.query:
+            path += "?" + request.url.query
+        headers = _request_headers(request)
+        timeout = self._timeout(route)
+        retry = route.retry
+        idempotent = request.method in retry.methods and content is None
+        attempts = retry.attempts if idempotent else 0
+        budget = self._budgets[route.upstream]
+        budget.record_request()
+        pool = self._pools[route.upstream]
+
+        def build(url, trace):
+            extensions = {"trace": trace} if trace is not None else {}
+            return self.client.build_request(
+                request.method, httpx.URL(url + path), headers=headers, content=content,
+                timeout=timeout, extensions=extensions
+            )
+
+        response = None
+        error = None
+        tried = set()
+        for attempt in range(attempts + 1):
+            if attempt > 0:
+                if not budget.try_retry():
+                    break
+                if response is not None:
+                    await self._aclose(response)
+                    response = None
+                await asyncio.sleep(retry.backoff * (2 ** (attempt - 1)))
+
+            candidates = pool.choose(tried) or pool.choose()
+            if not candidates:
+                break
+            tried.add(candidates[0].url)
+            hedge_delay = self._hedge_delay(route) if idempotent and len(candidates) > 1 else None
+            try:
+                if hedge_delay is not None:
+                    response = await self._send_hedged(route, candidates[0], candidates[1], build, timer, hedge_delay)
+                else:
+                    response = await self._send_to(route, candidates[0], build(candidates[0].url, timer.trace))
+                error = None
+            except (httpx.HTTPError, CircuitOpenError) as e:
+                response = None
+                error = e
+                continue
+            if response.status_code not in retry.statuses:
+                return response
+
+        if response is not None:
+            return response
+        if error is not None:
+            raise error
+        raise CircuitOpenError(route.upstream, pool.retry_after())
+
+    async def _send_to(self, route, replica, upstream_request):
+        """레플리카 하나에 요청 전송 후 서킷 브레이커/응답 시간 기록 (in-flight는 응답을 닫을 때 감소)"""
+        breaker = replica.breaker
+        if not breaker.allow():
+            raise CircuitOpenError(replica.url, breaker.retry_after())
+        replica.acquire()
+        started = time.perf_counter()
+        # 시도(재시도/헤징 포함)마다 span을 만들고 업스트림에 traceparent 전달
+        with start_span(f"proxy {self._upstream_name(route)}", replica=replica.url) as span:
+            inject(upstream_request.headers)
+            try:
+                response = await self.client.send(upstream_request, stream=True)
+            except asyncio.CancelledError:
+                replica.release()
+                breaker.release()
+                span.set_attribute("cancelled", True)
+                raise
+            except httpx.HTTPError as e:
+                replica.release()
+                breaker.record_failure()
+                outcome = "timeout" if isinstance(e, httpx.TimeoutException) else "error"
+                record_upstream(self._upstream_name(route), time.perf_counter() - started, outcome)
+                raise
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.status = "error"
+        elapsed = time.perf_counter() - started
+        response.extensions[self._REPLICA_KEY] = replica
+        replica.observe(elapsed)
+        record_upstream(self._upstream_name(route), elapsed, "ok" if response.status_code < 500 else "error")
+        if response.status_code >= 502:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            adaptive = self._timeouts.get(route.prefix)
+            if adaptive is not None:
+                adaptive.observe(elapsed)
+        return response
+
+    @staticmethod
+    def _upstream_name(route):
+        return route.tag or route.prefix.strip("/")
+
+    async def _send_hedged(self, route, primary, secondary, build, timer, delay):
+        """primary 응답이 delay 안에 오지 않으면 secondary에도 요청하고 먼저 성공한 응답 사용"""
+        first = asyncio.ensure_future(self._send_to(route, primary, build(primary.url, timer.trace)))
+        tasks = {first}
+        winner = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._hedges[route.prefix] += 1
+                tasks.add(asyncio.ensure_future(self._send_to(route, secondary, build(secondary.url, None))))
+
+            error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [t for t in done if not t.cancelled() and t.exception() is None]
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                if winners:
+                    winner = winners[0]
+                    return winner.result()
+            raise error
+        finally:
+            # 사용하지 않는 요청 정리: 진행 중이면 취소하고 끝날 때까지 기다린 뒤,
+            # 응답을 받은 요청(동시에 끝났거나 취소 직전에 끝난 것)은 닫아 연결과 레플리카 in-flight 수를 반환
+            losers = [task for task in tasks if task is not winner]
+            for task in losers:
+                task.cancel()
+            for result in await asyncio.gather(*losers, return_exceptions=True):
+                if isinstance(result, httpx.Response):
+                    await self._aclose(result)
+
+    async def _fetch_buffered(self, route, request, body, timer):
+        response = await self._send(route, request, body, timer)
+        try:
+            content = await response.aread()
+        finally:
+            await self._aclose(response)
+        headers = response.headers
+        if "content-encoding" in headers:
+            # aread()가 content-encoding을 풀었으므로 저장/재전송하는 본문은 압축되지 않은 원본
+            headers = headers.copy()
+            del headers["content-encoding"]
+            headers.pop("content-length", None)
+            if "etag" in headers:
+                headers["etag"] = identity_etag(headers["etag"])
+        return BufferedResponse(response.status_code, headers, content)
+
+    async def _handle_deduplicated(self, route, request, key):
+        """같은 Idempotency-Key의 POST를 업스트림 호출 하나로 합침"""
+        body = await request.body()
+        timer = UpstreamTimer()
+        try:
+            buffered, replayed = await self.idempotency_store.run(
+                key,
+                fingerprint(body),
+                lambda: self._fetch_buffered(route, request, body, timer),
+                cacheable=lambda r: r.status_code == 200
+            )
+        except IdempotencyConflict:
+            return JSONResponse(
+                {"detail": "Idempotency-Key is already used with a different request body."},
+                status_code=422
+            )
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            return self._failure_response(route, request, e, timer)
+
+        if not replayed:
+            self._observe(route, request, buffered.status_code, buffered.headers, timer)
+        if route.transform is not None and route.transform.wants(buffered.status_code, buffered.headers):
+            response = route.transform.apply(buffered.status_code, buffered.headers, buffered.body)
+        else:
+            response = Response(
+                content=buffered.body,
+                status_code=buffered.status_code,
+                headers=_response_headers(buffered.headers)
+            )
+        if replayed:
+            response.headers["Idempotency-Replayed"] = "true"
+        return response
+
+    def _failure_response(self, route, request, exc, timer):
+        """업스트림 연결 실패/타임아웃/서킷 open 응답"""
+        timer.finish()
+        if isinstance(exc, CircuitOpenError):
+            status_code = 503
+        elif isinstance(exc, httpx.TimeoutException):
+            status_code = 504
+        else:
+            status_code = 502
+        self._observe(route, request, status_code, {}, timer)
+
+        response = route.transform.on_failure(exc) if route.transform is not None else None
+        if response is None:
+            response = JSONResponse({"detail": describe_failure(exc)}, status_code=status_code)
+        if isinstance(exc, CircuitOpenError):
+            response.headers["Retry-After"] = str(max(1, int(exc.retry_after + 0.999)))
+        return response
+
+    def _rejected_response(self, route, exc):
+        """수용 제어로 거절된 요청 응답 (429/503 + Retry-After)"""
+        response = route.transform.on_rejected(exc) if route.transform is not None else None
+        if response is None:
+            detail = "Too many requests" if exc.status_code == 429 else "Server is busy"
+            response = JSONResponse({"detail": f"{detail} ({exc.reason})"}, status_code=exc.status_code)
+        response.status_code = exc.status_code
+        response.headers["Retry-After"] = str(max(1, int(exc.retry_after + 0.999)))
+        return response
+
+    def stats(self):
+        """업스트림별 레플리카 상태(헬스/in-flight/응답 시간/서킷), 재시도 예산, 라우트별 타임아웃/헤징 수"""
+        return {
+            "upstreams": {upstream: pool.stats() for upstream, pool in self._pools.items()},
+            "retry_budgets": {upstream: budget.stats() for upstream, budget in self._budgets.items()},
+            "routes": {
+                route.prefix: {
+                    "timeout": self._timeouts[route.prefix].stats() if route.prefix in self._timeouts
+                    else {"timeout": route.timeout, "max_timeout": route.timeout, "samples": 0},
+                    "hedged_requests": self._hedges[route.prefix],
+                }
+                for route in self.routes
+            },
+        }
+
+    def _observe(self, route, request, status_code, headers, timer):
+        if timer.finished is None:
+            timer.finish()
+        if route.observer is not None:
+            route.observer(request, status_code, headers, timer)
@@ -0,0 +1,41 @@
+"""
+프록시 요청 완료 콜백 (계측용)
+
+본문을 디코딩하지 않고 업스트림 응답 헤더와 UpstreamTimer 값만 사용한다.
+"""
+from common.chat_telemetry import ChatTelemetry, ChatTiming
+
+# 챗 프록시 성능 계측 (연결 풀 대기, 연결 시간, 첫 바이트, 전체 시간, 토큰 사용량)
+chat_telemetry = ChatTelemetry("gateway")
+
+_CHAT_PATHS = {"/chatbot/chat": False, "/chatbot/chat/stream": True}
+
+
+def _int_header(headers, name):
+    try:
+        return int(headers.get(name, 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def chat_observer(request, status_code, headers, timer):
+    """
+    챗 POST 요청 성능 기록
+
+    챗봇 서비스가 응답 헤더(X-Chat-Model, X-Chat-Prompt-Tokens, X-Chat-Completion-Tokens)로
+    모델과 토큰 사용량을 알려준다.
+    """
+    streamed = _CHAT_PATHS.get(request.url.path)
+    if streamed is None or request.method != "POST":
+        return
+    chat_telemetry.record(ChatTiming(
+        model=headers.get("x-chat-model", "unknown"),
+        status="success" if status_code == 200 else "error",
+        queue_wait=timer.queue_wait,
+        connect=timer.connect,
+        ttft=timer.first_byte,
+        total=timer.total,
+        prompt_tokens=_int_header(headers, "x-chat-prompt-tokens"),
+        completion_tokens=_int_header(headers, "x-chat-completion-tokens"),
+        streamed=streamed
+    ))
@@ -0,0 +1,229 @@
+"""
+업스트림 장애 대응 정책
+
+- CircuitBreaker: 연속 실패가 쌓이면 요청을 바로 거절(open)하고, 일정 시간 후 소수의 요청으로 회복을 확인(half-open)
+- RetryBudget: 최근 요청 수 대비 재시도 비율을 제한해 재시도 폭주를 막음
+- AdaptiveTimeout: 고정 타임아웃 대신 최근 응답 시간 분위수로 타임아웃 계산
+"""
+import time
+from collections import deque
+from dataclasses import dataclass
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 요청을 보내지 않음"""
+
+    def __init__(self, upstream, retry_after):
+        super().__init__(f"circuit open for {upstream}")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class CircuitPolicy:
+    """
+    서킷 브레이커 정책
+
+    Args:
+        failure_threshold: open으로 전환할 연속 실패 수
+        recovery_timeout: open 유지 시간 (초). 이후 half-open 으로 전환
+        half_open_max_calls: half-open 상태에서 동시에 허용할 시험 요청 수
+    """
+    failure_threshold: int = 5
+    recovery_timeout: float = 15.0
+    half_open_max_calls: int = 1
+
+
+class CircuitBreaker:
+    """업스트림(레플리카) 하나의 서킷 브레이커"""
+
+    def __init__(self, name, policy=None):
+        self.name = name
+        self.policy = policy or CircuitPolicy()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.rejected = 0
+
+    def _refresh(self, now):
+        if self.state == OPEN and now - self.opened_at >= self.policy.recovery_timeout:
+            self.state = HALF_OPEN
+            self.half_open_calls = 0
+
+    def retry_after(self):
+        """open 상태가 끝나기까지 남은 시간 (초)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.policy.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self):
+        """요청을 보내도 되는지 확인 (half-open이면 시험 요청 수를 차지)"""
+        self._refresh(time.monotonic())
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and self.half_open_calls < self.policy.half_open_max_calls:
+            self.half_open_calls += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def available(self):
+        """allow()와 같지만 상태를 바꾸지 않음 (레플리카 선택용)"""
+        self._refresh(time.monotonic())
+        if self.state == CLOSED:
+            return True
+        return self.state == HALF_OPEN and self.half_open_calls < self.policy.half_open_max_calls
+
+    def release(self):
+        """결과 없이 끝난(취소된) 시험 요청 자리를 반환"""
+        if self.state == HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.half_open_calls = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.policy.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.half_open_calls = 0
+
+    def stats(self):
+        self._refresh(time.monotonic())
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "retry_after": round(self.retry_after(), 1),
+        }
+
+
+class RetryBudget:
+    """
+    재시도 예산
+
+    window 초 동안의 재시도 수를 (min_per_second * window + ratio * 요청 수) 이하로 제한한다.
+
+    Args:
+        ratio: 요청 대비 허용 재시도 비율
+        min_per_second: 요청이 적을 때도 허용할 초당 재시도 수
+        window: 집계 구간 (초)
+    """
+
+    def __init__(self, ratio=0.2, min_per_second=1.0, window=10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self.exhausted = 0
+
+    def _trim(self, now):
+        cutoff = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_request(self):
+        self._requests.append(time.monotonic())
+
+    def try_retry(self):
+        """재시도 가능하면 예산을 차감하고 True"""
+        now = time.monotonic()
+        self._trim(now)
+        allowed = self.min_per_second * self.window + self.ratio * len(self._requests)
+        if len(self._retries) >= allowed:
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def stats(self):
+        self._trim(time.monotonic())
+        return {
+            "requests": len(self._requests),
+            "retries": len(self._retries),
+            "exhausted": self.exhausted,
+        }
+
+
+@dataclass(frozen=True)
+class AdaptiveTimeoutPolicy:
+    """
+    응답 시간 기반 타임아웃 정책
+
+    타임아웃 = clamp(percentile 응답 시간 * multiplier, min_timeout, 라우트 timeout)
+
+    Args:
+        percentile: 기준 분위수
+        multiplier: 분위수에 곱할 배수
+        min_timeout: 최소 타임아웃 (초)
+        min_samples: 이 수 이상 측정되기 전에는 라우트 timeout 사용
+        window: 보관할 최근 측정값 수
+    """
+    percentile: float = 99.0
+    multiplier: float = 2.0
+    min_timeout: float = 2.0
+    min_samples: int = 20
+    window: int = 500
+
+
+class AdaptiveTimeout:
+    """라우트 하나의 적응형 타임아웃"""
+
+    # 매 요청마다 정렬하지 않도록 이 횟수마다 분위수를 다시 계산
+    RECOMPUTE_EVERY = 10
+
+    def __init__(self, max_timeout, policy=None):
+        self.max_timeout = max_timeout
+        self.policy = policy or AdaptiveTimeoutPolicy()
+        self._samples = deque(maxlen=self.policy.window)
+        self._since_recompute = 0
+        self._current = max_timeout
+
+    def observe(self, seconds):
+        self._samples.append(seconds)
+        self._since_recompute += 1
+        if self._since_recompute >= self.RECOMPUTE_EVERY:
+            self._recompute()
+
+    def _recompute(self):
+        self._since_recompute = 0
+        if len(self._samples) < self.policy.min_samples:
+            self._current = self.max_timeout
+            return
+        values = sorted(self._samples)
+        index = min(len(values) - 1, int(self.policy.percentile / 100.0 * len(values)))
+        timeout = values[index] * self.policy.multiplier
+        self._current = min(self.max_timeout, max(self.policy.min_timeout, timeout))
+
+    @property
+    def current(self):
+        return self._current
+
+    @property
+    def ready(self):
+        """분위수를 신뢰할 만큼 측정값이 쌓였는지"""
+        return len(self._samples) >= self.policy.min_samples
+
+    def percentile(self, pct):
+        if not self._samples:
+            return None
+        values = sorted(self._samples)
+        return values[min(len(values) - 1, int(pct / 100.0 * len(values)))]
+
+    def stats(self):
+        return {
+            "timeout": round(self._current, 3),
+            "max_timeout": self.max_timeout,
+            "samples": len(self._samples),
+        }
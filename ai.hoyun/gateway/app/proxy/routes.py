@@ -0,0 +1,224 @@
+"""
+게이트웨이 라우트 테이블
+
+경로 접두사(prefix)별로 업스트림 서비스, 타임아웃, 재시도/서킷 브레이커/헤징 정책을 선언한다.
+요청 경로는 가장 긴 접두사가 일치하는 라우트로 처리되며, 경로는 바꾸지 않고 그대로 전달된다.
+업스트림 주소는 환경 변수(CHATBOT_SERVICE_URL 등)로 바꿀 수 있고,
+쉼표로 구분해 여러 레플리카를 지정하거나 (예: "http://crawler-1:9003,http://crawler-2:9003"),
+"dns://crawler-service:9003"처럼 지정해 DNS가 돌려주는 모든 주소를 레플리카로 사용할 수 있다.
+"""
+import os
+from dataclasses import dataclass, field, replace
+from typing import Callable, Optional
+from proxy.transforms import ChatErrorTransform
+from proxy.observers import chat_observer
+from proxy.resilience import CircuitPolicy, AdaptiveTimeoutPolicy
+from proxy.balancer import LEAST_OUTSTANDING
+from proxy.admission import ConcurrencyPolicy, RateLimitPolicy
+
+CHATBOT_SERVICE_URL = os.getenv("CHATBOT_SERVICE_URL", "http://chatbot-service:9001")
+DIARY_SERVICE_URL = os.getenv("DIARY_SERVICE_URL", "http://diary-service:9002")
+CRAWLER_SERVICE_URL = os.getenv("CRAWLER_SERVICE_URL", "http://crawler-service:9003")
+# 레플리카 선택 전략: least_outstanding | p2c
+BALANCER_STRATEGY = os.getenv("GATEWAY_BALANCER", LEAST_OUTSTANDING)
+# false면 라우트별 클라이언트 속도 제한(rate_limit)을 적용하지 않음 (부하 테스트 등, 동시 처리 수 제한은 유지)
+ROUTE_RATE_LIMITS = os.getenv("GATEWAY_ROUTE_RATE_LIMITS", "true").lower() != "false"
+
+# FastAPI bool 쿼리 파라미터가 참으로 해석하는 값
+_TRUE_VALUES = {"1", "true", "t", "yes", "y", "on"}
+
+
+def starts_crawl(request):
+    """
+    크롤링을 새로 시작하는 요청인지 (refresh=true)
+
+    refresh가 없는 요청은 크롤러 서비스의 스냅샷 캐시에서 응답하고, 캐시가 비었거나 만료되어 크롤링하더라도
+    스냅샷마다 크롤링은 하나만 실행되어(동시 요청은 그 결과를 기다림) 요청 수만큼 크롤링이 늘지 않는다.
+    """
+    return request.query_params.get("refresh", "").lower() in _TRUE_VALUES
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    재시도 정책 (멱등 메서드만 재시도)
+
+    Args:
+        attempts: 첫 시도 이후 추가 시도 횟수
+        backoff: 재시도 간 대기 시간 (초, 시도마다 2배)
+        statuses: 재시도할 업스트림 응답 코드
+        methods: 재시도 가능한 메서드
+        budget_ratio: 최근 요청 수 대비 허용 재시도 비율 (재시도 예산)
+    """
+    attempts: int = 0
+    backoff: float = 0.1
+    statuses: tuple = (502, 503, 504)
+    methods: tuple = ("GET", "HEAD", "OPTIONS")
+    budget_ratio: float = 0.2
+
+
+@dataclass
+class Route:
+    """
+    프록시 라우트
+
+    Args:
+        prefix: 경로 접두사 (예: "/chatbot")
+        upstream: 업스트림 기본 URL
+        timeout: 타임아웃 상한 (초)
+        connect_timeout: 연결 타임아웃 (초)
+        retry: 재시도 정책
+        circuit: 서킷 브레이커 정책 (레플리카마다 적용)
+        adaptive_timeout: 응답 시간 기반 타임아웃 정책 (None이면 timeout 고정)
+        hedge_after: 헤징 요청 지연 (초). "p95"면 최근 p95, None이면 헤징 안 함.
+            레플리카가 2개 이상이고 본문 없는 멱등 요청일 때만 적용
+        balancer: 레플리카 선택 전략 (같은 업스트림을 쓰는 라우트 중 처음 것의 설정 사용)
+        health_path: 레플리카 헬스 체크 경로 (기본 /ready: warm-up이 끝나지 않은 레플리카는 503이라 요청을 받지 않음)
+        concurrency: 동시 처리 수/대기열 제한 (None이면 제한 없음)
+        rate_limit: 이 라우트에만 추가로 적용할 클라이언트별 속도 제한
+        rate_limit_when: rate_limit을 적용할 요청 조건 (request → bool, None이면 모든 요청)
+        methods: 허용 메서드
+        transform: 응답 변환기 (지정된 경우에만 본문을 읽고 디코딩)
+        observer: 요청 완료 후 호출되는 콜백 (계측용)
+        dedupe_posts: Idempotency-Key가 있는 POST를 게이트웨이에서 합칠지 여부
+        tag: OpenAPI 문서 태그
+        description: OpenAPI 문서 설명
+    """
+    prefix: str
+    upstream: str
+    timeout: float = 60.0
+    connect_timeout: float = 10.0
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    circuit: CircuitPolicy = field(default_factory=CircuitPolicy)
+    adaptive_timeout: Optional[AdaptiveTimeoutPolicy] = None
+    hedge_after: object = None
+    balancer: str = BALANCER_STRATEGY
+    health_path: str = "/ready"
+    concurrency: Optional[ConcurrencyPolicy] = None
+    rate_limit: Optional[RateLimitPolicy] = None
+    rate_limit_when: Optional[Callable] = None
+    methods: tuple = ("GET",)
+    transform: Optional[object] = None
+    observer: Optional[Callable] = None
+    dedupe_posts: bool = False
+    tag: str = None
+    description: str = ""
+
+    def matches(self, path):
+        return path == self.prefix or path.startswith(self.prefix + "/")
+
+
+ROUTES = [
+    Route(
+        # 챗 요청 (POST /chatbot/chat, /chatbot/chat/stream, GET /chatbot/chat)
+        prefix="/chatbot/chat",
+        upstream=CHATBOT_SERVICE_URL,
+        # 적응형 타임아웃은 쓰지 않음: 스트리밍은 헤더가 바로 오고 스트리밍하지 않는 POST는 답변을 모두 만든 뒤에
+        # 헤더가 와서, 둘이 섞인 분위수로는 긴 답변 생성이 타임아웃(504)으로 끊김
+        timeout=60.0,  # 1분 타임아웃
+        methods=("GET", "POST"),
+        concurrency=ConcurrencyPolicy(max_concurrency=64, max_queue=256, queue_timeout=15.0),
+        transform=ChatErrorTransform(),
+        observer=chat_observer,
+        dedupe_posts=True,
+        tag="chatbot",
+        description="챗봇 대화 프록시 (POST /chatbot/chat, POST /chatbot/chat/stream, GET /chatbot/chat)"
+    ),
+    Route(
+        # 통계/설정 조회 (빠른 GET이라 응답 시간 기반 타임아웃)
+        prefix="/chatbot",
+        upstream=CHATBOT_SERVICE_URL,
+        timeout=60.0,
+        adaptive_timeout=AdaptiveTimeoutPolicy(min_timeout=10.0),
+        methods=("GET", "POST"),
+        concurrency=ConcurrencyPolicy(max_concurrency=16, max_queue=32, queue_timeout=5.0),
+        transform=ChatErrorTransform(),
+        tag="chatbot",
+        description="챗봇 서비스 프록시 (GET /chatbot/stats, /chatbot/provider 등)"
+    ),
+    Route(
+        # 일괄 가져오기는 본문을 스트리밍하며 배치 트랜잭션으로 저장하므로 일반 일기 요청보다 오래 걸림
+        prefix="/diary/diaries/import",
+        upstream=DIARY_SERVICE_URL,
+        timeout=300.0,  # 5분 타임아웃
+        methods=("POST",),
+        concurrency=ConcurrencyPolicy(max_concurrency=2, max_queue=4, queue_timeout=30.0),
+        tag="diary",
+        description="일기 NDJSON 일괄 가져오기 프록시"
+    ),
+    Route(
+        prefix="/diary",
+        upstream=DIARY_SERVICE_URL,
+        timeout=30.0,
+        retry=RetryPolicy(attempts=2),
+        adaptive_timeout=AdaptiveTimeoutPolicy(min_timeout=1.0),
+        hedge_after="p95",
+        concurrency=ConcurrencyPolicy(max_concurrency=128, max_queue=256, queue_timeout=5.0),
+        methods=("GET", "POST", "PUT", "PATCH", "DELETE"),
+        tag="diary",
+        description="일기 서비스 프록시"
+    ),
+    Route(
+        # Netflix 크롤링은 Selenium 사용으로 시간이 오래 걸리므로 타임아웃을 길게 설정
+        prefix="/crawler/netflix",
+        upstream=CRAWLER_SERVICE_URL,
+        # 적응형 타임아웃은 쓰지 않음: 대부분 캐시된 스냅샷 응답(수 ms)이라 분위수가 최소값까지 내려가
+        # refresh=true 또는 캐시가 빈 상태의 실제 크롤링이 타임아웃(504)으로 끊김
+        timeout=300.0,  # 5분 타임아웃
+        # 브라우저를 띄우는 요청이므로 동시 실행과 클라이언트별 크롤링 빈도를 강하게 제한
+        # (속도 제한은 refresh=true 요청에만 적용, 캐시된 결과의 페이지 조회는 제한하지 않음)
+        concurrency=ConcurrencyPolicy(max_concurrency=2, max_queue=4, queue_timeout=30.0),
+        rate_limit=RateLimitPolicy(rate=1 / 30, burst=2),
+        rate_limit_when=starts_crawl,
+        tag="crawler",
+        description="JustWatch Netflix 영화 산업 목록 크롤링 프록시"
+    ),
+    Route(
+        # Selenium 크롤링은 시간이 오래 걸리므로 타임아웃을 길게 설정
+        prefix="/crawler/movie",
+        upstream=CRAWLER_SERVICE_URL,
+        # 캐시 응답과 실제 크롤링의 응답 시간 차이가 커서 적응형 타임아웃 없이 고정 (/crawler/netflix와 같은 이유)
+        timeout=120.0,  # 2분 타임아웃
+        concurrency=ConcurrencyPolicy(max_concurrency=4, max_queue=8, queue_timeout=30.0),
+        rate_limit=RateLimitPolicy(rate=1 / 10, burst=3),
+        rate_limit_when=starts_crawl,
+        tag="crawler",
+        description="KMDB 뉴욕타임즈 21세기 영화 100선 크롤링 프록시"
+    ),
+    Route(
+        # KMDB 카탈로그 조회/크롤링 시작 (크롤링은 크롤러 서비스가 백그라운드로 실행하고 바로 202 응답)
+        prefix="/crawler/kmdb/catalog",
+        upstream=CRAWLER_SERVICE_URL,
+        timeout=30.0,
+        retry=RetryPolicy(attempts=1),
+        concurrency=ConcurrencyPolicy(max_concurrency=32, max_queue=64, queue_timeout=10.0),
+        methods=("GET", "POST"),
+        tag="crawler",
+        description="KMDB 카탈로그 프록시"
+    ),
+    Route(
+        # 포스터 썸네일 (목록 화면 하나가 수십 장을 동시에 요청하므로 동시 처리 수를 넉넉하게,
+        # 캐시에 없는 첫 요청은 원본을 받아 줄이므로 타임아웃은 원본 받기(10초)보다 길게)
+        prefix="/crawler/images",
+        upstream=CRAWLER_SERVICE_URL,
+        timeout=20.0,
+        retry=RetryPolicy(attempts=1),
+        concurrency=ConcurrencyPolicy(max_concurrency=64, max_queue=256, queue_timeout=10.0),
+        tag="crawler",
+        description="포스터 이미지 프록시"
+    ),
+    Route(
+        prefix="/crawler",
+        upstream=CRAWLER_SERVICE_URL,
+        timeout=60.0,
+        retry=RetryPolicy(attempts=1),
+        adaptive_timeout=AdaptiveTimeoutPolicy(min_timeout=2.0),
+        hedge_after="p95",
+        concurrency=ConcurrencyPolicy(max_concurrency=32, max_queue=64, queue_timeout=10.0),
+        tag="crawler",
+        description="크롤러 서비스 프록시"
+    ),
+]
+
+if not ROUTE_RATE_LIMITS:
+    ROUTES = [replace(route, rate_limit=None) for route in ROUTES]
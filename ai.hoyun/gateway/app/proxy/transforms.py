@@ -0,0 +1,84 @@
+"""
+프록시 응답 변환기
+
+라우트에 변환기가 지정된 경우에만 업스트림 본문을 읽어 디코딩한다.
+wants()가 False인 응답은 변환 없이 그대로 스트리밍된다.
+"""
+import json
+import httpx  # type: ignore
+from fastapi.responses import JSONResponse  # type: ignore
+from proxy.resilience import CircuitOpenError
+
+DEFAULT_CHAT_MODEL = "gpt-3.5-turbo"
+
+
+def describe_failure(exc):
+    """
+    업스트림 실패 예외 → 응답에 넣을 설명
+
+    httpx 타임아웃 예외는 메시지가 비어 있는 경우가 많아 예외 클래스 이름을 함께 쓴다.
+    (예: "Upstream timeout (ReadTimeout)", "Upstream error (ConnectError: [Errno 111] Connection refused)")
+    """
+    if isinstance(exc, CircuitOpenError):
+        return f"Upstream unavailable ({exc})"
+    kind = "Upstream timeout" if isinstance(exc, httpx.TimeoutException) else "Upstream error"
+    message = str(exc)
+    name = type(exc).__name__
+    return f"{kind} ({name}: {message})" if message else f"{kind} ({name})"
+
+
+class ResponseTransform:
+    """응답 변환기 기본 클래스"""
+
+    def wants(self, status_code, headers):
+        """이 응답을 변환할지 여부 (False면 본문을 디코딩하지 않음)"""
+        return False
+
+    def apply(self, status_code, headers, body):
+        """업스트림 응답(본문 bytes)을 변환한 Response 반환"""
+        raise NotImplementedError
+
+    def on_failure(self, exc):
+        """업스트림 연결 실패 시 반환할 Response (None이면 기본 502/504 응답)"""
+        return None
+
+    def on_rejected(self, exc):
+        """수용 제어로 거절된 요청에 반환할 Response (None이면 기본 429/503 응답, 상태 코드는 유지)"""
+        return None
+
+
+class ChatErrorTransform(ResponseTransform):
+    """
+    챗봇 에러 응답을 ChatResponse 형태로 변환
+
+    프론트엔드는 챗봇 에러도 {"message", "model", "status": "error"} 형태로 받는다.
+    정상(200) 응답은 변환하지 않고 그대로 전달한다.
+    """
+
+    def wants(self, status_code, headers):
+        return status_code != 200
+
+    def apply(self, status_code, headers, body):
+        try:
+            error_message = json.loads(body).get("detail", "Unknown error occurred")
+        except (ValueError, AttributeError):
+            error_message = body.decode("utf-8", "replace") or "Unknown error occurred"
+        return JSONResponse({
+            "message": f"오류가 발생했습니다: {error_message}",
+            "model": headers.get("x-chat-model", DEFAULT_CHAT_MODEL),
+            "status": "error"
+        })
+
+    def on_failure(self, exc):
+        return JSONResponse({
+            "message": f"서버 연결 오류: {describe_failure(exc)}",
+            "model": DEFAULT_CHAT_MODEL,
+            "status": "error"
+        })
+
+    def on_rejected(self, exc):
+        return JSONResponse({
+            "message": "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.",
+            "model": DEFAULT_CHAT_MODEL,
+            "status": "error"
+        })
@@ -0,0 +1,60 @@
+"""
+업스트림 호출 구간별 시간 측정 모듈
+
+httpx(httpcore)의 trace 확장으로 연결 풀 대기, TCP/TLS 연결, 응답 헤더 수신 시각을 기록한다.
+사용법:
+    timer = UpstreamTimer()
+    response = await client.post(url, json=..., extensions={"trace": timer.trace})
+    timer.finish()
+"""
+import time
+
+
+class UpstreamTimer:
+    """업스트림 요청 하나의 구간별 시각 기록"""
+
+    __slots__ = ("started", "finished", "_events")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self._events = {}
+
+    async def trace(self, name, info):
+        """httpcore trace 콜백 (예: "connection.connect_tcp.started")"""
+        # http11./http2. 접두사와 무관하게 마지막 두 단계 이름으로 저장
+        parts = name.split(".")
+        self._events[".".join(parts[-2:])] = time.perf_counter()
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def _span(self, start, end):
+        a = self._events.get(start)
+        b = self._events.get(end)
+        return b - a if a is not None and b is not None else 0.0
+
+    @property
+    def connect(self):
+        """TCP + TLS 연결 시간 (재사용된 연결이면 0)"""
+        return (self._span("connect_tcp.started", "connect_tcp.complete")
+                + self._span("start_tls.started", "start_tls.complete"))
+
+    @property
+    def queue_wait(self):
+        """요청 시작부터 헤더 전송 시작까지에서 연결 시간을 뺀 값 (연결 풀 대기)"""
+        sent = self._events.get("send_request_headers.started")
+        if sent is None:
+            return None
+        return max(0.0, sent - self.started - self.connect)
+
+    @property
+    def first_byte(self):
+        """요청 시작부터 응답 헤더 수신 완료까지 (TTFB)"""
+        received = self._events.get("receive_response_headers.complete")
+        return received - self.started if received is not None else None
+
+    @property
+    def total(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
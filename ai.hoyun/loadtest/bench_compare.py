@@ -0,0 +1,157 @@
+"""
+전체 스택 벤치마크 결과 비교
+
+stack_bench.py가 저장한 결과 두 개(기준, 비교 대상)를 트래픽 구성/동시 사용자 수별로 맞춰
+처리량, 지연 시간(p50/p95/p99), 오류/거절 비율을 비교하고, 임계값보다 나빠진 항목을 회귀로 표시한다.
+회귀가 있으면 종료 코드 1 (CI에서 사용).
+
+결과는 파일 경로나 커밋(해당 커밋의 가장 최근 결과)으로 지정한다. 생략하면 가장 최근 결과 두 개를 비교한다.
+
+실행 예:
+    python loadtest/bench_compare.py
+    python loadtest/bench_compare.py a1f2433 HEAD --threshold 10
+    python loadtest/bench_compare.py loadtest/results/base.json loadtest/results/new.json --operations
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+RESULTS_DIR = os.path.join(ROOT, "loadtest", "results")
+
+# (지표, 클수록 좋은지)
+METRICS = [("throughput_rps", True), ("p50", False), ("p95", False), ("p99", False)]
+
+
+def _result_files(directory):
+    return sorted(glob.glob(os.path.join(directory, "*.json")), key=os.path.getmtime)
+
+
+def resolve(ref, directory):
+    """파일 경로 또는 커밋 → 결과 파일 경로"""
+    if os.path.isfile(ref):
+        return ref
+    commit = subprocess.run(["git", "rev-parse", "--short=12", ref], cwd=ROOT,
+                            capture_output=True, text=True).stdout.strip() or ref
+    matches = [p for p in _result_files(directory) if os.path.basename(p).startswith(commit)]
+    if not matches:
+        raise SystemExit(f"{ref}: 결과 파일이 없습니다 ({directory})")
+    return matches[-1]
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _rate(run, key):
+    return run[key] / run["requests"] if run.get("requests") else 0.0
+
+
+def _change(base, new):
+    if not base:
+        return None
+    return 100.0 * (new - base) / base
+
+
+def compare_values(base, new, metrics, threshold, min_delta_ms):
+    """
+    지표별 변화
+
+    Returns:
+        list: (지표, 기준 값, 비교 값, 변화율(%), 회귀 여부)
+    """
+    rows = []
+    for metric, higher_is_better in metrics:
+        if metric not in base or metric not in new:
+            continue
+        before, after = base[metric], new[metric]
+        change = _change(before, after)
+        worse = change is not None and (-change if higher_is_better else change) > threshold
+        # 지연 시간은 절대 차이가 아주 작으면(측정 잡음) 회귀로 보지 않음
+        if worse and not higher_is_better and (after - before) * 1000.0 < min_delta_ms:
+            worse = False
+        rows.append((metric, before, after, change, worse))
+    return rows
+
+
+def _format(metric, value):
+    if metric == "throughput_rps":
+        return f"{value:.1f}"
+    if metric.endswith("_rate"):
+        return f"{value * 100:.2f}%"
+    return f"{value * 1000:.1f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 스택 벤치마크 결과 비교")
+    parser.add_argument("base", nargs="?", help="기준 결과 (파일 또는 커밋, 생략하면 최근 두 번째 결과)")
+    parser.add_argument("new", nargs="?", help="비교할 결과 (파일 또는 커밋, 생략하면 최근 결과)")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="결과 JSON 디렉터리")
+    parser.add_argument("--threshold", type=float, default=10.0, help="회귀로 볼 변화율 (%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="회귀로 볼 최소 지연 시간 차이 (ms)")
+    parser.add_argument("--operations", action="store_true", help="요청 종류별로도 비교")
+    args = parser.parse_args()
+
+    if args.base and args.new:
+        base_path, new_path = resolve(args.base, args.results_dir), resolve(args.new, args.results_dir)
+    else:
+        files = _result_files(args.results_dir)
+        if args.base:
+            base_path, new_path = resolve(args.base, args.results_dir), (files[-1] if files else None)
+        elif len(files) >= 2:
+            base_path, new_path = files[-2], files[-1]
+        else:
+            base_path = new_path = None
+        if base_path is None or new_path is None:
+            raise SystemExit(f"비교할 결과가 부족합니다 ({args.results_dir})")
+
+    base, new = load(base_path), load(new_path)
+    for label, path, result in (("기준", base_path, base), ("비교", new_path, new)):
+        env = result["environment"]
+        dirty = " (변경 있음)" if env.get("dirty") else ""
+        print(f"{label}: {env['commit']}{dirty} {env.get('subject', '')} [{os.path.basename(path)}]")
+    if base["environment"].get("host") != new["environment"].get("host"):
+        print("주의: 다른 머신에서 측정한 결과입니다.")
+
+    base_runs = {(r["mix"], r["concurrency"]): r for r in base["runs"]}
+    regressions = []
+    for run in new["runs"]:
+        key = (run["mix"], run["concurrency"])
+        before = base_runs.get(key)
+        if before is None:
+            print(f"\n{key[0]} 동시 {key[1]}명: 기준 결과 없음")
+            continue
+        targets = [("전체", before, run)]
+        if args.operations:
+            targets += [(name, before["operations"][name], op)
+                        for name, op in run["operations"].items() if name in before.get("operations", {})]
+        print(f"\n{key[0]} 동시 {key[1]}명")
+        print(f"  {'대상':<16} {'지표':<14} {'기준':>10} {'비교':>10} {'변화':>8}")
+        for name, old, cur in targets:
+            values_old = {**old, "error_rate": _rate(old, "errors"), "rejected_rate": _rate(old, "rejected")}
+            values_new = {**cur, "error_rate": _rate(cur, "errors"), "rejected_rate": _rate(cur, "rejected")}
+            rows = compare_values(values_old, values_new, METRICS, args.threshold, args.min_delta_ms)
+            # 오류/거절 비율은 변화율이 아니라 1%p 넘게 늘면 회귀
+            for metric in ("error_rate", "rejected_rate"):
+                delta = values_new[metric] - values_old[metric]
+                rows.append((metric, values_old[metric], values_new[metric], None, delta > 0.01))
+            for metric, before_value, after_value, change, worse in rows:
+                change_text = f"{change:+.1f}%" if change is not None else ""
+                mark = "  <- 회귀" if worse else ""
+                print(f"  {name:<16} {metric:<14} {_format(metric, before_value):>10} "
+                      f"{_format(metric, after_value):>10} {change_text:>8}{mark}")
+                if worse:
+                    regressions.append((key, name, metric))
+
+    if regressions:
+        print(f"\n회귀 {len(regressions)}건 (임계값 {args.threshold}%)")
+        sys.exit(1)
+    print("\n회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+챗봇 경로 부하 테스트 시나리오
+
+Mock LLM 프로바이더(LLM_PROVIDER=mock)로 챗봇 서비스를 띄운 뒤 실행한다.
+동시 대화 수를 지정해 게이트웨이(9000)와 챗봇 서비스(9001)에 직접 요청을 보내고,
+Mock의 이론상 응답 시간과 비교해 각 계층의 오버헤드를 측정한다.
+
+실행 예:
+    LLM_PROVIDER=mock docker-compose up -d
+    python loadtest/chat_loadtest.py --concurrency 50 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import httpx  # type: ignore
+
+
+def percentile(values, pct):
+    """정렬된 값 목록의 백분위수 (nearest-rank)"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(pct / 100.0 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+async def _run_target(url, concurrency, total, message):
+    """
+    한 대상 URL에 동시 요청을 보내고 지연 시간 수집
+
+    Args:
+        url: POST /chatbot/chat URL
+        concurrency: 동시 대화 수
+        total: 전체 요청 수
+        message: 사용자 메시지
+
+    Returns:
+        dict: 지연 시간 통계
+    """
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=10.0), limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                payload = {"message": f"{message} #{i}", "model": "gpt-3.5-turbo"}
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, json=payload)
+                    ok = response.status_code == 200 and response.json().get("status", "success") == "success"
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": url,
+        "requests": total,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "mean": round(statistics.fmean(latencies), 4) if latencies else 0.0,
+        "p50": round(percentile(latencies, 50), 4),
+        "p95": round(percentile(latencies, 95), 4),
+        "p99": round(percentile(latencies, 99), 4),
+    }
+
+
+async def main(args):
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        info = (await client.get(f"{args.chatbot}/chatbot/provider")).json()
+    if info.get("provider") != "mock":
+        raise SystemExit("챗봇 서비스가 mock 프로바이더로 실행 중이 아닙니다. (LLM_PROVIDER=mock)")
+
+    baseline = info.get("expected_seconds", 0.0)
+    direct = await _run_target(f"{args.chatbot}/chatbot/chat", args.concurrency, args.requests, args.message)
+    via_gateway = await _run_target(f"{args.gateway}/chatbot/chat", args.concurrency, args.requests, args.message)
+
+    report = {
+        "concurrency": args.concurrency,
+        "provider": info,
+        "chatbot": direct,
+        "gateway": via_gateway,
+        # Mock 지연을 뺀 순수 오버헤드 (p50 기준)
+        "overhead": {
+            "chatbot_p50": round(direct["p50"] - baseline, 4),
+            "gateway_p50": round(via_gateway["p50"] - direct["p50"], 4),
+            "chatbot_p95": round(direct["p95"] - baseline, 4),
+            "gateway_p95": round(via_gateway["p95"] - direct["p95"], 4),
+        },
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="챗봇 경로 부하 테스트 (Mock LLM)")
+    parser.add_argument("--gateway", default="http://localhost:9000", help="게이트웨이 URL")
+    parser.add_argument("--chatbot", default="http://localhost:9001", help="챗봇 서비스 URL")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 대화 수")
+    parser.add_argument("--requests", type=int, default=200, help="대상별 전체 요청 수")
+    parser.add_argument("--message", default="부하 테스트 메시지", help="사용자 메시지")
+    asyncio.run(main(parser.parse_args()))
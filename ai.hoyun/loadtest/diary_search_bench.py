@@ -0,0 +1,265 @@
+"""
+일기 전문 검색 벤치마크
+
+합성 한국어 일기 코퍼스(기본 100만 건)를 만들어 일기 서비스 저장소(store.diaries)에 넣고,
+FTS5 trigram 색인 검색과 LIKE '%...%' 전체 스캔의 지연 시간을 비교한다.
+HTTP 계층 없이 저장소를 직접 호출하므로 서비스를 띄울 필요가 없다.
+
+측정 항목:
+- 적재 속도 (트리거로 색인을 함께 갱신하며 INSERT, rows/s), DB 파일 크기
+- 사용자 검색 (GET /diary/diaries/search와 같은 경로): 검색어 종류별 p50/p95/p99
+- 전체 코퍼스 일치 건수: FTS 색인 vs LIKE 스캔
+
+실행 예:
+    python loadtest/diary_search_bench.py --entries 1000000 --users 5000
+    python loadtest/diary_search_bench.py --db /tmp/bench.db --reuse   # 이미 만든 코퍼스로 검색만 측정
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# 일기 서비스 앱 디렉터리(store 패키지)를 import 경로에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services", "diary_service", "app"))
+
+from store import search as fts  # noqa: E402
+from store.database import connect  # noqa: E402
+from store.diaries import DiaryStore  # noqa: E402
+
+PLACES = ["한강", "공원", "카페", "도서관", "회사", "학교", "바닷가", "시장", "영화관", "헬스장", "편의점", "지하철"]
+PEOPLE = ["친구", "엄마", "아빠", "동생", "팀장님", "선배", "강아지", "고양이", "남자친구", "여자친구"]
+THINGS = ["커피", "치킨", "떡볶이", "김치찌개", "라면", "케이크", "책", "영화", "음악", "드라마", "산책", "운동"]
+FEELINGS = ["행복했다", "피곤했다", "즐거웠다", "우울했다", "설렜다", "뿌듯했다", "심심했다", "화가 났다"]
+WEATHER = ["맑았다", "비가 왔다", "눈이 왔다", "흐렸다", "바람이 많이 불었다", "더웠다", "추웠다"]
+TEMPLATES = [
+    "오늘은 날씨가 {weather}.",
+    "{place}에서 {person}와 {thing}을 먹었다.",
+    "{person}랑 {place}에 갔는데 {feeling}.",
+    "퇴근하고 {place}에서 {thing}을 했다.",
+    "요즘 {thing}에 빠져 있다. 정말 {feeling}.",
+    "{person}에게 전화가 왔다. 오랜만이라 {feeling}.",
+    "내일은 {place}에 가서 {thing}을 해야겠다.",
+    "{topic}에 대해 한참 생각했다.",
+    "{topic} 이야기를 들었다.",
+]
+
+# 고정 템플릿만으로는 모든 단어가 흔한 단어가 되므로, 합성 단어(한글 2~4음절) 어휘를
+# Zipf 분포로 섞어 실제 일기처럼 드문 단어가 많은 코퍼스를 만든다.
+VOCAB_SIZE = 50_000
+# 검색할 합성 단어의 빈도 순위 (낮을수록 흔함)
+VOCAB_QUERY_RANKS = (10, 1_000, 20_000)
+
+# (종류, 검색어) — 흔한 색인 검색어 / 드문 색인 검색어 / 짧은 검색어(LIKE) / 여러 검색어
+QUERIES = [
+    ("common", "날씨가"), ("common", "떡볶이"), ("common", "도서관"),
+    ("rare", "바닷가에서 고양이"), ("rare", "김치찌개 팀장님"), ("rare", "화가 났다"),
+    ("short", "커피"), ("short", "영화"), ("short", "눈"),
+    ("multi", "한강 산책"), ("multi", "친구 치킨"), ("multi", "지하철 피곤했다"),
+]
+
+
+def percentile(values, pct):
+    """정렬된 값 목록의 백분위수 (nearest-rank)"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(pct / 100.0 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000.0, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000.0, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000.0, 2),
+    }
+
+
+def make_vocabulary(seed):
+    """
+    합성 어휘와 Zipf 누적 가중치
+
+    Returns:
+        tuple: (단어 목록(빈도 순), 누적 가중치)
+    """
+    rng = random.Random(seed)
+    syllables = [chr(0xAC00 + i) for i in rng.sample(range(11172), 600)]
+    words = list(dict.fromkeys("".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(VOCAB_SIZE * 2)))
+    words = words[:VOCAB_SIZE]
+    cumulative, total = [], 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1.0 / rank
+        cumulative.append(total)
+    return words, cumulative
+
+
+def make_entry(rng, vocabulary):
+    """합성 일기 한 건 (제목, 본문)"""
+    words, cumulative = vocabulary
+    sentences = []
+    for _ in range(rng.randint(3, 8)):
+        sentences.append(rng.choice(TEMPLATES).format(
+            weather=rng.choice(WEATHER), place=rng.choice(PLACES), person=rng.choice(PEOPLE),
+            thing=rng.choice(THINGS), feeling=rng.choice(FEELINGS),
+            topic=rng.choices(words, cum_weights=cumulative)[0]
+        ))
+    title = f"{rng.choice(PLACES)} {rng.choice(THINGS)}"
+    return title, " ".join(sentences)
+
+
+def load_corpus(store, entries, users, batch_size, seed, vocabulary):
+    """
+    코퍼스 적재 (batch_size 건씩 한 트랜잭션)
+
+    Returns:
+        float: 초당 적재 건수
+    """
+    rng = random.Random(seed)
+    start_ms = int(time.time() * 1000) - entries * 60_000
+    started = time.perf_counter()
+    inserted = 0
+    while inserted < entries:
+        count = min(batch_size, entries - inserted)
+        rows = []
+        for i in range(count):
+            title, content = make_entry(rng, vocabulary)
+            created = start_ms + (inserted + i) * 60_000
+            rows.append((f"user-{rng.randrange(users)}", title, content, created, created))
+
+        def insert(conn, rows=rows):
+            conn.executemany(
+                "INSERT INTO diaries (user_id, title, content, created_at, updated_at) VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+        store.pool.write_sync(insert)
+        inserted += count
+        if inserted % (batch_size * 20) == 0 or inserted == entries:
+            rate = inserted / (time.perf_counter() - started)
+            print(f"  적재 {inserted:,}/{entries:,} ({rate:,.0f} rows/s)", file=sys.stderr)
+    return entries / (time.perf_counter() - started)
+
+
+def bench_queries(vocabulary):
+    """고정 검색어 + 빈도 순위별 합성 단어 검색어 (색인 경로를 재도록 해당 순위 이후 첫 3음절 이상 단어)"""
+    words, _ = vocabulary
+    queries = list(QUERIES)
+    for rank in VOCAB_QUERY_RANKS:
+        word = next(w for w in words[rank - 1:] if len(w) >= fts.MIN_INDEXED_LENGTH)
+        queries.append((f"vocab_rank_{rank}", word))
+    return queries
+
+
+def bench_user_search(conn, users, iterations, seed, queries):
+    """
+    검색어 종류별 사용자 검색 지연 시간
+
+    FTS 경로(관련도순)와 해당 사용자 일기의 LIKE 스캔(최신순, 순위 없음)을 비교한다.
+    """
+    rng = random.Random(seed)
+    results = {}
+    for kind, query in queries:
+        fts_samples, like_samples, hits = [], [], 0
+        for _ in range(iterations):
+            user_id = f"user-{rng.randrange(users)}"
+
+            started = time.perf_counter()
+            rows = fts.search(conn, user_id, query, 20)
+            fts_samples.append(time.perf_counter() - started)
+            hits += len(rows)
+
+            clauses = " ".join("AND (title LIKE ? ESCAPE '\\' OR content LIKE ? ESCAPE '\\')" for _ in query.split())
+            params = [p for term in query.split() for p in (fts.like_pattern(term),) * 2]
+            started = time.perf_counter()
+            conn.execute(
+                f"SELECT * FROM diaries WHERE user_id = ? {clauses} ORDER BY created_at DESC LIMIT 20",
+                (user_id, *params)
+            ).fetchall()
+            like_samples.append(time.perf_counter() - started)
+
+        results.setdefault(kind, []).append({
+            "query": query,
+            "avg_hits": round(hits / iterations, 1),
+            "fts": summarize(fts_samples),
+            "like_scan": summarize(like_samples),
+        })
+    return results
+
+
+def bench_global_count(conn, queries):
+    """전체 코퍼스에서 검색어를 포함한 일기 수 세기 (색인 vs 전체 스캔)"""
+    results = []
+    for _, query in queries:
+        indexed, short = fts.split_terms(query)
+        if short:
+            continue
+        started = time.perf_counter()
+        fts_count = conn.execute(
+            f"SELECT count(*) FROM {fts.FTS_TABLE} WHERE {fts.FTS_TABLE} MATCH ?", (fts.match_expression(indexed),)
+        ).fetchone()[0]
+        fts_elapsed = time.perf_counter() - started
+
+        clauses = " AND ".join("(title LIKE ? ESCAPE '\\' OR content LIKE ? ESCAPE '\\')" for _ in indexed)
+        params = [p for term in indexed for p in (fts.like_pattern(term),) * 2]
+        started = time.perf_counter()
+        like_count = conn.execute(f"SELECT count(*) FROM diaries WHERE {clauses}", params).fetchone()[0]
+        like_elapsed = time.perf_counter() - started
+
+        results.append({
+            "query": query,
+            "matches": fts_count,
+            "like_matches": like_count,
+            "fts_ms": round(fts_elapsed * 1000.0, 1),
+            "like_scan_ms": round(like_elapsed * 1000.0, 1),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="일기 전문 검색 벤치마크")
+    parser.add_argument("--db", default="bench/diary_search.db", help="벤치마크용 SQLite 파일")
+    parser.add_argument("--entries", type=int, default=1_000_000, help="합성 일기 수")
+    parser.add_argument("--users", type=int, default=5_000, help="사용자 수")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="적재 트랜잭션당 건수")
+    parser.add_argument("--iterations", type=int, default=50, help="검색어별 반복 횟수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reuse", action="store_true", help="기존 DB가 있으면 적재를 건너뜀")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db) and not args.reuse:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    vocabulary = make_vocabulary(args.seed)
+    queries = bench_queries(vocabulary)
+    store = DiaryStore(args.db, readers=1)
+    report = {"entries": args.entries, "users": args.users}
+    try:
+        existing = store.pool.write_sync(lambda conn: conn.execute("SELECT count(*) FROM diaries").fetchone()[0])
+        if existing == 0:
+            print(f"코퍼스 적재: {args.entries:,}건, 사용자 {args.users:,}명", file=sys.stderr)
+            report["load_rows_per_sec"] = round(load_corpus(
+                store, args.entries, args.users, args.batch_size, args.seed, vocabulary))
+            store.pool.write_sync(lambda conn: conn.execute(f"INSERT INTO {fts.FTS_TABLE} ({fts.FTS_TABLE}) VALUES ('optimize')"))
+        else:
+            report["entries"] = existing
+        report["db_size_mb"] = round(os.path.getsize(args.db) / 1024 / 1024, 1)
+
+        print("검색 측정", file=sys.stderr)
+        # 측정은 읽기 연결 하나로 (서비스의 읽기 스레드 하나와 같은 조건)
+        conn = connect(args.db)
+        try:
+            report["user_search"] = bench_user_search(conn, args.users, args.iterations, args.seed, queries)
+            report["global_count"] = bench_global_count(conn, queries)
+        finally:
+            conn.close()
+    finally:
+        store.close()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+일기 쓰기 처리량 벤치마크
+
+같은 수의 단건 일기 작성을 동시에 보내면서 쓰기 경로별 초당 저장 건수(rows/s)를 비교한다.
+HTTP 계층 없이 저장소를 직접 호출한다.
+
+- direct: 쓰기마다 한 트랜잭션 (DIARY_WRITE_BEHIND=false)
+- write_behind: 쓰기 모으기 큐로 group commit (DIARY_WRITE_BEHIND=true)
+- import: NDJSON 일괄 가져오기 (POST /diary/diaries/import)
+
+실행 예:
+    python loadtest/diary_write_bench.py --writes 20000 --concurrency 64
+    python loadtest/diary_write_bench.py --synchronous FULL
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# 일기 서비스 앱 디렉터리(store 패키지)와 common 패키지를 import 경로에 추가
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, _ROOT)
+sys.path.insert(0, os.path.join(_ROOT, "services", "diary_service", "app"))
+
+from store.diaries import DiaryStore  # noqa: E402
+from store.importer import import_ndjson  # noqa: E402
+from store.write_behind import WriteBehindQueue  # noqa: E402
+
+
+async def _concurrent_writes(store, writes, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await store.create(f"user-{i % 100}", f"벤치마크 일기 {i}", title="bench")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(writes)))
+    return time.perf_counter() - started
+
+
+async def bench_direct(path, writes, concurrency, synchronous):
+    store = DiaryStore(path, synchronous=synchronous)
+    try:
+        elapsed = await _concurrent_writes(store, writes, concurrency)
+    finally:
+        store.close()
+    return {"rows_per_sec": round(writes / elapsed), "elapsed_s": round(elapsed, 2)}
+
+
+async def bench_write_behind(path, writes, concurrency, synchronous, max_batch, max_delay_ms):
+    store = DiaryStore(path, synchronous=synchronous)
+    queue = WriteBehindQueue(store.pool, max_batch=max_batch, max_delay=max_delay_ms / 1000.0)
+    queue.start()
+    store.use_writer(queue)
+    try:
+        elapsed = await _concurrent_writes(store, writes, concurrency)
+        await queue.close()
+    finally:
+        store.close()
+    stats = queue.stats()
+    return {
+        "rows_per_sec": round(writes / elapsed),
+        "elapsed_s": round(elapsed, 2),
+        "batches": stats["batches"],
+        "avg_batch_size": stats["avg_batch_size"],
+    }
+
+
+async def bench_import(path, writes, synchronous, batch_size):
+    lines = (
+        json.dumps({"user_id": f"user-{i % 100}", "content": f"벤치마크 일기 {i}", "title": "bench"},
+                   ensure_ascii=False) + "\n"
+        for i in range(writes)
+    )
+
+    async def chunks():
+        buffer = []
+        for line in lines:
+            buffer.append(line)
+            if len(buffer) == 500:
+                yield "".join(buffer).encode("utf-8")
+                buffer = []
+        if buffer:
+            yield "".join(buffer).encode("utf-8")
+
+    store = DiaryStore(path, synchronous=synchronous)
+    try:
+        result = await import_ndjson(store.pool, chunks(), batch_size=batch_size)
+    finally:
+        store.close()
+    return {k: result[k] for k in ("rows_per_sec", "elapsed_ms", "batches")}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="일기 쓰기 처리량 벤치마크")
+    parser.add_argument("--writes", type=int, default=20_000, help="쓰기 건수")
+    parser.add_argument("--concurrency", type=int, default=64, help="동시 쓰기 요청 수")
+    parser.add_argument("--synchronous", default="NORMAL", help="PRAGMA synchronous (NORMAL | FULL)")
+    parser.add_argument("--max-batch", type=int, default=256, help="group commit 최대 배치 크기")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0, help="group commit 최대 대기 시간 (ms)")
+    parser.add_argument("--import-batch-size", type=int, default=1000, help="일괄 가져오기 트랜잭션당 건수")
+    args = parser.parse_args()
+
+    report = {"writes": args.writes, "concurrency": args.concurrency, "synchronous": args.synchronous}
+    with tempfile.TemporaryDirectory() as directory:
+        report["direct"] = await bench_direct(
+            os.path.join(directory, "direct.db"), args.writes, args.concurrency, args.synchronous)
+        report["write_behind"] = await bench_write_behind(
+            os.path.join(directory, "write_behind.db"), args.writes, args.concurrency, args.synchronous,
+            args.max_batch, args.max_delay_ms)
+        report["import"] = await bench_import(
+            os.path.join(directory, "import.db"), args.writes, args.synchronous, args.import_batch_size)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
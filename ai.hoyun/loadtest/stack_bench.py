@@ -0,0 +1,572 @@
+"""
+전체 스택 부하 테스트/벤치마크
+
+게이트웨이와 세 서비스를 로컬 프로세스로 띄우고, 외부 의존성은 대역으로 바꿔 실행한다.
+
+- 챗봇: Mock LLM 프로바이더 (LLM_PROVIDER=mock, 토큰 생성 속도/첫 토큰 지연 설정)
+- 크롤러: 저장해 둔 크롤링 결과 (CRAWLER_FIXTURES_DIR, 크롤링 시간 CRAWLER_FIXTURE_DELAY)
+- 일기: 실제 서비스 (임시 SQLite, 시작 시 사용자별 일기를 미리 넣음)
+- 게이트웨이: 실제 서비스 (업스트림을 위 서비스로 지정, gunicorn 워커 수 설정)
+
+트래픽 구성(MIXES)별로 동시 사용자 수(--concurrency)를 바꿔 가며 정해진 시간 동안 요청을 보내고
+처리량, 지연 시간(p50/p95/p99), 요청 종류별 통계, 서비스별 CPU/메모리 사용량을 측정한다.
+결과는 커밋별 JSON(loadtest/results/<커밋>-<시각>.json)으로 저장되며 bench_compare.py로 비교한다.
+
+실행 예:
+    pip install -r gateway/requirements.txt -r loadtest/requirements.txt
+    python loadtest/stack_bench.py --mix mixed --concurrency 8,32,64 --duration 20
+    python loadtest/stack_bench.py --mix chat --chat-tokens-per-sec 100 --gateway-workers 2
+    python loadtest/bench_compare.py                       # 최근 두 결과 비교
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import httpx  # type: ignore
+
+from chat_loadtest import percentile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+RESULTS_DIR = os.path.join(ROOT, "loadtest", "results")
+CRAWL_FIXTURES_DIR = os.path.join(ROOT, "services", "crawler_service", "fixtures", "crawl")
+
+# 일기 내용/검색어 (시작 시 넣는 일기와 검색 요청에서 함께 사용)
+DIARY_WORDS = ["한강", "산책", "커피", "친구", "영화", "도서관", "떡볶이", "비가", "회사", "운동", "여행", "음악"]
+CRAWL_QUERIES = ["바다", "도시", "여름", "기억", "편지", "시간"]
+CHAT_MESSAGES = ["오늘 본 영화 추천해줘", "비 오는 날 듣기 좋은 노래", "일기 쓰는 습관 만드는 법", "주말에 갈 만한 곳"]
+
+
+# ---------------------------------------------------------------------------
+# 요청 종류와 트래픽 구성
+# ---------------------------------------------------------------------------
+
+def _chat_body(rng):
+    return {"message": rng.choice(CHAT_MESSAGES), "model": "gpt-3.5-turbo"}
+
+
+def _diary_body(rng, user):
+    words = rng.sample(DIARY_WORDS, 3)
+    return {"user_id": user, "title": words[0], "content": f"오늘은 {words[0]}에서 {words[1]}, {words[2]} 이야기를 했다."}
+
+
+# 요청 종류: 이름 → (메서드, 경로, 요청 만들기(rng, user) → httpx 인자, 스트리밍 여부)
+OPERATIONS = {
+    "chat": ("POST", "/chatbot/chat", lambda rng, user: {"json": _chat_body(rng)}, False),
+    "chat_stream": ("POST", "/chatbot/chat/stream", lambda rng, user: {"json": _chat_body(rng)}, True),
+    # 홈 화면: 상위 20개의 제목/이미지만
+    "netflix_home": ("GET", "/crawler/netflix",
+                     lambda rng, user: {"params": {"fields": "title,image", "limit": 20}}, False),
+    "netflix_full": ("GET", "/crawler/netflix", lambda rng, user: {}, False),
+    "netflix_search": ("GET", "/crawler/netflix",
+                       lambda rng, user: {"params": {"q": rng.choice(CRAWL_QUERIES), "fields": "rank,title"}}, False),
+    "movie_list": ("GET", "/crawler/movie", lambda rng, user: {"params": {"limit": 50}}, False),
+    "diary_list": ("GET", "/diary/diaries", lambda rng, user: {"params": {"user_id": user, "limit": 20}}, False),
+    "diary_search": ("GET", "/diary/diaries/search",
+                     lambda rng, user: {"params": {"user_id": user, "q": rng.choice(DIARY_WORDS)}}, False),
+    "diary_write": ("POST", "/diary/diaries", lambda rng, user: {"json": _diary_body(rng, user)}, False),
+}
+
+# 트래픽 구성: 이름 → {요청 종류: 비중}
+MIXES = {
+    # 홈/일기 화면 위주 (읽기 중심)
+    "browse": {"netflix_home": 30, "netflix_search": 5, "movie_list": 10, "diary_list": 35, "diary_search": 10,
+               "diary_write": 10},
+    # 챗봇 화면 (LLM 응답을 기다리는 긴 요청)
+    "chat": {"chat": 60, "chat_stream": 40},
+    # 전체 서비스 혼합
+    "mixed": {"chat": 10, "chat_stream": 10, "netflix_home": 20, "netflix_full": 5, "netflix_search": 5,
+              "movie_list": 10, "diary_list": 20, "diary_search": 10, "diary_write": 10},
+}
+
+
+# ---------------------------------------------------------------------------
+# 서비스 프로세스
+# ---------------------------------------------------------------------------
+
+class Service:
+    """
+    로컬에서 실행하는 서비스 하나 (gunicorn + uvicorn 워커, Dockerfile과 같은 설정 파일)
+
+    Args:
+        name: 서비스 이름
+        app_dir: 앱 디렉터리 (main.py 위치, ROOT 기준)
+        port: 수신 포트
+        workers: 워커 프로세스 수
+        env: 추가 환경 변수
+        workdir: 로그/데이터를 둘 임시 디렉터리
+    """
+
+    def __init__(self, name, app_dir, port, workers, env, workdir):
+        self.name = name
+        self.app_dir = os.path.join(ROOT, app_dir)
+        self.port = port
+        self.workers = workers
+        self.env = env
+        self.log_path = os.path.join(workdir, f"{name}.log")
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join([ROOT, self.app_dir]),
+            "PORT": str(self.port),
+            "WEB_CONCURRENCY": str(self.workers),
+            "LOG_LEVEL": "WARNING",
+            "GUNICORN_LOG_LEVEL": "warning",
+            **self.env,
+        }
+        log = open(self.log_path, "wb")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "main:app", "-c", os.path.join(ROOT, "common", "gunicorn_conf.py"),
+             "--bind", f"127.0.0.1:{self.port}"],
+            cwd=self.app_dir, env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+        )
+        log.close()
+
+    async def wait_ready(self, timeout):
+        """/ready가 200이 될 때까지 대기 (warm-up 포함)"""
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    break
+                try:
+                    if (await client.get(f"{self.url}/ready")).status_code == 200:
+                        return
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f"{self.name} did not become ready; log tail:\n{self.log_tail()}")
+
+    def log_tail(self, lines=30):
+        try:
+            with open(self.log_path, encoding="utf-8", errors="replace") as f:
+                return "".join(f.readlines()[-lines:])
+        except OSError:
+            return ""
+
+    def stop(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        # gunicorn 마스터가 워커를 정리하도록 SIGTERM, 응답이 없으면 프로세스 그룹째 종료
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            os.killpg(self.process.pid, signal.SIGKILL)
+            self.process.wait()
+
+
+def build_stack(args, workdir):
+    """게이트웨이와 서비스 대역 구성"""
+    base = args.base_port
+    chatbot = Service("chatbot", "services/chatbot_service/app", base + 1, args.service_workers, {
+        "LLM_PROVIDER": "mock",
+        "MOCK_LLM_LATENCY_MS": str(args.chat_latency_ms),
+        "MOCK_LLM_TOKENS_PER_SEC": str(args.chat_tokens_per_sec),
+        "MOCK_LLM_REPLY_TOKENS": str(args.chat_reply_tokens),
+        "MOCK_LLM_ERROR_RATE": str(args.chat_error_rate),
+        "SHARED_STATE_PATH": os.path.join(workdir, "chatbot-state.db"),
+    }, workdir)
+    diary = Service("diary", "services/diary_service/app", base + 2, 1, {
+        "DIARY_DB_PATH": os.path.join(workdir, "diary.db"),
+    }, workdir)
+    crawler = Service("crawler", "services/crawler_service/app", base + 3, args.service_workers, {
+        "CRAWLER_FIXTURES_DIR": args.crawl_fixtures,
+        "CRAWLER_FIXTURE_DELAY": str(args.crawl_delay),
+        "CRAWLER_SNAPSHOT_TTL": str(args.crawl_ttl),
+        "CRAWLER_DB_PATH": os.path.join(workdir, "crawler.db"),
+        "CRAWLER_IMAGE_CACHE_DIR": os.path.join(workdir, "images"),
+        "SHARED_STATE_PATH": os.path.join(workdir, "crawler-state.db"),
+    }, workdir)
+    gateway = Service("gateway", "gateway/app", base, args.gateway_workers, {
+        "CHATBOT_SERVICE_URL": chatbot.url,
+        "DIARY_SERVICE_URL": diary.url,
+        "CRAWLER_SERVICE_URL": crawler.url,
+        "SHARED_STATE_PATH": os.path.join(workdir, "gateway-state.db"),
+        **({} if args.rate_limits else {"GATEWAY_RATE_LIMIT_RPS": "0", "GATEWAY_ROUTE_RATE_LIMITS": "false"}),
+    }, workdir)
+    return [chatbot, diary, crawler, gateway]
+
+
+# ---------------------------------------------------------------------------
+# 자원 사용량 (/proc, Linux)
+# ---------------------------------------------------------------------------
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _proc_stat(pid):
+    """(부모 pid, CPU 시간(초), RSS(바이트)) 또는 None"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    # ')' 뒤 필드: state(0) ppid(1) ... utime(11) stime(12) ... rss(21, 페이지)
+    return int(fields[1]), (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS, int(fields[21]) * _PAGE_SIZE
+
+
+def process_tree_usage(root_pid):
+    """프로세스와 모든 자식(gunicorn 워커)의 CPU 시간 합과 RSS 합"""
+    stats = {}
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            stat = _proc_stat(int(name))
+            if stat is not None:
+                stats[int(name)] = stat
+    if root_pid not in stats:
+        return None
+    children = {}
+    for pid, (ppid, _, _) in stats.items():
+        children.setdefault(ppid, []).append(pid)
+    cpu = rss = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        _, pid_cpu, pid_rss = stats[pid]
+        cpu += pid_cpu
+        rss += pid_rss
+        pending.extend(children.get(pid, ()))
+    return cpu, rss
+
+
+class ResourceSampler:
+    """측정 구간 동안 서비스별 CPU 사용률과 최대 RSS 기록"""
+
+    def __init__(self, services, interval=0.5):
+        self.services = services
+        self.interval = interval
+        self._start = {}
+        self._rss_max = {}
+        self._task = None
+
+    def _sample(self):
+        usage = {}
+        for service in self.services:
+            result = process_tree_usage(service.process.pid) if os.path.isdir("/proc") else None
+            if result is not None:
+                usage[service.name] = result
+                self._rss_max[service.name] = max(self._rss_max.get(service.name, 0), result[1])
+        return usage
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self._sample()
+
+    def start(self):
+        self._rss_max = {}
+        self._start = {name: cpu for name, (cpu, _) in self._sample().items()}
+        self._client_cpu = _own_cpu()
+        self._started = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        wall = time.perf_counter() - self._started
+        end = self._sample()
+        report = {}
+        for name, (cpu, _) in end.items():
+            used = cpu - self._start.get(name, cpu)
+            report[name] = {
+                "cpu_seconds": round(used, 2),
+                "cpu_percent": round(100.0 * used / wall, 1),
+                "rss_max_mb": round(self._rss_max.get(name, 0) / 1024 / 1024, 1),
+            }
+        # 부하 생성기 자신이 CPU를 다 쓰면 측정값이 생성기 한계일 수 있음
+        report["load_generator"] = {"cpu_percent": round(100.0 * (_own_cpu() - self._client_cpu) / wall, 1)}
+        return report
+
+
+def _own_cpu():
+    times = os.times()
+    return times.user + times.system
+
+
+# ---------------------------------------------------------------------------
+# 부하 생성
+# ---------------------------------------------------------------------------
+
+class OpStats:
+    """요청 종류 하나의 측정값"""
+
+    __slots__ = ("latencies", "ttfts", "statuses", "errors", "rejected")
+
+    def __init__(self):
+        self.latencies = []
+        self.ttfts = []
+        self.statuses = {}
+        self.errors = 0
+        self.rejected = 0
+
+    def summary(self, wall):
+        latencies = sorted(self.latencies)
+        total = len(latencies) + self.errors + self.rejected
+        summary = {
+            "requests": total,
+            "ok": len(latencies),
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+            **_latency_summary(latencies),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+        if self.ttfts:
+            ttfts = sorted(self.ttfts)
+            summary["ttft_p50"] = round(percentile(ttfts, 50), 4)
+            summary["ttft_p95"] = round(percentile(ttfts, 95), 4)
+        return summary
+
+
+def _latency_summary(latencies):
+    return {
+        "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+        "p50": round(percentile(latencies, 50), 4),
+        "p95": round(percentile(latencies, 95), 4),
+        "p99": round(percentile(latencies, 99), 4),
+    }
+
+
+async def _one_request(client, op_name, rng, users, stats):
+    method, path, build, streamed = OPERATIONS[op_name]
+    user = f"bench-{rng.randrange(users)}"
+    kwargs = build(rng, user)
+    # 사용자마다 다른 인증 주체 → 게이트웨이의 클라이언트별 제한이 실제 사용자처럼 적용됨
+    headers = {"Authorization": f"Bearer {user}"}
+    started = time.perf_counter()
+    ttft = None
+    try:
+        if streamed:
+            async with client.stream(method, path, headers=headers, **kwargs) as response:
+                async for _ in response.aiter_raw():
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+            status = response.status_code
+            retry_after = "retry-after" in response.headers
+            ok = status == 200
+        else:
+            response = await client.request(method, path, headers=headers, **kwargs)
+            status = response.status_code
+            retry_after = "retry-after" in response.headers
+            ok = status < 400
+            # 챗봇 에러는 게이트웨이가 200 + {"status": "error"}로 바꿔 보냄
+            if ok and path.startswith("/chatbot") and response.json().get("status") == "error":
+                ok = False
+    except httpx.HTTPError:
+        status, retry_after, ok = "connection_error", False, False
+    elapsed = time.perf_counter() - started
+    stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+    if ok:
+        stats.latencies.append(elapsed)
+        if ttft is not None:
+            stats.ttfts.append(ttft)
+    elif status in (429, 503) and retry_after:
+        # 게이트웨이 수용 제어(속도 제한/대기열 초과)가 거절한 요청
+        stats.rejected += 1
+    else:
+        stats.errors += 1
+
+
+async def run_level(gateway_url, mix, concurrency, duration, users, seed, sampler=None):
+    """
+    동시 사용자 concurrency명이 duration초 동안 쉬지 않고 요청 (closed loop)
+
+    Returns:
+        dict: 전체/요청 종류별 통계와 자원 사용량
+    """
+    names = list(MIXES[mix])
+    weights = [MIXES[mix][name] for name in names]
+    stats = {name: OpStats() for name in names}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=gateway_url, timeout=httpx.Timeout(120.0, connect=10.0),
+                                 limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user_loop(index):
+            rng = random.Random(seed * 100003 + index)
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                await _one_request(client, name, rng, users, stats[name])
+
+        if sampler is not None:
+            sampler.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(user_loop(i) for i in range(concurrency)))
+        wall = time.perf_counter() - started
+        resources = await sampler.stop() if sampler is not None else {}
+
+    latencies = sorted(l for s in stats.values() for l in s.latencies)
+    errors = sum(s.errors for s in stats.values())
+    rejected = sum(s.rejected for s in stats.values())
+    return {
+        "mix": mix,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 2),
+        "requests": len(latencies) + errors + rejected,
+        "ok": len(latencies),
+        "errors": errors,
+        "rejected": rejected,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        **_latency_summary(latencies),
+        "operations": {name: s.summary(wall) for name, s in stats.items()},
+        "resources": resources,
+    }
+
+
+async def seed_diaries(diary_url, users, per_user, seed):
+    """사용자별 일기를 NDJSON 일괄 가져오기로 미리 저장 (목록/검색 요청이 빈 결과가 되지 않도록)"""
+    rng = random.Random(seed)
+    lines = "\n".join(
+        json.dumps(_diary_body(rng, f"bench-{u}"), ensure_ascii=False)
+        for u in range(users) for _ in range(per_user)
+    )
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        response = await client.post(f"{diary_url}/diary/diaries/import", content=lines.encode("utf-8"),
+                                     headers={"Content-Type": "application/x-ndjson"})
+        response.raise_for_status()
+        return response.json()
+
+
+# ---------------------------------------------------------------------------
+# 결과 저장
+# ---------------------------------------------------------------------------
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=30).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def environment_info():
+    """결과를 비교할 때 확인할 실행 환경 (커밋, 변경 여부, 머신)"""
+    return {
+        "commit": _git("rev-parse", "--short=12", "HEAD") or "unknown",
+        "branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "subject": _git("log", "-1", "--format=%s"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_result(result, directory, label=None):
+    os.makedirs(directory, exist_ok=True)
+    env = result["environment"]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    parts = [env["commit"] + ("-dirty" if env["dirty"] else ""), stamp] + ([label] if label else [])
+    path = os.path.join(directory, "-".join(parts) + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def print_summary(runs):
+    print(f"{'mix':<8} {'conc':>5} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>6} {'rej':>6}  cpu%",
+          file=sys.stderr)
+    for run in runs:
+        cpu = " ".join(f"{name}={usage['cpu_percent']}" for name, usage in run["resources"].items())
+        print(f"{run['mix']:<8} {run['concurrency']:>5} {run['throughput_rps']:>9.1f} "
+              f"{run['p50'] * 1000:>8.1f} {run['p95'] * 1000:>8.1f} {run['p99'] * 1000:>8.1f} "
+              f"{run['errors']:>6} {run['rejected']:>6}  {cpu}", file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+
+async def main(args):
+    mixes = [m.strip() for m in args.mix.split(",") if m.strip()]
+    unknown = [m for m in mixes if m not in MIXES]
+    if unknown:
+        raise SystemExit(f"알 수 없는 트래픽 구성: {', '.join(unknown)} (가능: {', '.join(MIXES)})")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    workdir = tempfile.mkdtemp(prefix="stack-bench-")
+    services = [] if args.gateway else build_stack(args, workdir)
+    try:
+        for service in services:
+            service.start()
+        for service in services:
+            await service.wait_ready(args.ready_timeout)
+        gateway_url = args.gateway or services[-1].url
+        if services and args.seed_diaries:
+            seeded = await seed_diaries(services[1].url, args.users, args.seed_diaries, args.seed)
+            print(f"일기 {seeded['imported']}건 저장", file=sys.stderr)
+
+        runs = []
+        for mix in mixes:
+            if args.warmup:
+                await run_level(gateway_url, mix, levels[0], args.warmup, args.users, args.seed)
+            for concurrency in levels:
+                print(f"측정: {mix} 동시 {concurrency}명, {args.duration}초", file=sys.stderr)
+                sampler = ResourceSampler(services) if services else None
+                runs.append(await run_level(gateway_url, mix, concurrency, args.duration, args.users,
+                                            args.seed, sampler))
+    finally:
+        for service in reversed(services):
+            service.stop()
+
+    result = {
+        "environment": environment_info(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output_dir",)},
+        "runs": runs,
+    }
+    print_summary(runs)
+    if not args.no_save:
+        print(f"결과 저장: {save_result(result, args.output_dir, args.label)}", file=sys.stderr)
+    if args.keep_workdir:
+        print(f"서비스 로그/데이터: {workdir}", file=sys.stderr)
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="전체 스택 부하 테스트 (로컬 서비스 대역)")
+    parser.add_argument("--mix", default="mixed", help=f"트래픽 구성, 쉼표로 여러 개 ({', '.join(MIXES)})")
+    parser.add_argument("--concurrency", default="8,32", help="동시 사용자 수, 쉼표로 여러 단계")
+    parser.add_argument("--duration", type=float, default=15.0, help="단계별 측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="트래픽 구성별 측정 전 예열 시간 (초, 기록 안 함)")
+    parser.add_argument("--users", type=int, default=200, help="가상 사용자 수 (인증 주체/일기 작성자)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seed-diaries", type=int, default=5, help="시작 시 사용자별로 넣을 일기 수")
+    parser.add_argument("--gateway", default=None, help="이미 실행 중인 게이트웨이 URL (지정하면 서비스를 띄우지 않음)")
+    parser.add_argument("--base-port", type=int, default=19000, help="게이트웨이 포트 (서비스는 +1, +2, +3)")
+    parser.add_argument("--gateway-workers", type=int, default=1, help="게이트웨이 워커 수")
+    parser.add_argument("--service-workers", type=int, default=1, help="챗봇/크롤러 워커 수")
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="게이트웨이 클라이언트별 속도 제한을 켠 채로 측정 (기본: 끔, 동시 처리 수 제한은 항상 적용)")
+    parser.add_argument("--chat-latency-ms", type=float, default=200, help="Mock LLM 첫 토큰 지연 (ms)")
+    parser.add_argument("--chat-tokens-per-sec", type=float, default=50, help="Mock LLM 토큰 생성 속도")
+    parser.add_argument("--chat-reply-tokens", type=int, default=40, help="Mock LLM 응답 토큰 수")
+    parser.add_argument("--chat-error-rate", type=float, default=0.0, help="Mock LLM 오류 비율")
+    parser.add_argument("--crawl-fixtures", default=CRAWL_FIXTURES_DIR, help="크롤링 결과 fixture 디렉터리")
+    parser.add_argument("--crawl-delay", type=float, default=2.0, help="크롤링 한 번에 걸리는 시간 (초)")
+    parser.add_argument("--crawl-ttl", type=float, default=600, help="크롤링 스냅샷 유효 시간 (초)")
+    parser.add_argument("--ready-timeout", type=float, default=60.0, help="서비스 준비 대기 시간 (초)")
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help="결과 JSON 저장 디렉터리")
+    parser.add_argument("--label", default=None, help="결과 파일 이름에 붙일 이름")
+    parser.add_argument("--no-save", action="store_true", help="결과를 저장하지 않음")
+    parser.add_argument("--keep-workdir", action="store_true", help="서비스 로그/데이터 디렉터리를 남김")
+    asyncio.run(main(parser.parse_args()))
@@ -1,28 +1,83 @@
-from fastapi import FastAPI, APIRouter, HTTPException  # type: ignore
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Request, Response  # type: ignore
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
+from fastapi.responses import StreamingResponse  # type: ignore
+from fastapi.concurrency import run_in_threadpool  # type: ignore
 from pydantic import BaseModel  # type: ignore
 import uvicorn  # type: ignore
 import os
-from openai import OpenAI  # type: ignore
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv  # type: ignore
+from providers.registry import create_provider
+from routing.router import create_router
+from providers.base import messages_tokens
+from common.compression import CompressionMiddleware
+from common.http_cache import ConditionalGetMiddleware
+from common.idempotency import AsyncIdempotencyStore, IdempotencyConflict, fingerprint
+from common.instrumentation import instrument, record_upstream, record_timing
+from common.tracing import start_span
+from common.log import configure_logging
+from common.chat_telemetry import ChatTelemetry, ChatTiming, ReceivedAtMiddleware, queue_wait_since
+from common.startup import StartupProfile
+from common.shared_state import create_backend
+
+# 시작 프로파일 (프로세스 시작 → 모듈 로드 시간, warm-up 시간, /ready)
+startup = StartupProfile("chatbot")
 
 # 환경 변수 로드
 load_dotenv()
 
-# OpenAI 클라이언트 초기화
-openai_api_key = os.getenv("OPENAI_API_KEY", "")
-if not openai_api_key:
-    print("Warning: OPENAI_API_KEY not set. Chat functionality will be limited.")
-    client = None
-else:
-    client = OpenAI(api_key=openai_api_key)
+# JSON 구조화 로깅 (큐 기반, LOG_LEVEL / LOG_LEVELS)
+configure_logging("chatbot")
+
+# LLM 프로바이더 (LLM_PROVIDER=openai | mock)
+# openai SDK import와 클라이언트 생성은 시작 시 warm-up에서 수행 (모듈 로드를 빠르게 유지)
+provider = None
+# warm-up이 끝나기 전에 들어온 요청이 프로바이더를 기다리는 최대 시간 (초)
+PROVIDER_WAIT_SECONDS = float(os.getenv("PROVIDER_WAIT_SECONDS", "10"))
+
+def _init_provider():
+    global provider
+    provider = create_provider()
+
+# 모델 라우팅 정책 (model="auto" 또는 MODEL_ROUTING_ENABLED=true 일 때 적용)
+model_router = create_router()
+
+# 워커 간 공유 상태 (WEB_CONCURRENCY > 1이면 SQLite, Idempotency-Key 결과)
+shared_state = create_backend("chatbot")
+
+# Idempotency-Key 저장소 (중복 POST /chatbot/chat 요청을 하나의 completion으로 처리)
+idempotency_store = AsyncIdempotencyStore(
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_KEYS", "1024")),
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600")),
+    backend=shared_state,
+    encode=lambda result: result.dict(),
+    decode=lambda data: ChatResponse(**data)
+)
+
+# 챗 성능 계측 (대기 시간, 연결 시간, TTFT, 생성 시간, 토큰 사용량)
+chat_telemetry = ChatTelemetry("chatbot")
+
+@asynccontextmanager
+async def lifespan(app):
+    """시작 시 LLM 프로바이더 warm-up (백그라운드로 실행하고, 끝나면 /ready가 200)"""
+    warm_up = startup.run_warm_up([("provider", _init_provider)])
+    try:
+        yield
+    finally:
+        warm_up.cancel()
 
 app = FastAPI(
     title="Chatbot Service API",
     version="1.0.0",
-    description="챗봇 서비스 API"
+    description="챗봇 서비스 API",
+    lifespan=lifespan
 )
 
+# 조건부 GET(ETag/304)과 gzip/brotli 압축 (SSE 스트림은 그대로 전달)
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+
 # CORS 설정 - 게이트웨이만 허용 (프론트엔드는 게이트웨이를 통해 접근)
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +91,15 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# 요청 수신 시각 기록 (스레드풀 대기 시간 측정용)
+app.add_middleware(ReceivedAtMiddleware)
+
+# 라우트별 지연 시간/처리 중 요청 수 메트릭, Server-Timing 헤더, /metrics 엔드포인트
+instrument(app, "chatbot")
+
+# 준비 상태 엔드포인트 (/ready, 프로바이더 warm-up이 끝나야 200)
+startup.install(app)
+
 # 서브 라우터 생성
 chatbot_router = APIRouter(prefix="/chatbot", tags=["chatbot"])
 
@@ -51,10 +115,114 @@ class ChatRequest(BaseModel):
     system_message: str = "You are a helpful assistant. Respond in Korean."
     conversation_history: list[Message] = []  # 대화 히스토리 (선택사항)
 
+# 토큰 사용량 모델
+class Usage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
 # 응답 모델
 class ChatResponse(BaseModel):
     message: str
     model: str
+    status: str = "success"
+    usage: Usage | None = None
+
+def _set_chat_headers(response: Response, result: ChatResponse):
+    """모델/토큰 사용량을 응답 헤더로도 전달 (게이트웨이가 본문을 파싱하지 않고 계측)"""
+    response.headers["X-Chat-Model"] = result.model
+    if result.usage is not None:
+        response.headers["X-Chat-Prompt-Tokens"] = str(result.usage.prompt_tokens)
+        response.headers["X-Chat-Completion-Tokens"] = str(result.usage.completion_tokens)
+
+def _require_provider():
+    """warm-up이 끝나지 않았으면 503, 프로바이더가 설정되지 않았으면 500 에러"""
+    if not startup.wait_ready(PROVIDER_WAIT_SECONDS):
+        raise HTTPException(
+            status_code=503,
+            detail="Chatbot service is starting up" if startup.status == "starting"
+            else "LLM provider failed to initialize",
+            headers={"Retry-After": "1"}
+        )
+    if provider is None:
+        raise HTTPException(
+            status_code=500,
+            detail="OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
+        )
+    return provider
+
+def _build_messages(request: ChatRequest):
+    """요청 모델을 LLM 메시지 배열로 변환"""
+    messages = [
+        {"role": "system", "content": request.system_message}
+    ]
+    
+    # 대화 히스토리가 있으면 추가
+    if request.conversation_history:
+        for msg in request.conversation_history:
+            messages.append({
+                "role": msg.role,
+                "content": msg.content
+            })
+    
+    # 현재 사용자 메시지 추가
+    messages.append({
+        "role": "user",
+        "content": request.message
+    })
+    return messages
+
+def _complete_chat(llm, request: ChatRequest, queue_wait=None):
+    """라우팅 후 LLM 응답 생성 및 성능 기록"""
+    messages = _build_messages(request)
+    decision = model_router.route(messages, request.model)
+    started = time.perf_counter()
+    
+    try:
+        with start_span("llm.complete", provider=llm.name, model=decision.model,
+                        routing_reason=decision.reason) as span:
+            completion = llm.complete(
+                messages=messages,
+                model=decision.model
+            )
+            span.set_attribute("prompt_tokens", completion.prompt_tokens)
+            span.set_attribute("completion_tokens", completion.completion_tokens)
+            if completion.ttft_seconds is not None:
+                span.set_attribute("ttft_ms", round(completion.ttft_seconds * 1000.0, 1))
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        record_upstream(llm.name, elapsed, "error")
+        model_router.observe(decision, elapsed, ok=False)
+        chat_telemetry.record(ChatTiming(
+            model=decision.model, status="error", queue_wait=queue_wait, total=elapsed
+        ))
+        raise HTTPException(
+            status_code=500,
+            detail=f"{llm.display_name} API error: {str(e)}",
+            headers={"X-Chat-Model": decision.model}
+        )
+    
+    elapsed = time.perf_counter() - started
+    record_upstream(llm.name, elapsed)
+    if completion.ttft_seconds is not None:
+        record_timing("llm_ttft", completion.ttft_seconds)
+    model_router.observe(decision, elapsed)
+    chat_telemetry.record(ChatTiming(
+        model=completion.model,
+        queue_wait=queue_wait,
+        connect=completion.connect_seconds,
+        ttft=completion.ttft_seconds,
+        total=completion.total_seconds if completion.total_seconds is not None else elapsed,
+        prompt_tokens=completion.prompt_tokens,
+        completion_tokens=completion.completion_tokens
+    ))
+    return ChatResponse(
+        message=completion.message,
+        model=completion.model,
+        usage=Usage(
+            prompt_tokens=completion.prompt_tokens,
+            completion_tokens=completion.completion_tokens
+        )
+    )
 
 @chatbot_router.get("/chat")
 def chat():
@@ -63,80 +231,204 @@ def chat():
     
     - **반환**: 챗봇 응답
     """
-    if client is None:
-        raise HTTPException(
-            status_code=500,
-            detail="OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
-        )
+    llm = _require_provider()
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        completion = llm.complete(
             messages=[
                 {"role": "system", "content": "You are a helpful assistant."},
                 {"role": "user", "content": "안녕하세요! 오늘 날씨 어때요?"}
-            ]
+            ],
+            model="gpt-3.5-turbo"
         )
         
         return {
-            "message": response.choices[0].message.content,
-            "model": response.model
+            "message": completion.message,
+            "model": completion.model,
+            "status": "success"
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OpenAI API error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"{llm.display_name} API error: {str(e)}")
+
+def _complete_chat_request(request: ChatRequest, http_request: Request):
+    """POST /chatbot/chat 처리 (스레드 풀에서 실행, 대기 시간은 스레드가 시작될 때까지)"""
+    llm = _require_provider()
+    return _complete_chat(llm, request, queue_wait_since(http_request))
 
 @chatbot_router.post("/chat", response_model=ChatResponse)
-def chat_post(request: ChatRequest):
+async def chat_post(
+    request: ChatRequest,
+    http_request: Request,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key")
+):
     """
     챗봇 대화 API (POST - 사용자 메시지 전송)
     
     대화 히스토리를 포함하여 연속적인 대화가 가능합니다.
     
     - **message**: 사용자 메시지
-    - **model**: 사용할 모델 (기본값: gpt-3.5-turbo)
+    - **model**: 사용할 모델 (기본값: gpt-3.5-turbo, "auto"면 라우팅 정책이 선택)
     - **system_message**: 시스템 메시지 (기본값: "You are a helpful assistant. Respond in Korean.")
     - **conversation_history**: 이전 대화 히스토리 (선택사항)
         예: [{"role": "user", "content": "안녕"}, {"role": "assistant", "content": "안녕하세요!"}]
+    - **Idempotency-Key** (헤더, 선택): 같은 키의 재시도/중복 요청은 하나의 응답을 공유합니다.
     
     - **반환**: 챗봇 응답
     """
-    if client is None:
-        raise HTTPException(
-            status_code=500,
-            detail="OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
-        )
+    # 프로바이더 준비 대기와 LLM 호출은 블로킹이므로 스레드 풀에서 실행
+    complete = lambda: run_in_threadpool(_complete_chat_request, request, http_request)
+    if not idempotency_key:
+        result = await complete()
+        _set_chat_headers(response, result)
+        return result
     
     try:
-        # 메시지 배열 구성
-        messages = [
-            {"role": "system", "content": request.system_message}
-        ]
-        
-        # 대화 히스토리가 있으면 추가
-        if request.conversation_history:
-            for msg in request.conversation_history:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-        
-        # 현재 사용자 메시지 추가
-        messages.append({
-            "role": "user",
-            "content": request.message
-        })
-        
-        response = client.chat.completions.create(
-            model=request.model,
-            messages=messages
+        result, replayed = await idempotency_store.run(
+            idempotency_key,
+            fingerprint(request.dict()),
+            complete
         )
-        
-        return ChatResponse(
-            message=response.choices[0].message.content or "",
-            model=response.model
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key is already used with a different request body."
         )
+    if replayed:
+        response.headers["Idempotency-Replayed"] = "true"
+    _set_chat_headers(response, result)
+    return result
+
+@chatbot_router.post("/chat/stream")
+def chat_stream(request: ChatRequest, http_request: Request):
+    """
+    챗봇 대화 API (POST - 스트리밍)
+    
+    응답을 생성되는 대로 text/plain 청크로 전송합니다.
+    요청 본문은 POST /chatbot/chat 과 같습니다.
+    
+    - **반환**: 응답 텍스트 스트림
+    """
+    llm = _require_provider()
+    queue_wait = queue_wait_since(http_request)
+    messages = _build_messages(request)
+    decision = model_router.route(messages, request.model)
+    timing = ChatTiming(
+        model=decision.model,
+        queue_wait=queue_wait,
+        prompt_tokens=messages_tokens(messages)
+    )
+    started = time.perf_counter()
+    chunks = llm.stream(messages=messages, model=decision.model)
+    
+    try:
+        # 첫 청크까지 받아서 연결/인증 오류는 일반 에러 응답으로 처리
+        with start_span("llm.first_token", provider=llm.name, model=decision.model,
+                        routing_reason=decision.reason):
+            first = next(chunks, "")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OpenAI API error: {str(e)}")
+        timing.status = "error"
+        timing.total = time.perf_counter() - started
+        record_upstream(llm.name, timing.total, "error")
+        model_router.observe(decision, timing.total, ok=False)
+        chat_telemetry.record(timing)
+        raise HTTPException(
+            status_code=500,
+            detail=f"{llm.display_name} API error: {str(e)}",
+            headers={"X-Chat-Model": decision.model}
+        )
+    timing.ttft = time.perf_counter() - started
+    # 스트리밍은 헤더를 보낼 때 첫 청크까지만 알 수 있으므로 TTFT만 Server-Timing에 기록
+    record_timing("llm_ttft", timing.ttft)
+    
+    def body():
+        ok = False
+        disconnected = False
+        # 스트림 청크 하나를 토큰 하나로 계산
+        count = 1 if first else 0
+        try:
+            yield first
+            for chunk in chunks:
+                count += 1
+                yield chunk
+            ok = True
+        except GeneratorExit:
+            disconnected = True
+            raise
+        finally:
+            timing.total = time.perf_counter() - started
+            timing.completion_tokens = count
+            timing.status = "success" if ok else "error"
+            record_upstream(llm.name, timing.total, "ok" if ok else "error")
+            # 클라이언트가 끊은 스트림은 모델 실패가 아니므로 라우팅 지연 시간 표본에서 제외
+            if not disconnected:
+                model_router.observe(decision, timing.total, ok=ok)
+            chat_telemetry.record(timing)
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/plain; charset=utf-8",
+        headers={
+            "X-Chat-Model": decision.model,
+            "X-Chat-Prompt-Tokens": str(timing.prompt_tokens)
+        }
+    )
+
+@chatbot_router.get("/stats")
+def chat_stats():
+    """
+    챗 성능 통계 조회 API
+    
+    모델별 요청 수, 대기 시간, 연결 시간, TTFT, 생성 시간, 초당 토큰 수(p50/p95/p99)와
+    누적 프롬프트/응답 토큰 수를 반환합니다.
+    
+    - **반환**: 모델별 성능 통계
+    """
+    return chat_telemetry.stats()
+
+@chatbot_router.get("/routing/stats")
+def routing_stats():
+    """
+    모델 라우팅 통계 조회 API
+    
+    티어/사유별 결정 수, 모델별 p50/p95 지연 시간, 최근 라우팅 결정을 반환합니다.
+    
+    - **반환**: 라우팅 통계
+    """
+    return model_router.stats()
+
+@chatbot_router.get("/idempotency/stats")
+def idempotency_stats():
+    """
+    Idempotency-Key 저장소 상태 조회 API
+    
+    - **반환**: 저장된 키 수, 진행 중인 요청 수, 재사용(hit/join) 횟수
+    """
+    return idempotency_store.stats()
+
+@chatbot_router.get("/provider")
+def provider_info():
+    """
+    현재 LLM 프로바이더 설정 조회 API
+    
+    부하 테스트에서 Mock 프로바이더의 기준 응답 시간을 확인하는 용도로 사용합니다.
+    
+    - **반환**: 프로바이더 이름 및 설정
+    """
+    if provider is None:
+        return {"provider": None}
+    return provider.describe()
+
+# Health check 엔드포인트
+@app.get("/health")
+async def health_check():
+    """
+    Health check 엔드포인트
+
+    프로세스가 살아 있는지만 확인합니다 (liveness).
+    게이트웨이는 warm-up까지 끝났는지 /ready로 확인해 레플리카를 선택합니다.
+    """
+    return {"status": "healthy", "service": "chatbot"}
 
 # 서브 라우터를 앱에 포함
 app.include_router(chatbot_router)
@@ -0,0 +1,89 @@
+"""
+LLM 프로바이더 공통 인터페이스 모듈
+챗봇 엔드포인트는 이 인터페이스만 사용하므로 OpenAI/Mock 등 구현체를 교체할 수 있다.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass
+class Completion:
+    """
+    한 번의 대화 완료(completion) 결과
+
+    시간 값은 초 단위이며, 프로바이더가 측정하지 못하면 None이다.
+    - connect_seconds: 업스트림 연결(응답 스트림 수립)까지의 시간
+    - ttft_seconds: 첫 토큰까지의 시간
+    - total_seconds: 전체 생성 시간
+    """
+    message: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    connect_seconds: float = None
+    ttft_seconds: float = None
+    total_seconds: float = None
+
+
+def estimate_tokens(text):
+    """
+    텍스트의 대략적인 토큰 수 추정 (토크나이저 없이 사용)
+
+    영어는 약 4글자, 한글은 약 1~2글자가 1토큰이므로 둘 중 큰 값을 사용한다.
+
+    Args:
+        text: 토큰 수를 추정할 문자열
+
+    Returns:
+        int: 추정 토큰 수
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_count = len(text) - non_ascii
+    return max(1, ascii_count // 4 + non_ascii)
+
+
+def messages_tokens(messages):
+    """메시지 배열 전체의 추정 토큰 수"""
+    return sum(estimate_tokens(m.get("content", "")) for m in messages)
+
+
+class LLMProvider(ABC):
+    """LLM 프로바이더 추상 클래스"""
+
+    # 프로바이더 식별자 (환경 변수 LLM_PROVIDER 값과 동일)
+    name = "base"
+    # 에러 메시지에 표시할 이름
+    display_name = "LLM"
+
+    @abstractmethod
+    def complete(self, messages, model) -> Completion:
+        """
+        메시지 배열로 응답 생성 (전체 응답을 한 번에 반환)
+
+        Args:
+            messages: [{"role": ..., "content": ...}] 형태의 메시지 배열
+            model: 사용할 모델 이름
+
+        Returns:
+            Completion: 응답 결과
+        """
+
+    @abstractmethod
+    def stream(self, messages, model) -> Iterator[str]:
+        """
+        메시지 배열로 응답 생성 (토큰 단위 스트리밍)
+
+        Args:
+            messages: [{"role": ..., "content": ...}] 형태의 메시지 배열
+            model: 사용할 모델 이름
+
+        Yields:
+            str: 응답 텍스트 조각
+        """
+
+    def describe(self):
+        """프로바이더 설정 정보 (부하 테스트 등에서 기준값으로 사용)"""
+        return {"provider": self.name}
@@ -0,0 +1,118 @@
+"""
+로컬 Mock LLM 프로바이더
+실제 토큰 비용 없이 부하 테스트/오프라인 실행을 하기 위한 결정적(deterministic) 백엔드.
+첫 토큰 지연, 토큰 생성 속도, 에러 비율을 시뮬레이션한다.
+"""
+import hashlib
+import random
+import threading
+import time
+from providers.base import LLMProvider, Completion, messages_tokens
+
+# 응답 생성에 사용하는 고정 어휘
+_VOCABULARY = [
+    "안녕하세요", "오늘은", "좋은", "하루", "입니다", "질문", "감사합니다",
+    "도움이", "필요하시면", "말씀해", "주세요", "이것은", "테스트", "응답",
+    "모의", "데이터", "입니다.", "그리고", "결과를", "확인해", "보세요.",
+]
+
+
+class MockProviderError(Exception):
+    """시뮬레이션된 LLM 오류"""
+
+
+class MockProvider(LLMProvider):
+    """
+    Mock 프로바이더
+
+    Args:
+        latency_ms: 첫 토큰까지의 지연 시간 (ms)
+        tokens_per_sec: 초당 생성 토큰 수 (0 이하이면 지연 없음)
+        error_rate: 요청 실패 확률 (0.0 ~ 1.0)
+        reply_tokens: 응답 토큰 수
+        seed: 에러 발생 난수 시드 (같은 시드면 같은 순서로 실패)
+    """
+
+    name = "mock"
+    display_name = "Mock LLM"
+
+    def __init__(self, latency_ms=200, tokens_per_sec=50.0, error_rate=0.0,
+                 reply_tokens=40, seed=0):
+        self.latency_ms = max(0.0, float(latency_ms))
+        self.tokens_per_sec = float(tokens_per_sec)
+        self.error_rate = min(1.0, max(0.0, float(error_rate)))
+        self.reply_tokens = max(1, int(reply_tokens))
+        self.seed = int(seed)
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def _should_fail(self):
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _reply_tokens(self, messages, model):
+        """마지막 사용자 메시지 해시로 항상 같은 응답 토큰 목록 생성"""
+        last = messages[-1]["content"] if messages else ""
+        digest = hashlib.sha256(f"{model}:{last}".encode("utf-8")).digest()
+        tokens = [f"[mock:{model}]"]
+        for i in range(self.reply_tokens - 1):
+            tokens.append(_VOCABULARY[digest[i % len(digest)] % len(_VOCABULARY)])
+        return tokens
+
+    def _connect(self):
+        """첫 응답까지의 지연과 에러 시뮬레이션"""
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        if self._should_fail():
+            raise MockProviderError("simulated upstream failure")
+
+    def _generate(self, messages, model):
+        interval = 1.0 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+        for i, token in enumerate(self._reply_tokens(messages, model)):
+            if interval:
+                time.sleep(interval)
+            yield token if i == 0 else " " + token
+
+    def stream(self, messages, model):
+        self._connect()
+        yield from self._generate(messages, model)
+
+    def complete(self, messages, model):
+        started = time.perf_counter()
+        self._connect()
+        connect_seconds = time.perf_counter() - started
+
+        parts = []
+        ttft_seconds = None
+        for token in self._generate(messages, model):
+            if ttft_seconds is None:
+                ttft_seconds = time.perf_counter() - started
+            parts.append(token)
+
+        return Completion(
+            message="".join(parts),
+            model=model,
+            prompt_tokens=messages_tokens(messages),
+            completion_tokens=self.reply_tokens,
+            connect_seconds=connect_seconds,
+            ttft_seconds=ttft_seconds,
+            total_seconds=time.perf_counter() - started
+        )
+
+    def expected_seconds(self):
+        """지연 시뮬레이션만으로 걸리는 이론상 응답 시간 (초)"""
+        generation = self.reply_tokens / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+        return self.latency_ms / 1000.0 + generation
+
+    def describe(self):
+        return {
+            "provider": self.name,
+            "latency_ms": self.latency_ms,
+            "tokens_per_sec": self.tokens_per_sec,
+            "error_rate": self.error_rate,
+            "reply_tokens": self.reply_tokens,
+            "seed": self.seed,
+            "expected_seconds": self.expected_seconds()
+        }
@@ -0,0 +1,67 @@
+"""
+OpenAI Chat Completions 프로바이더
+"""
+import time
+from openai import OpenAI  # type: ignore
+from providers.base import LLMProvider, Completion
+
+
+class OpenAIProvider(LLMProvider):
+    """openai.OpenAI 클라이언트를 사용하는 프로바이더"""
+
+    name = "openai"
+    display_name = "OpenAI"
+
+    def __init__(self, api_key):
+        self.client = OpenAI(api_key=api_key)
+
+    def complete(self, messages, model):
+        # 스트리밍으로 받아서 연결 시간과 첫 토큰 시간(TTFT)을 측정하고,
+        # 마지막 청크의 usage로 토큰 사용량을 기록한다
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        connect_seconds = time.perf_counter() - started
+
+        parts = []
+        ttft_seconds = None
+        usage = None
+        response_model = model
+        for chunk in response:
+            response_model = chunk.model or response_model
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if ttft_seconds is None:
+                    ttft_seconds = time.perf_counter() - started
+                parts.append(delta)
+
+        return Completion(
+            message="".join(parts),
+            model=response_model,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            connect_seconds=connect_seconds,
+            ttft_seconds=ttft_seconds,
+            total_seconds=time.perf_counter() - started
+        )
+
+    def stream(self, messages, model):
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True
+        )
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
@@ -0,0 +1,43 @@
+"""
+LLM 프로바이더 선택 모듈
+환경 변수 LLM_PROVIDER 값에 따라 프로바이더 인스턴스를 생성한다.
+
+- LLM_PROVIDER=openai (기본값): OPENAI_API_KEY 필요
+- LLM_PROVIDER=mock: MOCK_LLM_LATENCY_MS, MOCK_LLM_TOKENS_PER_SEC,
+  MOCK_LLM_ERROR_RATE, MOCK_LLM_REPLY_TOKENS, MOCK_LLM_SEED 로 동작 조절
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def create_provider():
+    """
+    환경 변수 설정으로 LLM 프로바이더 생성
+
+    Returns:
+        LLMProvider | None: 프로바이더 (설정이 부족하면 None)
+    """
+    provider_name = os.getenv("LLM_PROVIDER", "openai").strip().lower()
+
+    if provider_name == "mock":
+        from providers.mock_provider import MockProvider
+        return MockProvider(
+            latency_ms=float(os.getenv("MOCK_LLM_LATENCY_MS", "200")),
+            tokens_per_sec=float(os.getenv("MOCK_LLM_TOKENS_PER_SEC", "50")),
+            error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+            reply_tokens=int(os.getenv("MOCK_LLM_REPLY_TOKENS", "40")),
+            seed=int(os.getenv("MOCK_LLM_SEED", "0"))
+        )
+
+    if provider_name != "openai":
+        logger.warning("unknown LLM_PROVIDER, falling back to openai", extra={"provider": provider_name})
+
+    openai_api_key = os.getenv("OPENAI_API_KEY", "")
+    if not openai_api_key:
+        logger.warning("OPENAI_API_KEY not set. Chat functionality will be limited.")
+        return None
+
+    from providers.openai_provider import OpenAIProvider
+    return OpenAIProvider(api_key=openai_api_key)
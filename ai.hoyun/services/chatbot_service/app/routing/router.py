@@ -0,0 +1,348 @@
+"""
+지연 시간 기반 모델 라우팅 모듈
+
+프롬프트 길이, 추정 복잡도, 모델별 실측 지연 시간(p95)을 보고 요청을 모델 티어에 배정한다.
+선호 티어의 p95가 임계값을 넘으면 더 빠른 티어로 넘긴다(failover).
+지연 시간 표본은 최근 일정 시간(window) 안의 것만 보고, 실패/타임아웃은 임계값을 넘은 표본으로 센다.
+failover 중에는 일정 간격으로 요청 하나를 선호 티어로 보내(probe) 임계값 안에 성공하면 선호 티어로 복귀한다.
+모든 라우팅 결정은 기록되어 /chatbot/routing/stats 에서 확인할 수 있다.
+
+환경 변수:
+- MODEL_ROUTING_ENABLED: "true"면 모든 요청을 라우팅 (기본값: false, model="auto" 요청만 라우팅)
+- MODEL_ROUTING_TIERS: 티어 목록 JSON (빠른 티어부터 순서대로)
+    예: [{"name": "fast", "model": "gpt-3.5-turbo", "max_prompt_tokens": 1000, "max_complexity": 0.4}, ...]
+- MODEL_ROUTING_P95_THRESHOLD_MS: failover 기준 p95 (기본값: 8000)
+- MODEL_ROUTING_MIN_SAMPLES: p95 판단에 필요한 최소 표본 수 (기본값: 20)
+- MODEL_ROUTING_WINDOW_SECONDS: p95 계산에 쓰는 최근 표본 시간 범위 (초, 기본값: 120)
+- MODEL_ROUTING_PROBE_INTERVAL: failover 중 선호 티어로 보내는 probe 요청 간격 (초, 기본값: 15)
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque, defaultdict
+from dataclasses import dataclass, field, asdict
+from providers.base import estimate_tokens, messages_tokens
+
+logger = logging.getLogger(__name__)
+
+# 요청 모델이 이 값이면 라우팅 정책이 모델을 고른다
+AUTO_MODEL = "auto"
+
+DEFAULT_TIERS = [
+    {"name": "fast", "model": "gpt-3.5-turbo", "max_prompt_tokens": 1500, "max_complexity": 0.45},
+    {"name": "strong", "model": "gpt-4o", "max_prompt_tokens": None, "max_complexity": None},
+]
+
+# 분석/추론이 필요한 요청에 자주 등장하는 표현
+_ANALYTICAL_PATTERN = re.compile(
+    r"분석|비교|설명해|이유|원인|단계별|요약|정리해|장단점|코드|구현|증명|계산|"
+    r"analy[sz]e|compare|explain|why|step[- ]by[- ]step|summari[sz]e|implement|prove|calculate",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class ModelTier:
+    """모델 티어 설정 (None이면 제한 없음)"""
+    name: str
+    model: str
+    max_prompt_tokens: int = None
+    max_complexity: float = None
+    p95_threshold_ms: float = None
+
+    def accepts(self, prompt_tokens, complexity):
+        if self.max_prompt_tokens is not None and prompt_tokens > self.max_prompt_tokens:
+            return False
+        if self.max_complexity is not None and complexity > self.max_complexity:
+            return False
+        return True
+
+
+@dataclass
+class RoutingDecision:
+    """한 요청의 라우팅 결정 기록"""
+    requested_model: str
+    model: str
+    tier: str
+    reason: str
+    prompt_tokens: int
+    complexity: float
+    failover_from: str = None
+    timestamp: float = field(default_factory=time.time)
+    latency_ms: float = None
+    ok: bool = None
+
+
+def estimate_complexity(messages):
+    """
+    대화의 복잡도를 0.0 ~ 1.0 사이 점수로 추정
+
+    마지막 사용자 메시지의 길이, 분석형 표현, 코드 블록, 질문 수와 대화 길이를 본다.
+
+    Args:
+        messages: LLM 메시지 배열
+
+    Returns:
+        float: 복잡도 점수
+    """
+    if not messages:
+        return 0.0
+    text = messages[-1].get("content", "")
+    score = min(estimate_tokens(text) / 400.0, 0.4)
+    score += min(len(_ANALYTICAL_PATTERN.findall(text)) * 0.15, 0.3)
+    if "```" in text:
+        score += 0.2
+    score += min(max(text.count("?") - 1, 0) * 0.05, 0.1)
+    turns = sum(1 for m in messages if m.get("role") != "system")
+    score += min(turns / 40.0, 0.1)
+    return round(min(score, 1.0), 3)
+
+
+class LatencyTracker:
+    """
+    모델별 최근 응답 시간 기록 (시간 기반 슬라이딩 윈도우)
+
+    실패한 요청은 무한대 지연 시간으로 기록되어 백분위 계산에서 임계값을 넘은 표본으로 센다.
+
+    Args:
+        window_seconds: 표본을 유지할 시간 (초)
+        max_samples: 모델별 최대 표본 수
+    """
+
+    def __init__(self, window_seconds=120.0, max_samples=1000):
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        # 모델 → deque[(기록 시각, 지연 시간(초), 성공 여부)]
+        self._samples = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._lock = threading.Lock()
+
+    def _recent(self, model, now):
+        """윈도우 밖 표본을 버리고 남은 표본 목록 (lock 안에서 호출)"""
+        samples = self._samples.get(model)
+        if samples is None:
+            return []
+        cutoff = now - self.window_seconds
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+        return list(samples)
+
+    def observe(self, model, seconds, ok=True):
+        with self._lock:
+            self._samples[model].append((time.monotonic(), seconds, ok))
+
+    def percentile(self, model, pct, include_failures=True):
+        """
+        모델의 백분위 지연 시간 (초). 표본이 없으면 None
+
+        Args:
+            include_failures: True면 실패를 무한대 지연 시간으로 포함 (False면 성공한 요청만)
+        """
+        with self._lock:
+            samples = self._recent(model, time.monotonic())
+        values = sorted(
+            seconds if ok else float("inf")
+            for _, seconds, ok in samples if ok or include_failures
+        )
+        if not values:
+            return None
+        index = min(len(values) - 1, int(pct / 100.0 * len(values)))
+        return values[index]
+
+    def count(self, model):
+        with self._lock:
+            return len(self._recent(model, time.monotonic()))
+
+    def failures(self, model):
+        with self._lock:
+            return sum(1 for _, _, ok in self._recent(model, time.monotonic()) if not ok)
+
+    def last(self, model):
+        """가장 최근 표본 (기록 시각, 지연 시간, 성공 여부). 없으면 None"""
+        with self._lock:
+            samples = self._recent(model, time.monotonic())
+        return samples[-1] if samples else None
+
+    def reset(self, model):
+        with self._lock:
+            self._samples.pop(model, None)
+
+    def models(self):
+        with self._lock:
+            return list(self._samples.keys())
+
+
+class ModelRouter:
+    """
+    모델 라우팅 정책
+
+    Args:
+        tiers: ModelTier 목록 (빠른 티어부터)
+        enabled: True면 클라이언트가 지정한 모델도 라우팅
+        p95_threshold_ms: failover 기준 p95 (티어별 설정이 없을 때)
+        min_samples: p95 판단에 필요한 최소 표본 수
+        window_seconds: p95 계산에 쓰는 최근 표본 시간 범위 (초)
+        probe_interval: failover 중 선호 티어로 probe 요청을 보내는 간격 (초)
+        history: 보관할 최근 결정 수
+    """
+
+    def __init__(self, tiers, enabled=False, p95_threshold_ms=8000.0, min_samples=20,
+                 window_seconds=120.0, probe_interval=15.0, history=500):
+        self.tiers = tiers
+        self.enabled = enabled
+        self.p95_threshold_ms = p95_threshold_ms
+        self.min_samples = min_samples
+        self.probe_interval = probe_interval
+        self.latency = LatencyTracker(window_seconds=window_seconds)
+        self._decisions = deque(maxlen=history)
+        self._counts = defaultdict(int)
+        # failover 중인 티어 이름 → failover 시작 시각, 마지막 probe 시각
+        self._failover_since = {}
+        self._last_probe = {}
+        self._lock = threading.Lock()
+
+    def _threshold_seconds(self, tier):
+        return (tier.p95_threshold_ms or self.p95_threshold_ms) / 1000.0
+
+    def _over_threshold(self, tier, now):
+        """
+        티어가 failover 대상인지 판단
+
+        failover 중이면 그 뒤에 끝난 가장 최근 요청(probe)이 임계값 안에 성공했을 때 복귀하고,
+        이전 표본(느렸던 구간)은 버린다. 표본이 적은 동안에는 failover 상태를 유지해
+        느린 티어로 요청이 한꺼번에 다시 몰리지 않게 한다.
+        """
+        threshold = self._threshold_seconds(tier)
+        with self._lock:
+            since = self._failover_since.get(tier.name)
+        if since is not None:
+            last = self.latency.last(tier.model)
+            if last is None or last[0] < since or not last[2] or last[1] > threshold:
+                return True
+            with self._lock:
+                self._failover_since.pop(tier.name, None)
+                self._last_probe.pop(tier.name, None)
+            self.latency.reset(tier.model)
+            logger.info("model tier recovered", extra={"tier": tier.name, "model": tier.model})
+            return False
+
+        if self.latency.count(tier.model) < self.min_samples:
+            return False
+        if self.latency.percentile(tier.model, 95) <= threshold:
+            return False
+        with self._lock:
+            self._failover_since.setdefault(tier.name, now)
+        logger.warning("model tier over latency threshold, failing over",
+                       extra={"tier": tier.name, "model": tier.model})
+        return True
+
+    def _take_probe(self, tier, now):
+        """failover 중인 티어로 probe 요청을 보낼 차례인지 (차례면 시각을 기록)"""
+        with self._lock:
+            last = self._last_probe.get(tier.name, self._failover_since.get(tier.name, now))
+            if now - last < self.probe_interval:
+                return False
+            self._last_probe[tier.name] = now
+            return True
+
+    def route(self, messages, requested_model):
+        """
+        요청을 모델에 배정
+
+        Args:
+            messages: LLM 메시지 배열
+            requested_model: 클라이언트가 요청한 모델
+
+        Returns:
+            RoutingDecision: 라우팅 결정
+        """
+        prompt_tokens = messages_tokens(messages)
+        complexity = estimate_complexity(messages)
+
+        if not self.enabled and requested_model != AUTO_MODEL:
+            decision = RoutingDecision(requested_model, requested_model, "client", "client",
+                                       prompt_tokens, complexity)
+        else:
+            index = next(
+                (i for i, tier in enumerate(self.tiers) if tier.accepts(prompt_tokens, complexity)),
+                len(self.tiers) - 1
+            )
+            preferred = self.tiers[index]
+            reason = "policy"
+            failover_from = None
+            now = time.monotonic()
+            # 선호 티어가 느려졌으면 더 빠른 티어로 이동 (probe 차례면 복귀 확인용으로 그대로 보냄)
+            while index > 0 and self._over_threshold(self.tiers[index], now):
+                if self._take_probe(self.tiers[index], now):
+                    reason = "probe"
+                    break
+                index -= 1
+                reason = "failover"
+                failover_from = preferred.name
+            tier = self.tiers[index]
+            decision = RoutingDecision(requested_model, tier.model, tier.name, reason,
+                                       prompt_tokens, complexity, failover_from)
+
+        with self._lock:
+            self._decisions.append(decision)
+            self._counts[(decision.tier, decision.model, decision.reason)] += 1
+        return decision
+
+    def observe(self, decision, seconds, ok=True):
+        """라우팅된 요청의 결과(지연 시간, 성공 여부) 기록"""
+        decision.latency_ms = round(seconds * 1000.0, 1)
+        decision.ok = ok
+        self.latency.observe(decision.model, seconds, ok)
+
+    def stats(self, recent=50):
+        """라우팅 통계 (티어별 결정 수, 모델별 지연 시간, 최근 결정)"""
+        with self._lock:
+            counts = [
+                {"tier": tier, "model": model, "reason": reason, "count": count}
+                for (tier, model, reason), count in sorted(self._counts.items())
+            ]
+            decisions = [asdict(d) for d in list(self._decisions)[-recent:]]
+            failover = list(self._failover_since)
+
+        latency = {}
+        for model in self.latency.models():
+            # 지연 시간은 성공한 요청 기준, 실패는 failures로 따로 표시
+            p50 = self.latency.percentile(model, 50, include_failures=False)
+            p95 = self.latency.percentile(model, 95, include_failures=False)
+            latency[model] = {
+                "samples": self.latency.count(model),
+                "failures": self.latency.failures(model),
+                "p50_ms": round(p50 * 1000.0, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000.0, 1) if p95 is not None else None,
+            }
+
+        return {
+            "enabled": self.enabled,
+            "p95_threshold_ms": self.p95_threshold_ms,
+            "failover": sorted(failover),
+            "tiers": [asdict(t) for t in self.tiers],
+            "decisions": counts,
+            "latency": latency,
+            "recent": decisions,
+        }
+
+
+def create_router():
+    """환경 변수 설정으로 ModelRouter 생성"""
+    raw_tiers = os.getenv("MODEL_ROUTING_TIERS")
+    try:
+        tier_configs = json.loads(raw_tiers) if raw_tiers else DEFAULT_TIERS
+    except json.JSONDecodeError as e:
+        logger.warning("invalid MODEL_ROUTING_TIERS, using default tiers", extra={"error": str(e)})
+        tier_configs = DEFAULT_TIERS
+
+    return ModelRouter(
+        tiers=[ModelTier(**config) for config in tier_configs],
+        enabled=os.getenv("MODEL_ROUTING_ENABLED", "false").lower() == "true",
+        p95_threshold_ms=float(os.getenv("MODEL_ROUTING_P95_THRESHOLD_MS", "8000")),
+        min_samples=int(os.getenv("MODEL_ROUTING_MIN_SAMPLES", "20")),
+        window_seconds=float(os.getenv("MODEL_ROUTING_WINDOW_SECONDS", "120")),
+        probe_interval=float(os.getenv("MODEL_ROUTING_PROBE_INTERVAL", "15"))
+    )
@@ -1,20 +1,186 @@
-from fastapi import FastAPI, APIRouter  # type: ignore
+from contextlib import asynccontextmanager
+import importlib
+import json
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request  # type: ignore
+from fastapi.responses import Response  # type: ignore
 import uvicorn  # type: ignore
+import logging
+import os
+import threading
+import time
+import uuid
+from common.compression import CompressionMiddleware
+from common.http_cache import ConditionalGetMiddleware, not_modified
+from common.instrumentation import instrument
+from common.log import configure_logging
+from common.shared_state import create_backend, get_json, set_json
+from common.startup import StartupProfile
+from store.catalog import CatalogStore
+from utils.images import (
+    CACHE_CONTROL as IMAGE_CACHE_CONTROL, DEFAULT_WIDTH, ImageError, PosterCache, negotiate_format, proxy_url,
+    rewrite_images, snap_width,
+)
+from utils.records import MAX_LIMIT, QueryError, SnapshotQuery
+from utils.snapshot import SnapshotCache, snapshot_response
 
-app = FastAPI(title="Crawler Service API")
+# 시작 프로파일 (프로세스 시작 → 모듈 로드 시간, warm-up 시간, /ready)
+startup = StartupProfile("crawler")
 
-# 동적 import로 오류 방지
-try:
-    from movie.movie import crawl_kmdb_movie_list  # type: ignore
-except ImportError as e:
-    print(f"Warning: movie.movie import failed: {e}")
-    crawl_kmdb_movie_list = None
+# JSON 구조화 로깅 (큐 기반, LOG_LEVEL / LOG_LEVELS)
+configure_logging("crawler")
+logger = logging.getLogger(__name__)
+
+
+def _lazy_crawler(module_name, func_name):
+    """
+    크롤러 함수를 처음 호출할 때 import
+
+    selenium/BeautifulSoup/requests는 import에 수 초가 걸리므로 모듈 로드 시점이 아니라
+    lifespan warm-up(또는 warm-up이 끝나기 전에 들어온 첫 요청)에서 불러온다.
+    import 실패(ImportError)는 숨기지 않고 warm-up 상태와 요청 응답에 드러난다.
+    """
+    def crawl():
+        return getattr(importlib.import_module(module_name), func_name)()
+    return crawl
+
+
+def _fixture_crawler(name):
+    """
+    저장해 둔 크롤링 결과(CRAWLER_FIXTURES_DIR/<name>.json)를 CRAWLER_FIXTURE_DELAY초 뒤 돌려주는 크롤러
+
+    실제 사이트와 브라우저 없이 서비스를 띄울 때(부하 테스트, 로컬 개발) 사용한다.
+    """
+    path = os.path.join(CRAWLER_FIXTURES_DIR, f"{name}.json")
+
+    def crawl():
+        time.sleep(CRAWLER_FIXTURE_DELAY)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return crawl
+
+
+def _with_proxied_images(crawl):
+    """크롤링 결과의 image를 포스터 프록시 URL로 바꿈 (원본은 image_original, 스냅샷에는 바뀐 결과가 저장됨)"""
+    def crawl_and_rewrite():
+        return rewrite_images(crawl())
+    return crawl_and_rewrite
+
+
+# 워커 간 공유 상태 (WEB_CONCURRENCY > 1이면 SQLite, 스냅샷/크롤링 락/크롤링 작업 상태)
+shared_state = create_backend("crawler")
+
+# 지정하면 Selenium 크롤링 대신 저장해 둔 결과(movie.json, netflix.json)를 제공 (크롤링 시간은 CRAWLER_FIXTURE_DELAY초)
+CRAWLER_FIXTURES_DIR = os.getenv("CRAWLER_FIXTURES_DIR", "")
+CRAWLER_FIXTURE_DELAY = float(os.getenv("CRAWLER_FIXTURE_DELAY", "0"))
+if CRAWLER_FIXTURES_DIR:
+    _movie_crawler = _fixture_crawler("movie")
+    _netflix_crawler = _fixture_crawler("netflix")
+else:
+    _movie_crawler = _lazy_crawler("movie.movie", "crawl_kmdb_movie_list")
+    _netflix_crawler = _lazy_crawler("netflix.netflix", "crawl_netflix_movies")
+
+# 크롤링 결과 스냅샷 (CRAWLER_SNAPSHOT_TTL 동안 재사용, ETag는 결과 내용 해시)
+movie_snapshots = SnapshotCache("kmdb", _movie_crawler, state=shared_state)
+netflix_snapshots = SnapshotCache("netflix", _with_proxied_images(_netflix_crawler), state=shared_state)
+
+# 포스터 이미지 프록시 캐시 (원본 한 번만 받아 썸네일로 저장, 디스크 LRU)
+poster_cache = None
+
+# KMDB 카탈로그 저장소 (큐레이션 리스트 전체 + 상세 페이지, 크롤링 체크포인트 포함)
+CRAWLER_DB_PATH = os.getenv("CRAWLER_DB_PATH", "data/crawler.db")
+# 카탈로그 크롤링의 워커 간 락 유지 시간 (초, 크롤링 중인 워커가 죽으면 이 시간 뒤 다시 시작 가능)
+CATALOG_LOCK_SECONDS = float(os.getenv("KMDB_CATALOG_LOCK_SECONDS", "21600"))
+CATALOG_LOCK_KEY = "crawl-lock:kmdb-catalog"
+CATALOG_JOB_KEY = "crawl:kmdb-catalog"
+catalog_store = None
+# 이 워커에서 실행 중인 카탈로그 크롤러와 스레드
+_catalog_crawler = None
+_catalog_thread = None
+
+
+def _run_catalog_crawl(resume, token):
+    """카탈로그 크롤링 (백그라운드 스레드, 끝나면 워커 간 락 해제)"""
+    global _catalog_crawler
+    started_at = time.time()
+    set_json(shared_state, CATALOG_JOB_KEY, {"state": "running", "pid": os.getpid(), "started_at": started_at})
+    result = "failed"
+    try:
+        _catalog_crawler = importlib.import_module("movie.catalog").CatalogCrawler(catalog_store)
+        result = _catalog_crawler.run(resume)["status"]
+    except Exception as e:
+        logger.exception("kmdb catalog crawl failed")
+        result = f"failed: {type(e).__name__}: {e}"
+    finally:
+        _catalog_crawler = None
+        set_json(shared_state, CATALOG_JOB_KEY, {
+            "state": "idle",
+            "pid": os.getpid(),
+            "started_at": started_at,
+            "finished_at": time.time(),
+            "result": result,
+        })
+        shared_state.delete(CATALOG_LOCK_KEY, token)
+
+
+# 시작 시 순서대로 실행하는 warm-up 작업 (세 번째 값이 False면 실패해도 준비 완료로 봄)
+WARM_UP_TASKS = [
+    ("user_agents", lambda: importlib.import_module("utils.user_agent")),
+    ("import_kmdb", lambda: importlib.import_module("movie.movie")),
+    ("import_netflix", lambda: importlib.import_module("netflix.netflix")),
+    ("import_catalog", lambda: importlib.import_module("movie.catalog")),
+    # ChromeDriver를 찾지 못해도 크롤러는 요청마다 Selenium Manager로 다시 찾거나 requests로 크롤링
+    ("chromedriver", lambda: importlib.import_module("utils.chrome").resolve_driver(), False),
+]
+if CRAWLER_FIXTURES_DIR:
+    # 저장해 둔 결과만 제공하므로 Selenium 크롤러는 불러오지 않음
+    WARM_UP_TASKS = [task for task in WARM_UP_TASKS if task[0] in ("user_agents", "import_catalog")]
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    시작 시 카탈로그 저장소 열고 크롤링 엔진 warm-up (백그라운드로 실행하고, 끝나면 /ready가 200)
+
+    종료(워커 교체 포함) 시 카탈로그 크롤링은 진행 중인 페이지까지만 받고 멈추며, 다음 실행이 이어 간다.
+    """
+    global catalog_store, poster_cache
+    catalog_store = CatalogStore(CRAWLER_DB_PATH)
+    poster_cache = PosterCache()
+    warm_up = startup.run_warm_up(WARM_UP_TASKS)
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        crawler, thread = _catalog_crawler, _catalog_thread
+        if crawler is not None:
+            crawler.stop()
+        if thread is not None:
+            thread.join(timeout=30)
+        catalog_store.close()
+
+
+app = FastAPI(title="Crawler Service API", lifespan=lifespan)
+
+# 조건부 GET(ETag/304)과 gzip/brotli 압축 (계측 미들웨어 안쪽에서 동작)
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# 라우트별 지연 시간/처리 중 요청 수 메트릭, 크롤링 구간별 Server-Timing 헤더, /metrics 엔드포인트
+instrument(app, "crawler")
+
+# 준비 상태 엔드포인트 (/ready, warm-up이 끝나야 200)
+startup.install(app)
+
+def _query_response(request, snapshot, stale, query):
+    """스냅샷 응답 (조회 조건이 있으면 조건에 맞는 결과, 잘못된 조건은 400/409)"""
+    if query.is_full():
+        return snapshot_response(request, snapshot, stale)
+    try:
+        view = snapshot.view(query)
+    except QueryError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return snapshot_response(request, view, stale)
 
-try:
-    from netflix.netflix import crawl_netflix_movies  # type: ignore
-except ImportError as e:
-    print(f"Warning: netflix.netflix import failed: {e}")
-    crawl_netflix_movies = None
 
 # 서브 라우터 생성
 crawler_router = APIRouter(prefix="/crawler", tags=["crawler"])
@@ -29,41 +195,69 @@ def crawl():
     return {"message": "크롤링 완료", "staus": "running"}
 
 @crawler_router.get("/movie")
-def movie():
+def movie(
+    request: Request,
+    refresh: bool = False,
+    fields: str | None = None,
+    q: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+):
     """
     KMDB 뉴욕타임즈 21세기 영화 100선 크롤링 API
     
-    - **반환**: 영화 데이터 (순위, 제목, 감독, 제작년도, 링크)
+    - **refresh**: true면 스냅샷을 무시하고 다시 크롤링
+    - **fields**: 쉼표로 구분한 필드 이름 (예: title,image, 없으면 전체 필드)
+    - **q**: 제목 검색어 (공백/대소문자 무시, 부분 일치)
+    - **limit**: 최대 결과 수 (최대 500, 없으면 전체)
+    - **offset**: 건너뛸 결과 수
+    - **cursor**: 이전 응답의 next_cursor (다음 페이지, 그 사이 크롤링 결과가 바뀌었으면 409)
+    - **반환**: 영화 데이터 (순위, 제목, 감독, 제작년도, 링크), If-None-Match가 일치하면 304.
+      조회 조건이 있으면 total(검색 결과 수), offset, next_cursor(다음 페이지가 없으면 null)를 함께 반환
     """
-    movie_data = crawl_kmdb_movie_list()
-    return {
-        "status": "success",
-        "count": len(movie_data),
-        "data": movie_data
-    }
+    try:
+        snapshot, stale = movie_snapshots.get(refresh)
+    except ImportError as e:
+        return {
+            "status": "error",
+            "message": f"KMDB crawler module not available: {e}",
+            "count": 0,
+            "data": []
+        }
+    return _query_response(request, snapshot, stale, SnapshotQuery(fields, q, limit, offset, cursor))
 
 @crawler_router.get("/netflix")
-def netflix():
+def netflix(
+    request: Request,
+    refresh: bool = False,
+    fields: str | None = None,
+    q: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+):
     """
     JustWatch Netflix 영화 산업 목록 크롤링 API
     
-    - **반환**: Netflix 영화 데이터 (제목, 타입, 링크, 이미지)
+    - **refresh**: true면 스냅샷을 무시하고 다시 크롤링
+    - **fields**: 쉼표로 구분한 필드 이름 (예: title,image, 없으면 전체 필드)
+    - **q**: 제목 검색어 (공백/대소문자 무시, 부분 일치)
+    - **limit**: 최대 결과 수 (최대 500, 없으면 전체)
+    - **offset**: 건너뛸 결과 수
+    - **cursor**: 이전 응답의 next_cursor (다음 페이지, 그 사이 크롤링 결과가 바뀌었으면 409)
+    - **반환**: Netflix 영화 데이터 (제목, 타입, 링크, 이미지), If-None-Match가 일치하면 304.
+      조회 조건이 있으면 total(검색 결과 수), offset, next_cursor(다음 페이지가 없으면 null)를 함께 반환
     """
-    if crawl_netflix_movies is None:
+    try:
+        snapshot, stale = netflix_snapshots.get(refresh)
+    except ImportError as e:
         return {
             "status": "error",
-            "message": "Netflix crawler module not available",
+            "message": f"Netflix crawler module not available: {e}",
             "count": 0,
             "data": []
         }
-    
-    try:
-        movie_data = crawl_netflix_movies()
-        return {
-            "status": "success",
-            "count": len(movie_data),
-            "data": movie_data
-        }
     except Exception as e:
         return {
             "status": "error",
@@ -71,6 +265,135 @@ def netflix():
             "count": 0,
             "data": []
         }
+    return _query_response(request, snapshot, stale, SnapshotQuery(fields, q, limit, offset, cursor))
+
+@crawler_router.get("/snapshots")
+def snapshots():
+    """
+    크롤링 스냅샷 상태 API
+    
+    - **반환**: 크롤러별 스냅샷 ETag, 건수, 나이, 인코딩별 크기, 크롤링 작업 상태(실행 중 여부, 워커 pid, 결과)
+    """
+    return {
+        "snapshots": [movie_snapshots.stats(), netflix_snapshots.stats()]
+    }
+
+@crawler_router.post("/kmdb/catalog/crawl", status_code=202)
+def start_catalog_crawl(resume: bool = True):
+    """
+    KMDB 카탈로그 크롤링 시작 API (백그라운드 실행)
+
+    큐레이션 리스트를 모두 찾아 리스트 페이지와 영화 상세 페이지를 받아 저장합니다.
+    영화는 여러 리스트에 실려도 한 번만 저장되고, 최근에 받은 상세 페이지는 다시 받지 않습니다.
+
+    - **resume**: true면 중단된 이전 크롤링을 이어 감 (처리한 리스트/상세 페이지 건너뜀)
+    - **반환**: 시작 여부 (이미 크롤링 중이면 409)
+    """
+    global _catalog_thread
+    token = uuid.uuid4().hex.encode()
+    if not shared_state.add(CATALOG_LOCK_KEY, token, CATALOG_LOCK_SECONDS):
+        raise HTTPException(status_code=409, detail="KMDB catalog crawl is already running")
+    _catalog_thread = threading.Thread(
+        target=_run_catalog_crawl, args=(resume, token), name="kmdb-catalog", daemon=True)
+    _catalog_thread.start()
+    return {"status": "started", "resume": resume}
+
+@crawler_router.get("/kmdb/catalog/status")
+def catalog_status():
+    """
+    KMDB 카탈로그 크롤링 상태 API
+
+    - **반환**: 리스트/영화/상세 페이지 수, 마지막 실행 기록(진행 통계), 크롤링 작업 상태
+    """
+    return {
+        "counts": catalog_store.counts(),
+        "last_run": catalog_store.last_run(),
+        "job": get_json(shared_state, CATALOG_JOB_KEY),
+    }
+
+@crawler_router.get("/kmdb/catalog/lists")
+def catalog_lists():
+    """
+    KMDB 큐레이션 리스트 API
+
+    - **반환**: 리스트 id, 제목, 영화 수, 마지막 크롤링 시각, 오류
+    """
+    return {"lists": catalog_store.lists()}
+
+@crawler_router.get("/kmdb/catalog")
+def catalog_movies(
+    list_id: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """
+    KMDB 카탈로그 영화 API
+
+    - **list_id**: 리스트 id (예: 533/1401, 지정하면 그 리스트의 영화만 순위순)
+    - **limit**: 최대 결과 수 (기본값: 50, 최대 500)
+    - **offset**: 건너뛸 영화 수
+    - **반환**: 영화 목록 (기본 정보, 실린 리스트와 순위, 상세 정보), 전체 수
+    """
+    movies, total = catalog_store.list_movies(list_id, limit, offset)
+    for movie in movies:
+        detail = movie.get("detail")
+        if detail and detail.get("poster"):
+            detail["poster"] = proxy_url(detail["poster"])
+    return {"status": "success", "total": total, "count": len(movies), "data": movies}
+
+@crawler_router.get("/images/poster")
+def poster_image(
+    request: Request,
+    src: str,
+    w: int = Query(DEFAULT_WIDTH, ge=1, le=2000),
+    format: str | None = Query(None, pattern="^(webp|jpeg)$"),
+):
+    """
+    포스터 이미지 프록시 API
+
+    원본은 한 번만 받아 디스크에 캐시하고, 너비/형식별 썸네일을 만들어 저장해 둡니다.
+    같은 URL/너비/형식이면 내용이 바뀌지 않으므로 1년 캐시(immutable)와 ETag를 보냅니다.
+
+    - **src**: 원본 이미지 URL (허용한 호스트만, 크롤링 결과의 image_original)
+    - **w**: 너비 (160/240/320/480/640 중 요청보다 크거나 같은 가장 작은 값으로 맞춤)
+    - **format**: webp | jpeg (없으면 Accept 헤더에 image/webp가 있을 때 webp)
+    - **반환**: 썸네일 이미지, If-None-Match가 일치하면 304 (허용하지 않는 호스트 400, 원본을 받지 못하면 502)
+    """
+    width = snap_width(w)
+    fmt = negotiate_format(request.headers.get("accept"), format)
+    headers = {"Cache-Control": IMAGE_CACHE_CONTROL}
+    if format is None:
+        headers["Vary"] = "Accept"
+    # ETag는 URL/너비/형식으로 정해지므로 캐시 파일을 읽기 전에 304 판단
+    response = not_modified(request, PosterCache.etag(src, width, fmt), headers)
+    if response is not None:
+        return response
+    try:
+        thumbnail = poster_cache.thumbnail(src, width, fmt)
+    except ImageError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    headers["ETag"] = thumbnail.etag
+    return Response(content=thumbnail.body, media_type=thumbnail.media_type, headers=headers)
+
+@crawler_router.get("/images/stats")
+def poster_image_stats():
+    """
+    포스터 이미지 캐시 상태 API
+
+    - **반환**: 캐시 디렉터리, 최대/현재 크기, 파일 수, 원본 수
+    """
+    return poster_cache.stats()
+
+# Health check 엔드포인트
+@app.get("/health")
+async def health_check():
+    """
+    Health check 엔드포인트
+
+    프로세스가 살아 있는지만 확인합니다 (liveness).
+    게이트웨이는 warm-up까지 끝났는지 /ready로 확인해 레플리카를 선택합니다.
+    """
+    return {"status": "healthy", "service": "crawler"}
 
 # 서브 라우터를 앱에 포함
 app.include_router(crawler_router)
@@ -0,0 +1,311 @@
+"""
+KMDB 카탈로그 크롤링
+
+KMDB 큐레이션 리스트 전체와 리스트에 실린 영화의 상세 페이지를 모아 카탈로그 저장소(store.catalog)에 넣는다.
+
+1. 리스트 발견: 리스트 목록 페이지(KMDB_LIST_INDEX_URL)를 페이지 단위로 읽어 /db/list/detail/<그룹>/<리스트> 링크 수집
+   (새 리스트가 나오지 않는 페이지에서 멈춤, KMDB_SEED_LISTS는 항상 포함)
+2. 리스트 페이지: 리스트마다 영화 행을 읽어 저장. 영화는 상세 페이지 id로 합쳐지므로 여러 리스트에 실린 영화도 한 행
+3. 상세 페이지: 상세 정보가 없거나 오래된(KMDB_DETAIL_MAX_AGE) 영화만 받아 KMDB_CHECKPOINT_EVERY건마다 저장
+
+리스트/상세 페이지는 스레드 KMDB_CONCURRENCY개가 동시에 받고(요청 사이 KMDB_REQUEST_DELAY초 대기),
+실패한 요청은 KMDB_RETRIES번까지 다시 시도한다.
+중간에 멈춘 실행은 다음 실행이 이어 간다 (처리한 리스트와 받은 상세 페이지는 저장소에 남아 있음).
+
+페이지는 fetcher로 받으므로 FixtureFetcher를 쓰면 저장해 둔 페이지로 네트워크 없이 실행할 수 있다
+(서비스에서는 KMDB_FIXTURES_DIR을 지정):
+    python -m movie.catalog --fixtures ../fixtures/kmdb --db /tmp/kmdb.db
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+import requests
+from bs4 import BeautifulSoup
+from movie.parser import BASE_URL, extract_list_ids, extract_list_movies, extract_list_title, list_url, parse_detail
+from utils.user_agent import get_headers
+from common.instrumentation import phase
+from common.log import Throttled, log_context, configure_logging
+
+logger = logging.getLogger(__name__)
+# 페이지마다 발생할 수 있는 요청 실패는 5초에 한 번만 기록
+_fetch_errors = Throttled(logger, interval=5.0)
+# 상세 페이지 진행 상황은 5초에 한 번만 기록
+_progress = Throttled(logger, interval=5.0)
+
+LIST_INDEX_URL = os.getenv("KMDB_LIST_INDEX_URL", f"{BASE_URL}/db/list?page={{page}}")
+LIST_INDEX_MAX_PAGES = int(os.getenv("KMDB_LIST_INDEX_MAX_PAGES", "50"))
+# 리스트 목록 페이지에 없어도 항상 크롤링할 리스트 (쉼표로 구분, 기존 /crawler/movie의 21세기 영화 100선 포함)
+SEED_LISTS = tuple(s.strip() for s in os.getenv("KMDB_SEED_LISTS", "533/1401").split(",") if s.strip())
+CONCURRENCY = int(os.getenv("KMDB_CONCURRENCY", "4"))
+REQUEST_DELAY = float(os.getenv("KMDB_REQUEST_DELAY", "0.2"))
+RETRIES = int(os.getenv("KMDB_RETRIES", "2"))
+DETAIL_MAX_AGE = float(os.getenv("KMDB_DETAIL_MAX_AGE", str(7 * 86400)))
+CHECKPOINT_EVERY = int(os.getenv("KMDB_CHECKPOINT_EVERY", "50"))
+# 지정하면 KMDB 대신 이 디렉터리의 저장해 둔 페이지를 읽음 (오프라인 검증용)
+FIXTURES_DIR = os.getenv("KMDB_FIXTURES_DIR")
+
+
+class FetchError(Exception):
+    """페이지를 받지 못함 (재시도 후에도 실패)"""
+
+
+class HttpFetcher:
+    """
+    requests 기반 페이지 요청 (스레드마다 Session 하나, 연결 재사용)
+
+    Args:
+        timeout: 요청 타임아웃 (초)
+        delay: 같은 스레드의 요청 사이 대기 시간 (초, 사이트 부하 제한)
+    """
+
+    def __init__(self, timeout=10.0, delay=REQUEST_DELAY):
+        self.timeout = timeout
+        self.delay = delay
+        self._local = threading.local()
+
+    def fetch(self, url):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        last = getattr(self._local, "last", 0.0)
+        wait = self.delay - (time.monotonic() - last)
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            response = session.get(url, headers=get_headers(referer=f"{BASE_URL}/"), timeout=self.timeout)
+        finally:
+            self._local.last = time.monotonic()
+        if response.status_code == 404:
+            raise FileNotFoundError(url)
+        response.raise_for_status()
+        return response.text
+
+
+def fixture_name(url):
+    """URL → fixture 파일 이름 (경로와 쿼리의 영문/숫자만 '_'로 이어 붙임, 예: db_list_detail_533_1401.html)"""
+    parts = urlsplit(url)
+    key = "_".join(re.findall(r"[A-Za-z0-9]+", f"{parts.path} {parts.query}"))
+    return f"{key or 'index'}.html"
+
+
+class FixtureFetcher:
+    """
+    저장해 둔 페이지로 응답하는 fetcher (오프라인 검증용)
+
+    Args:
+        directory: fixture 디렉터리 (파일 이름은 fixture_name() 규칙)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, url):
+        path = os.path.join(self.directory, fixture_name(url))
+        if not os.path.exists(path):
+            raise FileNotFoundError(url)
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+
+class CatalogCrawler:
+    """
+    KMDB 카탈로그 크롤러
+
+    Args:
+        store: CatalogStore
+        fetcher: fetch(url) -> HTML 문자열 (없는 페이지는 FileNotFoundError, None이면 HTTP 또는 KMDB_FIXTURES_DIR)
+        concurrency: 동시에 받는 페이지 수
+        retries: 실패한 요청의 재시도 횟수 (없는 페이지는 재시도하지 않음)
+        detail_max_age: 이 시간(초)보다 오래된 상세 정보는 다시 받음
+        checkpoint_every: 상세 정보를 이만큼 모을 때마다 저장
+    """
+
+    def __init__(self, store, fetcher=None, concurrency=CONCURRENCY, retries=RETRIES,
+                 detail_max_age=DETAIL_MAX_AGE, checkpoint_every=CHECKPOINT_EVERY):
+        self.store = store
+        self.fetcher = fetcher or (FixtureFetcher(FIXTURES_DIR) if FIXTURES_DIR else HttpFetcher())
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.detail_max_age = detail_max_age
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """진행 중인 요청이 끝나면 멈춤 (다음 실행이 이어 감)"""
+        self._stop.set()
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    def _fetch(self, url):
+        for attempt in range(self.retries + 1):
+            try:
+                return BeautifulSoup(self.fetcher.fetch(url), "lxml")
+            except FileNotFoundError:
+                raise FetchError(f"not found: {url}") from None
+            except Exception as e:
+                self._count("retries" if attempt < self.retries else "fetch_errors")
+                if attempt == self.retries:
+                    raise FetchError(f"{type(e).__name__}: {e}") from e
+                _fetch_errors.warning("page fetch failed, retrying", extra={"url": url, "attempt": attempt + 1})
+                time.sleep(min(5.0, 0.5 * 2 ** attempt))
+
+    def discover(self):
+        """
+        리스트 목록 페이지를 넘기며 리스트 id 수집
+
+        Returns:
+            dict: 리스트 id → 제목
+        """
+        lists = {list_id: "" for list_id in SEED_LISTS}
+        for page in range(1, LIST_INDEX_MAX_PAGES + 1):
+            if self._stop.is_set():
+                break
+            try:
+                found = extract_list_ids(self._fetch(LIST_INDEX_URL.format(page=page)))
+            except FetchError as e:
+                logger.warning("list index page failed", extra={"page": page, "error": str(e)})
+                break
+            new = [list_id for list_id in found if list_id not in lists]
+            for list_id, title in found.items():
+                if not lists.get(list_id):
+                    lists[list_id] = title
+            # 목록 끝을 넘어가면 사이트가 마지막 페이지를 반복해서 보여 주므로 새 리스트가 없으면 멈춤
+            if not new:
+                break
+        self.stats["lists_discovered"] = len(lists)
+        logger.info("kmdb lists discovered", extra={"lists": len(lists)})
+        return lists
+
+    def _crawl_list(self, run_id, list_id):
+        if self._stop.is_set():
+            return
+        try:
+            soup = self._fetch(list_url(list_id))
+        except FetchError as e:
+            self._count("lists_failed")
+            self.store.fail_list(run_id, list_id, str(e))
+            return
+        movies = extract_list_movies(soup)
+        inserted = self.store.save_list(run_id, list_id, extract_list_title(soup), movies)
+        self._count("lists_crawled")
+        self._count("list_rows", len(movies))
+        self._count("movies_new", inserted)
+
+    def _crawl_detail(self, movie_id, url):
+        if self._stop.is_set():
+            return None
+        try:
+            return movie_id, parse_detail(self._fetch(url)), None
+        except FetchError as e:
+            return movie_id, None, str(e)
+
+    def _run_pool(self, tasks):
+        """(함수, 인자...) 작업을 스레드 concurrency개로 실행하며 결과를 끝난 순서대로 돌려줌"""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="kmdb-crawl") as executor:
+            futures = [executor.submit(func, *args) for func, *args in tasks]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def run(self, resume=True):
+        """
+        카탈로그 크롤링 실행
+
+        Args:
+            resume: 끝나지 않은 이전 실행이 있으면 이어 감 (False면 리스트를 모두 다시 읽음)
+
+        Returns:
+            dict: 실행 통계 (run_id, 리스트/영화/상세 페이지 수, 실패 수, 소요 시간)
+        """
+        started = time.monotonic()
+        run_id, resumed = self.store.open_run(resume)
+        self.stats = {"run_id": run_id, "resumed": resumed}
+        status = "failed"
+        with log_context(crawl_id=run_id, crawler="kmdb-catalog"):
+            logger.info("kmdb catalog crawl started", extra={"resumed": resumed})
+            try:
+                with phase("kmdb_discover"):
+                    self.store.add_lists(self.discover())
+
+                pending = self.store.pending_lists(run_id)
+                self.stats["lists_pending"] = len(pending)
+                with phase("kmdb_lists"):
+                    for _ in self._run_pool([(self._crawl_list, run_id, list_id) for list_id in pending]):
+                        pass
+
+                details = self.store.pending_details(self.detail_max_age)
+                self.stats["details_pending"] = len(details)
+                batch = []
+                with phase("kmdb_details"):
+                    for result in self._run_pool([(self._crawl_detail, *item) for item in details]):
+                        if result is None:
+                            continue
+                        batch.append(result)
+                        self._count("details_failed" if result[1] is None else "details_fetched")
+                        if len(batch) >= self.checkpoint_every:
+                            self.store.save_details(batch)
+                            self.store.update_run_stats(run_id, self.stats)
+                            batch = []
+                            _progress.info("kmdb details checkpoint", extra={
+                                "done": self.stats.get("details_fetched", 0) + self.stats.get("details_failed", 0),
+                                "pending": len(details),
+                            })
+                    if batch:
+                        self.store.save_details(batch)
+                status = "stopped" if self._stop.is_set() else "finished"
+            finally:
+                self.stats["seconds"] = round(time.monotonic() - started, 3)
+                # 멈췄거나 예외로 끝난 실행은 running으로 남겨 다음 실행이 이어 가게 함
+                if status == "finished":
+                    self.store.finish_run(run_id, status, self.stats)
+                else:
+                    self.store.update_run_stats(run_id, self.stats)
+                logger.info("kmdb catalog crawl ended", extra={"status": status, **self.stats})
+        self.stats["status"] = status
+        return self.stats
+
+
+def crawl_kmdb_catalog(store, fetcher=None, resume=True):
+    """
+    KMDB 카탈로그 크롤링 (환경 변수 설정 사용)
+
+    Args:
+        store: CatalogStore
+        fetcher: 페이지 fetcher (None이면 HTTP 또는 KMDB_FIXTURES_DIR)
+        resume: 중단된 이전 실행을 이어 감
+
+    Returns:
+        dict: 실행 통계
+    """
+    return CatalogCrawler(store, fetcher).run(resume)
+
+
+if __name__ == "__main__":
+    from store.catalog import CatalogStore
+
+    parser = argparse.ArgumentParser(description="KMDB 카탈로그 크롤링")
+    parser.add_argument("--db", default=os.getenv("CRAWLER_DB_PATH", "data/crawler.db"), help="카탈로그 DB 경로")
+    parser.add_argument("--fixtures", help="저장해 둔 페이지 디렉터리 (지정하면 네트워크 없이 실행)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--no-resume", action="store_true", help="중단된 실행을 이어 가지 않고 새로 시작")
+    args = parser.parse_args()
+
+    configure_logging("crawler")
+    catalog_store = CatalogStore(args.db)
+    crawler = CatalogCrawler(
+        catalog_store, FixtureFetcher(args.fixtures) if args.fixtures else None, concurrency=args.concurrency)
+    print(json.dumps(crawler.run(resume=not args.no_resume), ensure_ascii=False, indent=2))
+    print(json.dumps(catalog_store.counts(), ensure_ascii=False, indent=2))
@@ -0,0 +1,226 @@
+"""
+KMDB 페이지 파서
+
+- extract_list_movies(): 큐레이션 리스트 페이지(/db/list/detail/<그룹>/<리스트>)의 영화 행
+- extract_list_ids(): 리스트 목록 페이지에서 큐레이션 리스트 id 발견
+- parse_detail(): 영화 상세 페이지(/db/kor/detail/movie/<구분>/<번호>)의 정보
+
+requests/Selenium 어느 쪽으로 받은 HTML이든 BeautifulSoup 객체만 받으므로 저장해 둔 페이지(fixture)로도 검증할 수 있다.
+"""
+import hashlib
+import logging
+import re
+from urllib.parse import urljoin
+from common.log import Throttled
+
+logger = logging.getLogger(__name__)
+# 행마다 발생할 수 있는 파싱 오류는 5초에 한 번만 기록
+_row_errors = Throttled(logger, interval=5.0)
+
+BASE_URL = "https://www.kmdb.or.kr"
+
+_LIST_PATH = re.compile(r"/db/list/detail/(\d+)/(\d+)")
+_DETAIL_PATH = re.compile(r"/db/kor/detail/movie/([A-Za-z])/(\d+)")
+
+# 상세 페이지 항목 이름 → 필드 이름
+_DETAIL_LABELS = {
+    "감독": "director",
+    "제작년도": "year",
+    "제작연도": "year",
+    "국가": "country",
+    "제작국가": "country",
+    "장르": "genre",
+    "상영시간": "runtime",
+    "관람기준": "rating",
+    "심의등급": "rating",
+    "영문제목": "title_en",
+    "원제": "title_original",
+    "출연": "cast",
+    "제작사": "company",
+    "개봉일": "release_date",
+}
+
+
+def movie_id_from_url(url):
+    """
+    상세 페이지 URL의 영화 id (예: .../movie/F/27225 → F27225)
+
+    Returns:
+        str | None: URL이 상세 페이지가 아니면 None
+    """
+    match = _DETAIL_PATH.search(url or "")
+    return f"{match.group(1).upper()}{match.group(2)}" if match else None
+
+
+def fallback_movie_id(title, year):
+    """상세 링크가 없는 행의 id (제목+제작년도 해시, 리스트가 달라도 같은 영화면 같은 id)"""
+    key = "{}|{}".format(re.sub(r"\s+", "", title).lower(), year)
+    return "T" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def extract_list_movies(soup):
+    """
+    BeautifulSoup 객체에서 영화 데이터 추출
+
+    Args:
+        soup: BeautifulSoup 객체
+
+    Returns:
+        list: 영화 데이터 리스트 (순위, 제목, 감독, 제작년도, 영상도서관 링크, 상세 페이지 id/URL)
+    """
+    movie_data = []
+
+    # tbody > tr 구조로 영화 목록 찾기
+    rows = soup.select('tbody tr')
+
+    logger.debug("영화 행 발견", extra={"rows": len(rows)})
+
+    for idx, row in enumerate(rows, 1):
+        try:
+            # 순위 추출
+            rank_elem = row.select_one('td.num')
+            rank = rank_elem.get_text(strip=True) if rank_elem else str(idx)
+
+            # 제목 추출
+            title_elem = row.select_one('td.title a.ti')
+            title = title_elem.get_text(strip=True) if title_elem else "N/A"
+
+            # 상세 페이지 링크 (제목 링크, 영화 id가 없는 링크는 버림)
+            href = title_elem.get('href', '') if title_elem else ''
+            movie_id = movie_id_from_url(href)
+            detail_url = urljoin(BASE_URL, href) if movie_id else ""
+
+            # 감독 추출 (첫 번째 fcGray1 클래스 td)
+            director_elem = row.select('td.fcGray1')
+            director = director_elem[0].get_text(strip=True) if len(director_elem) > 0 else "N/A"
+
+            # 제작년도 추출 (두 번째 fcGray1 클래스 td)
+            year = director_elem[1].get_text(strip=True) if len(director_elem) > 1 else "N/A"
+
+            # 영상도서관 링크 추출 (4번째 td에서)
+            links = []
+            all_tds = row.select('td')
+            if len(all_tds) >= 4:
+                # 4번째 td (인덱스 3)에서 링크 추출
+                link_td = all_tds[3]
+                link_elems = link_td.select('a')
+                for link_elem in link_elems:
+                    href = link_elem.get('href', '')
+                    if href and 'koreafilm.or.kr/library' in href:
+                        link_text = link_elem.select_one('span')
+                        link_type = link_text.get_text(strip=True) if link_text else ""
+                        links.append({
+                            "type": link_type,
+                            "url": href
+                        })
+
+            # 데이터 저장
+            movie_data.append({
+                "rank": rank,
+                "title": title,
+                "director": director,
+                "year": year,
+                "links": links,
+                "movie_id": movie_id or fallback_movie_id(title, year),
+                "detail_url": detail_url,
+            })
+
+        except Exception as e:
+            _row_errors.warning("영화 행 파싱 실패", extra={"row": idx, "error": str(e)})
+            continue
+
+    return movie_data
+
+
+def extract_list_title(soup):
+    """큐레이션 리스트 페이지의 리스트 제목"""
+    for selector in ('meta[property="og:title"]', 'h3', 'h2', 'title'):
+        elem = soup.select_one(selector)
+        if elem is None:
+            continue
+        text = (elem.get('content') if elem.name == 'meta' else elem.get_text(strip=True)) or ""
+        if text.strip():
+            return text.strip()
+    return ""
+
+
+def extract_list_ids(soup):
+    """
+    리스트 목록 페이지에서 큐레이션 리스트 찾기
+
+    Returns:
+        dict: 리스트 id("그룹/리스트") → 링크 텍스트 (페이지에 나온 순서)
+    """
+    lists = {}
+    for link in soup.select('a[href]'):
+        match = _LIST_PATH.search(link['href'])
+        if match is None:
+            continue
+        list_id = f"{match.group(1)}/{match.group(2)}"
+        if list_id not in lists or not lists[list_id]:
+            lists[list_id] = link.get_text(" ", strip=True)
+    return lists
+
+
+def list_url(list_id):
+    """리스트 id("그룹/리스트")의 페이지 URL"""
+    return f"{BASE_URL}/db/list/detail/{list_id}"
+
+
+def _text(elem):
+    return elem.get_text(" ", strip=True) if elem is not None else ""
+
+
+def parse_detail(soup):
+    """
+    영화 상세 페이지 파싱
+
+    og 메타 태그(제목, 포스터, 줄거리)와 정보 표(dt/dd, th/td 쌍)를 읽는다.
+    알려진 항목은 필드 이름(_DETAIL_LABELS)으로, 나머지는 info에 항목 이름 그대로 남긴다.
+
+    Returns:
+        dict: 상세 정보 (title, poster, synopsis, director, year, genre, ..., info)
+    """
+    detail = {}
+    meta = {
+        "title": 'meta[property="og:title"]',
+        "poster": 'meta[property="og:image"]',
+        "synopsis": 'meta[property="og:description"]',
+    }
+    for field, selector in meta.items():
+        elem = soup.select_one(selector)
+        if elem is not None and elem.get('content', '').strip():
+            detail[field] = elem['content'].strip()
+    if "title" not in detail:
+        title = _text(soup.select_one('h3')) or _text(soup.select_one('title'))
+        if title:
+            detail["title"] = title
+    if "synopsis" not in detail:
+        synopsis = _text(soup.select_one('.synopsis, #synopsis'))
+        if synopsis:
+            detail["synopsis"] = synopsis
+    if detail.get("poster"):
+        detail["poster"] = urljoin(BASE_URL, detail["poster"])
+
+    info = {}
+    for dt in soup.select('dl dt'):
+        dd = dt.find_next_sibling('dd')
+        if dd is not None:
+            info.setdefault(_text(dt).rstrip(':'), _text(dd))
+    for th in soup.select('tr th'):
+        td = th.find_next_sibling('td')
+        if td is not None:
+            info.setdefault(_text(th).rstrip(':'), _text(td))
+
+    rest = {}
+    for label, value in info.items():
+        if not label or not value:
+            continue
+        field = _DETAIL_LABELS.get(label.replace(" ", ""))
+        if field is not None:
+            detail.setdefault(field, value)
+        else:
+            rest[label] = value
+    if rest:
+        detail["info"] = rest
+    return detail
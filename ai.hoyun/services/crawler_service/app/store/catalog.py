@@ -0,0 +1,331 @@
+"""
+KMDB 카탈로그 저장소 (SQLite)
+
+큐레이션 리스트, 영화(리스트가 달라도 영화 id 하나에 한 행), 리스트-영화 관계, 크롤링 실행 기록을 둔다.
+저장소 자체가 크롤링 체크포인트다:
+- 리스트 페이지는 처리할 때마다 실행 id(run_id)를 남기므로, 중단된 실행을 이어 가면 이미 처리한 리스트는 건너뜀
+- 상세 페이지는 받은 시각(detail_fetched_at)을 남기므로, 유효 기간 안에 받은 영화는 다시 받지 않음
+
+크롤링은 스레드 여러 개에서 진행되므로 연결은 스레드마다 하나씩 쓰고, 쓰기는 락 하나로 직렬화한다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS kmdb_lists (
+        list_id TEXT PRIMARY KEY,
+        title TEXT NOT NULL DEFAULT '',
+        movie_count INTEGER NOT NULL DEFAULT 0,
+        discovered_at REAL NOT NULL,
+        crawled_at REAL,
+        run_id TEXT,
+        error TEXT
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS kmdb_movies (
+        movie_id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        director TEXT NOT NULL DEFAULT '',
+        year TEXT NOT NULL DEFAULT '',
+        detail_url TEXT NOT NULL DEFAULT '',
+        links TEXT NOT NULL DEFAULT '[]',
+        detail TEXT,
+        detail_fetched_at REAL,
+        detail_error TEXT,
+        updated_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS kmdb_list_movies (
+        list_id TEXT NOT NULL,
+        movie_id TEXT NOT NULL,
+        rank TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (list_id, movie_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_kmdb_list_movies_movie ON kmdb_list_movies (movie_id)",
+    """
+    CREATE TABLE IF NOT EXISTS kmdb_runs (
+        run_id TEXT PRIMARY KEY,
+        started_at REAL NOT NULL,
+        finished_at REAL,
+        status TEXT NOT NULL,
+        stats TEXT NOT NULL DEFAULT '{}'
+    ) WITHOUT ROWID
+    """,
+)
+
+
+class CatalogStore:
+    """
+    KMDB 카탈로그 저장소
+
+    Args:
+        path: DB 파일 경로
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._write(lambda conn: [conn.execute(statement) for statement in SCHEMA])
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, func, *args):
+        """func(conn, *args)를 하나의 트랜잭션으로 실행"""
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return result
+
+    # 실행 기록
+
+    def open_run(self, resume=True):
+        """
+        크롤링 실행 시작
+
+        Args:
+            resume: 끝나지 않은 실행이 있으면 그 실행을 이어 감
+
+        Returns:
+            tuple: (run_id, 이어 가는 실행인지 여부)
+        """
+        def open_(conn):
+            if resume:
+                row = conn.execute(
+                    "SELECT run_id FROM kmdb_runs WHERE status = 'running' ORDER BY started_at DESC LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    return row["run_id"], True
+            # 이어 가지 않는 실행이 남아 있으면 중단된 것으로 기록
+            conn.execute("UPDATE kmdb_runs SET status = 'abandoned' WHERE status = 'running'")
+            run_id = uuid.uuid4().hex[:12]
+            conn.execute(
+                "INSERT INTO kmdb_runs (run_id, started_at, status) VALUES (?, ?, 'running')", (run_id, time.time()))
+            return run_id, False
+        return self._write(open_)
+
+    def finish_run(self, run_id, status, stats):
+        self._write(lambda conn: conn.execute(
+            "UPDATE kmdb_runs SET finished_at = ?, status = ?, stats = ? WHERE run_id = ?",
+            (time.time(), status, json.dumps(stats), run_id)
+        ))
+
+    def update_run_stats(self, run_id, stats):
+        self._write(lambda conn: conn.execute(
+            "UPDATE kmdb_runs SET stats = ? WHERE run_id = ?", (json.dumps(stats), run_id)))
+
+    def last_run(self):
+        row = self._conn().execute("SELECT * FROM kmdb_runs ORDER BY started_at DESC LIMIT 1").fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        run["stats"] = json.loads(run["stats"])
+        return run
+
+    # 리스트
+
+    def add_lists(self, lists):
+        """
+        발견한 리스트 등록 (이미 있으면 제목만 갱신)
+
+        Args:
+            lists: 리스트 id → 제목
+        """
+        now = time.time()
+        self._write(lambda conn: conn.executemany(
+            "INSERT INTO kmdb_lists (list_id, title, discovered_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (list_id) DO UPDATE SET title = CASE WHEN excluded.title != '' "
+            "THEN excluded.title ELSE kmdb_lists.title END",
+            [(list_id, title or "", now) for list_id, title in lists.items()]
+        ))
+
+    def pending_lists(self, run_id):
+        """이 실행에서 아직 처리하지 않은 리스트 id"""
+        rows = self._conn().execute(
+            "SELECT list_id FROM kmdb_lists WHERE run_id IS NULL OR run_id != ? ORDER BY list_id", (run_id,))
+        return [row["list_id"] for row in rows]
+
+    def save_list(self, run_id, list_id, title, movies):
+        """
+        리스트 페이지 결과 저장 (리스트의 영화 목록을 새 결과로 교체)
+
+        영화는 영화 id 기준으로 합친다. 다른 리스트에서 이미 저장한 영화는 목록 정보만 갱신하고
+        받아 둔 상세 정보는 유지한다.
+
+        Returns:
+            int: 처음 저장된 영화 수
+        """
+        now = time.time()
+
+        def save(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO kmdb_movies (movie_id, title, director, year, detail_url, links, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (movie_id) DO NOTHING",
+                [(m["movie_id"], m["title"], m["director"], m["year"], m["detail_url"],
+                  json.dumps(m["links"], ensure_ascii=False), now) for m in movies]
+            )
+            inserted = conn.total_changes - before
+            conn.executemany(
+                "UPDATE kmdb_movies SET links = ?, detail_url = CASE WHEN ? != '' THEN ? ELSE detail_url END, "
+                "updated_at = ? WHERE movie_id = ? AND updated_at < ?",
+                [(json.dumps(m["links"], ensure_ascii=False), m["detail_url"], m["detail_url"], now,
+                  m["movie_id"], now) for m in movies]
+            )
+            conn.execute("DELETE FROM kmdb_list_movies WHERE list_id = ?", (list_id,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO kmdb_list_movies (list_id, movie_id, rank) VALUES (?, ?, ?)",
+                [(list_id, m["movie_id"], str(m["rank"])) for m in movies]
+            )
+            conn.execute(
+                "UPDATE kmdb_lists SET title = CASE WHEN ? != '' THEN ? ELSE title END, movie_count = ?, "
+                "crawled_at = ?, run_id = ?, error = NULL WHERE list_id = ?",
+                (title, title, len(movies), now, run_id, list_id)
+            )
+            return inserted
+        return self._write(save)
+
+    def fail_list(self, run_id, list_id, error):
+        """리스트 페이지 실패 기록 (run_id를 남기므로 이 실행에서는 다시 시도하지 않음)"""
+        self._write(lambda conn: conn.execute(
+            "UPDATE kmdb_lists SET run_id = ?, error = ? WHERE list_id = ?", (run_id, error, list_id)))
+
+    # 상세 페이지
+
+    def pending_details(self, max_age):
+        """
+        상세 페이지를 받아야 하는 영화
+
+        Args:
+            max_age: 이 시간(초)보다 오래전에 받은 상세 정보는 다시 받음
+
+        Returns:
+            list: (영화 id, 상세 페이지 URL)
+        """
+        rows = self._conn().execute(
+            "SELECT movie_id, detail_url FROM kmdb_movies WHERE detail_url != '' "
+            "AND (detail_fetched_at IS NULL OR detail_fetched_at < ?) ORDER BY movie_id",
+            (time.time() - max_age,)
+        )
+        return [(row["movie_id"], row["detail_url"]) for row in rows]
+
+    def save_details(self, results):
+        """
+        상세 페이지 결과 저장 (체크포인트 단위로 묶어서)
+
+        Args:
+            results: (영화 id, 상세 정보 dict 또는 None, 오류 메시지 또는 None) 목록
+        """
+        now = time.time()
+
+        def save(conn):
+            for movie_id, detail, error in results:
+                if detail is not None:
+                    conn.execute(
+                        "UPDATE kmdb_movies SET detail = ?, detail_fetched_at = ?, detail_error = NULL, "
+                        "updated_at = ? WHERE movie_id = ?",
+                        (json.dumps(detail, ensure_ascii=False), now, now, movie_id)
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE kmdb_movies SET detail_error = ? WHERE movie_id = ?", (error, movie_id))
+        self._write(save)
+
+    # 조회
+
+    def _movie(self, row, lists):
+        movie = {
+            "movie_id": row["movie_id"],
+            "title": row["title"],
+            "director": row["director"],
+            "year": row["year"],
+            "detail_url": row["detail_url"],
+            "links": json.loads(row["links"]),
+            "lists": lists,
+        }
+        if row["detail"] is not None:
+            movie["detail"] = json.loads(row["detail"])
+        return movie
+
+    def list_movies(self, list_id=None, limit=50, offset=0):
+        """
+        카탈로그 영화 조회 (영화 id 순, list_id를 주면 그 리스트의 영화만)
+
+        Returns:
+            tuple: (영화 목록, 전체 수)
+        """
+        conn = self._conn()
+        if list_id is None:
+            total = conn.execute("SELECT COUNT(*) FROM kmdb_movies").fetchone()[0]
+            rows = conn.execute(
+                "SELECT * FROM kmdb_movies ORDER BY movie_id LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+        else:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM kmdb_list_movies WHERE list_id = ?", (list_id,)).fetchone()[0]
+            rows = conn.execute(
+                "SELECT m.* FROM kmdb_list_movies lm JOIN kmdb_movies m ON m.movie_id = lm.movie_id "
+                "WHERE lm.list_id = ? ORDER BY CAST(lm.rank AS INTEGER), m.movie_id LIMIT ? OFFSET ?",
+                (list_id, limit, offset)
+            ).fetchall()
+        memberships = {}
+        ids = [row["movie_id"] for row in rows]
+        if ids:
+            placeholders = ",".join("?" * len(ids))
+            for row in conn.execute(
+                f"SELECT movie_id, list_id, rank FROM kmdb_list_movies WHERE movie_id IN ({placeholders}) "
+                "ORDER BY list_id", ids
+            ):
+                memberships.setdefault(row["movie_id"], []).append({"list_id": row["list_id"], "rank": row["rank"]})
+        return [self._movie(row, memberships.get(row["movie_id"], [])) for row in rows], total
+
+    def lists(self):
+        rows = self._conn().execute(
+            "SELECT list_id, title, movie_count, crawled_at, error FROM kmdb_lists ORDER BY list_id")
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT COUNT(*) AS movies, COUNT(detail_fetched_at) AS details, "
+            "COUNT(detail_error) AS detail_errors FROM kmdb_movies"
+        ).fetchone()
+        lists = conn.execute("SELECT COUNT(*) AS lists, COUNT(crawled_at) AS crawled FROM kmdb_lists").fetchone()
+        return {
+            "lists": lists["lists"],
+            "lists_crawled": lists["crawled"],
+            "movies": row["movies"],
+            "details": row["details"],
+            "detail_errors": row["detail_errors"],
+        }
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,44 @@
+"""
+ChromeDriver 경로 캐시
+
+Service()에 경로를 주지 않으면 Selenium 4는 webdriver.Chrome()을 만들 때마다 Selenium Manager(외부 프로세스)를
+실행해 ChromeDriver를 찾는다 (없으면 다운로드). 경로를 한 번만 찾아 두고 이후 크롤링에서는 바로 사용한다.
+서비스 시작 시 warm-up에서 resolve_driver()를 호출하므로 첫 크롤링 요청도 이 비용을 내지 않는다.
+
+환경 변수:
+- CHROMEDRIVER_PATH: ChromeDriver 경로 (지정하면 Selenium Manager를 실행하지 않음)
+"""
+import logging
+import os
+import threading
+from selenium.webdriver.chrome.options import Options  # type: ignore
+from selenium.webdriver.chrome.service import Service  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_driver_path = os.getenv("CHROMEDRIVER_PATH") or None
+_lock = threading.Lock()
+
+
+def resolve_driver():
+    """
+    ChromeDriver 경로 (처음 한 번만 Selenium Manager로 찾음)
+
+    Returns:
+        str: ChromeDriver 실행 파일 경로
+    """
+    global _driver_path
+    with _lock:
+        if _driver_path is None:
+            from selenium.webdriver.common.selenium_manager import SeleniumManager  # type: ignore
+            _driver_path = SeleniumManager().driver_location(Options())
+    return _driver_path
+
+
+def chrome_service():
+    """캐시한 ChromeDriver 경로의 Service (경로를 찾지 못하면 Selenium 자동 관리로 대체)"""
+    try:
+        return Service(executable_path=resolve_driver())
+    except Exception:
+        logger.warning("chromedriver lookup failed, falling back to selenium manager", exc_info=True)
+        return Service()
@@ -0,0 +1,358 @@
+"""
+포스터 이미지 프록시
+
+크롤링 결과의 이미지 URL(JustWatch/KMDB CDN)을 프론트엔드가 직접 불러오지 않도록
+원본을 한 번만 받아 썸네일(WebP/JPEG)로 줄여 디스크 캐시에 두고 우리 서버에서 제공한다.
+
+- 원본과 썸네일은 디스크 캐시(CRAWLER_IMAGE_CACHE_DIR)에 파일로 저장하고 최근 사용 시각(mtime)으로 LRU 관리.
+  전체 크기가 CRAWLER_IMAGE_CACHE_MAX_BYTES를 넘으면 오래 안 쓴 파일부터 지워 90%까지 줄인다
+  (파일 시스템이 기준이므로 워커가 여러 개여도 같은 캐시를 함께 씀)
+- 같은 이미지를 동시에 요청해도 원본은 한 번만 받음 (프로세스 안에서 키별 락)
+- 같은 URL/너비/형식이면 항상 같은 내용이므로 1년 캐시(immutable) + ETag
+- 허용한 호스트(CRAWLER_IMAGE_HOSTS)의 이미지만 받음 (열린 프록시가 되지 않도록, 리다이렉트 대상도 확인)
+- 너비는 정해진 크기(THUMBNAIL_WIDTHS) 중 요청보다 크거나 같은 가장 작은 값으로 맞춤 (캐시 항목 수 제한)
+
+Pillow가 없으면 줄이지 않고 원본을 그대로 제공한다.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from io import BytesIO
+from urllib.parse import quote, urljoin, urlsplit
+from common.http_cache import make_etag
+from common.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("CRAWLER_IMAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "crawler-images"))
+CACHE_MAX_BYTES = int(os.getenv("CRAWLER_IMAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+ALLOWED_HOSTS = tuple(
+    h.strip().lower() for h in os.getenv(
+        "CRAWLER_IMAGE_HOSTS", "images.justwatch.com,www.justwatch.com,www.kmdb.or.kr,file.koreafilm.or.kr"
+    ).split(",") if h.strip()
+)
+# 크롤링 결과의 image 필드를 바꿀 때 쓰는 프록시 주소 (프론트엔드가 접근하는 게이트웨이 주소)
+PUBLIC_BASE_URL = os.getenv("CRAWLER_IMAGE_BASE_URL", "http://localhost:9000").rstrip("/")
+PROXY_PATH = "/crawler/images/poster"
+THUMBNAIL_WIDTHS = (160, 240, 320, 480, 640)
+DEFAULT_WIDTH = int(os.getenv("CRAWLER_IMAGE_DEFAULT_WIDTH", "240"))
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+# 원본을 받을 때 따라갈 최대 리다이렉트 수 (리다이렉트마다 허용한 호스트인지 다시 확인)
+MAX_REDIRECTS = 3
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+_QUALITY = {"webp": 80, "jpeg": 82}
+_MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+# 썸네일 생성 방식이 바뀌면 올려서 이전 ETag/캐시 파일과 구분
+_VERSION = "1"
+
+IMAGE_REQUESTS = REGISTRY.counter(
+    "crawler_image_requests_total", "Poster proxy requests by cache result", ("result",))
+IMAGE_CACHE_BYTES = REGISTRY.gauge(
+    "crawler_image_cache_bytes", "Bytes stored in the poster disk cache (as seen by this worker)")
+
+
+class ImageError(Exception):
+    """이미지를 제공할 수 없음 (status_code: 응답 상태 코드)"""
+
+    def __init__(self, message, status_code=502):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def allowed_source(url):
+    parts = urlsplit(url or "")
+    return parts.scheme in ("http", "https") and (parts.hostname or "").lower() in ALLOWED_HOSTS
+
+
+def snap_width(width):
+    """요청 너비 → 제공하는 썸네일 너비"""
+    for candidate in THUMBNAIL_WIDTHS:
+        if width <= candidate:
+            return candidate
+    return THUMBNAIL_WIDTHS[-1]
+
+
+def negotiate_format(accept, requested=None):
+    """요청한 형식(webp/jpeg), 없으면 Accept 헤더에 image/webp가 있을 때 webp"""
+    if requested in _MEDIA_TYPES:
+        return requested
+    return "webp" if "image/webp" in (accept or "").lower() else "jpeg"
+
+
+def proxy_url(url, width=DEFAULT_WIDTH):
+    """
+    원본 이미지 URL → 프록시 URL (허용하지 않는 호스트나 빈 값은 그대로)
+
+    Args:
+        url: 원본 이미지 URL
+        width: 썸네일 너비
+    """
+    if not allowed_source(url):
+        return url
+    return f"{PUBLIC_BASE_URL}{PROXY_PATH}?src={quote(url, safe='')}&w={snap_width(width)}"
+
+
+def rewrite_images(items, field="image", original_field="image_original", width=DEFAULT_WIDTH):
+    """
+    크롤링 결과 목록의 이미지 필드를 프록시 URL로 바꿈 (원본은 original_field에 남김)
+
+    Returns:
+        list: 같은 목록 (항목을 제자리에서 수정)
+    """
+    for item in items:
+        url = item.get(field)
+        proxied = proxy_url(url, width)
+        if proxied != url:
+            item[original_field] = url
+            item[field] = proxied
+    return items
+
+
+class Thumbnail:
+    """제공할 썸네일 (본문, 미디어 타입, ETag)"""
+
+    __slots__ = ("body", "media_type", "etag")
+
+    def __init__(self, body, media_type, etag):
+        self.body = body
+        self.media_type = media_type
+        self.etag = etag
+
+
+class PosterCache:
+    """
+    포스터 원본/썸네일 디스크 LRU 캐시
+
+    Args:
+        directory: 캐시 디렉터리
+        max_bytes: 캐시 최대 크기 (바이트)
+        fetch: 원본을 받는 함수 (url → (본문 bytes, Content-Type)), None이면 requests 사용
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, fetch=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fetch = fetch or _http_fetch
+        os.makedirs(directory, exist_ok=True)
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._bytes = sum(size for _, size, _ in self._scan())
+        IMAGE_CACHE_BYTES.set(self._bytes)
+
+    @staticmethod
+    def etag(url, width, fmt):
+        """썸네일 ETag (URL/너비/형식이 같으면 내용이 같으므로 파일을 읽지 않고 계산)"""
+        return make_etag(_VERSION, url, str(width), fmt)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _lock_for(self, key):
+        with self._locks_lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _read(self, name):
+        """캐시 파일 읽기 (읽으면 mtime을 갱신해 최근 사용으로 표시)"""
+        path = self._path(name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _write(self, name, data):
+        # 다른 워커가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(name))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self._bytes += len(data)
+        IMAGE_CACHE_BYTES.set(self._bytes)
+        if self._bytes > self.max_bytes:
+            self._evict()
+
+    def _scan(self):
+        """캐시 파일 목록 (이름, 크기, mtime)"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.name, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """오래 안 쓴 파일부터 지워 최대 크기의 90%까지 줄임 (다른 워커가 쓴 파일도 포함해 디렉터리 기준)"""
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            entries = sorted(self._scan(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            removed = 0
+            for name, size, _ in entries:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(self._path(name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            self._bytes = total
+            IMAGE_CACHE_BYTES.set(total)
+            if removed:
+                logger.info("poster cache evicted", extra={"files": removed, "bytes": total})
+        finally:
+            self._evict_lock.release()
+
+    def _original(self, url):
+        """원본 이미지 (캐시에 없으면 한 번만 받아 저장)"""
+        key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+        name = f"{key}.orig"
+        data = self._read(name)
+        if data is not None:
+            return data
+        with self._lock_for(name):
+            data = self._read(name)
+            if data is None:
+                data = self.fetch(url)
+                self._write(name, data)
+        return data
+
+    def thumbnail(self, url, width, fmt):
+        """
+        썸네일 (캐시에 없으면 원본에서 만들어 저장)
+
+        Args:
+            url: 원본 이미지 URL (허용한 호스트)
+            width: 썸네일 너비 (THUMBNAIL_WIDTHS 중 하나)
+            fmt: webp | jpeg
+
+        Raises:
+            ImageError: 허용하지 않는 호스트, 원본을 받지 못했거나 이미지가 아님
+        """
+        if not allowed_source(url):
+            raise ImageError("image host is not allowed", status_code=400)
+        etag = self.etag(url, width, fmt)
+        name = f"{etag.strip(chr(34))}.{fmt}"
+        data = self._read(name)
+        if data is not None:
+            IMAGE_REQUESTS.inc(result="hit")
+            return Thumbnail(data, _MEDIA_TYPES[fmt], etag)
+        with self._lock_for(name):
+            data = self._read(name)
+            if data is None:
+                IMAGE_REQUESTS.inc(result="miss")
+                original = self._original(url)
+                try:
+                    data = _resize(original, width, fmt)
+                except ImportError:
+                    # Pillow가 없으면 원본을 그대로 제공 (캐시와 헤더는 동일)
+                    logger.warning("Pillow not available, serving original poster")
+                    return Thumbnail(original, _sniff_media_type(original), etag)
+                except Exception as e:
+                    raise ImageError(f"not a decodable image: {e}") from e
+                self._write(name, data)
+            else:
+                IMAGE_REQUESTS.inc(result="hit")
+        return Thumbnail(data, _MEDIA_TYPES[fmt], etag)
+
+    def stats(self):
+        entries = self._scan()
+        return {
+            "directory": self.directory,
+            "max_bytes": self.max_bytes,
+            "bytes": sum(size for _, size, _ in entries),
+            "files": len(entries),
+            "originals": sum(1 for name, _, _ in entries if name.endswith(".orig")),
+        }
+
+
+def _http_fetch(url):
+    import requests
+
+    from utils.user_agent import get_headers
+
+    started = time.perf_counter()
+    source = url
+    # requests가 리다이렉트를 알아서 따라가면 허용한 호스트가 내부 주소 등으로 보낼 수 있으므로 직접 따라감
+    for _ in range(MAX_REDIRECTS + 1):
+        try:
+            response = requests.get(source, headers=get_headers(), timeout=10, stream=True, allow_redirects=False)
+        except requests.RequestException as e:
+            raise ImageError(f"poster fetch failed: {e}") from e
+        if response.status_code not in _REDIRECT_STATUSES:
+            break
+        response.close()
+        location = response.headers.get("location")
+        if not location:
+            raise ImageError(f"poster fetch failed: HTTP {response.status_code} without Location")
+        source = urljoin(source, location)
+        if not allowed_source(source):
+            raise ImageError("poster redirected to a host that is not allowed")
+    else:
+        raise ImageError("poster fetch failed: too many redirects")
+    with response:
+        if response.status_code != 200:
+            raise ImageError(f"poster fetch failed: HTTP {response.status_code}")
+        if not response.headers.get("content-type", "").startswith("image/"):
+            raise ImageError("poster source is not an image")
+        data = response.raw.read(MAX_SOURCE_BYTES + 1, decode_content=True)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ImageError("poster source is too large")
+    logger.debug("poster fetched", extra={"url": url, "bytes": len(data),
+                                          "seconds": round(time.perf_counter() - started, 3)})
+    return data
+
+
+def _resize(data, width, fmt):
+    from PIL import Image  # type: ignore
+
+    with Image.open(BytesIO(data)) as image:
+        image.draft("RGB", (width, width * 3))
+        image = image.convert("RGB")
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        out = BytesIO()
+        if fmt == "webp":
+            image.save(out, "WEBP", quality=_QUALITY["webp"], method=4)
+        else:
+            image.save(out, "JPEG", quality=_QUALITY["jpeg"], optimize=True, progressive=True)
+        return out.getvalue()
+
+
+def _sniff_media_type(data):
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
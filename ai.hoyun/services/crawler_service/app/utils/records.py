@@ -0,0 +1,196 @@
+"""
+크롤링 결과 조회용 레코드 테이블
+
+스냅샷(크롤링 결과 목록)을 필드 선택(fields), 제목 검색(q), 페이지(limit/offset/cursor)로 잘라 돌려줄 때
+요청마다 dict 목록을 다시 직렬화하지 않도록, 스냅샷마다 한 번만 레코드 테이블을 만든다.
+
+- 레코드는 __slots__ 객체로, 필드별 JSON 조각('"title":"..."')을 미리 인코딩해 둠
+  → 응답 본문은 선택한 필드의 조각을 이어 붙이기만 하면 됨
+- 제목 검색용 정규화 문자열(공백 제거, casefold)도 레코드마다 한 번만 만듦
+- cursor는 스냅샷 ETag와 다음 위치를 담은 불투명 문자열이라 스냅샷이 바뀌면 만료(409)
+"""
+import base64
+import json
+
+# 제목 검색에 쓰는 필드
+SEARCH_FIELD = "title"
+MAX_LIMIT = 500
+
+
+class QueryError(Exception):
+    """잘못된 조회 조건 (status_code: 응답 상태 코드)"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _normalize(text):
+    return "".join(str(text).split()).casefold()
+
+
+class Record:
+    """
+    크롤링 결과 한 건
+
+    Args:
+        fragments: 필드 순서(RecordTable.fields)대로 JSON 조각(bytes), 없는 필드는 None
+        search: 제목 검색용 정규화 문자열
+    """
+
+    __slots__ = ("fragments", "search")
+
+    def __init__(self, fragments, search):
+        self.fragments = fragments
+        self.search = search
+
+    def render(self, positions):
+        return b"{" + b",".join(f for f in (self.fragments[p] for p in positions) if f is not None) + b"}"
+
+
+class RecordTable:
+    """
+    크롤링 결과 목록의 레코드 테이블
+
+    Args:
+        data: 크롤링 결과 목록 (dict 목록)
+    """
+
+    __slots__ = ("fields", "positions", "records")
+
+    def __init__(self, data):
+        positions = {}
+        for item in data:
+            for key in item:
+                positions.setdefault(key, len(positions))
+        self.fields = tuple(positions)
+        self.positions = positions
+        width = len(positions)
+        records = []
+        for item in data:
+            fragments = [None] * width
+            for key, value in item.items():
+                fragments[positions[key]] = (
+                    json.dumps(key, ensure_ascii=False) + ":"
+                    + json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+                ).encode("utf-8")
+            records.append(Record(tuple(fragments), _normalize(item.get(SEARCH_FIELD, ""))))
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def select_fields(self, fields):
+        """
+        필드 이름 목록 → 레코드 조각 위치 (None이면 전체 필드)
+
+        Raises:
+            QueryError: 없는 필드 (결과가 비어 있으면 필드를 알 수 없으므로 무시)
+        """
+        if not fields:
+            return tuple(range(len(self.fields)))
+        unknown = [f for f in fields if f not in self.positions]
+        if unknown and self.records:
+            raise QueryError(
+                f"unknown fields: {', '.join(unknown)} (available: {', '.join(self.fields)})")
+        return tuple(self.positions[f] for f in fields if f in self.positions)
+
+    def matching(self, q):
+        """제목에 q가 들어 있는 레코드 (q가 없으면 전체)"""
+        if not q:
+            return self.records
+        needle = _normalize(q)
+        return [r for r in self.records if needle in r.search]
+
+
+class SnapshotQuery:
+    """
+    스냅샷 조회 조건
+
+    Args:
+        fields: 쉼표로 구분한 필드 이름 (None이면 전체)
+        q: 제목 검색어
+        limit: 최대 건수 (None이면 전체)
+        offset: 건너뛸 건수
+        cursor: 이전 응답의 next_cursor (지정하면 offset 대신 사용)
+    """
+
+    __slots__ = ("fields", "q", "limit", "offset", "cursor")
+
+    def __init__(self, fields=None, q=None, limit=None, offset=0, cursor=None):
+        self.fields = tuple(dict.fromkeys(f.strip() for f in (fields or "").split(",") if f.strip()))
+        self.q = (q or "").strip()
+        self.limit = limit
+        self.offset = offset
+        self.cursor = cursor
+
+    def is_full(self):
+        """조건이 없음 (스냅샷 본문을 그대로 보내면 됨)"""
+        return not (self.fields or self.q or self.limit is not None or self.offset or self.cursor)
+
+    def resolve_offset(self, etag):
+        """
+        시작 위치 (cursor가 있으면 cursor의 위치)
+
+        Raises:
+            QueryError: 잘못된 cursor(400), 다른 스냅샷의 cursor(409)
+        """
+        if not self.cursor:
+            return self.offset
+        snapshot_tag, offset = decode_cursor(self.cursor)
+        if snapshot_tag != _cursor_tag(etag):
+            raise QueryError("cursor expired: crawl results changed, start again without cursor", 409)
+        return offset
+
+    def key(self, offset):
+        """조회 결과 캐시 키 (같은 스냅샷에서 같은 키면 같은 본문)"""
+        return "|".join((",".join(self.fields), _normalize(self.q), str(self.limit), str(offset)))
+
+
+def _cursor_tag(etag):
+    return etag.strip('"')[:12]
+
+
+def encode_cursor(etag, offset):
+    raw = f"{_cursor_tag(etag)}:{offset}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor):
+    """cursor → (스냅샷 태그, 위치)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        tag, offset = raw.split(":", 1)
+        offset = int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise QueryError("invalid cursor")
+    if offset < 0:
+        raise QueryError("invalid cursor")
+    return tag, offset
+
+
+def render_page(table, query, etag):
+    """
+    조회 조건에 맞는 응답 본문
+
+    Returns:
+        tuple: (JSON 본문 bytes, 건수)
+
+    Raises:
+        QueryError: 잘못된 조회 조건
+    """
+    positions = table.select_fields(query.fields)
+    offset = query.resolve_offset(etag)
+    matched = table.matching(query.q)
+    end = len(matched) if query.limit is None else offset + query.limit
+    page = matched[offset:end]
+    next_cursor = encode_cursor(etag, end) if end < len(matched) else None
+    head = json.dumps({
+        "status": "success",
+        "count": len(page),
+        "total": len(matched),
+        "offset": offset,
+        "next_cursor": next_cursor,
+    }, separators=(",", ":")).encode("utf-8")
+    body = head[:-1] + b',"data":[' + b",".join(r.render(positions) for r in page) + b"]}"
+    return body, len(page)
@@ -0,0 +1,344 @@
+"""
+크롤링 결과 스냅샷 캐시
+
+크롤링(Selenium)은 수십 초가 걸리고 결과는 자주 바뀌지 않으므로 마지막 결과를 스냅샷으로 보관한다.
+
+- TTL(CRAWLER_SNAPSHOT_TTL) 안에는 다시 크롤링하지 않고 스냅샷을 돌려줌 (?refresh=true면 강제로 다시 크롤링)
+- 여러 요청이 동시에 만료된 스냅샷을 요청해도 크롤링은 한 번만 실행
+- 스냅샷마다 JSON 본문과 ETag(내용 해시)를 한 번만 만들고, 압축본도 인코딩별로 한 번만 만들어 재사용
+- 다시 크롤링한 결과가 같으면 ETag가 그대로라 클라이언트는 계속 304를 받음
+- 크롤링이 실패하거나 빈 결과를 돌려주면 이전 스냅샷을 계속 제공 (X-Snapshot-Stale: true)
+- 필드 선택/제목 검색/페이지 조회(fields, q, limit/offset/cursor)는 스냅샷마다 한 번 만든 레코드 테이블
+  (utils.records)에서 본문을 조립하고, 조건별 결과(압축본 포함)를 최근 _MAX_VIEWS개까지 재사용
+
+워커 프로세스가 여러 개면(공유 상태 저장소가 shared) 스냅샷 본문/메타데이터와 크롤링 락을 저장소에 두어
+크롤링은 모든 워커를 통틀어 한 번만 실행되고, 다른 워커는 그 결과를 받아 쓴다.
+크롤링 작업 상태(실행 중 여부, 워커 pid, 시작/종료 시각, 결과)도 저장소에 기록한다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from email.utils import formatdate
+from fastapi import Response  # type: ignore
+from common.compression import SUPPORTED_ENCODINGS, add_vary, compress, negotiate
+from common.http_cache import encoded_etag, make_etag, not_modified
+from common.shared_state import MemoryBackend, get_json, set_json
+from utils.records import RecordTable, render_page
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TTL = float(os.getenv("CRAWLER_SNAPSHOT_TTL", "600"))
+
+# 워커 간 크롤링 락의 최대 유지 시간 (초, 락을 잡은 워커가 죽으면 이 시간 뒤 다른 워커가 크롤링)
+CRAWL_LOCK_SECONDS = float(os.getenv("CRAWLER_CRAWL_LOCK_SECONDS", "600"))
+
+# 다른 워커의 크롤링이 끝났는지 확인하는 간격 (초)
+_POLL_INTERVAL = 0.5
+
+# 공유 저장소에 둔 스냅샷 본문 보존 시간 (초, 메타데이터가 가리키는 본문은 계속 다시 저장됨)
+_BODY_TTL = 86400
+
+# 스냅샷은 한 번 압축해 계속 재사용하므로 최고 수준으로 압축
+_PRECOMPRESS_LEVELS = {"gzip": 9, "br": 11}
+
+# 스냅샷마다 보관하는 조회 조건별 결과 수
+_MAX_VIEWS = 32
+
+CACHE_CONTROL = "no-cache"
+
+
+class Snapshot:
+    """
+    크롤링 결과 하나 (JSON 본문과 인코딩별 압축본)
+
+    Args:
+        data: 크롤링 결과 목록
+    """
+
+    __slots__ = ("count", "body", "etag", "crawled_at", "_encoded", "_lock", "_table", "_views")
+
+    def __init__(self, data):
+        self.count = len(data)
+        self.body = json.dumps(
+            {"status": "success", "count": self.count, "data": data}, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = make_etag(self.body)
+        self.crawled_at = time.time()
+        self._encoded = {}
+        self._lock = threading.Lock()
+        self._table = None
+        self._views = OrderedDict()
+
+    @classmethod
+    def restore(cls, body, etag, count, crawled_at):
+        """다른 워커가 만든 스냅샷 본문으로 복원"""
+        snapshot = cls.__new__(cls)
+        snapshot.count = count
+        snapshot.body = body
+        snapshot.etag = etag
+        snapshot.crawled_at = crawled_at
+        snapshot._encoded = {}
+        snapshot._lock = threading.Lock()
+        snapshot._table = None
+        snapshot._views = OrderedDict()
+        return snapshot
+
+    def encoded(self, encoding):
+        """인코딩별 본문 (처음 요청될 때 한 번만 압축)"""
+        if encoding is None:
+            return self.body
+        with self._lock:
+            body = self._encoded.get(encoding)
+            if body is None:
+                body = self._encoded[encoding] = compress(self.body, encoding, _PRECOMPRESS_LEVELS[encoding])
+            return body
+
+    def sizes(self):
+        return {"identity": len(self.body), **{e: len(b) for e, b in self._encoded.items()}}
+
+    def table(self):
+        """레코드 테이블 (처음 조회될 때 본문에서 한 번만 만듦, 다른 워커가 만든 스냅샷도 동일)"""
+        with self._lock:
+            if self._table is None:
+                self._table = RecordTable(json.loads(self.body)["data"])
+            return self._table
+
+    def view(self, query):
+        """
+        조회 조건에 맞는 결과 (본문/ETag/압축본을 가진 Snapshot, 조건별로 한 번만 만듦)
+
+        Args:
+            query: utils.records.SnapshotQuery
+
+        Raises:
+            QueryError: 잘못된 조회 조건
+        """
+        key = query.key(query.resolve_offset(self.etag))
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+                return view
+        body, count = render_page(self.table(), query, self.etag)
+        view = Snapshot.restore(body, make_etag(self.etag, key), count, self.crawled_at)
+        with self._lock:
+            self._views[key] = view
+            while len(self._views) > _MAX_VIEWS:
+                self._views.popitem(last=False)
+        return view
+
+
+class SnapshotCache:
+    """
+    크롤러 하나의 스냅샷 캐시
+
+    Args:
+        name: 크롤러 이름 (로그/공유 저장소 키)
+        loader: 크롤링 함수 (결과 목록 반환)
+        ttl: 스냅샷 유효 시간 (초)
+        state: 공유 상태 저장소 (shared면 워커끼리 스냅샷과 크롤링 락을 공유, None이면 프로세스 메모리)
+    """
+
+    def __init__(self, name, loader, ttl=SNAPSHOT_TTL, state=None):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.state = state or MemoryBackend()
+        self.shared = self.state.shared
+        self._snapshot = None
+        self._fetched_at = 0.0
+        self._stale = False
+        self._lock = threading.Lock()
+        self._meta_key = f"snapshot:{name}"
+        self._lock_key = f"crawl-lock:{name}"
+        self._job_key = f"crawl:{name}"
+
+    def _fresh(self):
+        return self._snapshot is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def _load(self, meta):
+        """공유 메타데이터가 가리키는 스냅샷 (이 워커에 같은 ETag가 있으면 압축본째 재사용)"""
+        if self._snapshot is not None and self._snapshot.etag == meta["etag"]:
+            return self._snapshot
+        body = self.state.get(f"{self._meta_key}:{meta['etag']}")
+        if body is None:
+            return None
+        self._snapshot = Snapshot.restore(body, meta["etag"], meta["count"], meta["crawled_at"])
+        return self._snapshot
+
+    def _cached(self, since=None):
+        """
+        재사용할 수 있는 스냅샷
+
+        Args:
+            since: 이 시각(time.time()) 이후에 크롤링된 스냅샷만 (None이면 TTL 안의 스냅샷)
+        """
+        if not self.shared:
+            return (self._snapshot, self._stale) if since is None and self._fresh() else None
+        meta = get_json(self.state, self._meta_key)
+        if meta is None:
+            return None
+        if since is None and time.time() - meta["fetched_at"] >= self.ttl:
+            return None
+        if since is not None and meta["fetched_at"] < since:
+            return None
+        snapshot = self._load(meta)
+        return (snapshot, meta["stale"]) if snapshot is not None else None
+
+    def get(self, refresh=False):
+        """
+        스냅샷 조회 (만료되었거나 refresh면 크롤링)
+
+        Returns:
+            tuple: (Snapshot, stale) stale이면 크롤링에 실패해 이전 스냅샷을 돌려준 것
+
+        Raises:
+            Exception: 크롤링이 실패했고 이전 스냅샷도 없음
+        """
+        if not refresh:
+            cached = self._cached()
+            if cached is not None:
+                return cached
+        requested = time.monotonic()
+        requested_at = time.time()
+        with self._lock:
+            # 기다리는 동안 다른 요청이 크롤링을 끝냈으면 그 결과를 사용
+            if not self.shared and self._snapshot is not None and self._fetched_at >= requested:
+                return self._snapshot, self._stale
+            cached = self._cached(requested_at if refresh else None)
+            if cached is not None:
+                return cached
+            if not self.shared:
+                return self._crawl()
+            return self._crawl_shared(refresh, requested_at)
+
+    def _crawl_shared(self, refresh, requested_at):
+        """워커 간 크롤링 락을 잡고 크롤링 (다른 워커가 크롤링 중이면 끝날 때까지 기다려 그 결과를 사용)"""
+        token = uuid.uuid4().hex.encode()
+        while not self.state.add(self._lock_key, token, CRAWL_LOCK_SECONDS):
+            time.sleep(_POLL_INTERVAL)
+            cached = self._cached(requested_at)
+            if cached is not None:
+                return cached
+        try:
+            # 락을 기다리는 동안 다른 워커가 크롤링을 끝냈을 수 있음
+            cached = self._cached(requested_at if refresh else None)
+            if cached is not None:
+                return cached
+            meta = get_json(self.state, self._meta_key)
+            if meta is not None:
+                self._load(meta)
+            return self._crawl()
+        finally:
+            self.state.delete(self._lock_key, token)
+
+    def _crawl(self):
+        """크롤링해 스냅샷 갱신 (self._lock과 워커 간 락을 잡은 상태에서 호출)"""
+        started_at = time.time()
+        set_json(self.state, self._job_key, {"state": "running", "pid": os.getpid(), "started_at": started_at})
+        result = "failed"
+        try:
+            try:
+                data = self.loader()
+            except Exception:
+                if self._snapshot is None:
+                    raise
+                logger.warning("crawl failed, serving previous snapshot", exc_info=True,
+                               extra={"crawler": self.name})
+                data = None
+            # 크롤러는 실패하면 빈 목록을 돌려주므로 빈 결과는 스냅샷으로 남기지 않음
+            if not data:
+                if self._snapshot is None:
+                    result = "empty"
+                    return Snapshot([]), False
+                if data is not None:
+                    logger.warning("crawl returned no data, serving previous snapshot",
+                                   extra={"crawler": self.name})
+                # 실패한 크롤링도 TTL 동안은 다시 시도하지 않음 (요청마다 크롤링이 몰리지 않도록)
+                result = "stale"
+                self._publish(self._snapshot, True)
+                return self._snapshot, True
+            snapshot = Snapshot(data)
+            if self._snapshot is not None and snapshot.etag == self._snapshot.etag:
+                # 내용이 같으면 기존 스냅샷(압축본 포함)을 유지
+                snapshot = self._snapshot
+            result = "ok"
+            self._publish(snapshot, False)
+            return snapshot, False
+        finally:
+            set_json(self.state, self._job_key, {
+                "state": "idle",
+                "pid": os.getpid(),
+                "started_at": started_at,
+                "finished_at": time.time(),
+                "result": result,
+            })
+
+    def _publish(self, snapshot, stale):
+        self._snapshot = snapshot
+        self._fetched_at = time.monotonic()
+        self._stale = stale
+        if not self.shared:
+            return
+        # 본문을 먼저 저장해야 메타데이터를 읽은 워커가 항상 본문을 찾음
+        self.state.set(f"{self._meta_key}:{snapshot.etag}", snapshot.body, _BODY_TTL)
+        set_json(self.state, self._meta_key, {
+            "etag": snapshot.etag,
+            "count": snapshot.count,
+            "crawled_at": snapshot.crawled_at,
+            "fetched_at": time.time(),
+            "stale": stale,
+        })
+
+    def stats(self):
+        job = get_json(self.state, self._job_key)
+        if self.shared:
+            meta = get_json(self.state, self._meta_key)
+            snapshot = self._load(meta) if meta is not None else None
+            age = time.time() - meta["fetched_at"] if snapshot is not None else None
+            stale = meta["stale"] if snapshot is not None else False
+        else:
+            snapshot = self._snapshot
+            age = time.monotonic() - self._fetched_at
+            stale = self._stale
+        if snapshot is None:
+            return {"name": self.name, "ttl": self.ttl, "cached": False, "job": job}
+        return {
+            "name": self.name,
+            "ttl": self.ttl,
+            "cached": True,
+            "etag": snapshot.etag,
+            "count": snapshot.count,
+            "age_seconds": round(age, 1),
+            "stale": stale,
+            "bytes": snapshot.sizes(),
+            "job": job,
+        }
+
+
+def snapshot_response(request, snapshot, stale=False):
+    """
+    스냅샷 응답 (If-None-Match가 일치하면 본문 없이 304)
+
+    압축본은 스냅샷에 캐시된 것을 그대로 보내므로 요청마다 직렬화/압축하지 않는다.
+    """
+    encoding = negotiate(request.headers.get("accept-encoding"), SUPPORTED_ENCODINGS)
+    headers = {
+        "Cache-Control": CACHE_CONTROL,
+        "Last-Modified": formatdate(snapshot.crawled_at, usegmt=True),
+    }
+    add_vary(headers)
+    if stale:
+        headers["X-Snapshot-Stale"] = "true"
+    etag = encoded_etag(snapshot.etag, encoding)
+    response = not_modified(request, etag, headers)
+    if response is not None:
+        return response
+    headers["ETag"] = etag
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=snapshot.encoded(encoding), media_type="application/json", headers=headers)
@@ -1,40 +1,64 @@
 """
 User-Agent 유틸리티 모듈
-fake-useragent를 사용하여 랜덤 User-Agent 생성
+로컬 User-Agent 목록에서 랜덤 User-Agent 선택
+
+fake-useragent는 첫 호출 때 데이터 파일을 읽어 UserAgent 객체를 만들었기 때문에 첫 크롤링 요청이 느렸다.
+목록은 모듈 import 시 만들어지므로 요청 중에는 고르기만 한다.
+CRAWLER_USER_AGENTS_FILE(한 줄에 하나)을 지정하면 그 목록을 대신 사용한다.
 """
-from fake_useragent import UserAgent  # type: ignore
+import logging
+import os
+import random
+
+logger = logging.getLogger(__name__)
+
+# 데스크톱 브라우저 최신 버전 (Chrome/Edge/Firefox/Safari, Windows/macOS/Linux)
+_DEFAULT_USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+)
+
+
+def _load_user_agents():
+    path = os.getenv("CRAWLER_USER_AGENTS_FILE")
+    if not path:
+        return _DEFAULT_USER_AGENTS
+    try:
+        with open(path, encoding="utf-8") as f:
+            agents = tuple(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    except OSError:
+        logger.warning("user agent file not readable, using built-in list", extra={"path": path})
+        return _DEFAULT_USER_AGENTS
+    return agents or _DEFAULT_USER_AGENTS
+
+
+USER_AGENTS = _load_user_agents()
 
-# UserAgent 인스턴스 생성 (캐싱)
-_ua = None
 
 def get_user_agent():
     """
     랜덤 User-Agent 문자열 반환
-    
+
     Returns:
         str: User-Agent 문자열
     """
-    global _ua
-    if _ua is None:
-        try:
-            _ua = UserAgent()
-        except Exception:
-            # fake-useragent 실패시 기본값 반환
-            return 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    
-    try:
-        return _ua.random
-    except Exception:
-        # 랜덤 생성 실패시 기본값 반환
-        return 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    return random.choice(USER_AGENTS)
 
 def get_headers(referer=None):
     """
     requests용 헤더 딕셔너리 반환 (User-Agent 포함)
-    
+
     Args:
         referer: Referer URL (선택사항)
-        
+
     Returns:
         dict: HTTP 헤더 딕셔너리
     """
@@ -46,9 +70,8 @@ def get_headers(referer=None):
         'Connection': 'keep-alive',
         'Upgrade-Insecure-Requests': '1',
     }
-    
+
     if referer:
         headers['Referer'] = referer
-    
-    return headers
 
+    return headers
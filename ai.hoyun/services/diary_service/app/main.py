@@ -1,23 +1,291 @@
-from fastapi import FastAPI, APIRouter  # type: ignore
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response  # type: ignore
+from fastapi.responses import JSONResponse  # type: ignore
+from pydantic import BaseModel  # type: ignore
 import uvicorn  # type: ignore
+from common.compression import CompressionMiddleware
+from common.http_cache import ConditionalGetMiddleware, make_etag, not_modified
+from common.instrumentation import instrument
+from common.log import configure_logging
+from common.startup import StartupProfile
+from store.diaries import DiaryStore, InvalidCursor, MAX_PAGE_SIZE, to_ms
+from store.importer import import_ndjson
+from store.search import MAX_SEARCH_RESULTS
+from store.write_behind import WriteBehindQueue, WriteQueueClosed
+
+# 시작 프로파일 (프로세스 시작 → 모듈 로드 시간, DB 준비 시간, /ready)
+startup = StartupProfile("diary")
+
+# JSON 구조화 로깅 (큐 기반, LOG_LEVEL / LOG_LEVELS)
+configure_logging("diary")
+
+# SQLite DB 파일 경로 / 읽기 연결 수
+DIARY_DB_PATH = os.getenv("DIARY_DB_PATH", "data/diary.db")
+DIARY_DB_READERS = int(os.getenv("DIARY_DB_READERS", "4"))
+# 쓰기 연결의 PRAGMA synchronous (NORMAL: 프로세스 장애에 안전, FULL: 전원 장애에도 커밋 유지)
+DIARY_DB_SYNCHRONOUS = os.getenv("DIARY_DB_SYNCHRONOUS", "NORMAL")
+# 단건 쓰기를 모아 한 트랜잭션으로 커밋 (group commit)
+DIARY_WRITE_BEHIND = os.getenv("DIARY_WRITE_BEHIND", "false").lower() == "true"
+DIARY_WRITE_BATCH_SIZE = int(os.getenv("DIARY_WRITE_BATCH_SIZE", "256"))
+DIARY_WRITE_MAX_DELAY_MS = float(os.getenv("DIARY_WRITE_MAX_DELAY_MS", "0"))
+# 일괄 가져오기 트랜잭션당 건수
+DIARY_IMPORT_BATCH_SIZE = int(os.getenv("DIARY_IMPORT_BATCH_SIZE", "1000"))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """시작 시 DB 연결/스키마 생성, 종료 시 남은 쓰기 커밋 후 연결 정리"""
+    store = DiaryStore(DIARY_DB_PATH, readers=DIARY_DB_READERS, synchronous=DIARY_DB_SYNCHRONOUS)
+    queue = None
+    if DIARY_WRITE_BEHIND:
+        queue = WriteBehindQueue(
+            store.pool, max_batch=DIARY_WRITE_BATCH_SIZE, max_delay=DIARY_WRITE_MAX_DELAY_MS / 1000.0
+        )
+        queue.start()
+        store.use_writer(queue)
+    app.state.store = store
+    app.state.write_queue = queue
+    startup.finish()
+    try:
+        yield
+    finally:
+        if queue is not None:
+            await queue.close()
+        store.close()
+
 
 app = FastAPI(
     title="Diary Service API",
     version="1.0.0",
-    description="일기 서비스 API"
+    description="일기 서비스 API",
+    lifespan=lifespan
 )
 
+# 조건부 GET(ETag/304)과 gzip/brotli 압축 (계측 미들웨어 안쪽에서 동작)
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# 라우트별 지연 시간/처리 중 요청 수 메트릭, Server-Timing 헤더, /metrics 엔드포인트
+instrument(app, "diary")
+
+# 준비 상태 엔드포인트 (/ready, DB 연결/스키마 준비 후 200)
+startup.install(app)
+
+# 종료 중 (쓰기 모으기 큐가 닫힌 뒤 들어온 쓰기)
+@app.exception_handler(WriteQueueClosed)
+async def write_queue_closed_handler(request: Request, exc: WriteQueueClosed):
+    return JSONResponse({"detail": "Diary service is shutting down"}, status_code=503, headers={"Retry-After": "1"})
+
 # 서브 라우터 생성
 diary_router = APIRouter(prefix="/diary", tags=["diary"])
 
-@diary_router.get("/diaries")
-def get_diaries():
+# 일기 작성 요청 모델
+class DiaryCreate(BaseModel):
+    user_id: str
+    content: str
+    title: str = ""
+    created_at: datetime | None = None  # 지난 날짜의 일기를 옮겨 올 때 (기본: 현재 시각)
+
+# 일기 수정 요청 모델 (보낸 필드만 수정)
+class DiaryUpdate(BaseModel):
+    title: str | None = None
+    content: str | None = None
+
+# 일기 응답 모델
+class Diary(BaseModel):
+    id: int
+    user_id: str
+    title: str
+    content: str
+    created_at: str
+    updated_at: str
+
+# 일기 목록 응답 모델
+class DiaryPage(BaseModel):
+    diaries: list[Diary]
+    next_cursor: str | None = None
+
+# 검색 결과 모델 (title_highlight/snippet은 HTML 이스케이프한 뒤 일치 부분만 <mark>로 감싼 HTML)
+class DiarySearchResult(Diary):
+    title_highlight: str
+    snippet: str
+    score: float
+
+# 검색 응답 모델
+class DiarySearchResponse(BaseModel):
+    query: str
+    results: list[DiarySearchResult]
+
+def _store(request: Request) -> DiaryStore:
+    return request.app.state.store
+
+# 일괄 가져오기 오류 줄 모델
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+# 일괄 가져오기 응답 모델
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    batches: int
+    elapsed_ms: float
+    rows_per_sec: int
+    errors: list[ImportLineError]
+
+# 사용자 일기는 본인만 보므로 공유 캐시에는 저장하지 않고, 매번 ETag로 재검증
+_CACHE_HEADERS = {"Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+
+async def _conditional(request: Request, response: Response, user_id: str, *params):
+    """
+    사용자 일기 버전으로 ETag를 만들고 If-None-Match가 일치하면 304 응답을 돌려줌
+
+    버전만 읽으므로 일치하면 목록/검색 결과를 다시 만들지 않는다.
     """
-    일기 목록 조회 API
-    
-    - **반환**: 일기 목록
+    version = await _store(request).version(user_id)
+    etag = make_etag("diaries", user_id, version, request.url.path, *params)
+    cached = not_modified(request, etag, _CACHE_HEADERS)
+    if cached is None:
+        response.headers.update({**_CACHE_HEADERS, "ETag": etag})
+    return cached
+
+def _not_found(diary_id: int):
+    return HTTPException(status_code=404, detail=f"Diary {diary_id} not found")
+
+@diary_router.get("/diaries", response_model=DiaryPage)
+async def get_diaries(
+    request: Request,
+    response: Response,
+    user_id: str,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None
+):
+    """
+    일기 목록 조회 API (최신순)
+
+    - **user_id**: 작성자
+    - **limit**: 페이지 크기 (1~100)
+    - **cursor**: 이전 응답의 next_cursor (첫 페이지는 생략)
+    - **반환**: 일기 목록과 다음 페이지 커서 (마지막 페이지면 null), If-None-Match가 일치하면 304
+    """
+    cached = await _conditional(request, response, user_id, limit, cursor)
+    if cached is not None:
+        return cached
+    try:
+        diaries, next_cursor = await _store(request).list(user_id, limit=limit, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"diaries": diaries, "next_cursor": next_cursor}
+
+# /diaries/{diary_id}보다 먼저 등록해야 "search"가 id로 해석되지 않음
+@diary_router.get("/diaries/search", response_model=DiarySearchResponse)
+async def search_diaries(
+    request: Request,
+    response: Response,
+    user_id: str,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS)
+):
+    """
+    일기 검색 API (관련도순)
+
+    - **user_id**: 작성자
+    - **q**: 검색어 (공백으로 구분한 검색어를 모두 포함하는 일기를 찾음)
+    - **limit**: 최대 결과 수 (1~50)
+    - **반환**: 일기 목록 (HTML 이스케이프 후 일치 부분을 <mark>로 감싼 제목/본문 스니펫, 관련도 점수 포함), If-None-Match가 일치하면 304
+    """
+    cached = await _conditional(request, response, user_id, q, limit)
+    if cached is not None:
+        return cached
+    results = await _store(request).search(user_id, q, limit=limit)
+    return {"query": q, "results": results}
+
+@diary_router.post("/diaries", response_model=Diary, status_code=201)
+async def create_diary(request: Request, body: DiaryCreate):
+    """
+    일기 작성 API
+
+    - **반환**: 저장된 일기
+    """
+    created_at = to_ms(body.created_at) if body.created_at is not None else None
+    return await _store(request).create(body.user_id, body.content, title=body.title, created_at=created_at)
+
+@diary_router.post("/diaries/import", response_model=ImportResult)
+async def import_diaries(request: Request):
+    """
+    일기 일괄 가져오기 API (NDJSON)
+
+    요청 본문은 한 줄에 일기 하나인 NDJSON (`Content-Type: application/x-ndjson`).
+    본문을 받는 대로 1000건(DIARY_IMPORT_BATCH_SIZE)씩 한 트랜잭션으로 저장합니다.
+    잘못된 줄은 건너뛰고 줄 번호와 이유를 돌려줍니다.
+
+    - **반환**: 저장/실패 건수, 트랜잭션 수, 소요 시간, 초당 저장 건수(rows_per_sec)
+    """
+    return await import_ndjson(_store(request).pool, request.stream(), batch_size=DIARY_IMPORT_BATCH_SIZE)
+
+@diary_router.get("/diaries/{diary_id}", response_model=Diary)
+async def get_diary(request: Request, response: Response, diary_id: int, user_id: str):
+    """
+    일기 조회 API
+
+    - **반환**: 일기 (없으면 404), If-None-Match가 일치하면 304
+    """
+    cached = await _conditional(request, response, user_id)
+    if cached is not None:
+        return cached
+    diary = await _store(request).get(user_id, diary_id)
+    if diary is None:
+        raise _not_found(diary_id)
+    return diary
+
+@diary_router.put("/diaries/{diary_id}", response_model=Diary)
+async def update_diary(request: Request, diary_id: int, user_id: str, body: DiaryUpdate):
+    """
+    일기 수정 API
+
+    - **반환**: 수정된 일기 (없으면 404)
+    """
+    diary = await _store(request).update(user_id, diary_id, **body.dict())
+    if diary is None:
+        raise _not_found(diary_id)
+    return diary
+
+@diary_router.delete("/diaries/{diary_id}", status_code=204)
+async def delete_diary(request: Request, diary_id: int, user_id: str):
+    """
+    일기 삭제 API
+
+    - **반환**: 본문 없음 (없으면 404)
+    """
+    if not await _store(request).delete(user_id, diary_id):
+        raise _not_found(diary_id)
+    return Response(status_code=204)
+
+# 쓰기 모으기 큐 상태
+@diary_router.get("/write-queue")
+async def write_queue_stats(request: Request):
+    """
+    쓰기 모으기 큐 상태 조회 API
+
+    - **반환**: 활성화 여부, 배치 수, 평균 배치 크기, 대기 중인 쓰기 수
+    """
+    queue = request.app.state.write_queue
+    if queue is None:
+        return {"enabled": False}
+    return {"enabled": True, **queue.stats()}
+
+# Health check 엔드포인트
+@app.get("/health")
+async def health_check():
+    """
+    Health check 엔드포인트
+
+    프로세스가 살아 있는지만 확인합니다 (liveness).
+    게이트웨이는 warm-up까지 끝났는지 /ready로 확인해 레플리카를 선택합니다.
     """
-    return {"diaries": []}
+    return {"status": "healthy", "service": "diary"}
 
 # 서브 라우터를 앱에 포함
 app.include_router(diary_router)
@@ -0,0 +1,118 @@
+"""
+SQLite 연결 풀
+
+- WAL 모드: 쓰기 중에도 읽기가 막히지 않음
+- 읽기: 스레드 N개가 각자 연결을 하나씩 가지고 처리 (연결을 스레드 간에 공유하지 않음)
+- 쓰기: SQLite는 한 번에 하나만 쓸 수 있으므로 전용 스레드 하나가 트랜잭션 단위로 직렬 처리
+- read()/write()는 코루틴이라 이벤트 루프를 막지 않는다
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    # WAL에서는 NORMAL이어도 커밋된 트랜잭션이 DB 손상 없이 유지됨 (전원 장애 시 마지막 커밋만 유실 가능)
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    # 페이지 캐시 약 16MB (음수는 KiB 단위)
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def connect(path, synchronous=None):
+    """
+    설정이 적용된 SQLite 연결 (autocommit, 트랜잭션은 직접 BEGIN)
+
+    Args:
+        path: DB 파일 경로
+        synchronous: PRAGMA synchronous 값 (None이면 NORMAL).
+            FULL이면 커밋마다 WAL을 fsync해 전원 장애에도 커밋된 트랜잭션이 남는다.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    if synchronous is not None:
+        if synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {SYNCHRONOUS_MODES}: {synchronous}")
+        conn.execute(f"PRAGMA synchronous={synchronous.upper()}")
+    return conn
+
+
+class SQLitePool:
+    """
+    읽기 스레드 풀 + 단일 쓰기 스레드
+
+    Args:
+        path: DB 파일 경로
+        readers: 읽기 스레드(연결) 수
+        synchronous: 쓰기 연결의 PRAGMA synchronous (None이면 NORMAL)
+    """
+
+    def __init__(self, path, readers=4, synchronous=None):
+        self.path = path
+        self.readers = readers
+        self.synchronous = synchronous
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="sqlite-read", initializer=self._open_thread_connection)
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-write", initializer=self._open_thread_connection,
+            initargs=(synchronous,))
+
+    def _open_thread_connection(self, synchronous=None):
+        conn = connect(self.path, synchronous)
+        self._local.conn = conn
+        with self._lock:
+            self._connections.append(conn)
+
+    def _run_read(self, func, args):
+        return func(self._local.conn, *args)
+
+    def _run_write(self, func, args):
+        conn = self._local.conn
+        # 쓰기 잠금을 트랜잭션 시작 시점에 잡아 중간에 SQLITE_BUSY로 실패하지 않게 함
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn, *args)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    async def read(self, func, *args):
+        """func(conn, *args)를 읽기 스레드에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self._run_read, func, args)
+
+    async def write(self, func, *args):
+        """func(conn, *args)를 쓰기 스레드에서 하나의 트랜잭션으로 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._write_executor, self._run_write, func, args)
+
+    def write_sync(self, func, *args):
+        """스레드에서 직접 쓰기 (이벤트 루프 밖, 예: 스키마 생성)"""
+        return self._write_executor.submit(self._run_write, func, args).result()
+
+    def close(self):
+        self._read_executor.shutdown(wait=True)
+        self._write_executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
@@ -0,0 +1,259 @@
+"""
+일기 저장소
+
+사용자별 목록은 (user_id, created_at, id) 인덱스를 따라 키셋(cursor) 방식으로 페이지를 나눈다.
+OFFSET처럼 앞 페이지를 모두 건너뛰며 읽지 않으므로 일기가 몇 년치 쌓여도 페이지마다 비용이 같다.
+"""
+import base64
+import binascii
+import json
+import time
+from datetime import datetime, timezone
+from store import search as fts
+from store.database import SQLitePool
+
+# 버전은 현재 시각(밀리초)보다 작아지지 않게 올린다 (DB를 새로 만들어도 이전 ETag와 겹치지 않음)
+_BUMP_VERSION = """
+    INSERT INTO diary_versions (user_id, version)
+    VALUES ({row}.user_id, CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+    ON CONFLICT (user_id) DO UPDATE SET version = MAX(version + 1, excluded.version);
+"""
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS diaries (
+        id INTEGER PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        title TEXT NOT NULL DEFAULT '',
+        content TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL
+    )
+    """,
+    # 사용자별 최신순 목록 (커서 조건과 정렬을 인덱스만으로 처리)
+    "CREATE INDEX IF NOT EXISTS idx_diaries_user_created ON diaries (user_id, created_at DESC, id DESC)",
+    # 사용자별 일기 버전 (쓰기마다 증가, 목록/검색/조회 응답의 ETag에 사용)
+    """
+    CREATE TABLE IF NOT EXISTS diary_versions (
+        user_id TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS diary_versions_{event.lower()} AFTER {event} ON diaries BEGIN
+            {_BUMP_VERSION.format(row=row)}
+        END
+        """
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+    ),
+)
+
+_COLUMNS = "id, user_id, title, content, created_at, updated_at"
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """해석할 수 없는 페이지 커서"""
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def to_ms(value):
+    """datetime → UTC epoch 밀리초 (시간대가 없으면 UTC로 간주)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _iso(ms):
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).isoformat(timespec="milliseconds")
+
+
+def encode_cursor(created_at, entry_id):
+    raw = json.dumps([created_at, entry_id], separators=(",", ":")).encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, entry_id = json.loads(raw)
+        return int(created_at), int(entry_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def row_to_dict(row):
+    return {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "title": row["title"],
+        "content": row["content"],
+        "created_at": _iso(row["created_at"]),
+        "updated_at": _iso(row["updated_at"]),
+    }
+
+
+class DiaryStore:
+    """
+    일기 CRUD + 커서 페이지네이션
+
+    Args:
+        path: SQLite DB 파일 경로
+        readers: 읽기 연결 수
+        synchronous: 쓰기 연결의 PRAGMA synchronous (None이면 NORMAL)
+    """
+
+    def __init__(self, path, readers=4, synchronous=None):
+        self.pool = SQLitePool(path, readers=readers, synchronous=synchronous)
+        self.pool.write_sync(self._migrate)
+        # 단건 쓰기 경로 (use_writer()로 쓰기 모으기 큐로 바꿀 수 있음)
+        self.writer = self.pool
+
+    @staticmethod
+    def _migrate(conn):
+        for statement in SCHEMA:
+            conn.execute(statement)
+        fts.migrate(conn)
+
+    def use_writer(self, writer):
+        """
+        단건 쓰기(create/update/delete)를 보낼 객체 지정
+
+        Args:
+            writer: write(func, *args) 코루틴을 가진 객체 (SQLitePool 또는 WriteBehindQueue)
+        """
+        self.writer = writer
+
+    def close(self):
+        self.pool.close()
+
+    async def create(self, user_id, content, title="", created_at=None):
+        """
+        일기 작성
+
+        Args:
+            user_id: 작성자
+            content: 본문
+            title: 제목
+            created_at: 작성 시각 (epoch 밀리초, None이면 현재 시각)
+
+        Returns:
+            dict: 저장된 일기
+        """
+        def insert(conn):
+            created = created_at if created_at is not None else now_ms()
+            cursor = conn.execute(
+                "INSERT INTO diaries (user_id, title, content, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (user_id, title, content, created, created)
+            )
+            return conn.execute(f"SELECT {_COLUMNS} FROM diaries WHERE id = ?", (cursor.lastrowid,)).fetchone()
+
+        return row_to_dict(await self.writer.write(insert))
+
+    async def get(self, user_id, entry_id):
+        """일기 하나 조회 (없거나 다른 사용자의 일기면 None)"""
+        def select(conn):
+            return conn.execute(
+                f"SELECT {_COLUMNS} FROM diaries WHERE id = ? AND user_id = ?", (entry_id, user_id)
+            ).fetchone()
+
+        row = await self.pool.read(select)
+        return row_to_dict(row) if row is not None else None
+
+    async def version(self, user_id):
+        """사용자 일기 버전 (일기를 쓰거나 고치거나 지울 때마다 커짐, 일기가 없으면 0)"""
+        def select(conn):
+            row = conn.execute("SELECT version FROM diary_versions WHERE user_id = ?", (user_id,)).fetchone()
+            return row[0] if row is not None else 0
+
+        return await self.pool.read(select)
+
+    async def update(self, user_id, entry_id, title=None, content=None):
+        """
+        일기 수정 (None인 필드는 그대로 둠)
+
+        Returns:
+            dict | None: 수정된 일기 (없으면 None)
+        """
+        def apply(conn):
+            cursor = conn.execute(
+                "UPDATE diaries SET title = COALESCE(?, title), content = COALESCE(?, content), updated_at = ? "
+                "WHERE id = ? AND user_id = ?",
+                (title, content, now_ms(), entry_id, user_id)
+            )
+            if cursor.rowcount == 0:
+                return None
+            return conn.execute(f"SELECT {_COLUMNS} FROM diaries WHERE id = ?", (entry_id,)).fetchone()
+
+        row = await self.writer.write(apply)
+        return row_to_dict(row) if row is not None else None
+
+    async def delete(self, user_id, entry_id):
+        """일기 삭제 (삭제했으면 True)"""
+        def remove(conn):
+            return conn.execute("DELETE FROM diaries WHERE id = ? AND user_id = ?", (entry_id, user_id)).rowcount
+
+        return await self.writer.write(remove) > 0
+
+    async def list(self, user_id, limit=20, cursor=None):
+        """
+        사용자 일기 최신순 목록
+
+        Args:
+            user_id: 작성자
+            limit: 페이지 크기 (최대 MAX_PAGE_SIZE)
+            cursor: 이전 페이지의 next_cursor (None이면 첫 페이지)
+
+        Returns:
+            tuple: (일기 목록, 다음 페이지 커서 또는 None)
+
+        Raises:
+            InvalidCursor: 커서를 해석할 수 없음
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        after = decode_cursor(cursor) if cursor else None
+
+        def select(conn):
+            # 한 개 더 읽어서 다음 페이지가 있는지 확인
+            if after is None:
+                return conn.execute(
+                    f"SELECT {_COLUMNS} FROM diaries WHERE user_id = ? "
+                    "ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (user_id, limit + 1)
+                ).fetchall()
+            return conn.execute(
+                f"SELECT {_COLUMNS} FROM diaries WHERE user_id = ? AND (created_at, id) < (?, ?) "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (user_id, after[0], after[1], limit + 1)
+            ).fetchall()
+
+        rows = await self.pool.read(select)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return [row_to_dict(row) for row in rows], next_cursor
+
+    async def search(self, user_id, query, limit=20):
+        """
+        사용자 일기 전문 검색 (관련도순)
+
+        Args:
+            user_id: 작성자
+            query: 검색어 (공백으로 구분한 검색어를 모두 포함하는 일기)
+            limit: 최대 결과 수 (최대 fts.MAX_SEARCH_RESULTS)
+
+        Returns:
+            list: 일기 dict에 title_highlight, snippet, score를 더한 목록
+        """
+        limit = max(1, min(limit, fts.MAX_SEARCH_RESULTS))
+        results = await self.pool.read(fts.search, user_id, query, limit)
+        return [
+            {**row_to_dict(row), "title_highlight": title, "snippet": snippet, "score": round(score, 4)}
+            for row, title, snippet, score in results
+        ]
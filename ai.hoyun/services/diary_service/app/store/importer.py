@@ -0,0 +1,168 @@
+"""
+NDJSON 일괄 가져오기
+
+요청 본문을 끝까지 메모리에 올리지 않고 줄 단위로 읽어 batch_size건씩 한 트랜잭션으로 넣는다.
+한 배치를 쓰는 동안 다음 배치를 읽고 검증하므로 파싱과 쓰기가 겹친다.
+
+한 줄 형식:
+    {"user_id": "u1", "content": "...", "title": "...", "created_at": "2024-01-01T09:00:00+09:00"}
+created_at/updated_at은 ISO 8601 문자열 또는 epoch 밀리초 (생략하면 현재 시각).
+잘못된 줄은 건너뛰고 줄 번호와 이유를 결과에 남긴다. 이미 커밋된 배치는 되돌리지 않는다.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from store.diaries import now_ms, to_ms
+
+logger = logging.getLogger(__name__)
+
+# 결과에 담는 오류 줄 수 상한
+MAX_REPORTED_ERRORS = 20
+
+# 저장할 수 있는 시각 범위 (epoch 밀리초, 응답에서 datetime으로 바꿀 수 있는 0001~9999년)
+MIN_TIMESTAMP_MS = to_ms(datetime(1, 1, 1, tzinfo=timezone.utc))
+MAX_TIMESTAMP_MS = to_ms(datetime(9999, 12, 31, 23, 59, 59, 999000, tzinfo=timezone.utc))
+
+_INSERT = "INSERT INTO diaries (user_id, title, content, created_at, updated_at) VALUES (?, ?, ?, ?, ?)"
+
+
+class InvalidLine(ValueError):
+    """가져올 수 없는 NDJSON 줄"""
+
+
+def _timestamp(value, field):
+    if value is None:
+        return None
+    error = InvalidLine(f"{field} must be an ISO 8601 string or epoch milliseconds")
+    if isinstance(value, bool):
+        raise error
+    if isinstance(value, (int, float)):
+        # json.loads는 NaN/Infinity도 받으므로 int() 전에 거름
+        if isinstance(value, float) and not math.isfinite(value):
+            raise error
+        ms = int(value)
+    elif isinstance(value, str):
+        try:
+            ms = to_ms(datetime.fromisoformat(value))
+        except (ValueError, OverflowError):
+            raise error from None
+    else:
+        raise error
+    if not MIN_TIMESTAMP_MS <= ms <= MAX_TIMESTAMP_MS:
+        raise InvalidLine(f"{field} is out of range")
+    return ms
+
+
+def parse_line(line):
+    """
+    NDJSON 한 줄 → INSERT 파라미터
+
+    Raises:
+        InvalidLine: 형식이 잘못됨
+    """
+    try:
+        item = json.loads(line)
+    except ValueError as e:
+        raise InvalidLine(f"invalid JSON: {e}") from e
+    if not isinstance(item, dict):
+        raise InvalidLine("line must be a JSON object")
+    user_id = item.get("user_id")
+    content = item.get("content")
+    title = item.get("title", "")
+    if not isinstance(user_id, str) or not user_id:
+        raise InvalidLine("user_id is required")
+    if not isinstance(content, str):
+        raise InvalidLine("content is required")
+    if not isinstance(title, str):
+        raise InvalidLine("title must be a string")
+    created_at = _timestamp(item.get("created_at"), "created_at")
+    if created_at is None:
+        created_at = now_ms()
+    updated_at = _timestamp(item.get("updated_at"), "updated_at") or created_at
+    return user_id, title, content, created_at, updated_at
+
+
+async def _lines(chunks):
+    """바이트 청크 스트림 → (줄 번호, 줄) (청크 경계에서 잘린 줄은 이어 붙임)"""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            yield number, line
+    if buffer:
+        yield number + 1, buffer
+
+
+def _insert_batch(conn, rows):
+    conn.executemany(_INSERT, rows)
+    return len(rows)
+
+
+async def import_ndjson(pool, chunks, batch_size=1000):
+    """
+    NDJSON 스트림을 배치 트랜잭션으로 가져오기
+
+    Args:
+        pool: SQLitePool (쓰기 모으기 큐를 거치지 않고 쓰기 스레드에 바로 넣음)
+        chunks: 요청 본문 바이트 청크의 async iterator
+        batch_size: 트랜잭션당 건수
+
+    Returns:
+        dict: imported, failed, batches, elapsed_ms, rows_per_sec, errors(최대 MAX_REPORTED_ERRORS건)
+    """
+    started = time.perf_counter()
+    imported = failed = batches = 0
+    errors = []
+    rows = []
+    pending = None
+
+    async def flush(batch):
+        nonlocal imported, batches
+        imported += await pool.write(_insert_batch, batch)
+        batches += 1
+
+    try:
+        async for number, line in _lines(chunks):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(parse_line(line))
+            except InvalidLine as e:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": number, "error": str(e)})
+                continue
+            if len(rows) >= batch_size:
+                # 이전 배치 커밋을 기다린 뒤 다음 배치를 넘김 (쓰기 스레드에 최대 한 배치만 대기)
+                if pending is not None:
+                    await pending
+                pending = asyncio.ensure_future(flush(rows))
+                rows = []
+        if pending is not None:
+            await pending
+            pending = None
+        if rows:
+            await flush(rows)
+    finally:
+        if pending is not None:
+            # 본문 읽기 중 오류(클라이언트 연결 끊김 등)가 나도 넘긴 배치는 끝까지 기다림
+            await pending
+
+    elapsed = time.perf_counter() - started
+    result = {
+        "imported": imported,
+        "failed": failed,
+        "batches": batches,
+        "elapsed_ms": round(elapsed * 1000.0, 1),
+        "rows_per_sec": round(imported / elapsed) if elapsed > 0 else 0,
+        "errors": errors,
+    }
+    logger.info("diary import finished", extra={k: v for k, v in result.items() if k != "errors"})
+    return result
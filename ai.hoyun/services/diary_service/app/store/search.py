@@ -0,0 +1,261 @@
+"""
+일기 전문 검색 (SQLite FTS5 + trigram 토크나이저)
+
+한국어는 띄어쓰기 단위로 조사가 붙어("산책을", "산책했다") 단어 단위 토크나이저로는 검색이 잘 안 된다.
+trigram 토크나이저는 문자 3개 단위로 색인하므로 형태소 분석 없이 부분 문자열 검색이 된다.
+
+- diaries_fts: diaries 테이블을 원본으로 하는 external content 색인 (본문을 두 번 저장하지 않음).
+  사용자별 소유자 토큰 열을 함께 색인해 검색이 해당 사용자의 문서만 읽는다.
+- 트리거로 diaries INSERT/UPDATE/DELETE 시 색인을 함께 갱신 (같은 트랜잭션)
+- 3글자 이상 검색어는 FTS 색인으로 찾고 bm25로 순위를 매김
+- trigram으로 색인되지 않는 1~2글자 검색어("일기", "비")는 해당 사용자의 일기 안에서 LIKE로 거름
+- 강조/스니펫은 제목과 본문을 HTML 이스케이프한 뒤 <mark>만 넣어 돌려줌 (그대로 innerHTML로 써도 됨)
+"""
+import html
+import re
+
+FTS_TABLE = "diaries_fts"
+
+# 사용자별 소유자 토큰: 사용자마다 정수 키를 주고 사용 빈도가 없는 사설 영역(PUA) 문자 3개로 바꾼 것.
+# trigram 하나가 곧 사용자 하나이므로 MATCH가 해당 사용자 문서의 doclist만 교차한다.
+# (user_id를 JOIN으로 거르면 전체 사용자에서 일치한 문서를 모두 읽고 bm25를 계산한 뒤에 버리게 됨)
+_PUA_BASE = 0xE000
+_PUA_SIZE = 6400
+OWNER_TOKEN_SQL = (
+    f"char({_PUA_BASE} + user_key % {_PUA_SIZE}, "
+    f"{_PUA_BASE} + (user_key / {_PUA_SIZE}) % {_PUA_SIZE}, "
+    f"{_PUA_BASE} + (user_key / {_PUA_SIZE * _PUA_SIZE}) % {_PUA_SIZE})"
+)
+
+FTS_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS diary_owners (user_key INTEGER PRIMARY KEY, user_id TEXT NOT NULL UNIQUE)",
+    # 색인 원본 (본문은 diaries에서 읽으므로 두 번 저장하지 않음)
+    f"""
+    CREATE VIEW IF NOT EXISTS diaries_fts_source AS
+    SELECT d.id AS id, {OWNER_TOKEN_SQL} AS owner, d.title AS title, d.content AS content
+    FROM diaries d JOIN diary_owners o ON o.user_id = d.user_id
+    """,
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        owner, title, content, content='diaries_fts_source', content_rowid='id', tokenize='trigram'
+    )
+    """,
+)
+
+TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS diaries_fts_insert AFTER INSERT ON diaries BEGIN
+        INSERT OR IGNORE INTO diary_owners (user_id) VALUES (new.user_id);
+        INSERT INTO {FTS_TABLE} (rowid, owner, title, content)
+        SELECT new.id, {OWNER_TOKEN_SQL}, new.title, new.content FROM diary_owners WHERE user_id = new.user_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS diaries_fts_delete AFTER DELETE ON diaries BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, owner, title, content)
+        SELECT 'delete', old.id, {OWNER_TOKEN_SQL}, old.title, old.content FROM diary_owners WHERE user_id = old.user_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS diaries_fts_update AFTER UPDATE OF user_id, title, content ON diaries BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, owner, title, content)
+        SELECT 'delete', old.id, {OWNER_TOKEN_SQL}, old.title, old.content FROM diary_owners WHERE user_id = old.user_id;
+        INSERT OR IGNORE INTO diary_owners (user_id) VALUES (new.user_id);
+        INSERT INTO {FTS_TABLE} (rowid, owner, title, content)
+        SELECT new.id, {OWNER_TOKEN_SQL}, new.title, new.content FROM diary_owners WHERE user_id = new.user_id;
+    END
+    """,
+)
+
+# trigram 토크나이저가 색인하는 최소 길이
+MIN_INDEXED_LENGTH = 3
+
+# bm25 열 가중치 (소유자 토큰은 순위에 반영하지 않고, 제목 일치를 본문보다 높게)
+OWNER_WEIGHT = 0.0
+TITLE_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+# FTS5 highlight()/snippet()에 넘기는 표시 (결과를 이스케이프한 뒤 <mark>로 바꿈, 이스케이프 대상이 아닌 제어 문자)
+_OPEN_SENTINEL = "\x02"
+_CLOSE_SENTINEL = "\x03"
+SNIPPET_ELLIPSIS = "…"
+# 스니펫 길이 (trigram 토큰 수 ≒ 글자 수)
+SNIPPET_TOKENS = 32
+
+MAX_SEARCH_RESULTS = 50
+
+
+def migrate(conn):
+    """
+    FTS 색인과 트리거 생성
+
+    색인을 처음 만드는 경우 기존 일기로 한 번에 채운다 (rebuild).
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).fetchone()
+    if exists is None:
+        for statement in FTS_SCHEMA:
+            conn.execute(statement)
+        conn.execute("INSERT OR IGNORE INTO diary_owners (user_id) SELECT DISTINCT user_id FROM diaries")
+        conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    for statement in TRIGGERS:
+        conn.execute(statement)
+
+
+def split_terms(query):
+    """
+    검색어를 공백 기준으로 나눠 (색인 검색어, 짧은 검색어)로 분류
+
+    Returns:
+        tuple: (3글자 이상 검색어 목록, 1~2글자 검색어 목록)
+    """
+    terms = list(dict.fromkeys(query.split()))
+    indexed = [t for t in terms if len(t) >= MIN_INDEXED_LENGTH]
+    short = [t for t in terms if len(t) < MIN_INDEXED_LENGTH]
+    return indexed, short
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def match_expression(terms, owner=None):
+    """
+    색인 검색어를 FTS5 MATCH 식으로 변환
+
+    Args:
+        terms: 3글자 이상 검색어 (각각 구문으로 감싸 AND, 제목/본문에서만 찾음)
+        owner: 소유자 토큰 (지정하면 해당 사용자 문서로 한정)
+    """
+    expression = "{title content} : (" + " AND ".join(_phrase(term) for term in terms) + ")"
+    if owner is not None:
+        expression = f"owner : {_phrase(owner)} AND {expression}"
+    return expression
+
+
+def owner_token(conn, user_id):
+    """사용자의 소유자 토큰 (일기를 쓴 적이 없으면 None)"""
+    row = conn.execute(f"SELECT {OWNER_TOKEN_SQL} FROM diary_owners WHERE user_id = ?", (user_id,)).fetchone()
+    return row[0] if row is not None else None
+
+
+def like_pattern(term):
+    """LIKE 부분 일치 패턴 (ESCAPE '\\')"""
+    return "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+
+
+def _terms_pattern(terms):
+    return re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+
+
+def _escape(text):
+    # 본문에 표시 문자가 섞여 있어도 <mark>로 바뀌지 않도록 제거
+    return html.escape(text.replace(_OPEN_SENTINEL, "").replace(_CLOSE_SENTINEL, ""), quote=True)
+
+
+def _mark(pattern, text):
+    """일치 부분을 <mark>로 감싼 HTML (나머지는 이스케이프)"""
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(_escape(text[last:match.start()]))
+        parts.append(HIGHLIGHT_OPEN + _escape(match.group(0)) + HIGHLIGHT_CLOSE)
+        last = match.end()
+    parts.append(_escape(text[last:]))
+    return "".join(parts)
+
+
+def _has_sentinel(text):
+    return _OPEN_SENTINEL in text or _CLOSE_SENTINEL in text
+
+
+def _fts_markup(text):
+    """FTS5 highlight()/snippet() 결과를 이스케이프하고 표시 문자를 <mark>로 바꿈"""
+    return html.escape(text, quote=True).replace(_OPEN_SENTINEL, HIGHLIGHT_OPEN).replace(
+        _CLOSE_SENTINEL, HIGHLIGHT_CLOSE)
+
+
+def highlight_text(text, terms):
+    """색인을 쓰지 않은 검색의 강조 (FTS5 highlight()와 같은 표시, HTML 이스케이프)"""
+    return _mark(_terms_pattern(terms), text)
+
+
+def snippet_text(text, terms):
+    """색인을 쓰지 않은 검색의 스니펫 (FTS5 snippet()처럼 첫 일치 위치 주변만 잘라 강조)"""
+    pattern = _terms_pattern(terms)
+    match = pattern.search(text)
+    start = max(0, match.start() - SNIPPET_TOKENS // 4) if match is not None else 0
+    end = min(len(text), start + SNIPPET_TOKENS)
+    snippet = _mark(pattern, text[start:end])
+    if start > 0:
+        snippet = SNIPPET_ELLIPSIS + snippet
+    if end < len(text):
+        snippet += SNIPPET_ELLIPSIS
+    return snippet
+
+
+def search(conn, user_id, query, limit):
+    """
+    사용자 일기 검색
+
+    Args:
+        conn: SQLite 연결
+        user_id: 작성자
+        query: 검색어 (공백으로 구분, 모두 포함하는 일기만)
+        limit: 최대 결과 수
+
+    Returns:
+        list: (diaries 행, 제목 강조, 본문 스니펫, 점수) 목록. 강조/스니펫은 이스케이프된 HTML,
+            점수가 높을수록 관련도가 높다.
+    """
+    indexed, short = split_terms(query)
+    if not indexed and not short:
+        return []
+
+    short_clauses = " ".join("AND (d.title LIKE ? ESCAPE '\\' OR d.content LIKE ? ESCAPE '\\')" for _ in short)
+    short_params = [p for term in short for p in (like_pattern(term), like_pattern(term))]
+
+    if indexed:
+        owner = owner_token(conn, user_id)
+        if owner is None:
+            return []
+        rows = conn.execute(
+            "SELECT d.*, "
+            f"highlight({FTS_TABLE}, 1, ?, ?) AS title_highlight, "
+            f"snippet({FTS_TABLE}, 2, ?, ?, ?, ?) AS snippet, "
+            f"bm25({FTS_TABLE}, ?, ?, ?) AS rank "
+            f"FROM {FTS_TABLE} JOIN diaries d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH ? AND d.user_id = ? {short_clauses} "
+            "ORDER BY rank LIMIT ?",
+            (_OPEN_SENTINEL, _CLOSE_SENTINEL, _OPEN_SENTINEL, _CLOSE_SENTINEL, SNIPPET_ELLIPSIS, SNIPPET_TOKENS,
+             OWNER_WEIGHT, TITLE_WEIGHT, CONTENT_WEIGHT, match_expression(indexed, owner), user_id,
+             *short_params, limit)
+        ).fetchall()
+        # bm25는 관련도가 높을수록 작은(음수) 값
+        terms = indexed + short
+        return [
+            (
+                row,
+                # 원문에 표시 문자가 들어 있으면 FTS 결과와 구분할 수 없으므로 직접 강조
+                highlight_text(row["title"], terms) if _has_sentinel(row["title"])
+                else _fts_markup(row["title_highlight"]),
+                snippet_text(row["content"], terms) if _has_sentinel(row["content"])
+                else _fts_markup(row["snippet"]),
+                -row["rank"],
+            )
+            for row in rows
+        ]
+
+    # 짧은 검색어만 있음: 사용자 인덱스로 범위를 좁힌 뒤 LIKE (최신순)
+    rows = conn.execute(
+        f"SELECT d.* FROM diaries d WHERE d.user_id = ? {short_clauses} "
+        "ORDER BY d.created_at DESC, d.id DESC LIMIT ?",
+        (user_id, *short_params, limit)
+    ).fetchall()
+    return [
+        (row, highlight_text(row["title"], short), snippet_text(row["content"], short), 0.0)
+        for row in rows
+    ]
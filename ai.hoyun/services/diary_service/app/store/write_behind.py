@@ -0,0 +1,162 @@
+"""
+쓰기 모으기 큐 (group commit)
+
+SQLite는 트랜잭션마다 WAL 동기화 비용이 들기 때문에 일기 한 건씩 커밋하면 초당 처리량이 커밋 횟수에 묶인다.
+이 큐는 동시에 들어온 단건 쓰기를 모아 한 트랜잭션으로 커밋한다.
+
+- 한 배치를 커밋하는 동안 들어온 쓰기가 다음 배치가 된다 (부하가 높을수록 배치가 커지고, 한가할 때는 바로 커밋)
+- max_delay를 주면 첫 쓰기 이후 그 시간만큼 더 모은다 (최대 max_batch건)
+- 호출한 쪽은 자기 쓰기가 포함된 트랜잭션이 커밋된 뒤에 결과를 받는다 (응답을 받은 쓰기는 DB에 반영되어 있음)
+- 쓰기마다 SAVEPOINT를 두어 한 건이 실패해도 같은 배치의 다른 쓰기는 커밋된다
+- close(): 새 쓰기를 거절하고 큐에 남은 쓰기를 모두 커밋한 뒤 종료 (서비스 종료 시 유실 없음)
+"""
+import asyncio
+import logging
+import time
+from common.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = REGISTRY.histogram(
+    "diary_write_batch_size", "Writes committed per group-commit transaction",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+BATCH_DURATION = REGISTRY.histogram(
+    "diary_write_batch_duration_seconds", "Duration of group-commit transactions")
+QUEUE_DEPTH = REGISTRY.gauge(
+    "diary_write_queue_depth", "Writes waiting for the next group commit")
+
+_STOP = object()
+
+
+class WriteQueueClosed(RuntimeError):
+    """종료 중이라 쓰기를 받지 않음"""
+
+
+class WriteBehindQueue:
+    """
+    단건 쓰기를 모아 한 트랜잭션으로 커밋하는 큐 (SQLitePool.write와 같은 인터페이스)
+
+    Args:
+        pool: SQLitePool
+        max_batch: 트랜잭션당 최대 쓰기 수
+        max_delay: 첫 쓰기 이후 다음 쓰기를 더 기다리는 시간 (초, 0이면 기다리지 않음)
+    """
+
+    def __init__(self, pool, max_batch=256, max_delay=0.0):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._closed = False
+        self._batches = 0
+        self._writes = 0
+
+    def start(self):
+        """커밋 루프 시작 (이벤트 루프 안에서 호출)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def write(self, func, *args):
+        """
+        func(conn, *args)를 다음 배치 트랜잭션에서 실행
+
+        Returns:
+            func의 반환값 (트랜잭션 커밋 후)
+
+        Raises:
+            WriteQueueClosed: 종료 중
+        """
+        if self._closed:
+            raise WriteQueueClosed("write queue is closed")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((func, args, future))
+        QUEUE_DEPTH.inc()
+        return await future
+
+    async def close(self):
+        """새 쓰기를 거절하고 남은 쓰기를 모두 커밋"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None:
+            self._queue.put_nowait(_STOP)
+            await self._task
+
+    async def _collect(self, first):
+        """첫 쓰기 이후 max_delay 동안 max_batch건까지 모음 (종료 신호를 받으면 두 번째 값이 True)"""
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        # close()는 _closed를 먼저 세우고 종료 신호를 넣으므로 신호 뒤에는 쓰기가 없다
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = await self._collect(first)
+            QUEUE_DEPTH.dec(len(batch))
+            await self._commit(batch)
+
+    async def _commit(self, batch):
+        def apply(conn):
+            outcomes = []
+            for func, args, _ in batch:
+                conn.execute("SAVEPOINT write_behind_item")
+                try:
+                    outcomes.append((True, func(conn, *args)))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_behind_item")
+                    outcomes.append((False, e))
+                conn.execute("RELEASE write_behind_item")
+            return outcomes
+
+        started = time.perf_counter()
+        try:
+            outcomes = await self.pool.write(apply)
+        except Exception as e:
+            # 커밋 자체가 실패하면 배치 전체가 반영되지 않음
+            logger.exception("group commit failed", extra={"batch_size": len(batch)})
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        BATCH_DURATION.observe(time.perf_counter() - started)
+        BATCH_SIZE.observe(len(batch))
+        self._batches += 1
+        self._writes += len(batch)
+        for (_, _, future), (ok, value) in zip(batch, outcomes):
+            # 기다리던 요청이 취소되었어도 쓰기는 이미 커밋됨
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def stats(self):
+        return {
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000.0,
+            "pending": self._queue.qsize(),
+            "batches": self._batches,
+            "writes": self._writes,
+            "avg_batch_size": round(self._writes / self._batches, 2) if self._batches else 0.0,
+        }
@@ -0,0 +1,81 @@
+"""모델 라우팅 failover/복귀 테스트"""
+import pytest
+from routing import router as router_module
+from routing.router import ModelRouter, ModelTier
+
+MESSAGES = [{"role": "user", "content": "비교 분석해서 단계별로 설명해줘 " * 20}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(router_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def model_router(clock):
+    tiers = [
+        ModelTier(name="fast", model="fast-model", max_complexity=0.1),
+        ModelTier(name="strong", model="strong-model"),
+    ]
+    return ModelRouter(tiers, p95_threshold_ms=1000.0, min_samples=5,
+                       window_seconds=60.0, probe_interval=10.0)
+
+
+def _run(model_router, seconds, ok=True):
+    decision = model_router.route(MESSAGES, "auto")
+    model_router.observe(decision, seconds, ok=ok)
+    return decision
+
+
+def test_routes_to_preferred_tier(model_router):
+    decision = _run(model_router, 0.2)
+    assert (decision.tier, decision.reason) == ("strong", "policy")
+
+
+def test_failures_count_as_over_threshold(model_router):
+    for _ in range(5):
+        _run(model_router, 0.1, ok=False)
+    decision = model_router.route(MESSAGES, "auto")
+    assert (decision.tier, decision.reason, decision.failover_from) == ("fast", "failover", "strong")
+
+
+def test_probe_recovers_preferred_tier(model_router, clock):
+    for _ in range(5):
+        _run(model_router, 3.0)
+    assert _run(model_router, 0.1).reason == "failover"
+
+    # probe 간격 전에는 계속 failover
+    clock.now += 5.0
+    assert _run(model_router, 0.1).reason == "failover"
+
+    # 느린 probe는 복귀시키지 않음
+    clock.now += 10.0
+    probe = _run(model_router, 3.0)
+    assert (probe.tier, probe.reason) == ("strong", "probe")
+    assert _run(model_router, 0.1).reason == "failover"
+
+    # 빠른 probe가 성공하면 선호 티어로 복귀
+    clock.now += 10.0
+    assert _run(model_router, 0.2).reason == "probe"
+    assert _run(model_router, 0.2).reason == "policy"
+    assert model_router.stats()["failover"] == []
+
+
+def test_old_samples_leave_window(model_router, clock):
+    tracker = model_router.latency
+    for _ in range(5):
+        tracker.observe("strong-model", 3.0)
+    clock.now += 61.0
+    tracker.observe("strong-model", 0.2)
+    assert tracker.count("strong-model") == 1
+    assert tracker.percentile("strong-model", 95) == 0.2
@@ -0,0 +1,7 @@
+"""공통 모듈 테스트: 저장소 루트를 import 루트로 사용 (common.*)"""
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
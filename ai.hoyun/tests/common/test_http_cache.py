@@ -0,0 +1,129 @@
+"""조건부 GET(ETag/304)과 응답 압축(gzip/br, Vary) 테스트"""
+import gzip
+import pytest
+from fastapi import FastAPI, Request, Response  # type: ignore
+from fastapi.responses import StreamingResponse  # type: ignore
+from fastapi.testclient import TestClient  # type: ignore
+from common import compression
+from common.compression import CompressionMiddleware, negotiate
+from common.http_cache import ConditionalGetMiddleware, etag_matches, make_etag, not_modified
+
+BIG = {"items": ["같은 내용이 반복되는 응답 본문"] * 100}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    # 서비스 main.py와 같은 순서 (압축이 바깥쪽)
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/big")
+    def big():
+        return BIG
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/versioned")
+    def versioned(request: Request, response: Response):
+        etag = make_etag("items", 7)
+        cached = not_modified(request, etag, {"Cache-Control": "no-cache"})
+        if cached is not None:
+            return cached
+        response.headers["ETag"] = etag
+        return {"version": 7}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b'{"a":', b"1}" + b" " * 2048]), media_type="application/json")
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_compressed_response_revalidates_with_304(client):
+    first = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    etag = first.headers["etag"]
+    assert etag.endswith('-gzip"')
+    assert first.json() == BIG
+
+    again = client.get("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    # 304는 본문이 없어 압축 미들웨어를 거치지 않으므로 인코딩 접미사 없는 같은 ETag
+    assert again.headers["etag"] == etag.replace("-gzip", "")
+    assert "content-encoding" not in again.headers
+
+    # 압축하지 않은 표현의 ETag로 받은 클라이언트도 304 (인코딩 접미사 무시)
+    plain = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] == etag.replace("-gzip", "")
+    gzipped = client.get("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]})
+    assert gzipped.status_code == 304
+
+
+def test_changed_body_does_not_match(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": make_etag(b"old")})
+    assert response.status_code == 200
+
+
+def test_small_body_is_not_compressed_but_varies(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_versioned_etag_short_circuits(client):
+    first = client.get("/versioned")
+    etag = first.headers["etag"]
+    assert etag == make_etag("items", 7)
+    again = client.get("/versioned", headers={"If-None-Match": f'W/"other", {etag}'})
+    assert again.status_code == 304
+    assert again.headers["cache-control"] == "no-cache"
+
+
+def test_streaming_response_is_passed_through(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "etag" not in response.headers
+    assert response.content.startswith(b'{"a":1}')
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("*;q=0.3", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate_respects_q_values(header, expected):
+    assert negotiate(header, supported=("br", "gzip")) == expected
+
+
+def test_gzip_output_is_deterministic():
+    body = b"x" * 4096
+    assert compression.compress(body, "gzip") == compression.compress(body, "gzip")
+    assert gzip.decompress(compression.compress(body, "gzip")) == body
+
+
+def test_brotli_when_available(client):
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/big", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["etag"].endswith('-br"')
+    assert brotli is compression.brotli
+
+
+def test_etag_matches_star_and_weak_tags():
+    etag = make_etag(b"body")
+    assert etag_matches("*", etag)
+    assert etag_matches("W/" + etag, etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,132 @@
+"""Idempotency-Key 저장소 테스트 (in-flight 공유, 보존된 결과 재사용, 만료)"""
+import asyncio
+import pytest
+from common import idempotency as idempotency_module
+from common.idempotency import AsyncIdempotencyStore, IdempotencyConflict, fingerprint
+from common.shared_state import SQLiteBackend
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(idempotency_module.time, "monotonic", clock)
+    return clock
+
+
+class Work:
+    """호출 횟수를 세는 작업 (release 전까지 끝나지 않음)"""
+
+    def __init__(self, result="done"):
+        self.result = result
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        return self.result
+
+
+def test_fingerprint_normalizes_key_order():
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint(b"raw") != fingerprint(b"other")
+
+
+def test_concurrent_requests_join_in_flight_call():
+    async def scenario():
+        store = AsyncIdempotencyStore()
+        work = Work()
+        work.release = asyncio.Event()
+        first = asyncio.create_task(store.run("k", "fp", work))
+        second = asyncio.create_task(store.run("k", "fp", work))
+        await asyncio.sleep(0)
+        assert store.stats()["in_flight"] == 1
+        work.release.set()
+        return store, work, await first, await second
+
+    store, work, first, second = asyncio.run(scenario())
+    assert work.calls == 1
+    assert first == ("done", False)
+    assert second == ("done", True)
+    assert store.stats()["joins"] == 1
+
+
+def test_completed_result_is_replayed_until_ttl(clock):
+    async def scenario():
+        store = AsyncIdempotencyStore(ttl_seconds=60)
+        work = Work()
+        results = [await store.run("k", "fp", work)]
+        clock.now += 59
+        results.append(await store.run("k", "fp", work))
+        clock.now += 2
+        results.append(await store.run("k", "fp", work))
+        return store, work, results
+
+    store, work, results = asyncio.run(scenario())
+    assert [replayed for _, replayed in results] == [False, True, False]
+    assert work.calls == 2
+    assert store.stats()["hits"] == 1
+
+
+def test_same_key_with_different_body_conflicts():
+    async def scenario():
+        store = AsyncIdempotencyStore()
+        await store.run("k", "fp", Work())
+        with pytest.raises(IdempotencyConflict):
+            await store.run("k", "other", Work())
+
+    asyncio.run(scenario())
+
+
+def test_failed_or_uncacheable_call_is_not_kept():
+    async def scenario():
+        store = AsyncIdempotencyStore()
+
+        async def fail():
+            raise RuntimeError("upstream")
+
+        with pytest.raises(RuntimeError):
+            await store.run("k", "fp", fail)
+        work = Work(result=503)
+        assert await store.run("k", "fp", work, cacheable=lambda status: status < 500) == (503, False)
+        assert await store.run("k", "fp", work, cacheable=lambda status: status < 500) == (503, False)
+        return work
+
+    assert asyncio.run(scenario()).calls == 2
+
+
+def test_lru_evicts_completed_entries_only():
+    async def scenario():
+        store = AsyncIdempotencyStore(max_entries=2)
+        for key in ("a", "b", "c"):
+            await store.run(key, "fp", Work())
+        return store
+
+    store = asyncio.run(scenario())
+    assert list(store._entries) == ["b", "c"]
+
+
+def test_shared_backend_replays_result_from_other_worker(tmp_path):
+    async def scenario():
+        stores = [
+            AsyncIdempotencyStore(backend=SQLiteBackend(str(tmp_path / "state.db")))
+            for _ in range(2)
+        ]
+        work = Work()
+        first = await stores[0].run("k", "fp", work)
+        second = await stores[1].run("k", "fp", work)
+        return stores[1], work, first, second
+
+    other, work, first, second = asyncio.run(scenario())
+    assert work.calls == 1
+    assert (first, second) == (("done", False), ("done", True))
+    assert other.stats()["shared_hits"] == 1
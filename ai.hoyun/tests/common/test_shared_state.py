@@ -0,0 +1,89 @@
+"""공유 상태 저장소 테스트 (같은 SQLite 파일을 여는 두 저장소 = 두 워커)"""
+import threading
+import pytest
+from common import shared_state
+from common.shared_state import MemoryBackend, SQLiteBackend
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(shared_state.time, "time", clock)
+    monkeypatch.setattr(shared_state.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def workers(tmp_path):
+    path = str(tmp_path / "state.db")
+    return SQLiteBackend(path), SQLiteBackend(path)
+
+
+def test_token_bucket_is_shared_between_backends(workers, clock):
+    first, second = workers
+    assert first.take_token("ratelimit:*:ip:a", 1.0, 3) == 0.0
+    assert second.take_token("ratelimit:*:ip:a", 1.0, 3) == 0.0
+    assert first.take_token("ratelimit:*:ip:a", 1.0, 3) == 0.0
+    # 두 워커가 합쳐 burst만큼 쓴 뒤에는 어느 쪽이든 거절
+    assert second.take_token("ratelimit:*:ip:a", 1.0, 3) == pytest.approx(1.0)
+    assert first.take_token("ratelimit:*:ip:a", 1.0, 3) > 0
+
+    clock.now += 1.0
+    assert second.take_token("ratelimit:*:ip:a", 1.0, 3) == 0.0
+    assert first.take_token("ratelimit:*:ip:b", 1.0, 3) == 0.0
+    assert first.bucket_count("ratelimit:*:") == second.bucket_count("ratelimit:*:") == 2
+
+
+def test_concurrent_takes_never_exceed_burst(workers, clock):
+    results = []
+    lock = threading.Lock()
+
+    def take(backend):
+        for _ in range(10):
+            wait = backend.take_token("bucket", 0.001, 8)
+            with lock:
+                results.append(wait)
+
+    threads = [threading.Thread(target=take, args=(backend,)) for backend in workers for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(1 for wait in results if wait == 0.0) == 8
+    assert len(results) == 40
+
+
+def test_add_is_a_lock_across_backends(workers, clock):
+    first, second = workers
+    assert first.add("lock:k", b"worker-1", ttl=5)
+    assert not second.add("lock:k", b"worker-2", ttl=5)
+    # 다른 워커가 잡은 락은 값이 다르면 풀 수 없음
+    second.delete("lock:k", b"worker-2")
+    assert second.get("lock:k") == b"worker-1"
+    # ttl이 지나면 락을 잡은 워커가 죽었어도 다시 잡을 수 있음
+    clock.now += 6
+    assert second.add("lock:k", b"worker-2", ttl=5)
+    assert first.get("lock:k") == b"worker-2"
+
+
+def test_values_expire(workers, clock):
+    first, second = workers
+    first.set("result:k", b"v", ttl=10)
+    assert second.get("result:k") == b"v"
+    clock.now += 10
+    assert second.get("result:k") is None
+
+
+def test_memory_backend_matches_sqlite_bucket_semantics(clock):
+    backend = MemoryBackend()
+    assert [backend.take_token("k", 2.0, 2) for _ in range(3)] == [0.0, 0.0, pytest.approx(0.5)]
+    clock.now += 0.5
+    assert backend.take_token("k", 2.0, 2) == 0.0
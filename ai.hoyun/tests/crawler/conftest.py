@@ -0,0 +1,8 @@
+"""크롤러 서비스 테스트: services/crawler_service/app 을 import 루트로 사용"""
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+for path in (ROOT, os.path.join(ROOT, "services", "crawler_service", "app")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
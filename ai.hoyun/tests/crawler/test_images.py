@@ -0,0 +1,152 @@
+"""포스터 이미지 프록시 테스트 (원본 받기 리다이렉트 확인, 썸네일 디스크 캐시/LRU 정리)"""
+import io
+import os
+import pytest
+import requests
+from utils import images
+from utils.images import ImageError, _http_fetch
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+class FakeRaw(io.BytesIO):
+    def read(self, size=-1, decode_content=False):
+        return super().read(size)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, body=b""):
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.raw = FakeRaw(body)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@pytest.fixture
+def fake_get(monkeypatch):
+    """URL → 응답 표 (requests.get이 따라가지 않도록 allow_redirects=False로 불렸는지도 확인)"""
+    table = {}
+    calls = []
+
+    def get(url, allow_redirects=True, **kwargs):
+        assert allow_redirects is False
+        calls.append(url)
+        return table[url]
+
+    monkeypatch.setattr(requests, "get", get)
+    monkeypatch.setattr(images, "ALLOWED_HOSTS", ("images.justwatch.com", "www.kmdb.or.kr"))
+    return table, calls
+
+
+def test_follows_redirects_between_allowed_hosts(fake_get):
+    table, calls = fake_get
+    table["http://www.kmdb.or.kr/poster.png"] = FakeResponse(301, {"location": "https://www.kmdb.or.kr/poster.png"})
+    table["https://www.kmdb.or.kr/poster.png"] = FakeResponse(302, {"location": "/cdn/poster.png"})
+    table["https://www.kmdb.or.kr/cdn/poster.png"] = FakeResponse(200, {"content-type": "image/png"}, PNG)
+    assert _http_fetch("http://www.kmdb.or.kr/poster.png") == PNG
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("location", [
+    "http://169.254.169.254/latest/meta-data/", "http://localhost:9002/diary", "file:///etc/passwd",
+])
+def test_redirect_to_disallowed_host_is_refused(fake_get, location):
+    table, calls = fake_get
+    table["https://images.justwatch.com/poster.png"] = FakeResponse(302, {"location": location})
+    with pytest.raises(ImageError, match="not allowed"):
+        _http_fetch("https://images.justwatch.com/poster.png")
+    # 허용하지 않는 주소로는 요청하지 않음
+    assert calls == ["https://images.justwatch.com/poster.png"]
+
+
+def test_redirect_loop_is_cut_off(fake_get):
+    table, calls = fake_get
+    table["https://images.justwatch.com/a.png"] = FakeResponse(302, {"location": "/a.png"})
+    with pytest.raises(ImageError, match="too many redirects"):
+        _http_fetch("https://images.justwatch.com/a.png")
+    assert len(calls) == images.MAX_REDIRECTS + 1
+
+
+def _png(width=800, height=1200):
+    from PIL import Image  # type: ignore
+
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, "PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def poster_cache(tmp_path, monkeypatch):
+    pytest.importorskip("PIL")
+    monkeypatch.setattr(images, "ALLOWED_HOSTS", ("images.justwatch.com",))
+    fetched = []
+    source = _png()
+
+    def fetch(url):
+        fetched.append(url)
+        return source
+
+    cache = images.PosterCache(str(tmp_path / "posters"), max_bytes=10 * 1024 * 1024, fetch=fetch)
+    return cache, fetched
+
+
+def test_thumbnail_is_cached_and_original_fetched_once(poster_cache):
+    from PIL import Image  # type: ignore
+
+    cache, fetched = poster_cache
+    url = "https://images.justwatch.com/poster/1.jpg"
+    first = cache.thumbnail(url, 240, "webp")
+    again = cache.thumbnail(url, 240, "webp")
+    jpeg = cache.thumbnail(url, 160, "jpeg")
+    assert fetched == [url]
+    assert first.body == again.body and first.etag == again.etag == cache.etag(url, 240, "webp")
+    assert first.media_type == "image/webp" and jpeg.media_type == "image/jpeg"
+    with Image.open(io.BytesIO(first.body)) as image:
+        assert image.size == (240, 360)
+    assert cache.stats()["files"] == 3 and cache.stats()["originals"] == 1
+
+
+def test_thumbnail_rejects_disallowed_hosts_and_non_images(poster_cache, tmp_path):
+    cache, fetched = poster_cache
+    with pytest.raises(ImageError) as rejected:
+        cache.thumbnail("http://169.254.169.254/poster.png", 240, "webp")
+    assert rejected.value.status_code == 400
+    assert fetched == []
+
+    broken = images.PosterCache(str(tmp_path / "broken"), fetch=lambda url: b"not an image")
+    with pytest.raises(ImageError) as undecodable:
+        broken.thumbnail("https://images.justwatch.com/poster/2.jpg", 240, "jpeg")
+    assert undecodable.value.status_code == 502
+
+
+def test_eviction_removes_least_recently_used_files(tmp_path):
+    cache = images.PosterCache(str(tmp_path / "lru"), max_bytes=1000)
+    for index, name in enumerate(("a", "b", "c")):
+        cache._write(name, b"x" * 300)
+        os.utime(cache._path(name), (100 + index, 100 + index))
+    # 가장 오래된 a를 읽으면 최근 사용으로 바뀜
+    assert cache._read("a") == b"x" * 300
+    cache._write("d", b"x" * 300)
+    names = sorted(name for name, _, _ in cache._scan())
+    # 1200바이트 > 1000 → 900바이트 이하가 될 때까지 오래 안 쓴 b부터 제거
+    assert names == ["a", "c", "d"]
+    assert cache.stats()["bytes"] == 900
+
+
+def test_rewrite_images_keeps_original_and_snaps_width(monkeypatch):
+    monkeypatch.setattr(images, "ALLOWED_HOSTS", ("images.justwatch.com",))
+    items = [{"image": "https://images.justwatch.com/p.jpg"}, {"image": "https://example.com/p.jpg"}, {}]
+    images.rewrite_images(items, width=200)
+    assert items[0]["image_original"] == "https://images.justwatch.com/p.jpg"
+    assert items[0]["image"].endswith("?src=https%3A%2F%2Fimages.justwatch.com%2Fp.jpg&w=240")
+    assert items[1] == {"image": "https://example.com/p.jpg"}
+    assert images.snap_width(10_000) == images.THUMBNAIL_WIDTHS[-1]
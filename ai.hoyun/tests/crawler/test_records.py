@@ -0,0 +1,66 @@
+"""크롤링 결과 조회 테스트 (필드 선택, 제목 검색, cursor 페이지)"""
+import json
+import pytest
+from utils.records import QueryError, RecordTable, SnapshotQuery, decode_cursor, encode_cursor, render_page
+from utils.snapshot import Snapshot
+
+DATA = [
+    {"rank": i, "title": f"Movie {i}", "image": f"https://img.example/{i}.jpg"}
+    for i in range(1, 8)
+]
+
+
+def _page(snapshot, **query):
+    return json.loads(snapshot.view(SnapshotQuery(**query)).body)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('"0123456789abcdef"', 40)
+    assert decode_cursor(cursor) == ("0123456789ab", 40)
+
+
+# 형식 오류, 구분자 없음("foo"), 음수 위치("tag:-5")
+@pytest.mark.parametrize("cursor", ["not-base64!", "Zm9v", "dGFnOi01"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(QueryError) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_pages_follow_next_cursor_to_the_end():
+    snapshot = Snapshot(DATA)
+    page = _page(snapshot, fields="rank", limit=3)
+    ranks = [item["rank"] for item in page["data"]]
+    while page["next_cursor"]:
+        page = _page(snapshot, fields="rank", limit=3, cursor=page["next_cursor"])
+        ranks += [item["rank"] for item in page["data"]]
+    assert ranks == list(range(1, 8))
+    assert page["total"] == 7
+    assert page["offset"] == 6
+
+
+def test_cursor_from_other_snapshot_is_409():
+    old = Snapshot(DATA)
+    cursor = _page(old, limit=2)["next_cursor"]
+    new = Snapshot(DATA + [{"rank": 8, "title": "Movie 8", "image": None}])
+    with pytest.raises(QueryError) as error:
+        new.view(SnapshotQuery(limit=2, cursor=cursor))
+    assert error.value.status_code == 409
+
+
+def test_fields_and_title_search():
+    table = RecordTable(DATA)
+    body, count = render_page(table, SnapshotQuery(fields="title,rank", q="movie 3"), '"etag"')
+    page = json.loads(body)
+    assert count == 1
+    assert page["data"] == [{"rank": 3, "title": "Movie 3"}]
+    with pytest.raises(QueryError):
+        table.select_fields(("missing",))
+
+
+def test_views_have_own_etag_per_query():
+    snapshot = Snapshot(DATA)
+    first = snapshot.view(SnapshotQuery(limit=2))
+    second = snapshot.view(SnapshotQuery(limit=2, offset=2))
+    assert first.etag != second.etag != snapshot.etag
+    assert snapshot.view(SnapshotQuery(limit=2)).etag == first.etag
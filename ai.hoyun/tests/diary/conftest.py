@@ -0,0 +1,20 @@
+"""일기 서비스 테스트: services/diary_service/app 을 import 루트로 사용"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+for path in (ROOT, os.path.join(ROOT, "services", "diary_service", "app")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from store.diaries import DiaryStore  # noqa: E402
+
+
+@pytest.fixture
+def diary_store(tmp_path):
+    """임시 파일 DB를 쓰는 DiaryStore"""
+    store = DiaryStore(str(tmp_path / "diary.db"), readers=2)
+    yield store
+    store.close()
@@ -0,0 +1,69 @@
+"""일기 저장소 테스트 (사용자별 격리, 키셋 커서 페이지, 버전 트리거)"""
+import asyncio
+import pytest
+from store.diaries import InvalidCursor, decode_cursor, encode_cursor
+
+CREATED = 1704067200000
+
+
+def test_cursor_pages_through_entries_with_equal_created_at(diary_store):
+    async def scenario():
+        ids = [(await diary_store.create("u1", f"일기 {i}", created_at=CREATED))["id"] for i in range(5)]
+        ids.append((await diary_store.create("u1", "이전 일기", created_at=CREATED - 1))["id"])
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = await diary_store.list("u1", limit=2, cursor=cursor)
+            pages.append([entry["id"] for entry in page])
+            if cursor is None:
+                return ids, pages
+
+    ids, pages = asyncio.run(scenario())
+    # 작성 시각이 같으면 id 내림차순, 페이지 경계에서 빠지거나 겹치는 항목 없음
+    assert pages == [[ids[4], ids[3]], [ids[2], ids[1]], [ids[0], ids[5]]]
+
+
+def test_cursor_round_trip_and_invalid_cursor(diary_store):
+    assert decode_cursor(encode_cursor(CREATED, 42)) == (CREATED, 42)
+    for cursor in ("not-a-cursor", encode_cursor("x", 1), "W10"):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+    with pytest.raises(InvalidCursor):
+        asyncio.run(diary_store.list("u1", cursor="%%%"))
+
+
+def test_users_only_see_and_change_their_own_entries(diary_store):
+    async def scenario():
+        mine = await diary_store.create("u1", "내 일기")
+        theirs = await diary_store.create("u2", "남의 일기")
+        listed, _ = await diary_store.list("u1")
+        return mine, theirs, listed, (
+            await diary_store.get("u1", theirs["id"]),
+            await diary_store.update("u1", theirs["id"], content="바꿈"),
+            await diary_store.delete("u1", theirs["id"]),
+            await diary_store.get("u2", theirs["id"]),
+        )
+
+    mine, theirs, listed, (get_other, update_other, delete_other, still_there) = asyncio.run(scenario())
+    assert [entry["id"] for entry in listed] == [mine["id"]]
+    assert get_other is None and update_other is None and delete_other is False
+    assert still_there["content"] == "남의 일기"
+
+
+def test_version_increases_on_every_write_per_user(diary_store):
+    async def scenario():
+        versions = [await diary_store.version("u1")]
+        entry = await diary_store.create("u1", "하나")
+        versions.append(await diary_store.version("u1"))
+        await diary_store.update("u1", entry["id"], title="제목")
+        versions.append(await diary_store.version("u1"))
+        other_before = await diary_store.version("u2")
+        await diary_store.delete("u1", entry["id"])
+        versions.append(await diary_store.version("u1"))
+        return versions, other_before, await diary_store.version("u2")
+
+    versions, other_before, other_after = asyncio.run(scenario())
+    assert versions[0] == 0
+    assert versions == sorted(set(versions))
+    # 다른 사용자의 쓰기는 버전을 바꾸지 않음
+    assert other_before == other_after == 0
@@ -0,0 +1,56 @@
+"""NDJSON 일괄 가져오기 테스트 (잘못된 줄은 건너뛰고 보고, 나머지는 배치로 커밋)"""
+import asyncio
+import json
+import pytest
+from store.importer import InvalidLine, MAX_TIMESTAMP_MS, import_ndjson, parse_line
+
+
+@pytest.mark.parametrize("created_at", ["NaN", "Infinity", "-Infinity", "1e30", "-1e30", '"0001-01-01T00:00:00+09:00"',
+                                        '"not a date"', "true", "[1]"])
+def test_invalid_timestamps_are_invalid_lines(created_at):
+    with pytest.raises(InvalidLine):
+        parse_line('{"user_id": "u1", "content": "c", "created_at": %s}' % created_at)
+
+
+def test_timestamps_accept_iso_and_epoch_ms():
+    assert parse_line('{"user_id": "u1", "content": "c", "created_at": "2024-01-01T09:00:00+09:00"}')[3] \
+        == 1704067200000
+    row = parse_line('{"user_id": "u1", "content": "c", "created_at": 1704067200000.5, "updated_at": %d}'
+                     % MAX_TIMESTAMP_MS)
+    assert row[3:] == (1704067200000, MAX_TIMESTAMP_MS)
+
+
+def _chunks(lines, size=7):
+    body = "\n".join(lines).encode("utf-8")
+
+    async def stream():
+        # 청크 경계가 줄 중간에 오도록 잘게 나눔
+        for start in range(0, len(body), size):
+            yield body[start:start + size]
+
+    return stream()
+
+
+def test_bad_lines_are_reported_and_the_rest_imported(diary_store):
+    good = [json.dumps({"user_id": "u1", "content": f"일기 {i}", "created_at": 1704067200000 + i}) for i in range(5)]
+    lines = [
+        good[0], good[1],
+        '{"user_id": "u1", "content": "nan", "created_at": NaN}',
+        good[2],
+        '{"user_id": "u1", "content": "big", "created_at": 1e30}',
+        "not json",
+        "",
+        good[3], good[4],
+    ]
+
+    async def scenario():
+        result = await import_ndjson(diary_store.pool, _chunks(lines), batch_size=2)
+        page, _ = await diary_store.list("u1", limit=10)
+        return result, page
+
+    result, page = asyncio.run(scenario())
+    assert result["imported"] == 5
+    assert result["failed"] == 3
+    assert [error["line"] for error in result["errors"]] == [3, 5, 6]
+    assert result["batches"] == 3
+    assert [entry["content"] for entry in page] == [f"일기 {i}" for i in reversed(range(5))]
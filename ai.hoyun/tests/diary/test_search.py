@@ -0,0 +1,58 @@
+"""일기 검색 테스트 (강조/스니펫 HTML 이스케이프)"""
+import asyncio
+
+
+def _search(store, entries, query, user_id="u1"):
+    async def scenario():
+        for owner, title, content in entries:
+            await store.create(owner, content, title=title)
+        return await store.search(user_id, query)
+
+    return asyncio.run(scenario())
+
+
+def test_indexed_highlight_escapes_html(diary_store):
+    results = _search(diary_store, [("u1", "<b>산책로</b>", "<img src=x onerror=alert(1)> 산책로 걷기")], "산책로")
+    assert len(results) == 1
+    result = results[0]
+    assert result["title_highlight"] == "&lt;b&gt;<mark>산책로</mark>&lt;/b&gt;"
+    assert "<img" not in result["snippet"]
+    assert "&lt;img src=x onerror=alert(1)&gt;" in result["snippet"]
+    assert "<mark>산책로</mark>" in result["snippet"]
+    # 원문 필드는 그대로
+    assert result["title"] == "<b>산책로</b>"
+
+
+def test_short_term_highlight_escapes_html(diary_store):
+    results = _search(diary_store, [("u1", "비 & <i>바람</i>", "<script>비</script>")], "비")
+    assert len(results) == 1
+    result = results[0]
+    assert result["title_highlight"] == "<mark>비</mark> &amp; &lt;i&gt;바람&lt;/i&gt;"
+    assert result["snippet"] == "&lt;script&gt;<mark>비</mark>&lt;/script&gt;"
+
+
+def test_sentinel_characters_in_content_do_not_become_markup(diary_store):
+    results = _search(diary_store, [("u1", "", "\x02<x>\x03 산책로")], "산책로")
+    assert results[0]["snippet"].count("<mark>") == 1
+    assert "<x>" not in results[0]["snippet"]
+
+
+def test_indexed_search_only_returns_the_users_entries(diary_store):
+    entries = [("u1", "한강", "한강 공원 산책"), ("u2", "한강", "한강 공원 산책"), ("u2", "", "공원 산책로")]
+    assert [r["user_id"] for r in _search(diary_store, entries, "공원 산책")] == ["u1"]
+
+
+def test_search_for_user_without_entries_is_empty(diary_store):
+    assert _search(diary_store, [("u1", "", "한강 공원 산책")], "산책", user_id="nobody") == []
+
+
+def test_short_terms_use_like_within_the_user_newest_first(diary_store):
+    entries = [("u1", "", "비 오는 날"), ("u2", "", "비 오는 날"), ("u1", "", "맑음"), ("u1", "", "또 비")]
+    results = _search(diary_store, entries, "비")
+    assert [r["content"] for r in results] == ["또 비", "비 오는 날"]
+    assert all(r["score"] == 0.0 for r in results)
+
+
+def test_mixed_terms_require_both_and_like_escapes_wildcards(diary_store):
+    entries = [("u1", "", "100% 산책로 완주"), ("u1", "", "산책로 10x 완주"), ("u1", "", "산책로만")]
+    assert [r["content"] for r in _search(diary_store, entries, "산책로 0%")] == ["100% 산책로 완주"]
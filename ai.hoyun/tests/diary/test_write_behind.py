@@ -0,0 +1,69 @@
+"""쓰기 모으기 큐 테스트 (한 트랜잭션 안의 쓰기별 SAVEPOINT, 종료 시 남은 쓰기 커밋)"""
+import asyncio
+import sqlite3
+import pytest
+from store.write_behind import WriteBehindQueue, WriteQueueClosed
+
+
+def _insert(content):
+    def insert(conn):
+        return conn.execute(
+            "INSERT INTO diaries (user_id, title, content, created_at, updated_at) VALUES ('u1', '', ?, 1, 1)",
+            (content,)
+        ).lastrowid
+    return insert
+
+
+def _insert_then_fail(conn):
+    # 같은 쓰기 안에서 먼저 넣은 행도 함께 되돌려져야 함
+    _insert("half written")(conn)
+    raise RuntimeError("boom")
+
+
+def _contents(diary_store):
+    def select(conn):
+        return [row[0] for row in conn.execute("SELECT content FROM diaries ORDER BY id")]
+    return asyncio.run(diary_store.pool.read(select))
+
+
+def test_failed_write_is_isolated_within_its_batch(diary_store):
+    async def scenario():
+        queue = WriteBehindQueue(diary_store.pool, max_batch=16, max_delay=0.05)
+        queue.start()
+        results = await asyncio.gather(
+            queue.write(_insert("first")),
+            queue.write(_insert_then_fail),
+            queue.write(_insert(None)),
+            queue.write(_insert("last")),
+            return_exceptions=True,
+        )
+        await queue.close()
+        return results, queue.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert isinstance(results[1], RuntimeError)
+    assert isinstance(results[2], sqlite3.IntegrityError)
+    assert isinstance(results[0], int) and isinstance(results[3], int)
+    # 네 쓰기가 한 트랜잭션으로 커밋되고, 실패한 두 쓰기만 반영되지 않음
+    assert stats["batches"] == 1 and stats["writes"] == 4
+    assert _contents(diary_store) == ["first", "last"]
+
+
+def test_close_commits_pending_writes_and_rejects_new_ones(diary_store):
+    async def scenario():
+        queue = WriteBehindQueue(diary_store.pool, max_batch=2, max_delay=1.0)
+        queue.start()
+        diary_store.use_writer(queue)
+        tasks = [asyncio.create_task(diary_store.create("u1", f"일기 {i}")) for i in range(5)]
+        await asyncio.sleep(0)
+        await queue.close()
+        created = [task.result() for task in tasks]
+        with pytest.raises(WriteQueueClosed):
+            await diary_store.create("u1", "닫힌 뒤")
+        return created, queue.stats()
+
+    created, stats = asyncio.run(scenario())
+    # close()는 max_delay를 기다리지 않고 남은 쓰기를 모두 커밋한 뒤 끝남
+    assert [entry["content"] for entry in created] == [f"일기 {i}" for i in range(5)]
+    assert stats["writes"] == 5 and stats["pending"] == 0
+    assert _contents(diary_store) == [f"일기 {i}" for i in range(5)]
@@ -0,0 +1,56 @@
+"""게이트웨이 테스트: gateway/app 을 import 루트로 사용"""
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import httpx  # type: ignore
+import pytest
+from fastapi import FastAPI  # type: ignore
+from fastapi.testclient import TestClient  # type: ignore
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+for path in (ROOT, os.path.join(ROOT, "gateway", "app")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from proxy.engine import ProxyEngine  # noqa: E402
+
+
+def gateway_app(engine):
+    """main.py와 같은 방식으로 라우트 접두사마다 프록시 핸들러를 등록한 앱"""
+    @asynccontextmanager
+    async def lifespan(app):
+        await engine.startup()
+        yield
+        await engine.shutdown()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.engine = engine
+    for route in engine.routes:
+        for path in (route.prefix, route.prefix + "/{path:path}"):
+            app.add_api_route(path, engine.handle, methods=list(route.methods))
+    return app
+
+
+@pytest.fixture
+def make_gateway():
+    """
+    (라우트 목록, 업스트림) → 게이트웨이 TestClient
+
+    업스트림이 ASGI 앱이면 httpx.ASGITransport로 바로 전달하고,
+    httpx transport(MockTransport 등)면 그대로 사용한다.
+    """
+    clients = []
+
+    def make(routes, upstream, **options):
+        if not isinstance(upstream, httpx.AsyncBaseTransport):
+            upstream = httpx.ASGITransport(app=upstream)
+        engine = ProxyEngine(routes, health_interval=0, transport=upstream, **options)
+        client = TestClient(gateway_app(engine))
+        client.__enter__()
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.__exit__(None, None, None)
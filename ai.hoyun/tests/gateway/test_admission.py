@@ -0,0 +1,163 @@
+"""수용 제어 테스트 (동시 처리 슬롯 FIFO 인계, 티켓 반납, 대기열 제한, 토큰 버킷)"""
+import asyncio
+import threading
+import pytest
+from proxy.admission import (
+    AdmissionRejected, ConcurrencyLimiter, ConcurrencyPolicy, RateLimitPolicy, TokenBucketLimiter, _per_worker,
+)
+from common.shared_state import MemoryBackend
+
+
+def _limiter(max_concurrency=1, max_queue=8, queue_timeout=5.0):
+    return ConcurrencyLimiter("/svc", ConcurrencyPolicy(max_concurrency, max_queue, queue_timeout))
+
+
+def test_slots_are_handed_off_in_fifo_order():
+    async def scenario():
+        limiter = _limiter()
+        holder = await limiter.acquire()
+        order = []
+        in_flight = []
+
+        async def request(name):
+            ticket = await limiter.acquire()
+            order.append(name)
+            in_flight.append(limiter.in_flight)
+            ticket.release()
+
+        tasks = [asyncio.create_task(request(name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        assert limiter.queued == 3
+
+        holder.release()
+        # 반납 직후 들어온 요청도 대기열 맨 뒤로 (빈 슬롯을 가로채지 않음)
+        tasks.append(asyncio.create_task(request("late")))
+        await asyncio.gather(*tasks)
+        return limiter, order, in_flight
+
+    limiter, order, in_flight = asyncio.run(scenario())
+    assert order == ["a", "b", "c", "late"]
+    # 슬롯은 반납되지 않고 다음 대기자에게 넘어감
+    assert in_flight == [1, 1, 1, 1]
+    assert limiter.in_flight == 0
+    assert limiter.stats()["admitted"] == 5
+
+
+def test_ticket_release_is_idempotent():
+    async def scenario():
+        limiter = _limiter(max_concurrency=2)
+        first = await limiter.acquire()
+        second = await limiter.acquire()
+        first.release()
+        first.release()
+        return limiter, second
+
+    limiter, second = asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    second.release()
+    assert limiter.in_flight == 0
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario():
+        limiter = _limiter(max_queue=1)
+        holder = await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        holder.release()
+        (await waiting).release()
+        return limiter, rejected.value
+
+    limiter, rejected = asyncio.run(scenario())
+    assert (rejected.status_code, rejected.reason) == (503, "queue_full")
+    assert rejected.retry_after > 0
+    assert limiter.stats()["rejected"]["queue_full"] == 1
+
+
+def test_queue_timeout_rejects_and_keeps_slot_accounting():
+    async def scenario():
+        limiter = _limiter(queue_timeout=0.01)
+        holder = await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        holder.release()
+        return limiter, rejected.value
+
+    limiter, rejected = asyncio.run(scenario())
+    assert rejected.reason == "queue_timeout"
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+def test_cancelled_waiter_passes_slot_to_next():
+    async def scenario():
+        limiter = _limiter()
+        holder = await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        nxt = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        # 슬롯을 넘겨받은 직후(아직 실행되기 전) 취소된 대기자
+        holder.release()
+        cancelled.cancel()
+        ticket = await asyncio.wait_for(nxt, timeout=1)
+        assert limiter.in_flight == 1
+        ticket.release()
+        return limiter, cancelled
+
+    limiter, cancelled = asyncio.run(scenario())
+    assert cancelled.cancelled()
+    assert limiter.in_flight == 0
+
+
+def test_token_bucket_limits_per_client():
+    limiter = TokenBucketLimiter("/svc", RateLimitPolicy(rate=0.1, burst=2), state=MemoryBackend())
+
+    def take(key):
+        return asyncio.run(limiter.try_acquire(key))
+
+    assert take("ip:a") == 0.0
+    assert take("ip:a") == 0.0
+    assert take("ip:a") > 0
+    # 다른 클라이언트는 자기 버킷 사용
+    assert take("ip:b") == 0.0
+    assert limiter.stats()["limited"] == 1
+
+
+def test_shared_token_bucket_is_taken_off_the_event_loop():
+    class SharedBackend(MemoryBackend):
+        shared = True
+        threads = []
+
+        def take_token(self, *args):
+            self.threads.append(threading.get_ident())
+            return super().take_token(*args)
+
+    async def scenario():
+        limiter = TokenBucketLimiter("/svc", RateLimitPolicy(rate=1.0, burst=1), state=SharedBackend())
+        return await limiter.try_acquire("ip:a"), threading.get_ident()
+
+    wait, loop_thread = asyncio.run(scenario())
+    assert wait == 0.0
+    assert SharedBackend.threads and SharedBackend.threads[0] != loop_thread
+
+
+@pytest.mark.parametrize("max_concurrency, max_queue, workers", [(32, 128, 5), (64, 1, 4), (8, 3, 3), (4, 0, 2)])
+def test_per_worker_split_never_exceeds_route_cap(max_concurrency, max_queue, workers):
+    policy = _per_worker(ConcurrencyPolicy(max_concurrency, max_queue, 1.0), workers)
+    assert policy.max_concurrency * workers <= max_concurrency
+    assert policy.max_queue * workers <= max_queue
+    assert policy.max_concurrency >= 1
+
+
+def test_worker_with_no_queue_share_rejects_when_full():
+    async def scenario():
+        limiter = ConcurrencyLimiter("/svc", _per_worker(ConcurrencyPolicy(2, 1, 1.0), 2))
+        ticket = await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        ticket.release()
+        return rejected.value
+
+    assert asyncio.run(scenario()).reason == "queue_full"
@@ -0,0 +1,65 @@
+"""게이트웨이를 거친 크롤링 결과 페이지 조회 테스트 (크롤러 서비스는 저장해 둔 결과로 실행)"""
+import importlib.util
+import json
+import os
+import sys
+import pytest
+from proxy.routes import ROUTES
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CRAWLER_APP_DIR = os.path.join(ROOT, "services", "crawler_service", "app")
+FIXTURES_DIR = os.path.join(ROOT, "services", "crawler_service", "fixtures", "crawl")
+
+
+@pytest.fixture
+def crawler_app(monkeypatch, tmp_path):
+    """크롤러 서비스 앱 (fixture 모드, 게이트웨이의 main과 겹치지 않도록 다른 모듈 이름으로 로드)"""
+    monkeypatch.setenv("CRAWLER_FIXTURES_DIR", FIXTURES_DIR)
+    monkeypatch.setenv("CRAWLER_FIXTURE_DELAY", "0")
+    monkeypatch.setenv("CRAWLER_DB_PATH", str(tmp_path / "crawler.db"))
+    monkeypatch.setenv("SHARED_STATE_BACKEND", "memory")
+    if CRAWLER_APP_DIR not in sys.path:
+        monkeypatch.syspath_prepend(CRAWLER_APP_DIR)
+    spec = importlib.util.spec_from_file_location("crawler_main", os.path.join(CRAWLER_APP_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("path, fixture", [("/crawler/netflix", "netflix"), ("/crawler/movie", "movie")])
+def test_pages_through_gateway_without_rate_limit(make_gateway, crawler_app, path, fixture):
+    client = make_gateway(ROUTES, crawler_app)
+    params = {"fields": "title", "limit": 20}
+    titles = []
+    pages = 0
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        titles += [item["title"] for item in page["data"]]
+        pages += 1
+        if not page["next_cursor"]:
+            break
+        params = {"fields": "title", "limit": 20, "cursor": page["next_cursor"]}
+
+    expected = [item["title"] for item in _fixture(fixture)]
+    assert titles == expected
+    # 라우트 속도 제한(burst 2~3)보다 많은 요청이 모두 통과
+    assert pages > 3
+
+
+@pytest.mark.parametrize("path, burst", [("/crawler/netflix", 2), ("/crawler/movie", 3)])
+def test_refresh_requests_are_rate_limited(make_gateway, crawler_app, path, burst):
+    client = make_gateway(ROUTES, crawler_app)
+    for _ in range(burst):
+        assert client.get(path, params={"refresh": "true", "limit": 1}).status_code == 200
+    response = client.get(path, params={"refresh": "true", "limit": 1})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+    # 크롤링을 시작하지 않는 페이지 조회는 계속 허용
+    assert client.get(path, params={"limit": 1}).status_code == 200
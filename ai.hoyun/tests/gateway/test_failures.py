@@ -0,0 +1,44 @@
+"""업스트림 실패 응답 테스트"""
+import httpx  # type: ignore
+import pytest
+from proxy.resilience import CircuitPolicy
+from proxy.routes import Route
+from proxy.transforms import ChatErrorTransform
+
+
+def _failing(exc):
+    def handler(request):
+        raise exc
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.parametrize("exc, status_code, detail", [
+    (httpx.ReadTimeout(""), 504, "Upstream timeout (ReadTimeout)"),
+    (httpx.ConnectTimeout(""), 504, "Upstream timeout (ConnectTimeout)"),
+    (httpx.ConnectError("connection refused"), 502, "Upstream error (ConnectError: connection refused)"),
+])
+def test_failure_detail_names_exception(make_gateway, exc, status_code, detail):
+    client = make_gateway([Route(prefix="/svc", upstream="http://svc")], _failing(exc))
+    response = client.get("/svc/items")
+    assert response.status_code == status_code
+    assert response.json() == {"detail": detail}
+
+
+def test_open_circuit_returns_503_with_retry_after(make_gateway):
+    route = Route(prefix="/svc", upstream="http://svc",
+                  circuit=CircuitPolicy(failure_threshold=1, recovery_timeout=30.0))
+    client = make_gateway([route], _failing(httpx.ReadTimeout("")))
+    assert client.get("/svc/items").status_code == 504
+
+    response = client.get("/svc/items")
+    assert response.status_code == 503
+    assert response.json()["detail"].startswith("Upstream unavailable (circuit open")
+    assert int(response.headers["retry-after"]) > 0
+
+
+def test_chat_failure_message_is_not_empty(make_gateway):
+    route = Route(prefix="/chatbot", upstream="http://chatbot", methods=("GET", "POST"),
+                  transform=ChatErrorTransform())
+    client = make_gateway([route], _failing(httpx.ReadTimeout("")))
+    response = client.post("/chatbot/chat", json={"message": "hi"})
+    assert response.json()["message"] == "서버 연결 오류: Upstream timeout (ReadTimeout)"
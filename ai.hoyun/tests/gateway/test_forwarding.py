@@ -0,0 +1,15 @@
+"""요청 전달 테스트 (경로/쿼리 문자열)"""
+from fastapi import FastAPI, Request  # type: ignore
+from proxy.routes import Route
+
+
+def test_path_and_query_are_forwarded_once(make_gateway):
+    upstream = FastAPI()
+
+    @upstream.get("/svc/{name}")
+    def echo(name: str, request: Request):
+        return {"name": name, "query": request.url.query}
+
+    client = make_gateway([Route(prefix="/svc", upstream="http://svc")], upstream)
+    response = client.get("/svc/a%20b", params={"limit": 1, "q": "x y"})
+    assert response.json() == {"name": "a b", "query": "limit=1&q=x%20y"}
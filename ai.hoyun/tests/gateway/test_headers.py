@@ -0,0 +1,26 @@
+"""업스트림 응답 헤더 전달 테스트"""
+from fastapi import FastAPI, Response  # type: ignore
+from proxy.routes import Route
+
+
+def test_repeated_response_headers_are_kept(make_gateway):
+    upstream = FastAPI()
+
+    @upstream.get("/svc/login")
+    def login():
+        response = Response(b"ok")
+        response.set_cookie("session", "abc")
+        response.set_cookie("theme", "dark")
+        response.headers.append("Link", "</a>; rel=preload")
+        response.headers.append("Link", "</b>; rel=preload")
+        response.headers["Server"] = "upstream"
+        return response
+
+    client = make_gateway([Route(prefix="/svc", upstream="http://svc")], upstream)
+    response = client.get("/svc/login")
+
+    assert response.status_code == 200
+    cookies = response.headers.get_list("set-cookie")
+    assert [c.split(";")[0] for c in cookies] == ["session=abc", "theme=dark"]
+    assert response.headers.get_list("link") == ["</a>; rel=preload", "</b>; rel=preload"]
+    assert response.headers.get("server") != "upstream"
@@ -0,0 +1,83 @@
+"""헤징 요청 테스트: 사용하지 않은 응답도 닫혀 레플리카 in-flight 수가 남지 않아야 함"""
+import asyncio
+import httpx  # type: ignore
+from proxy.routes import Route
+
+class _Body(httpx.AsyncByteStream):
+    """스트리밍으로 전달되는 응답 본문 (MockTransport 응답을 게이트웨이가 aiter_raw로 읽을 수 있게)"""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def __aiter__(self):
+        yield self.data
+
+
+def _reply(request):
+    return httpx.Response(200, stream=_Body(request.url.host.encode()))
+
+
+ROUTE = Route(prefix="/svc", upstream="http://a,http://b", hedge_after=0.05)
+
+
+def _in_flight(client):
+    pool = client.app.state.engine._pools[ROUTE.upstream]
+    return {url: replica.in_flight for url, replica in pool.replicas.items()}
+
+
+def _requests(client):
+    pool = client.app.state.engine._pools[ROUTE.upstream]
+    return sum(replica.requests for replica in pool.replicas.values())
+
+
+def test_slow_primary_is_cancelled_when_hedge_wins(make_gateway):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.host)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return _reply(request)
+
+    client = make_gateway([ROUTE], httpx.MockTransport(handler))
+    response = client.get("/svc/items")
+    assert response.status_code == 200
+    assert response.text == calls[1]
+    assert _in_flight(client) == {"http://a": 0, "http://b": 0}
+
+
+def test_losing_response_finished_during_cancel_is_closed(make_gateway):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.host)
+        if len(calls) == 1:
+            # 취소가 도착한 순간 응답이 이미 와 있던 경우
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                pass
+        return _reply(request)
+
+    client = make_gateway([ROUTE], httpx.MockTransport(handler))
+    assert client.get("/svc/items").status_code == 200
+    assert _requests(client) == 2
+    assert _in_flight(client) == {"http://a": 0, "http://b": 0}
+
+
+def test_responses_finishing_together_are_both_released(make_gateway):
+    hedged = asyncio.Event()
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.host)
+        if len(calls) == 1:
+            await hedged.wait()
+        else:
+            hedged.set()
+        return _reply(request)
+
+    client = make_gateway([ROUTE], httpx.MockTransport(handler))
+    assert client.get("/svc/items").status_code == 200
+    assert _requests(client) == 2
+    assert _in_flight(client) == {"http://a": 0, "http://b": 0}
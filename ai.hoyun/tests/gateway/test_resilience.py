@@ -0,0 +1,139 @@
+"""서킷 브레이커, 재시도 예산, 적응형 타임아웃 테스트"""
+import pytest
+from proxy import resilience
+from proxy.resilience import (
+    CLOSED, HALF_OPEN, OPEN,
+    AdaptiveTimeout, AdaptiveTimeoutPolicy, CircuitBreaker, CircuitPolicy, RetryBudget,
+)
+from proxy.engine import ProxyEngine
+from proxy.routes import ROUTES
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("svc", CircuitPolicy(failure_threshold=3, recovery_timeout=10.0))
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == 10.0
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_circuit_half_open_allows_limited_trial_calls(clock):
+    breaker = CircuitBreaker("svc", CircuitPolicy(failure_threshold=1, recovery_timeout=10.0))
+    breaker.record_failure()
+    clock.now += 10.0
+    assert breaker.available()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # 시험 요청이 진행 중이면 다른 요청은 거절
+    assert not breaker.available()
+    assert not breaker.allow()
+    # 취소된 시험 요청은 자리를 반환
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_circuit_reopens_when_trial_call_fails(clock):
+    breaker = CircuitBreaker("svc", CircuitPolicy(failure_threshold=5, recovery_timeout=10.0))
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 10.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 10.0
+
+
+def test_retry_budget_limits_retries_to_ratio_of_requests(clock):
+    budget = RetryBudget(ratio=0.5, min_per_second=0.1, window=10.0)
+    # 요청이 없어도 min_per_second * window(1회)는 허용
+    assert budget.try_retry()
+    assert not budget.try_retry()
+    for _ in range(4):
+        budget.record_request()
+    assert budget.try_retry()
+    assert budget.try_retry()
+    assert not budget.try_retry()
+    assert budget.stats() == {"requests": 4, "retries": 3, "exhausted": 2}
+
+
+def test_retry_budget_window_expires(clock):
+    budget = RetryBudget(ratio=0.0, min_per_second=0.1, window=10.0)
+    assert budget.try_retry()
+    assert not budget.try_retry()
+    clock.now += 10.1
+    assert budget.try_retry()
+
+
+def test_adaptive_timeout_uses_max_until_enough_samples():
+    timeout = AdaptiveTimeout(30.0, AdaptiveTimeoutPolicy(min_timeout=1.0, min_samples=20))
+    for _ in range(10):
+        timeout.observe(0.1)
+    assert not timeout.ready
+    assert timeout.current == 30.0
+
+
+def test_adaptive_timeout_clamps_to_min_and_max():
+    fast = AdaptiveTimeout(30.0, AdaptiveTimeoutPolicy(min_timeout=1.0, min_samples=10))
+    for _ in range(20):
+        fast.observe(0.01)
+    assert fast.current == 1.0
+
+    slow = AdaptiveTimeout(30.0, AdaptiveTimeoutPolicy(min_timeout=1.0, min_samples=10))
+    for _ in range(20):
+        slow.observe(25.0)
+    assert slow.current == 30.0
+
+    mid = AdaptiveTimeout(30.0, AdaptiveTimeoutPolicy(percentile=99, multiplier=2.0,
+                                                       min_timeout=1.0, min_samples=10))
+    for _ in range(20):
+        mid.observe(3.0)
+    assert mid.current == 6.0
+
+
+@pytest.mark.parametrize("prefix", ["/crawler/netflix", "/crawler/movie"])
+def test_crawl_routes_use_fixed_timeout(prefix):
+    # 캐시 응답이 분위수를 낮춰 실제 크롤링이 끊기지 않도록 크롤링 라우트는 고정 타임아웃
+    route = next(r for r in ROUTES if r.prefix == prefix)
+    assert route.adaptive_timeout is None
+
+
+@pytest.mark.parametrize("path", ["/chatbot/chat", "/chatbot/chat/stream"])
+def test_chat_routes_use_fixed_timeout(path):
+    # 빠른 통계 조회가 분위수를 낮춰도 스트리밍하지 않는 챗 POST(답변 완성까지 헤더 대기)가 끊기지 않음
+    engine = ProxyEngine(ROUTES, health_interval=0)
+    stats_route = engine.match("/chatbot/stats")
+    for _ in range(200):
+        engine._timeouts[stats_route.prefix].observe(0.01)
+    assert engine._timeout(stats_route).read == stats_route.adaptive_timeout.min_timeout
+
+    chat_route = engine.match(path)
+    assert chat_route.prefix == "/chatbot/chat"
+    assert chat_route.adaptive_timeout is None
+    assert engine._timeout(chat_route).read == 60.0
+    assert chat_route.dedupe_posts and chat_route.observer is not None
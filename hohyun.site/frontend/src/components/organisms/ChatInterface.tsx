@@ -9,8 +9,21 @@ interface Message {
   role: "user" | "assistant";
   content: string;
   timestamp: Date;
+  idempotencyKey?: string; // 사용자 메시지마다 한 번 생성, 재전송 시 같은 키 사용
+  failed?: boolean; // 전송 실패한 사용자 메시지 (다시 보내기 가능)
+  isError?: boolean; // 오류 안내 메시지 (대화 히스토리에서 제외)
 }
 
+// 백엔드로 보낼 대화 히스토리 (오류 안내 메시지 제외)
+// 재전송 요청의 본문이 처음 요청과 같아야 서버가 같은 Idempotency-Key로 처리함
+const buildConversationHistory = (messages: Message[]) =>
+  messages
+    .filter((msg) => !msg.isError)
+    .map((msg) => ({
+      role: msg.role as "user" | "assistant",
+      content: msg.content,
+    }));
+
 // localStorage 키 생성 (사용자별)
 const getChatMessagesKey = (userId: string | null): string => {
   if (!userId) return "chat_messages_anonymous";
@@ -113,37 +126,19 @@ export const ChatInterface: React.FC = () => {
     return () => clearInterval(interval);
   }, []);
 
-  const handleSend = async (e?: React.FormEvent) => {
-    e?.preventDefault();
-    
-    if (!input.trim() || isLoading) return;
-
-    const userMessage = input.trim();
-    setInput("");
+  // 사용자 메시지를 전송하고 응답(또는 오류 안내)을 추가
+  // history: 이 메시지 이전의 대화 (재전송 시에도 처음 전송 때와 같은 범위)
+  const requestReply = async (userMessage: Message, history: Message[]) => {
     setError(null);
-
-    // 사용자 메시지 추가
-    const newUserMessage: Message = {
-      role: "user",
-      content: userMessage,
-      timestamp: new Date(),
-    };
-    setMessages((prev) => [...prev, newUserMessage]);
-
     setIsLoading(true);
 
     try {
-      // 대화 히스토리 생성 (백엔드 API 형식에 맞춤)
-      const conversationHistory = messages.map((msg) => ({
-        role: msg.role as "user" | "assistant",
-        content: msg.content,
-      }));
-
       const response = await sendChatMessage({
-        message: userMessage,
+        message: userMessage.content,
         model: "gpt-3.5-turbo",
         system_message: "You are a helpful assistant. Respond in Korean.",
-        conversation_history: conversationHistory,
+        conversation_history: buildConversationHistory(history),
+        idempotencyKey: userMessage.idempotencyKey,
       });
 
       // 응답 메시지 추가
@@ -193,19 +188,59 @@ export const ChatInterface: React.FC = () => {
       
       setError(errorMessage);
       
-      // 에러 메시지도 표시
+      // 에러 메시지도 표시하고, 사용자 메시지는 다시 보낼 수 있게 표시
       const errorMsg: Message = {
         role: "assistant",
         content: `❌ ${errorTitle}\n\n${errorMessage}\n\n${err.code === "OPENAI_QUOTA_EXCEEDED" ? "관리자에게 문의해주세요." : "잠시 후 다시 시도해주세요."}`,
         timestamp: new Date(),
+        isError: true,
       };
-      setMessages((prev) => [...prev, errorMsg]);
+      setMessages((prev) => [
+        ...prev.map((msg) => (msg === userMessage ? { ...msg, failed: true } : msg)),
+        errorMsg,
+      ]);
     } finally {
       setIsLoading(false);
       inputRef.current?.focus();
     }
   };
 
+  const handleSend = async (e?: React.FormEvent) => {
+    e?.preventDefault();
+    
+    if (!input.trim() || isLoading) return;
+
+    setInput("");
+
+    // 사용자 메시지 추가 (Idempotency-Key는 메시지마다 한 번만 생성)
+    const newUserMessage: Message = {
+      role: "user",
+      content: input.trim(),
+      timestamp: new Date(),
+      idempotencyKey: crypto.randomUUID(),
+    };
+    setMessages((prev) => [...prev, newUserMessage]);
+
+    await requestReply(newUserMessage, messages);
+  };
+
+  // 실패한 메시지를 같은 Idempotency-Key로 다시 전송
+  // (앞선 요청이 서버에서 아직 처리 중이거나 이미 끝났으면 새로 생성하지 않고 그 응답을 받음)
+  const handleResend = async (index: number) => {
+    if (isLoading) return;
+
+    const failedMessage = messages[index];
+    const resent: Message = {
+      ...failedMessage,
+      failed: false,
+      idempotencyKey: failedMessage.idempotencyKey || crypto.randomUUID(),
+    };
+    // 실패 메시지 뒤의 오류 안내는 제거 (다시 보내기는 마지막 메시지에만 표시됨)
+    setMessages([...messages.slice(0, index), resent]);
+
+    await requestReply(resent, messages.slice(0, index));
+  };
+
   const handleKeyPress = (e: React.KeyboardEvent<HTMLInputElement>) => {
     if (e.key === "Enter" && !e.shiftKey) {
       e.preventDefault();
@@ -343,6 +378,17 @@ export const ChatInterface: React.FC = () => {
                     }`}
                   >
                     <p className="whitespace-pre-wrap break-words">{msg.content}</p>
+                    {msg.role === "user" && msg.failed &&
+                      messages.slice(index + 1).every((next) => next.isError) && (
+                      <button
+                        type="button"
+                        onClick={() => handleResend(index)}
+                        disabled={isLoading}
+                        className="mt-2 text-xs text-gray-300 underline hover:text-white disabled:opacity-50"
+                      >
+                        다시 보내기
+                      </button>
+                    )}
                   </div>
                 </div>
               ))}
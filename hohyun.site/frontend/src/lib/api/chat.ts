@@ -21,6 +21,7 @@ export interface ChatRequest {
   }>;
   conversationId?: string;
   history?: ChatMessage[]; // 하위 호환성을 위해 유지
+  idempotencyKey?: string; // 사용자 메시지마다 한 번 만들고 재전송 시 같은 값을 사용하면 서버가 하나의 응답으로 처리
   [key: string]: any;
 }
 
@@ -45,6 +46,7 @@ export interface ChatResponse {
  * @param request.model - 사용할 모델 (기본값: "gpt-3.5-turbo")
  * @param request.system_message - 시스템 메시지 (기본값: "You are a helpful assistant. Respond in Korean.")
  * @param request.conversation_history - 대화 히스토리 (연속적인 대화를 위해 사용)
+ * @param request.idempotencyKey - Idempotency-Key 헤더 값 (호출하는 쪽에서 사용자 메시지마다 생성, 없으면 헤더 생략)
  */
 export const sendChatMessage = async (
   request: ChatRequest
@@ -71,9 +73,12 @@ export const sendChatMessage = async (
     requestBody.conversation_history = conversationHistory;
   }
 
+  // 같은 키로 다시 보낸 요청은 서버에서 하나의 completion으로 처리됨
+  // (키를 여기서 새로 만들면 재전송마다 키가 달라져 중복 처리를 막지 못하므로 호출하는 쪽의 키만 사용)
   const response = await chatApiClient.post<ChatResponse>(
     "/chatbot/chat",
-    requestBody
+    requestBody,
+    request.idempotencyKey ? { headers: { "Idempotency-Key": request.idempotencyKey } } : undefined
   );
   return response.data;
 };
@@ -253,10 +253,14 @@ class ChatApiClient {
         url,
         {
           method: "POST",
-          headers: this.getHeaders(),
           credentials: "include",
           body: body ? JSON.stringify(body) : undefined,
           ...options,
+          // 기본 헤더에 요청별 헤더(Idempotency-Key 등)를 덧붙임
+          headers: {
+            ...(this.getHeaders() as Record<string, string>),
+            ...(options.headers as Record<string, string> | undefined),
+          },
         },
         options.timeout || 30000
       );